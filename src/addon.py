@@ -14,6 +14,7 @@ import traceback
 import os
 import shutil
 import zipfile
+from collections import deque
 from bpy.props import IntProperty
 import io
 from datetime import datetime
@@ -65,6 +66,202 @@ class SessionConnection:
             "idle": self.is_idle()
         }
 
+# コマンドの優先度クラス（数値が小さいほど先に実行）
+PRIORITY_INTERACTIVE = 0  # 状態取得・イントロスペクション
+PRIORITY_NORMAL = 1       # シーン編集など
+PRIORITY_BULK = 2         # インポート・生成・コード実行
+
+# 時間のかかるコマンド（インタラクティブな操作を待たせない）
+BULK_COMMANDS = {
+    "execute_code",
+    "download_polyhaven_asset",
+    "download_sketchfab_model",
+    "import_generated_asset",
+    "import_generated_asset_hunyuan",
+    "create_rodin_job",
+    "create_hunyuan_job",
+}
+
+SCHEDULER_TICK_BUDGET = 0.02  # 1 tick でコマンドを実行する時間（秒）
+PRIORITY_BURST = 8            # 下位クラスを待たせる最大連続回数（飢餓防止）
+
+
+def command_priority(cmd_type: str) -> int:
+    """コマンド種別から優先度クラスを決定"""
+    if cmd_type in BULK_COMMANDS:
+        return PRIORITY_BULK
+    if cmd_type.startswith(("get_", "search_", "poll_")) or cmd_type.endswith("_status"):
+        return PRIORITY_INTERACTIVE
+    return PRIORITY_NORMAL
+
+
+class QueuedCommand:
+    """待ち行列に入ったコマンド"""
+    def __init__(self, session_id: str, command: dict, callback, priority: int):
+        self.session_id = session_id
+        self.command = command
+        self.callback = callback
+        self.priority = priority
+        self.enqueued_at = time.time()
+        self.request_id = command.get("request_id")
+        self.deadline = command.get("deadline")  # エポック秒（クライアントが付与）
+    
+    def expired(self) -> bool:
+        return self.deadline is not None and time.time() > self.deadline
+
+
+class SessionScheduler:
+    """メインスレッドの前段に置く公平スケジューラ
+
+    セッションごとに優先度クラス別の待ち行列を持ち、優先度の高いクラスから
+    セッションをラウンドロビンで1件ずつ取り出して dispatch に渡す。
+    dispatch はメインスレッド（タイマー）から呼ばれる。
+    """
+    def __init__(self, dispatch, tick_budget: float = SCHEDULER_TICK_BUDGET):
+        self.dispatch = dispatch
+        self.tick_budget = tick_budget
+        self.queues = {}      # session_id → [deque] (優先度クラスごと)
+        self.order = deque()  # ラウンドロビン順の session_id
+        self.lock = threading.Lock()
+        self.burst = 0
+        self.stats = {"dispatched": 0, "expired": 0, "cancelled": 0, "max_wait": 0.0}
+        # Blender はタイマーを関数オブジェクトで識別する（バウンドメソッドは参照のたびに別物）
+        self.timer = self._pump
+
+    def submit(self, session_id: str, command: dict, callback) -> QueuedCommand:
+        """コマンドを積む
+
+        接続ごとに応答を待ってから次のコマンドを読むので、1 セッションの待ち行列は高々 1 件。
+        """
+        priority = command_priority(command.get("type", ""))
+        with self.lock:
+            queues = self.queues.get(session_id)
+            if queues is None:
+                queues = self.queues[session_id] = [deque() for _ in range(PRIORITY_BULK + 1)]
+                self.order.append(session_id)
+            entry = QueuedCommand(session_id, command, callback, priority)
+            queues[priority].append(entry)
+
+        if not bpy.app.timers.is_registered(self.timer):
+            bpy.app.timers.register(self.timer, first_interval=0.0)
+        return entry
+
+    def discard(self, entry: QueuedCommand) -> bool:
+        """まだ実行されていないコマンドを取り消す"""
+        with self.lock:
+            queues = self.queues.get(entry.session_id)
+            if queues and entry in queues[entry.priority]:
+                queues[entry.priority].remove(entry)
+                return True
+        return False
+
+    def cancel(self, request_id: str) -> bool:
+        """request_id のコマンドを待ち行列から取り除く（実行前のみ）"""
+        with self.lock:
+            entry = next((
+                entry for queues in self.queues.values() for queue in queues for entry in queue
+                if entry.request_id == request_id
+            ), None)
+            if entry is None:
+                return False
+            self.queues[entry.session_id][entry.priority].remove(entry)
+            self.stats["cancelled"] += 1
+        entry.callback({
+            "status": "error",
+            "message": "Command cancelled",
+            "cancelled": True,
+            "request_id": request_id,
+        })
+        return True
+
+    def drop_session(self, session_id: str):
+        """セッション終了時に待ち行列を破棄"""
+        with self.lock:
+            queues = self.queues.pop(session_id, None)
+            if session_id in self.order:
+                self.order.remove(session_id)
+        for queue in queues or []:
+            for entry in queue:
+                entry.callback({"status": "error", "message": "Session closed"})
+
+    def queue_depth(self, session_id: str) -> int:
+        with self.lock:
+            return sum(len(q) for q in self.queues.get(session_id, []))
+
+    def _next(self):
+        """次に実行するコマンドを選ぶ（ロック保持中に呼ぶ）"""
+        waiting = [
+            priority for priority in range(PRIORITY_BULK + 1)
+            if any(queues[priority] for queues in self.queues.values())
+        ]
+        if not waiting:
+            return None
+
+        # 高優先度が連続したら、待っている下位クラスに1回譲る
+        priority = waiting[0]
+        if len(waiting) == 1:
+            self.burst = 0
+        elif self.burst >= PRIORITY_BURST:
+            priority = waiting[1]
+            self.burst = 0
+        else:
+            self.burst += 1
+
+        for _ in range(len(self.order)):
+            session_id = self.order[0]
+            self.order.rotate(-1)
+            queue = self.queues[session_id][priority]
+            if queue:
+                return queue.popleft()
+        return None
+
+    def _pump(self):
+        """タイマーコールバック: 時間予算内でコマンドを実行"""
+        deadline = time.time() + self.tick_budget
+        while time.time() < deadline:
+            with self.lock:
+                entry = self._next()
+            if entry is None:
+                break
+
+            # 期限切れのコマンドは実行せずに破棄（クライアントはもう待っていない）
+            if entry.expired():
+                self.stats["expired"] += 1
+                entry.callback({
+                    "status": "error",
+                    "message": "Command deadline exceeded before it could start",
+                    "cancelled": True,
+                    "request_id": entry.request_id,
+                })
+                continue
+
+            wait = time.time() - entry.enqueued_at
+            self.stats["max_wait"] = max(self.stats["max_wait"], wait)
+            self.stats["dispatched"] += 1
+            try:
+                self.dispatch(entry.command, entry.callback)
+            except Exception as e:
+                traceback.print_exc()
+                entry.callback({"status": "error", "message": str(e)})
+
+        with self.lock:
+            pending = any(any(q) for queues in self.queues.values() for q in queues)
+        return 0.0 if pending else None
+
+    def snapshot(self) -> dict:
+        """スケジューラの状態を取得"""
+        with self.lock:
+            sessions = {
+                session_id: [len(q) for q in queues]
+                for session_id, queues in self.queues.items()
+            }
+        return {
+            "tick_budget": self.tick_budget,
+            "queued": sessions,  # [interactive, normal, bulk]
+            **self.stats,
+        }
+
+
 class BlenderMCPServerV2:
     """Blender MCP Server - Phase 2: Session Management"""
     
@@ -77,6 +274,7 @@ class BlenderMCPServerV2:
         self.sessions = {}  # session_id → SessionConnection
         self.sessions_lock = threading.Lock()
         self.cleanup_thread = None
+        self.scheduler = SessionScheduler(self._dispatch)
     
     def start(self):
         """サーバーを起動"""
@@ -213,30 +411,29 @@ class BlenderMCPServerV2:
                             # Add session_id to command
                             command['session_id'] = session_id
                             
+                            if command.get("type") == "cancel":
+                                # キャンセルは待ち行列を通さずに即時処理
+                                client.sendall(json.dumps(self._cancel_response(command)).encode('utf-8'))
+                                continue
+                            
                             # Execute command
                             response_holder = {'response': None}
+                            response_ready = threading.Event()
                             
-                            def execute_wrapper():
-                                try:
-                                    response = self.execute_command(command)
-                                    response_holder['response'] = response
-                                except Exception as e:
-                                    print(f"Error executing command: {str(e)}")
-                                    traceback.print_exc()
-                                    response_holder['response'] = {
-                                        "status": "error",
-                                        "message": str(e)
-                                    }
-                                return None
+                            def deliver(response):
+                                response_holder['response'] = response
+                                response_ready.set()
                             
-                            # Schedule execution in main thread
-                            bpy.app.timers.register(execute_wrapper, first_interval=0.0)
+                            # Queue for the main thread (fair across sessions)
+                            entry = self.scheduler.submit(session_id, command, deliver)
                             
-                            # Wait for response
+                            # Wait for response (クライアントの期限まで)
                             timeout = 180.0
-                            start = time.time()
-                            while response_holder['response'] is None and (time.time() - start) < timeout:
-                                time.sleep(0.01)
+                            if command.get("deadline") is not None:
+                                timeout = min(timeout, max(0.0, command["deadline"] - time.time()) + 1.0)
+                            if not response_ready.wait(timeout=timeout):
+                                # Not started in time: don't run it after the client gave up
+                                self.scheduler.discard(entry)
                             
                             # Send response
                             if response_holder['response']:
@@ -307,6 +504,7 @@ class BlenderMCPServerV2:
                     pass
                 del self.sessions[session_id]
                 print(f"Session closed: {session_id}")
+        self.scheduler.drop_session(session_id)
     
     def _cleanup_loop(self):
         """アイドルセッションをクリーンアップ"""
@@ -334,10 +532,44 @@ class BlenderMCPServerV2:
     def get_sessions_info(self) -> list:
         """全セッション情報を取得"""
         with self.sessions_lock:
-            return [session.to_dict() for session in self.sessions.values()]
+            sessions = [session.to_dict() for session in self.sessions.values()]
+        for info in sessions:
+            info["queued"] = self.scheduler.queue_depth(info["session_id"])
+        return sessions
+    
+    def _cancel_response(self, command: dict) -> dict:
+        """cancel コマンドの応答（不正なパラメータは接続を落とさずにエラー応答にする）"""
+        params = command.get("params") or {}
+        if not isinstance(params, dict):
+            return {"status": "error", "message": "params must be an object"}
+        request_id = params.get("request_id")
+        if request_id is None:
+            return {"status": "error", "message": "Invalid parameters for cancel: request_id is required"}
+        result = {"request_id": request_id, "cancelled": self.scheduler.cancel(request_id)}
+        return {"status": "success", "result": result}
+    
+    def _dispatch(self, command: dict, callback):
+        """スケジューラから呼ばれる（メインスレッド）"""
+        try:
+            response = self.execute_command(command)
+        except Exception as e:
+            print(f"Error executing command: {str(e)}")
+            traceback.print_exc()
+            response = {
+                "status": "error",
+                "message": str(e)
+            }
+        callback(response)
     
     def execute_command(self, command: dict) -> dict:
         """コマンドを実行（元の実装を使用）"""
+        if command.get("type") == "get_scheduler_status":
+            return {
+                "status": "success",
+                "result": self.scheduler.snapshot(),
+                "session_id": command.get("session_id")
+            }
+        
         # This would be the same as the original addon.py execute_command
         # For now, return a placeholder
         return {
@@ -3,19 +3,27 @@ Flask Web Server - LegoDesigner V3
 QR コードアクセス対応 + MCP Client 統合
 """
 
-from flask import Flask, render_template, request, jsonify, redirect, url_for, session
+from flask import Flask, render_template, request, jsonify, redirect, url_for, session, Response, send_file, stream_with_context
 from flask_cors import CORS
 from flask_session import Session
 import logging
+import atexit
 import os
+import queue
 import uuid
 import qrcode
 from io import BytesIO
 import base64
+import codecs
 from datetime import datetime, timedelta
 import json
+import socket
 import subprocess
 import sys
+import tempfile
+import threading
+import time
+from collections import deque
 from pathlib import Path
 import psutil
 
@@ -42,22 +50,42 @@ SESSIONS_DIR = os.path.join(DATA_DIR, 'sessions')
 MODELS_DIR = os.path.join(DATA_DIR, 'models')
 ORDERS_DIR = os.path.join(DATA_DIR, 'orders')
 QR_DIR = os.path.join(DATA_DIR, 'qr_codes')
+PREVIEWS_DIR = os.path.join(DATA_DIR, 'previews')
 
 # ディレクトリ作成
-for directory in [SESSIONS_DIR, MODELS_DIR, ORDERS_DIR, QR_DIR]:
+for directory in [SESSIONS_DIR, MODELS_DIR, ORDERS_DIR, QR_DIR, PREVIEWS_DIR]:
     os.makedirs(directory, exist_ok=True)
 
 # ========================================
 # MCP Client 管理
 # ========================================
 
+MCP_POOL_MIN = int(os.getenv('MCP_POOL_MIN', 1))                        # 常に起動しておくワーカー数
+MCP_POOL_MAX = int(os.getenv('MCP_POOL_MAX', 4))                        # 同時に処理できるリクエスト数の上限
+MCP_WORKER_MAX_REQUESTS = int(os.getenv('MCP_WORKER_MAX_REQUESTS', 500))  # この回数を処理したワーカーは入れ替える
+MCP_REQUEST_TIMEOUT = 120.0   # 応答がなければワーカーを異常とみなす秒数
+MCP_ACQUIRE_TIMEOUT = 30.0    # 空きワーカーを待つ最大秒数
+MCP_HEALTH_INTERVAL = 30.0    # アイドルなワーカーに ping を送る間隔
+MCP_PING_TIMEOUT = 10.0
+MCP_IDLE_TIMEOUT = 300.0      # これだけ使われなかった MCP_POOL_MIN 超過分のワーカーを止める
+
+class MCPError(Exception):
+    """MCP Server が返したエラー（ワーカー自体は正常）"""
+
 class MCPClient:
-    """MCP Server との通信を管理"""
+    """MCP Server ワーカープロセス 1 つとの通信を管理（複数のセッションで共有）"""
     
-    def __init__(self, session_id: str):
-        self.session_id = session_id
+    def __init__(self, worker_id: int):
+        self.worker_id = worker_id
         self.process = None
         self.request_id = 0
+        self.requests = 0
+        self.responses = queue.Queue()
+        self.busy = False
+        self.broken = False
+        self.started_at = None
+        self.last_used = time.monotonic()     # 最後にセッションのリクエストを処理した時刻
+        self.last_checked = time.monotonic()  # 最後に応答を確認した時刻（リクエストか ping）
     
     def start(self):
         """MCP Server プロセスを起動"""
@@ -75,14 +103,35 @@ class MCPClient:
                 text=True,
                 bufsize=1
             )
+            self.started_at = time.monotonic()
             
-            logger.info(f"MCP Server started for session {self.session_id} (PID: {self.process.pid})")
+            # 長く動かすので stdout / stderr は常に読み続ける（パイプが詰まるとワーカーが止まる）
+            threading.Thread(target=self._read_stdout, args=(self.process,), daemon=True,
+                             name=f"mcp-{self.worker_id}-stdout").start()
+            threading.Thread(target=self._read_stderr, args=(self.process,), daemon=True,
+                             name=f"mcp-{self.worker_id}-stderr").start()
+            
+            logger.info(f"MCP worker {self.worker_id} started (PID: {self.process.pid})")
             return True
         except Exception as e:
             logger.error(f"Failed to start MCP Server: {e}")
             return False
     
-    def send_request(self, method: str, params: dict = None, session_id: str = None) -> dict:
+    def _read_stdout(self, process):
+        for line in process.stdout:
+            self.responses.put(line)
+        self.responses.put(None)
+    
+    def _read_stderr(self, process):
+        for line in process.stderr:
+            logger.debug(f"MCP worker {self.worker_id}: {line.rstrip()}")
+    
+    @property
+    def healthy(self) -> bool:
+        return self.process is not None and self.process.poll() is None and not self.broken
+    
+    def send_request(self, method: str, params: dict = None, session_id: str = None,
+                     timeout: float = MCP_REQUEST_TIMEOUT) -> dict:
         """MCP Server に JSON-RPC リクエストを送信"""
         if not self.process:
             raise Exception("MCP Server not started")
@@ -108,12 +157,22 @@ class MCPClient:
             
             logger.debug(f"Sent: {request_json}")
             
-            # レスポンス受信
-            response_line = self.process.stdout.readline()
-            if not response_line:
-                raise Exception("MCP Server closed connection")
-            
-            response = json.loads(response_line)
+            # レスポンス受信（通知や以前のリクエストへの応答は読み飛ばす）
+            deadline = time.monotonic() + timeout
+            while True:
+                try:
+                    response_line = self.responses.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    raise TimeoutError(f"MCP Server did not respond within {timeout:g}s")
+                if response_line is None:
+                    raise Exception("MCP Server closed connection")
+                try:
+                    response = json.loads(response_line)
+                except ValueError:
+                    logger.debug(f"Ignored output: {response_line.rstrip()}")
+                    continue
+                if isinstance(response, dict) and response.get("id") == self.request_id:
+                    break
             logger.debug(f"Received: {response_line}")
             
             # ログに記録
@@ -121,53 +180,246 @@ class MCPClient:
                 status = "success" if "error" not in response else "error"
                 add_communication_log(session_id, "response", response, status)
             
+            self.last_checked = time.monotonic()
             if "error" in response:
-                raise Exception(f"MCP Error: {response['error']}")
+                raise MCPError(f"MCP Error: {response['error']}")
             
             return response.get("result", {})
         
+        except MCPError:
+            raise
         except Exception as e:
+            # 通信できないワーカーはプールから外す
+            self.broken = True
             logger.error(f"MCP communication error: {e}")
             if session_id:
                 add_communication_log(session_id, "response", {"error": str(e)}, "error")
             raise
     
+    def ping(self) -> bool:
+        """ワーカーが応答するか確認（エラー応答でも返ってくれば正常）"""
+        try:
+            self.send_request("ping", timeout=MCP_PING_TIMEOUT)
+        except MCPError:
+            pass
+        except Exception:
+            return False
+        return True
+    
     def stop(self):
         """MCP Server プロセスを停止"""
         if self.process:
             try:
                 self.process.terminate()
                 self.process.wait(timeout=5)
-                logger.info(f"MCP Server stopped for session {self.session_id}")
+                logger.info(f"MCP worker {self.worker_id} stopped")
             except subprocess.TimeoutExpired:
                 self.process.kill()
-                logger.warning(f"MCP Server killed for session {self.session_id}")
+                logger.warning(f"MCP worker {self.worker_id} killed")
             finally:
                 self.process = None
+    
+    def to_dict(self) -> dict:
+        return {
+            'worker_id': self.worker_id,
+            'pid': self.process.pid if self.process else None,
+            'running': self.process is not None and self.process.poll() is None,
+            'busy': self.busy,
+            'requests': self.requests,
+            'uptime': round(time.monotonic() - self.started_at, 1) if self.started_at else 0,
+            'idle': round(time.monotonic() - self.last_used, 1)
+        }
+
+class MCPWorkerPool:
+    """長く動かす MCP Server ワーカーのプール（全セッションで共有）
+
+    ワーカーは 1 度に 1 リクエストを処理し、セッションは session_id で多重化する。
+    同じセッションは空いていれば前回と同じワーカーに送る。空きがなければ max_workers まで
+    ワーカーを増やし、それ以上は空くのを待つ。保守スレッドが定期的に
+    - 終了した / 応答しないワーカーを外し、アイドルなワーカーに ping を送る
+    - max_requests を処理したワーカーを入れ替える
+    - idle_timeout 使われなかったワーカーを min_workers まで減らす
+    """
+    
+    def __init__(self, min_workers: int = MCP_POOL_MIN, max_workers: int = MCP_POOL_MAX,
+                 max_requests: int = MCP_WORKER_MAX_REQUESTS, idle_timeout: float = MCP_IDLE_TIMEOUT):
+        self.min_workers = max(min_workers, 0)
+        self.max_workers = max(max_workers, self.min_workers, 1)
+        self.max_requests = max_requests
+        self.idle_timeout = idle_timeout
+        self.workers = []
+        self.sessions = {}  # session_id -> 最後に使ったワーカーの ID
+        self.next_worker_id = 1
+        self.condition = threading.Condition()
+        self.thread = None
+        self.closed = False
+        self.stats = {'started': 0, 'recycled': 0, 'unhealthy': 0, 'scaled_down': 0, 'requests': 0, 'waited': 0}
+    
+    def _spawn(self) -> MCPClient:
+        """ワーカーを 1 つ起動して追加（condition を保持した状態で呼ぶ）"""
+        worker = MCPClient(self.next_worker_id)
+        self.next_worker_id += 1
+        if not worker.start():
+            raise Exception("Failed to start MCP Server")
+        self.workers.append(worker)
+        self.stats['started'] += 1
+        return worker
+    
+    def _remove(self, worker: MCPClient, reason: str):
+        """ワーカーをプールから外す（condition を保持した状態で呼ぶ。停止は呼び出し側）"""
+        self.workers.remove(worker)
+        self.stats[reason] += 1
+        for session_id in [sid for sid, worker_id in self.sessions.items() if worker_id == worker.worker_id]:
+            del self.sessions[session_id]
+        logger.info(f"MCP worker {worker.worker_id} removed ({reason}, {worker.requests} requests)")
+    
+    def start(self):
+        with self.condition:
+            self.closed = False
+            while len(self.workers) < self.min_workers:
+                self._spawn()
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._maintain, name="mcp-pool", daemon=True)
+                self.thread.start()
+    
+    def acquire(self, session_id: str = None, timeout: float = MCP_ACQUIRE_TIMEOUT) -> MCPClient:
+        """セッションに使うワーカーを確保"""
+        deadline = time.monotonic() + timeout
+        with self.condition:
+            if self.closed:
+                raise Exception("MCP worker pool is shut down")
+            while True:
+                idle = [w for w in self.workers if not w.busy and w.healthy]
+                preferred = self.sessions.get(session_id)
+                worker = next((w for w in idle if w.worker_id == preferred), None)
+                if worker is None and idle:
+                    worker = min(idle, key=lambda w: w.requests)
+                if worker is None and len(self.workers) < self.max_workers:
+                    worker = self._spawn()
+                if worker is not None:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"No MCP worker available within {timeout:g}s")
+                self.stats['waited'] += 1
+                self.condition.wait(remaining)
+            worker.busy = True
+            worker.requests += 1
+            worker.last_used = time.monotonic()
+            if session_id:
+                self.sessions[session_id] = worker.worker_id
+            self.stats['requests'] += 1
+            return worker
+    
+    def release(self, worker: MCPClient):
+        """ワーカーを返却。異常なもの・上限まで使ったものはここで入れ替える"""
+        retired = None
+        with self.condition:
+            worker.busy = False
+            if worker in self.workers:
+                if not worker.healthy:
+                    self._remove(worker, 'unhealthy')
+                    retired = worker
+                elif self.max_requests and worker.requests >= self.max_requests:
+                    self._remove(worker, 'recycled')
+                    retired = worker
+            self.condition.notify_all()
+        if retired is not None:
+            retired.stop()
+    
+    def send_request(self, session_id: str, method: str, params: dict = None) -> dict:
+        """セッションのリクエストを空いているワーカーで処理"""
+        worker = self.acquire(session_id)
+        try:
+            return worker.send_request(method, params, session_id)
+        finally:
+            self.release(worker)
+    
+    def forget_session(self, session_id: str):
+        with self.condition:
+            self.sessions.pop(session_id, None)
+    
+    def _maintain(self):
+        """ヘルスチェック・入れ替え・スケールダウン"""
+        while True:
+            with self.condition:
+                self.condition.wait(timeout=min(MCP_HEALTH_INTERVAL, self.idle_timeout) / 3)
+                if self.closed:
+                    return
+                now = time.monotonic()
+                retired, to_ping = [], []
+                for worker in list(self.workers):
+                    if worker.busy:
+                        continue
+                    if not worker.healthy:
+                        self._remove(worker, 'unhealthy')
+                        retired.append(worker)
+                    elif (len(self.workers) > self.min_workers
+                          and now - worker.last_used > self.idle_timeout):
+                        self._remove(worker, 'scaled_down')
+                        retired.append(worker)
+                    elif now - max(worker.last_used, worker.last_checked) > MCP_HEALTH_INTERVAL:
+                        worker.busy = True
+                        to_ping.append(worker)
+                try:
+                    while len(self.workers) < self.min_workers:
+                        self._spawn()
+                except Exception as e:
+                    logger.error(f"Failed to refill MCP worker pool: {e}")
+            
+            for worker in retired:
+                worker.stop()
+            for worker in to_ping:
+                if not worker.ping():
+                    logger.warning(f"MCP worker {worker.worker_id} failed its health check")
+                    worker.broken = True
+                self.release(worker)
+    
+    def shutdown(self):
+        with self.condition:
+            self.closed = True
+            workers, self.workers = self.workers, []
+            self.sessions.clear()
+            self.condition.notify_all()
+        for worker in workers:
+            worker.stop()
+    
+    def to_dict(self) -> dict:
+        with self.condition:
+            return {
+                'min_workers': self.min_workers,
+                'max_workers': self.max_workers,
+                'max_requests': self.max_requests,
+                'sessions': len(self.sessions),
+                'workers': [worker.to_dict() for worker in self.workers],
+                **self.stats
+            }
 
-# セッションごとの MCP Client を管理
-_mcp_clients = {}
+# 全セッションで共有する MCP ワーカープール
+_mcp_pool = None
+_mcp_pool_lock = threading.Lock()
 
 # 通信ログ管理
 _communication_logs = {}
 
-def get_mcp_client(session_id: str) -> MCPClient:
-    """セッションの MCP Client を取得（なければ作成）"""
-    if session_id not in _mcp_clients:
-        client = MCPClient(session_id)
-        if client.start():
-            _mcp_clients[session_id] = client
-            _communication_logs[session_id] = []
-        else:
-            raise Exception("Failed to start MCP Server")
-    
-    return _mcp_clients[session_id]
+def get_mcp_pool() -> MCPWorkerPool:
+    """MCP ワーカープールを取得（初回に起動）"""
+    global _mcp_pool
+    with _mcp_pool_lock:
+        if _mcp_pool is None:
+            _mcp_pool = MCPWorkerPool()
+            _mcp_pool.start()
+            atexit.register(_mcp_pool.shutdown)
+    return _mcp_pool
+
+def mcp_request(session_id: str, method: str, params: dict = None) -> dict:
+    """セッションのリクエストを MCP Server に送信"""
+    return get_mcp_pool().send_request(session_id, method, params)
 
 def cleanup_mcp_client(session_id: str):
-    """セッションの MCP Client をクリーンアップ"""
-    if session_id in _mcp_clients:
-        _mcp_clients[session_id].stop()
-        del _mcp_clients[session_id]
+    """セッションの MCP 関連の状態をクリーンアップ（ワーカーは他のセッションと共有なので止めない）"""
+    if _mcp_pool is not None:
+        _mcp_pool.forget_session(session_id)
     if session_id in _communication_logs:
         del _communication_logs[session_id]
 
@@ -187,6 +439,419 @@ def add_communication_log(session_id: str, direction: str, data: dict, status: s
     _communication_logs[session_id].append(log_entry)
     logger.debug(f"Communication log: {log_entry}")
 
+# ========================================
+# ライブプレビュー（ビューポート配信）
+# ========================================
+
+BLENDER_HOST = os.getenv('BLENDER_HOST', 'localhost')
+BLENDER_PORT = int(os.getenv('BLENDER_PORT', 9876))
+PREVIEW_FPS = float(os.getenv('PREVIEW_FPS', 5))
+PREVIEW_MAX_SIZE = int(os.getenv('PREVIEW_MAX_SIZE', 640))
+PREVIEW_IDLE_TIMEOUT = 30.0  # 視聴者がいなくなってから中継を止めるまでの秒数
+PREVIEW_KEEPALIVE = 15.0     # 新しいフレームがない時に keep-alive を送る間隔
+MJPEG_BOUNDARY = 'frame'
+
+_json_decoder = json.JSONDecoder()
+
+def blender_request(sock: socket.socket, command: dict) -> dict:
+    """アドオンにコマンドを送り、JSON レスポンスを受信"""
+    sock.sendall(json.dumps(command).encode('utf-8'))
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    parts = []
+    last = ''
+    while True:
+        chunk = sock.recv(65536)
+        if not chunk:
+            raise ConnectionError("Blender closed the connection")
+        text = decoder.decode(chunk)
+        parts.append(text)
+        stripped = text.rstrip()
+        if stripped:
+            last = stripped[-1]
+        # 応答は '}' で終わるオブジェクト。チャンクごとに全体をパースし直すと
+        # 数 MB の GLB（base64）を受け取る時に二乗の時間がかかる
+        if last != '}':
+            continue
+        try:
+            response, _ = _json_decoder.raw_decode(''.join(parts).lstrip())
+            return response
+        except ValueError:
+            continue
+
+def send_blender_command(command_type: str, params: dict = None, timeout: float = 120.0) -> dict:
+    """MCP を経由せずにアドオンへコマンドを 1 回送信し、result を返す"""
+    with socket.create_connection((BLENDER_HOST, BLENDER_PORT), timeout=timeout) as sock:
+        response = blender_request(sock, {
+            "type": command_type,
+            "params": params or {},
+            "deadline": time.time() + timeout
+        })
+    if response.get("status") != "success":
+        raise RuntimeError(response.get("message", "Unknown error from Blender"))
+    result = response.get("result", {})
+    if isinstance(result, dict) and result.get("error"):
+        raise RuntimeError(result["error"])
+    return result
+
+class ViewportStream:
+    """1 セッションのビューポート配信
+
+    Blender アドオンのフレームプロデューサーを 1 本の接続でロングポーリングし、
+    届いたフレームを MJPEG パート / SSE イベントに 1 回だけ変換して全視聴者で共有する。
+    Blender 側はシーンかビューが変わった時だけキャプチャするので、変化がなければ何も流れない。
+    """
+    
+    def __init__(self, session_id: str, fps: float = PREVIEW_FPS):
+        self.session_id = session_id
+        self.fps = fps
+        self.frame = None  # {"seq", "part", "event"}
+        self.seq = 0
+        self.blender_seq = 0
+        self.error = None
+        self.viewers = 0
+        self.last_viewer = time.monotonic()
+        self.condition = threading.Condition()
+        self.thread = None
+    
+    def _ensure_running(self):
+        """中継スレッドを起動（condition を保持した状態で呼ぶ）"""
+        if self.thread is None or not self.thread.is_alive():
+            self.thread = threading.Thread(target=self._run, name=f"viewport-{self.session_id}", daemon=True)
+            self.thread.start()
+    
+    def _run(self):
+        """Blender からフレームを取得し続ける（視聴者がいなくなったら終了）"""
+        sock = None
+        logger.info(f"Viewport stream started for session {self.session_id}")
+        try:
+            while True:
+                with self.condition:
+                    if self.viewers == 0 and time.monotonic() - self.last_viewer > PREVIEW_IDLE_TIMEOUT:
+                        self.thread = None
+                        break
+                try:
+                    if sock is None:
+                        sock = socket.create_connection((BLENDER_HOST, BLENDER_PORT), timeout=30)
+                    response = blender_request(sock, {
+                        "type": "get_viewport_frame",
+                        "params": {
+                            "after_seq": self.blender_seq,
+                            "timeout": 10,
+                            "fps": self.fps,
+                            "max_size": PREVIEW_MAX_SIZE,
+                            "format": "jpeg",
+                        }
+                    })
+                    if response.get("status") != "success":
+                        raise RuntimeError(response.get("message", "Unknown error from Blender"))
+                    result = response["result"]
+                    if result.get("not_modified"):
+                        # Blender が再起動すると番号が戻る
+                        if result.get("seq", 0) < self.blender_seq:
+                            self.blender_seq = 0
+                        continue
+                    self._publish(result)
+                except Exception as e:
+                    logger.warning(f"Viewport stream error for session {self.session_id}: {e}")
+                    with self.condition:
+                        self.error = str(e)
+                        self.condition.notify_all()
+                    if sock is not None:
+                        sock.close()
+                        sock = None
+                    time.sleep(1.0)
+        finally:
+            if sock is not None:
+                sock.close()
+            logger.info(f"Viewport stream stopped for session {self.session_id}")
+    
+    def _publish(self, result: dict):
+        """フレームを配信形式に 1 回だけ変換して視聴者に通知"""
+        mimetype = f"image/{result['format']}"
+        image = base64.b64decode(result['data'])
+        part = (
+            f"--{MJPEG_BOUNDARY}\r\nContent-Type: {mimetype}\r\nContent-Length: {len(image)}\r\n\r\n"
+        ).encode('ascii') + image + b"\r\n"
+        event = "event: frame\ndata: " + json.dumps({
+            'seq': result['seq'],
+            'etag': result['etag'],
+            'width': result['width'],
+            'height': result['height'],
+            'captured': result['captured'],
+            'image': f"data:{mimetype};base64,{result['data']}",
+        }) + "\n\n"
+        with self.condition:
+            self.blender_seq = result['seq']
+            self.error = None
+            self.seq += 1
+            self.frame = {'seq': self.seq, 'part': part, 'event': event.encode('utf-8')}
+            self.condition.notify_all()
+    
+    def subscribe(self):
+        """視聴者 1 人分のフレーム列。新しいフレームごとに返し、PREVIEW_KEEPALIVE 秒来なければ None"""
+        with self.condition:
+            self.viewers += 1
+            self._ensure_running()
+        last = 0
+        try:
+            while True:
+                with self.condition:
+                    self.condition.wait_for(
+                        lambda: self.frame is not None and self.frame['seq'] > last,
+                        timeout=PREVIEW_KEEPALIVE
+                    )
+                    frame = self.frame if self.frame is not None and self.frame['seq'] > last else None
+                    self._ensure_running()
+                if frame is not None:
+                    # 遅い視聴者は途中のフレームを飛ばして最新だけを受け取る
+                    last = frame['seq']
+                yield frame
+        finally:
+            with self.condition:
+                self.viewers -= 1
+                self.last_viewer = time.monotonic()
+    
+    def to_dict(self) -> dict:
+        with self.condition:
+            return {
+                'session_id': self.session_id,
+                'viewers': self.viewers,
+                'fps': self.fps,
+                'frames': self.seq,
+                'running': self.thread is not None and self.thread.is_alive(),
+                'error': self.error
+            }
+
+# セッションごとの配信（全視聴者で共有）
+_viewport_streams = {}
+_viewport_streams_lock = threading.Lock()
+
+def get_viewport_stream(session_id: str, fps: float = None) -> ViewportStream:
+    """セッションの配信を取得（なければ作成）。fps を指定すると以後のキャプチャ頻度を変更"""
+    with _viewport_streams_lock:
+        stream = _viewport_streams.get(session_id)
+        if stream is None:
+            stream = _viewport_streams[session_id] = ViewportStream(session_id)
+    if fps:
+        stream.fps = min(max(fps, 0.1), 30.0)
+    return stream
+
+# ========================================
+# プレビュー用 3D モデル（GLB）
+# ========================================
+
+PREVIEW_TEXTURE_MAX_SIZE = 512
+PREVIEW_MODELS_KEPT = 8
+
+# セッションごとに最後に返したモデルのハッシュ（Flask のスレッドから読み書きするのでロックで保護）
+_preview_models = {}
+_preview_models_lock = threading.Lock()
+
+def last_preview_model(session_id: str):
+    """セッションに最後に返したモデルのハッシュ（ファイルが残っている場合のみ）"""
+    with _preview_models_lock:
+        content_hash = _preview_models.get(session_id)
+    if content_hash and os.path.exists(os.path.join(PREVIEWS_DIR, f"{content_hash}.glb")):
+        return content_hash
+    return None
+
+def fetch_preview_model(session_id: str, texture_max_size: int = PREVIEW_TEXTURE_MAX_SIZE) -> str:
+    """シーンのプレビュー GLB を用意してそのハッシュを返す
+
+    手元に同じハッシュのファイルがあれば Blender からは転送しない（if_none_match）。
+    """
+    known = last_preview_model(session_id)
+    result = send_blender_command("export_preview_gltf", {
+        "if_none_match": known,
+        "inline": True,
+        "texture_max_size": texture_max_size
+    })
+    content_hash = result['hash']
+    path = os.path.join(PREVIEWS_DIR, f"{content_hash}.glb")
+    written = False
+    if not result.get('not_modified') and not os.path.exists(path):
+        # 同じシーンへの同時リクエストがあるので一時ファイルはリクエストごとに別にする
+        fd, tmp_path = tempfile.mkstemp(dir=PREVIEWS_DIR, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(base64.b64decode(result['data']))
+            os.replace(tmp_path, path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+        written = True
+    with _preview_models_lock:
+        _preview_models[session_id] = content_hash
+        if written:
+            # 古いモデルを削除（どのセッションも参照していないもの）
+            models = sorted(Path(PREVIEWS_DIR).glob('*.glb'), key=lambda p: p.stat().st_mtime)
+            for old_model in models[:-PREVIEW_MODELS_KEPT]:
+                if old_model.stem not in _preview_models.values():
+                    old_model.unlink(missing_ok=True)
+    return content_hash
+
+# ========================================
+# シーン差分配信
+# ========================================
+
+SCENE_DELTA_LOG = 256  # 中継側で保持するバッチ数（それより遅れた視聴者にはスナップショットを送る）
+
+class SceneDeltaStream:
+    """1 セッションのシーン差分（オブジェクト単位の add / update / remove）配信
+
+    Blender アドオンの差分トラッカーを 1 本の接続でロングポーリングし、届いた差分を
+    シーンのミラーに適用してから SSE イベントに 1 回だけ変換して全視聴者で共有する。
+    新しい視聴者にはミラーから作ったスナップショット（reset イベント）を送り、以後は差分だけを流す。
+    イベントの id は中継側の番号なので、再接続時の Last-Event-ID から続きを送れる。
+    """
+    
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.objects = {}     # name -> {"geometry", "matrix"}
+        self.geometries = {}  # id -> geometry デルタ
+        self.batches = deque(maxlen=SCENE_DELTA_LOG)  # (seq, SSE イベント)
+        self.seq = 0
+        self.base_seq = 0     # これより後のバッチはすべて batches にある
+        self.blender_seq = 0
+        self.error = None
+        self.viewers = 0
+        self.last_viewer = time.monotonic()
+        self.condition = threading.Condition()
+        self.thread = None
+    
+    def _ensure_running(self):
+        """中継スレッドを起動（condition を保持した状態で呼ぶ）"""
+        if self.thread is None or not self.thread.is_alive():
+            self.thread = threading.Thread(target=self._run, name=f"deltas-{self.session_id}", daemon=True)
+            self.thread.start()
+    
+    def _run(self):
+        """Blender から差分を取得し続ける（視聴者がいなくなったら終了）"""
+        sock = None
+        logger.info(f"Scene delta stream started for session {self.session_id}")
+        try:
+            while True:
+                with self.condition:
+                    if self.viewers == 0 and time.monotonic() - self.last_viewer > PREVIEW_IDLE_TIMEOUT:
+                        self.thread = None
+                        break
+                try:
+                    if sock is None:
+                        sock = socket.create_connection((BLENDER_HOST, BLENDER_PORT), timeout=30)
+                    response = blender_request(sock, {
+                        "type": "get_scene_deltas",
+                        "params": {"after_seq": self.blender_seq, "timeout": 10}
+                    })
+                    if response.get("status") != "success":
+                        raise RuntimeError(response.get("message", "Unknown error from Blender"))
+                    result = response["result"]
+                    if not result.get("not_modified"):
+                        self._apply(result)
+                except Exception as e:
+                    logger.warning(f"Scene delta stream error for session {self.session_id}: {e}")
+                    with self.condition:
+                        self.error = str(e)
+                        self.condition.notify_all()
+                    if sock is not None:
+                        sock.close()
+                        sock = None
+                    time.sleep(1.0)
+        finally:
+            if sock is not None:
+                sock.close()
+            logger.info(f"Scene delta stream stopped for session {self.session_id}")
+    
+    def _apply(self, result: dict):
+        """差分をミラーに適用し、SSE イベントに 1 回だけ変換して視聴者に通知"""
+        with self.condition:
+            if result['reset']:
+                self.objects.clear()
+                self.geometries.clear()
+            for delta in result['deltas']:
+                if delta['op'] == 'geometry':
+                    self.geometries[delta['id']] = delta
+                elif delta['op'] == 'remove':
+                    self.objects.pop(delta['name'], None)
+                else:
+                    state = self.objects.setdefault(delta['name'], {})
+                    state['matrix'] = delta['matrix']
+                    if 'geometry' in delta:
+                        state['geometry'] = delta['geometry']
+            # Blender 側と同じく、どのオブジェクトも使わなくなったジオメトリは捨てる
+            used = {state['geometry'] for state in self.objects.values()}
+            self.geometries = {key: delta for key, delta in self.geometries.items() if key in used}
+            
+            self.blender_seq = result['seq']
+            self.error = None
+            self.seq += 1
+            self.batches.append((self.seq, self._event('reset' if result['reset'] else 'deltas', result['deltas'])))
+            self.base_seq = max(self.base_seq, self.batches[0][0] - 1)
+            self.condition.notify_all()
+    
+    def _event(self, name: str, deltas: list) -> bytes:
+        return (f"id: {self.seq}\nevent: {name}\ndata: " + json.dumps(deltas) + "\n\n").encode('utf-8')
+    
+    def _snapshot(self) -> bytes:
+        """ミラーの現在の状態を reset イベントにする（condition を保持した状態で呼ぶ）"""
+        deltas = list(self.geometries.values())
+        deltas.extend(
+            {'op': 'add', 'name': name, 'geometry': state['geometry'], 'matrix': state['matrix']}
+            for name, state in self.objects.items()
+        )
+        return self._event('reset', deltas)
+    
+    def subscribe(self, last_event_id: int = None):
+        """視聴者 1 人分のイベント列。届いた分をまとめて返し、PREVIEW_KEEPALIVE 秒来なければ None
+
+        last_event_id が保持している範囲内ならその続きから、そうでなければスナップショットから始める。
+        """
+        with self.condition:
+            self.viewers += 1
+            self._ensure_running()
+            last = last_event_id if last_event_id is not None and self.base_seq <= last_event_id <= self.seq else None
+        try:
+            while True:
+                with self.condition:
+                    after = 0 if last is None else last
+                    self.condition.wait_for(lambda: self.seq > after, timeout=PREVIEW_KEEPALIVE)
+                    event = None
+                    if self.seq > after:
+                        if last is None or last < self.base_seq:
+                            event = self._snapshot()
+                        else:
+                            event = b''.join(batch for seq, batch in self.batches if seq > last)
+                        last = self.seq
+                    self._ensure_running()
+                yield event
+        finally:
+            with self.condition:
+                self.viewers -= 1
+                self.last_viewer = time.monotonic()
+    
+    def to_dict(self) -> dict:
+        with self.condition:
+            return {
+                'session_id': self.session_id,
+                'viewers': self.viewers,
+                'batches': self.seq,
+                'objects': len(self.objects),
+                'geometries': len(self.geometries),
+                'running': self.thread is not None and self.thread.is_alive(),
+                'error': self.error
+            }
+
+# セッションごとの差分配信（全視聴者で共有）
+_scene_delta_streams = {}
+_scene_delta_streams_lock = threading.Lock()
+
+def get_scene_delta_stream(session_id: str) -> SceneDeltaStream:
+    """セッションの差分配信を取得（なければ作成）"""
+    with _scene_delta_streams_lock:
+        stream = _scene_delta_streams.get(session_id)
+        if stream is None:
+            stream = _scene_delta_streams[session_id] = SceneDeltaStream(session_id)
+    return stream
+
 # ========================================
 # QR コード生成
 # ========================================
@@ -359,12 +1024,8 @@ def order(session_id: str):
 # クリーンアップ
 # ========================================
 
-@app.teardown_appcontext
-def cleanup(error=None):
-    """アプリケーション終了時にクリーンアップ"""
-    # 全ての MCP Client を停止
-    for session_id in list(_mcp_clients.keys()):
-        cleanup_mcp_client(session_id)
+# MCP ワーカーはリクエストをまたいで使い回すので、teardown_appcontext（リクエストごとに呼ばれる）
+# では止めず、プロセス終了時に get_mcp_pool() が登録した atexit で停止する
 
 # ========================================
 # API エンドポイント
@@ -421,14 +1082,11 @@ def api_chat_send():
         return jsonify({'status': 'error', 'message': 'Session not found'}), 404
     
     try:
-        # MCP Client を取得
-        mcp_client = get_mcp_client(session_id)
-        
-        # MCP Server に処理を依頼
-        result = mcp_client.send_request("process_message", {
+        # MCP Server に処理を依頼（共有ワーカープール経由）
+        result = mcp_request(session_id, "process_message", {
             "message": message,
             "session_id": session_id
-        }, session_id)
+        })
         
         # メッセージを追加
         msg_obj = {
@@ -562,6 +1220,107 @@ def api_order_list(session_id: str):
         'orders': session_data.get('orders', [])
     })
 
+@app.route('/api/preview/model/<session_id>', methods=['GET'])
+def api_preview_model(session_id: str):
+    """シーンのプレビュー用 GLB（ETag / If-None-Match / Range 対応）"""
+    if not get_session_data(session_id):
+        return jsonify({'status': 'error', 'message': 'Session not found'}), 404
+    
+    try:
+        content_hash = fetch_preview_model(
+            session_id, request.args.get('texture_max_size', PREVIEW_TEXTURE_MAX_SIZE, type=int)
+        )
+    except Exception as e:
+        # Blender に繋がらない間は最後のモデルを返す
+        logger.warning(f"Preview export failed for session {session_id}: {e}")
+        content_hash = last_preview_model(session_id)
+        if not content_hash:
+            return jsonify({'status': 'error', 'message': str(e)}), 503
+    
+    response = send_file(
+        os.path.abspath(os.path.join(PREVIEWS_DIR, f"{content_hash}.glb")),
+        mimetype='model/gltf-binary',
+        etag=content_hash,
+        conditional=True,
+        max_age=0
+    )
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+@app.route('/api/preview/stream/<session_id>', methods=['GET'])
+def api_preview_stream(session_id: str):
+    """ビューポートのライブ配信（multipart MJPEG、<img src> でそのまま表示できる）"""
+    if not get_session_data(session_id):
+        return jsonify({'status': 'error', 'message': 'Session not found'}), 404
+    
+    stream = get_viewport_stream(session_id, request.args.get('fps', type=float))
+    
+    def generate():
+        part = None
+        for frame in stream.subscribe():
+            if frame is not None:
+                part = frame['part']
+            # 変化がない間も最後のフレームを再送して切断を検出する
+            if part is not None:
+                yield part
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype=f'multipart/x-mixed-replace; boundary={MJPEG_BOUNDARY}',
+        headers={'Cache-Control': 'no-store'}
+    )
+
+@app.route('/api/preview/events/<session_id>', methods=['GET'])
+def api_preview_events(session_id: str):
+    """ビューポートのライブ配信（Server-Sent Events、画像は data URL）"""
+    if not get_session_data(session_id):
+        return jsonify({'status': 'error', 'message': 'Session not found'}), 404
+    
+    stream = get_viewport_stream(session_id, request.args.get('fps', type=float))
+    
+    def generate():
+        for frame in stream.subscribe():
+            if frame is not None:
+                yield frame['event']
+            elif stream.error:
+                yield ("event: error\ndata: " + json.dumps({'message': stream.error}) + "\n\n").encode('utf-8')
+            else:
+                yield b": keepalive\n\n"
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/api/preview/deltas/<session_id>', methods=['GET'])
+def api_preview_deltas(session_id: str):
+    """シーンのオブジェクト単位の差分（Server-Sent Events）
+
+    最初に reset イベント（全オブジェクトの add）、以後は deltas イベントを送る。
+    ジオメトリは id ごとに 1 回だけ送られ、オブジェクトはそれを id で参照する。
+    """
+    if not get_session_data(session_id):
+        return jsonify({'status': 'error', 'message': 'Session not found'}), 404
+    
+    stream = get_scene_delta_stream(session_id)
+    last_event_id = request.headers.get('Last-Event-ID', type=int)
+    
+    def generate():
+        for event in stream.subscribe(last_event_id):
+            if event is not None:
+                yield event
+            elif stream.error:
+                yield ("event: error\ndata: " + json.dumps({'message': stream.error}) + "\n\n").encode('utf-8')
+            else:
+                yield b": keepalive\n\n"
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 # ========================================
 # ヘルスチェック
 # ========================================
@@ -587,8 +1346,7 @@ def api_mcp_execute():
         return jsonify({'status': 'error', 'message': 'Missing parameters'}), 400
     
     try:
-        mcp_client = get_mcp_client(session_id)
-        result = mcp_client.send_request(method, params, session_id)
+        result = mcp_request(session_id, method, params)
         
         return jsonify({
             'status': 'success',
@@ -615,19 +1373,31 @@ def api_server_status():
     """MCP Server のステータスを取得"""
     status_info = {
         'timestamp': datetime.now().isoformat(),
-        'active_sessions': len(_mcp_clients),
+        'active_sessions': 0,
         'sessions': [],
-        'active_ports': get_active_ports()
+        'mcp_pool': None,
+        'active_ports': get_active_ports(),
+        'viewport_streams': [stream.to_dict() for stream in list(_viewport_streams.values())],
+        'scene_delta_streams': [stream.to_dict() for stream in list(_scene_delta_streams.values())]
     }
     
-    for session_id, client in _mcp_clients.items():
-        session_info = {
-            'session_id': session_id,
-            'pid': client.process.pid if client.process else None,
-            'running': client.process is not None and client.process.poll() is None,
-            'log_count': len(_communication_logs.get(session_id, []))
-        }
-        status_info['sessions'].append(session_info)
+    if _mcp_pool is not None:
+        pool = _mcp_pool.to_dict()
+        workers = {worker['worker_id']: worker for worker in pool['workers']}
+        with _mcp_pool.condition:
+            sessions = dict(_mcp_pool.sessions)
+        for session_id, worker_id in sessions.items():
+            worker = workers.get(worker_id, {})
+            session_info = {
+                'session_id': session_id,
+                'worker_id': worker_id,
+                'pid': worker.get('pid'),
+                'running': worker.get('running', False),
+                'log_count': len(_communication_logs.get(session_id, []))
+            }
+            status_info['sessions'].append(session_info)
+        status_info['active_sessions'] = len(sessions)
+        status_info['mcp_pool'] = pool
     
     return jsonify(status_info)
 
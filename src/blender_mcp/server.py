@@ -5,6 +5,8 @@ import json
 import asyncio
 import logging
 import tempfile
+import time
+import uuid
 from dataclasses import dataclass
 from contextlib import asynccontextmanager
 from typing import AsyncIterator, Dict, Any, List, Optional
@@ -109,9 +111,12 @@ class BlenderConnection:
         if not self.sock and not self.connect():
             raise ConnectionError("Not connected to Blender")
         
+        # Blender drops the command if it can't start it before the deadline
         command = {
             "type": command_type,
-            "params": params or {}
+            "params": params or {},
+            "request_id": uuid.uuid4().hex,
+            "deadline": time.time() + 180.0,
         }
         
         try:
@@ -250,13 +255,15 @@ def get_object_info(ctx: Context, object_name: str, session_id: str = None) -> s
         return f"Error getting object info: {str(e)}"
 
 @mcp.tool()
-def execute_blender_code(ctx: Context, code: str, session_id: str = None) -> str:
+def execute_blender_code(ctx: Context, code: str, session_id: str = None, profile: bool = False) -> str:
     """
     Execute arbitrary Python code in Blender. Make sure to do it step-by-step by breaking it into smaller chunks.
 
     Parameters:
     - code: The Python code to execute
     - session_id: Optional session ID for session management. If not provided, a new session will be created.
+    - profile: Run the code under cProfile. Only the v1 stack (v1/addon.py) executes code and returns
+      a profile; the v2 addon does not implement code execution yet
     """
     try:
         sm = get_session_manager()
@@ -264,12 +271,15 @@ def execute_blender_code(ctx: Context, code: str, session_id: str = None) -> str
         if not session_id:
             session_id = sm.create_session()
         
-        # TODO: Implement actual code execution
-        return json.dumps({
+        # TODO: Implement actual code execution (src/addon.py has no execute_code handler yet)
+        response = {
             "status": "success",
             "session_id": session_id,
             "message": "Code execution not yet implemented"
-        }, indent=2)
+        }
+        if profile:
+            response["profile"] = "Profiling is only available with the v1 stack (v1/addon.py)"
+        return json.dumps(response, indent=2)
     except Exception as e:
         logger.error(f"Error executing code: {str(e)}")
         return f"Error executing code: {str(e)}"
@@ -0,0 +1,104 @@
+"""
+テスト共通フィクスチャ
+
+アドオン（v1/addon.py, src/addon.py）は bpy なしでは import できないので、純粋な Python 部分のテスト用に
+最小限の bpy（タイマーは Blender と同じく関数オブジェクトの同一性で識別）を用意して読み込む。
+"""
+
+import importlib.util
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+V1_ADDON_PATH = Path(__file__).resolve().parents[2] / "v1" / "addon.py"
+V2_ADDON_PATH = Path(__file__).resolve().parents[1] / "addon.py"
+
+
+class FakeTimers:
+    """bpy.app.timers の代わり。Blender と同じく登録済みかどうかは関数オブジェクトの同一性で判定"""
+
+    def __init__(self):
+        self.registered = []  # [function, first_interval, persistent]
+
+    def register(self, function, first_interval=0.0, persistent=False):
+        self.registered.append([function, first_interval, persistent])
+
+    def is_registered(self, function):
+        return any(entry[0] is function for entry in self.registered)
+
+    def unregister(self, function):
+        for entry in self.registered:
+            if entry[0] is function:
+                self.registered.remove(entry)
+                return
+        raise ValueError("Error: function is not registered")
+
+    def run(self):
+        """登録中のタイマーを 1 回ずつ実行（None を返したものは登録解除）"""
+        for entry in list(self.registered):
+            if entry not in self.registered:
+                continue
+            interval = entry[0]()
+            if interval is None:
+                if entry in self.registered:
+                    self.registered.remove(entry)
+            else:
+                entry[1] = interval
+
+
+class _Types(types.ModuleType):
+    """bpy.types: 参照された型をその場で作る（サブクラス化と isinstance ができればよい）"""
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        cls = type(name, (), {})
+        setattr(self, name, cls)
+        return cls
+
+
+def make_fake_bpy():
+    bpy = types.ModuleType("bpy")
+    bpy.types = _Types("bpy.types")
+    bpy.props = types.ModuleType("bpy.props")
+    for name in ("IntProperty", "BoolProperty", "StringProperty", "EnumProperty", "FloatProperty"):
+        setattr(bpy.props, name, lambda *args, **kwargs: None)
+    handlers = types.SimpleNamespace(persistent=lambda function: function)
+    for name in ("depsgraph_update_post", "load_post", "undo_post", "redo_post", "frame_change_post"):
+        setattr(handlers, name, [])
+    bpy.app = types.SimpleNamespace(
+        timers=FakeTimers(),
+        handlers=handlers,
+        version=(5, 0, 0),
+        background=True,
+        tempdir="",
+    )
+    bpy.context = types.SimpleNamespace(scene=None, screen=None, window=None, window_manager=None)
+    bpy.data = types.SimpleNamespace()
+    bpy.utils = types.SimpleNamespace(register_class=lambda cls: None, unregister_class=lambda cls: None)
+    return bpy
+
+
+def _load_addon(monkeypatch, path, module_name):
+    bpy = make_fake_bpy()
+    monkeypatch.setitem(sys.modules, "bpy", bpy)
+    monkeypatch.setitem(sys.modules, "bpy.props", bpy.props)
+    monkeypatch.setitem(sys.modules, "mathutils", types.ModuleType("mathutils"))
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def addon(monkeypatch):
+    """v1/addon.py を最小限の bpy で読み込んだモジュール（テストごとに新しく読み込む）"""
+    return _load_addon(monkeypatch, V1_ADDON_PATH, "blendermcp_addon_under_test")
+
+
+@pytest.fixture
+def addon_v2(monkeypatch):
+    """src/addon.py（v2）を最小限の bpy で読み込んだモジュール"""
+    return _load_addon(monkeypatch, V2_ADDON_PATH, "blendermcp_addon_v2_under_test")
@@ -0,0 +1,51 @@
+"""
+v1 アドオン: キャンセルと期限
+"""
+
+import pytest
+
+
+@pytest.fixture
+def server(addon):
+    # ソケットは開かない（__init__ を通さずにハンドラだけ使う）
+    return object.__new__(addon.BlenderMCPServer)
+
+
+def _cancel(server, params):
+    command = {"type": "cancel", "params": params}
+    return server._answer_on_socket_thread(
+        lambda **p: {"status": "success", "result": server.cancel(**p)}, command
+    )
+
+
+@pytest.mark.parametrize("params", [{}, {"request": "r1"}, ["r1"], "r1"])
+def test_cancel_with_bad_params_is_an_error_response(server, params):
+    """不正なパラメータは接続を落とさずにエラー応答にする"""
+    response = _cancel(server, params)
+    assert response["status"] == "error"
+
+
+def test_cancel_marks_the_running_command(addon, server):
+    token = addon.track_command({"type": "execute_code", "request_id": "r1"})
+    response = _cancel(server, {"request_id": "r1"})
+    assert response == {"status": "success", "result": {"request_id": "r1", "cancelled": True}}
+    assert token.cancelled
+    with pytest.raises(addon.CommandCancelled):
+        token.check()
+    addon.untrack_command(token)
+    assert _cancel(server, {"request_id": "r1"})["result"]["cancelled"] is False
+
+
+def test_deadline_cancels_token(addon, monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(addon.time, "time", lambda: now[0])
+    token = addon.CancelToken("r2", deadline=105.0)
+    assert not token.cancelled
+    now[0] = 106.0
+    assert token.cancelled and token.reason == "deadline exceeded"
+    assert token.response()["cancelled"] is True
+
+
+def test_socket_thread_long_polls_reject_unknown_params(server):
+    response = server._answer_on_socket_thread(server.get_viewport_frame, {"type": "get_viewport_frame", "params": {"bogus": 1}})
+    assert response["status"] == "error"
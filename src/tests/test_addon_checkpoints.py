@@ -0,0 +1,198 @@
+"""
+v1 アドオン: チェックポイントとロールバック
+"""
+
+import contextlib
+import os
+import types
+
+import pytest
+
+
+class _Scene(dict):
+    pass
+
+
+class _UndoStack:
+    """Blender の memfile undo の代わり: 各ステップにシーンのマーカーを記録する"""
+
+    def __init__(self, scene, max_steps):
+        self.scene = scene
+        self.max_steps = max_steps
+        self.steps = [dict(scene)]
+        self.index = 0
+
+    def push(self, message=""):
+        del self.steps[self.index + 1:]
+        self.steps.append(dict(self.scene))
+        # 上限を超えた古いステップは消える
+        del self.steps[:max(0, len(self.steps) - self.max_steps)]
+        self.index = len(self.steps) - 1
+
+    def _restore(self):
+        self.scene.clear()
+        self.scene.update(self.steps[self.index])
+
+    def undo(self):
+        self.index -= 1
+        self._restore()
+
+    def redo(self):
+        self.index += 1
+        self._restore()
+
+
+def _operator(function, poll=lambda: True):
+    op = lambda *args, **kwargs: function(*args, **kwargs)
+    op.poll = poll
+    return op
+
+
+@pytest.fixture
+def undo_stack(addon):
+    bpy = addon.bpy
+    scene = _Scene()
+    stack = _UndoStack(scene, max_steps=4)
+    bpy.app.background = False
+    bpy.context.scene = scene
+    bpy.context.window = object()
+    bpy.context.temp_override = lambda **kwargs: contextlib.nullcontext()
+    bpy.context.preferences = types.SimpleNamespace(edit=types.SimpleNamespace(undo_steps=3, undo_memory_limit=0))
+    bpy.data.scenes = [scene]
+    bpy.ops = types.SimpleNamespace(ed=types.SimpleNamespace(
+        undo_push=_operator(stack.push),
+        undo=_operator(stack.undo, poll=lambda: stack.index > 0),
+        redo=_operator(stack.redo, poll=lambda: stack.index < len(stack.steps) - 1),
+    ))
+    return stack
+
+
+def test_rollback_through_undo(addon, undo_stack):
+    store = addon.CheckpointStore()
+    store.begin("before")
+    undo_stack.scene["edit"] = 1
+    undo_stack.push()
+
+    result = store.rollback()
+
+    assert "edit" not in undo_stack.scene
+    assert addon.CHECKPOINT_MARKER not in undo_stack.scene
+    assert result["undo_steps"] == 2
+
+
+def test_rollback_past_undo_stack_leaves_scene_alone(addon, undo_stack):
+    """チェックポイントが undo 履歴から消えていたら、undo した分を redo してからエラーにする"""
+    store = addon.CheckpointStore()
+    checkpoint = store.begin()
+    for i in range(5):
+        undo_stack.scene["edit"] = i
+        undo_stack.push()
+
+    with pytest.raises(ValueError, match="no longer on the undo stack"):
+        store.rollback(checkpoint["id"])
+
+    assert undo_stack.scene["edit"] == 4
+    assert undo_stack.index == len(undo_stack.steps) - 1
+    assert checkpoint["id"] not in store.checkpoints
+
+
+def test_file_checkpoints_are_pinned(addon, tmp_path):
+    """.blend のコピーはチェックポイントがある間スクラッチの回収から守る"""
+    addon.bpy.data.images = []
+    addon._scratch_space = scratch = addon.ScratchSpace(str(tmp_path), quota_bytes=0)
+
+    def save_as_mainfile(filepath, **kwargs):
+        with open(filepath, "wb") as f:
+            f.write(b"BLENDER" * 10)
+
+    addon.bpy.ops = types.SimpleNamespace(wm=types.SimpleNamespace(save_as_mainfile=save_as_mainfile))
+    store = addon.CheckpointStore(limit=1)
+    first = store.begin(session_id="s1")
+    scratch.reclaim()
+    assert os.path.exists(first["path"])
+
+    second = store.begin(session_id="s1")
+    assert not os.path.exists(first["path"])
+    store.commit(second["id"])
+    assert not scratch.pins
+
+
+class _Scenes(list):
+    """bpy.data.scenes の代わり"""
+
+    def new(self, name):
+        scene = types.SimpleNamespace(name=name)
+        self.append(scene)
+        return scene
+
+
+@pytest.fixture
+def file_checkpoints(addon, tmp_path):
+    """undo が使えない環境: チェックポイントは .blend のコピー（ここではシーン名を書いたファイル）"""
+    bpy = addon.bpy
+    bpy.app.background = False
+    bpy.context.preferences = types.SimpleNamespace(edit=types.SimpleNamespace(undo_steps=0, undo_memory_limit=0))
+    bpy.data.images = []
+    bpy.data.scenes = _Scenes()
+    bpy.context.window = types.SimpleNamespace(scene=bpy.data.scenes.new("Scene"))
+    bpy.context.window_manager = None
+    opened = []
+
+    def save_as_mainfile(filepath, **kwargs):
+        with open(filepath, "w") as f:
+            f.write("\n".join(scene.name for scene in bpy.data.scenes))
+
+    @contextlib.contextmanager
+    def load(filepath, link=False):
+        with open(filepath) as f:
+            data_from = types.SimpleNamespace(scenes=f.read().split("\n"))
+        data_to = types.SimpleNamespace(scenes=[])
+        yield data_from, data_to
+        # 読み込み後は名前がデータブロックに置き換わる（名前が使われていれば .001 が付く）
+        names = {scene.name for scene in bpy.data.scenes}
+        data_to.scenes = [bpy.data.scenes.new(name if name not in names else f"{name}.001") for name in data_to.scenes]
+
+    bpy.data.libraries = types.SimpleNamespace(load=load)
+    bpy.data.orphans_purge = lambda **kwargs: None
+    bpy.ops = types.SimpleNamespace(wm=types.SimpleNamespace(
+        save_as_mainfile=save_as_mainfile,
+        open_mainfile=lambda filepath, **kwargs: opened.append(filepath),
+    ))
+    addon._scratch_space = addon.ScratchSpace(str(tmp_path))
+    return opened
+
+
+def test_file_rollback_swaps_scenes_in_place(addon, file_checkpoints):
+    """ウィンドウがあればシーンだけ入れ替え、開いているファイルとタイマーはそのまま"""
+    bpy = addon.bpy
+    store = addon.CheckpointStore()
+    checkpoint = store.begin()
+    assert checkpoint["method"] == "file"
+    bpy.data.scenes.new("Added later")
+
+    result = store.rollback()
+
+    assert file_checkpoints == []
+    assert [scene.name for scene in bpy.data.scenes] == ["Scene"]
+    assert bpy.context.window.scene is bpy.data.scenes[0]
+    assert "file_reopened" not in result
+    assert os.path.exists(checkpoint["path"])
+
+
+def test_file_rollback_without_window(addon, file_checkpoints):
+    """バックグラウンドではファイルを開き直すしかないので、他のコマンドが待っている間は断る"""
+    addon.bpy.context.window = None
+    store = addon.CheckpointStore()
+    checkpoint = store.begin()
+    running = addon.track_command({"type": "rollback"})
+    other = addon.track_command({"type": "create_object"})
+    with pytest.raises(ValueError, match="other commands are pending"):
+        store.rollback()
+    assert file_checkpoints == []
+
+    addon.untrack_command(other)
+    result = store.rollback()
+    addon.untrack_command(running)
+    assert file_checkpoints == [checkpoint["path"]]
+    assert result["file_reopened"] is True
+    assert addon.commands_in_flight() == 0
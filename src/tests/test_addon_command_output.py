@@ -0,0 +1,54 @@
+"""
+v1 アドオン: コマンド出力の取り込みとストリーミング
+"""
+
+import pytest
+
+
+def test_checked_output_keeps_head_and_tail(addon):
+    """上限を超えた出力は先頭と末尾の limit/2 文字だけ残す"""
+    out = addon.CheckedOutput(addon.CancelToken(), limit=10)
+    for i in range(10):
+        assert out.write(f"{i}abc") == 4
+    value = out.getvalue()
+    assert value.startswith("0abc1")
+    assert value.endswith("c9abc")
+    assert "[30 characters of output truncated]" in value
+
+
+def test_checked_output_short_output_untouched(addon):
+    out = addon.CheckedOutput(addon.CancelToken(), limit=100)
+    assert out.write("abc") == 3
+    assert out.write("") == 0
+    assert out.getvalue() == "abc"
+
+
+def test_checked_output_streams_and_checks_cancellation(addon):
+    token = addon.CancelToken("r1")
+    token.stream = addon.CommandStream()
+    out = addon.CheckedOutput(token)
+    out.write("hello ")
+    out.write("world")
+    assert token.stream.drain() == [{"frame": "output", "data": "hello world"}]
+
+    token.cancel()
+    with pytest.raises(addon.CommandCancelled):
+        out.write("more")
+
+
+def test_stream_drops_oldest_output_and_keeps_progress(addon):
+    """遅いクライアント向けに溜まった出力は古いものから捨て、進捗フレームは残す"""
+    stream = addon.CommandStream(max_pending=5)
+    stream.output("abc")
+    stream.progress(50, "half")
+    stream.output("defg")
+    assert stream.drain() == [
+        {"frame": "output", "data": "c"},
+        {"frame": "progress", "progress": 50.0, "total": 100.0, "message": "half"},
+        {"frame": "output", "data": "defg"},
+        {"frame": "dropped", "characters": 2},
+    ]
+    assert stream.drain() == []
+
+    stream.output("abcdefgh")
+    assert stream.drain() == [{"frame": "output", "data": "defgh"}, {"frame": "dropped", "characters": 3}]
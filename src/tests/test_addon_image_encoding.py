@@ -0,0 +1,59 @@
+"""
+v1 アドオン: 縮小と PNG エンコード
+"""
+
+import struct
+import zlib
+
+import numpy as np
+import pytest
+
+
+def decode_png(data):
+    """encode_png が書く形式（RGBA 8bit、フィルタなし、IDAT 1 つ）だけを読む"""
+    assert data[:8] == b"\x89PNG\r\n\x1a\n"
+    chunks, pos = {}, 8
+    while pos < len(data):
+        (length,) = struct.unpack(">I", data[pos:pos + 4])
+        kind, body = data[pos + 4:pos + 8], data[pos + 8:pos + 8 + length]
+        (crc,) = struct.unpack(">I", data[pos + 8 + length:pos + 12 + length])
+        assert crc == zlib.crc32(kind + body) & 0xFFFFFFFF
+        chunks[kind] = body
+        pos += 12 + length
+    width, height, depth, color, _, _, _ = struct.unpack(">IIBBBBB", chunks[b"IHDR"])
+    assert (depth, color) == (8, 6)
+    raw = np.frombuffer(zlib.decompress(chunks[b"IDAT"]), dtype=np.uint8).reshape(height, width * 4 + 1)
+    assert not raw[:, 0].any()
+    return raw[:, 1:].reshape(height, width, 4)
+
+
+def test_encode_png_round_trip(addon):
+    rgba = np.random.default_rng(0).integers(0, 256, size=(7, 5, 4), dtype=np.uint8)
+    assert np.array_equal(decode_png(addon.encode_png(rgba)), rgba)
+    assert addon.encode_image(rgba, "PNG") == addon.encode_png(rgba)
+
+
+@pytest.mark.parametrize("shape, max_size, expected", [
+    ((1080, 1920), 800, (450, 800)),
+    ((1920, 1080), 800, (800, 450)),
+    ((601, 7), 100, (100, 1)),
+    ((300, 200), 400, (300, 200)),
+])
+def test_box_downsample_size(addon, shape, max_size, expected):
+    pixels = np.zeros(shape + (4,), dtype=np.float32)
+    assert addon.box_downsample(pixels, max_size).shape == expected + (4,)
+
+
+def test_box_downsample_averages_blocks(addon):
+    """各出力画素はそれが覆う入力ブロックの平均（端数のブロックも含む）"""
+    pixels = np.arange(5 * 6, dtype=np.float32).reshape(5, 6, 1).repeat(4, axis=2)
+    out = addon.box_downsample(pixels, 3)
+    assert out.shape == (2, 3, 4)
+    for (r0, r1), row in zip(((0, 2), (2, 5)), out):
+        for (c0, c1), value in zip(((0, 2), (2, 4), (4, 6)), row):
+            assert value[0] == pytest.approx(pixels[r0:r1, c0:c1, 0].mean())
+
+
+def test_to_uint8_rounds_and_clips(addon):
+    pixels = np.array([-0.5, 0.0, 0.5, 1.0, 2.0], dtype=np.float32)
+    assert addon.to_uint8(pixels).tolist() == [0, 0, 128, 255, 255]
@@ -0,0 +1,123 @@
+"""
+v1 アドオン: モデルアーカイブのストリーミング展開
+"""
+
+import io
+import json
+import zipfile
+
+import pytest
+
+GLTF = json.dumps({
+    "buffers": [{"uri": "scene.bin"}],
+    "images": [{"uri": "textures/base%20color.png"}],
+}).encode()
+
+
+class _Unseekable(io.RawIOBase):
+    """シークできない出力先（zipfile がデータディスクリプタ付きで書く）"""
+
+    def __init__(self):
+        self.data = bytearray()
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self.data += b
+        return len(b)
+
+
+def make_zip(entries, seekable=True, force_zip64=False, compression=zipfile.ZIP_DEFLATED):
+    out = io.BytesIO() if seekable else _Unseekable()
+    with zipfile.ZipFile(out, "w", compression=compression) as zf:
+        for name, data in entries.items():
+            info = zipfile.ZipInfo(name)
+            info.compress_type = compression
+            with zf.open(info, "w", force_zip64=force_zip64) as f:
+                f.write(data)
+    return bytes(out.getvalue() if seekable else out.data)
+
+
+def chunked(data, size=7):
+    """小さく不揃いなチャンクで届く HTTP レスポンスの代わり"""
+    return (data[i:i + size] for i in range(0, len(data), size))
+
+
+MODEL = {
+    "model/scene.gltf": GLTF,
+    "model/scene.bin": b"\0" * 1000,
+    "model/textures/base color.png": b"png" * 50,
+    "model/textures/unused.png": b"unused",
+    "model/readme.txt": b"not a model file",
+}
+
+
+@pytest.mark.parametrize("seekable", [True, False])
+@pytest.mark.parametrize("force_zip64", [False, True])
+def test_extracts_main_file_and_references(addon, tmp_path, seekable, force_zip64):
+    """zip64 のローカルヘッダやデータディスクリプタ付きでも展開でき、参照されないファイルは残さない"""
+    archive = make_zip(MODEL, seekable=seekable, force_zip64=force_zip64)
+    result = addon.extract_model_archive(chunked(archive), str(tmp_path))
+
+    model_dir = tmp_path / "model"
+    assert result["main_file"] == str(model_dir / "scene.gltf")
+    assert sorted(result["files"]) == sorted([
+        str(model_dir / "scene.gltf"),
+        str(model_dir / "scene.bin"),
+        str(model_dir / "textures" / "base color.png"),
+    ])
+    assert (model_dir / "scene.bin").read_bytes() == MODEL["model/scene.bin"]
+    assert not (model_dir / "textures" / "unused.png").exists()
+    assert not (model_dir / "readme.txt").exists()
+    assert result["entries"] == len(MODEL)
+
+
+def test_stored_entries(addon, tmp_path):
+    archive = make_zip({"a.glb": b"glTF" + bytes(range(256))}, compression=zipfile.ZIP_STORED)
+    result = addon.extract_model_archive(chunked(archive, 3), str(tmp_path))
+    assert (tmp_path / "a.glb").read_bytes() == b"glTF" + bytes(range(256))
+    assert result["bytes"] == 260
+
+
+@pytest.mark.parametrize("name", ["../evil.gltf", "model/../../evil.gltf", "/abs/evil.gltf", "C:/evil.gltf", "..\\evil.gltf"])
+def test_rejects_path_traversal(addon, tmp_path, name):
+    dest = tmp_path / "dest"
+    dest.mkdir()
+    archive = make_zip({name: b"{}"})
+    with pytest.raises(ValueError, match="path traversal"):
+        addon.extract_model_archive(chunked(archive), str(dest))
+    assert not (tmp_path / "evil.gltf").exists()
+
+
+def test_uncompressed_size_limit(addon, tmp_path):
+    """展開後のサイズで制限する（zip bomb 対策）"""
+    archive = make_zip({"scene.glb": b"\0" * 100000})
+    assert len(archive) < 1000
+    with pytest.raises(ValueError, match="size limit"):
+        addon.extract_model_archive(chunked(archive, 512), str(tmp_path), max_bytes=50000)
+
+
+def test_crc_mismatch(addon, tmp_path):
+    data = b"glTF" + b"x" * 100
+    archive = bytearray(make_zip({"scene.glb": data}, compression=zipfile.ZIP_STORED))
+    archive[archive.index(data) + 10] ^= 0xFF
+    with pytest.raises(ValueError, match="CRC mismatch"):
+        addon.extract_model_archive([bytes(archive)], str(tmp_path))
+
+
+def test_requires_a_model_file(addon, tmp_path):
+    with pytest.raises(ValueError, match="No glTF/GLB/OBJ"):
+        addon.extract_model_archive([make_zip({"textures/a.png": b"png"})], str(tmp_path))
+
+
+def test_rejects_non_zip(addon, tmp_path):
+    with pytest.raises(ValueError, match="not a valid zip"):
+        addon.extract_model_archive([b"<html>rate limited</html>"], str(tmp_path))
+
+
+def test_stored_entry_without_size(addon, tmp_path):
+    """サイズがデータディスクリプタにしかない無圧縮エントリは終わりが分からないので拒否する"""
+    archive = make_zip({"scene.glb": b"glTF"}, seekable=False, compression=zipfile.ZIP_STORED)
+    with pytest.raises(ValueError, match="without size"):
+        addon.extract_model_archive([archive], str(tmp_path))
@@ -0,0 +1,95 @@
+"""
+v1 アドオン: プレビュー用 GLB の書き出し
+"""
+
+import json
+import struct
+
+import numpy as np
+
+
+def parse_glb(data):
+    magic, version, length = struct.unpack("<III", data[:12])
+    assert (magic, version, length) == (0x46546C67, 2, len(data))
+    json_length, json_type = struct.unpack("<II", data[12:20])
+    assert json_type == 0x4E4F534A and json_length % 4 == 0
+    document = json.loads(data[20:20 + json_length])
+    pos = 20 + json_length
+    bin_length, bin_type = struct.unpack("<II", data[pos:pos + 8])
+    assert bin_type == 0x004E4942 and bin_length % 4 == 0
+    assert pos + 8 + bin_length == len(data)
+    return document, data[pos + 8:]
+
+
+def test_glb_layout_and_alignment(addon):
+    """ビューは 4 バイト境界から始まり、頂点属性の行は byteStride で 4 バイトに揃える"""
+    writer = addon.GlbWriter()
+    indices = writer.accessor(np.array([0, 1, 2], dtype=np.uint8), 5121, "SCALAR",
+                              target=addon.GLTF_ELEMENT_ARRAY_BUFFER)
+    positions = np.array([[1, -2, 3], [4, 5, -6], [-7, 8, 9]], dtype=np.int16)
+    position = writer.accessor(positions, addon.GLTF_SHORT, "VEC3", target=addon.GLTF_ARRAY_BUFFER, min_max=True)
+    normals = writer.accessor(np.zeros((3, 3), dtype=np.int8), addon.GLTF_BYTE, "VEC3",
+                              target=addon.GLTF_ARRAY_BUFFER, normalized=True)
+
+    document, binary = parse_glb(writer.tobytes())
+
+    views = document["bufferViews"]
+    assert all(view["byteOffset"] % 4 == 0 for view in views)
+    assert "byteStride" not in views[0]
+    assert views[1]["byteStride"] == 8 and views[1]["byteLength"] == 24
+    assert views[2]["byteStride"] == 4
+    assert document["buffers"][0]["byteLength"] == writer.length <= len(binary)
+
+    accessor = document["accessors"][position]
+    assert accessor["min"] == [-7, -2, -6] and accessor["max"] == [4, 8, 9]
+    assert document["accessors"][normals]["normalized"] is True
+    view = views[accessor["bufferView"]]
+    rows = np.frombuffer(binary, dtype=np.uint8, count=view["byteLength"], offset=view["byteOffset"])
+    decoded = rows.reshape(3, 8)[:, :6].copy().view(np.int16)
+    assert np.array_equal(decoded, positions)
+    assert document["accessors"][indices]["count"] == 3
+    # 空のリストは書き出さない
+    assert "meshes" not in document and "materials" not in document
+
+
+def _quaternion_matrix(q):
+    x, y, z, w = q
+    return np.array([
+        [1 - 2 * (y * y + z * z), 2 * (x * y - z * w), 2 * (x * z + y * w)],
+        [2 * (x * y + z * w), 1 - 2 * (x * x + z * z), 2 * (y * z - x * w)],
+        [2 * (x * z - y * w), 2 * (y * z + x * w), 1 - 2 * (x * x + y * y)],
+    ])
+
+
+def _random_rotations(rng, n):
+    q = rng.normal(size=(n, 4))
+    q /= np.linalg.norm(q, axis=1, keepdims=True)
+    return q, np.array([_quaternion_matrix(row) for row in q])
+
+
+def test_decompose_matrices_recomposes(addon):
+    rng = np.random.default_rng(1)
+    _, rotations = _random_rotations(rng, 50)
+    scales = rng.uniform(0.1, 5.0, size=(50, 3))
+    scales[::5, 1] *= -1  # 鏡像（行列式が負）も含める
+    matrices = np.zeros((50, 4, 4))
+    matrices[:, :3, :3] = rotations * scales[:, None, :]
+    matrices[:, :3, 3] = rng.normal(size=(50, 3))
+    matrices[:, 3, 3] = 1
+
+    translations, quaternions, out_scales = addon.decompose_matrices(matrices)
+
+    assert np.allclose(np.linalg.norm(quaternions, axis=1), 1)
+    recomposed = np.array([_quaternion_matrix(q) for q in quaternions]) * out_scales[:, None, :]
+    assert np.allclose(recomposed, matrices[:, :3, :3], atol=1e-6)
+    assert np.allclose(translations, matrices[:, :3, 3])
+    assert np.allclose(np.abs(out_scales), np.abs(scales))
+    # 鏡像は X スケールの符号で表す
+    assert (out_scales[::5, 0] < 0).all()
+
+
+def test_decompose_identity(addon):
+    translations, quaternions, scales = addon.decompose_matrices(np.eye(4)[None])
+    assert np.allclose(quaternions, [[0, 0, 0, 1]])
+    assert np.allclose(scales, [[1, 1, 1]])
+    assert np.allclose(translations, 0)
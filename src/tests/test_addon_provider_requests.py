@@ -0,0 +1,77 @@
+"""
+v1 アドオン: プロバイダー API へのリクエストとレート制限
+"""
+
+import inspect
+import threading
+import types
+
+import pytest
+
+
+@pytest.fixture
+def server(addon):
+    return object.__new__(addon.BlenderMCPServer)
+
+
+@pytest.fixture
+def requests_log(addon, monkeypatch, tmp_path):
+    """provider_request の代わり: 呼ばれたスレッドとプロバイダーを記録する"""
+    log = []
+
+    def fake_provider_request(provider, method, url, **kwargs):
+        log.append((provider, threading.get_ident()))
+        body = {"jobs": [{"status": "Done"}], "results": [], "username": "someone"}
+        return types.SimpleNamespace(status_code=200, json=lambda: body)
+
+    monkeypatch.setattr(addon, "provider_request", fake_provider_request)
+    addon._sketchfab_preview_cache = addon.SketchfabPreviewCache(str(tmp_path))
+    addon.bpy.context.scene = types.SimpleNamespace(
+        blendermcp_hyper3d_api_key="key",
+        blendermcp_sketchfab_api_key="key",
+        blendermcp_use_sketchfab=True,
+    )
+    return log
+
+
+@pytest.mark.parametrize("handler, params, provider", [
+    ("get_polyhaven_categories", {"asset_type": "hdris"}, "polyhaven"),
+    ("poll_rodin_job_status_main_site", {"subscription_key": "s"}, "hyper3d"),
+    ("poll_rodin_job_status_fal_ai", {"request_id": "r"}, "fal"),
+    ("create_rodin_job_fal_ai", {"text_prompt": "a chair"}, "fal"),
+    ("get_sketchfab_status", {}, "sketchfab"),
+    ("search_sketchfab_models", {"query": "chair"}, "sketchfab"),
+])
+def test_provider_calls_leave_the_main_thread(addon, server, requests_log, handler, params, provider):
+    """レート制限で待つことがあるので、API 呼び出しはメインスレッドでなくバックグラウンドで行う"""
+    gen = getattr(server, handler)(**params)
+    assert inspect.isgenerator(gen)
+    assert requests_log == []
+    result = addon.run_to_completion(gen)
+    assert "error" not in result
+    assert [name for name, _ in requests_log] == [provider]
+    assert requests_log[0][1] != threading.get_ident()
+
+
+def test_texture_downloads_use_the_limiter(addon, tmp_path, monkeypatch):
+    """大きなダウンロードも同じプロバイダーのリミッターを通す"""
+    calls = []
+
+    def fake_provider_request(provider, method, url, **kwargs):
+        calls.append((provider, url, kwargs.get("timeout")))
+        return types.SimpleNamespace(content=b"pixels", raise_for_status=lambda: None)
+
+    monkeypatch.setattr(addon, "provider_request", fake_provider_request)
+    registry = addon.DatablockRegistry(str(tmp_path))
+    digest, path, downloaded = registry.fetch_file("https://x/a.jpg", "jpg")
+    assert downloaded
+    assert calls == [("polyhaven", "https://x/a.jpg", addon.DOWNLOAD_TIMEOUT)]
+
+
+def test_limiter_rejects_after_max_wait(addon):
+    limiter = addon.ProviderLimiter("test", max_in_flight=1, rate=100.0, burst=1)
+    limiter.acquire()
+    with pytest.raises(addon.ProviderBusyError):
+        limiter.acquire(timeout=0)
+    limiter.release()
+    assert limiter.snapshot()["rejected"] == 1
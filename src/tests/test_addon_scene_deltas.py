@@ -0,0 +1,39 @@
+"""
+v1 アドオン: シーン差分の追跡
+"""
+
+import types
+
+
+def _update(addon, name):
+    obj = addon.bpy.types.Object()
+    obj.original = types.SimpleNamespace(name=name)
+    return types.SimpleNamespace(id=obj, is_updated_geometry=False)
+
+
+def test_updates_coalesce_into_one_flush(addon):
+    """depsgraph の更新がいくつ来てもフラッシュ用タイマーは 1 つ（SCENE_DELTA_INTERVAL ごとにまとめる）"""
+    timers = addon.bpy.app.timers
+    tracker = addon.SceneDeltaTracker()
+    tracker.touch()
+    tracker.touch()
+    assert [entry[0] for entry in timers.registered] == [tracker.start_timer]
+
+    timers.registered.clear()
+    tracker.active = True
+    for i in range(20):
+        tracker.on_update(types.SimpleNamespace(updates=[_update(addon, f"Cube.{i % 3}")]))
+    assert [entry[0] for entry in timers.registered] == [tracker.flush_timer]
+    assert timers.registered[0][1] == addon.SCENE_DELTA_INTERVAL
+    assert sorted(tracker.dirty) == ["Cube.0", "Cube.1", "Cube.2"]
+
+    tracker.stop()
+    assert not timers.registered
+    assert not tracker.active
+
+
+def test_image_updates_are_ignored(addon):
+    tracker = addon.SceneDeltaTracker()
+    image = types.SimpleNamespace(id=addon.bpy.types.Image(), is_updated_geometry=False)
+    tracker.on_update(types.SimpleNamespace(updates=[image]))
+    assert not addon.bpy.app.timers.registered
@@ -0,0 +1,101 @@
+"""
+v1 アドオン: スクラッチ領域の回収
+"""
+
+import os
+import subprocess
+import sys
+import time
+
+
+def _old_file(path, age=10 * 3600):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x" * 10)
+    old = time.time() - age
+    os.utime(path, (old, old))
+    os.utime(path.parent, (old, old))
+
+
+def _dead_pid():
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+def test_process_alive(addon):
+    assert addon.process_alive(os.getpid())
+    assert not addon.process_alive(_dead_pid())
+    assert not addon.process_alive(0)
+
+
+def test_reclaim_keeps_roots_of_running_processes(addon, tmp_path):
+    """他の Blender が動いている間はそのルートを mtime に関係なく消さない"""
+    addon.bpy.data.images = []
+    live = tmp_path / str(os.getppid()) / "session" / "texture.png"
+    dead = tmp_path / str(_dead_pid()) / "session" / "texture.png"
+    other = tmp_path / "not-a-pid" / "file.bin"
+    for path in (live, dead, other):
+        _old_file(path)
+
+    scratch = addon.ScratchSpace(str(tmp_path))
+    scratch.reclaim()
+
+    assert live.exists()
+    assert other.exists()
+    assert not dead.exists()
+    assert not dead.parent.parent.exists()
+
+
+def test_reclaim_own_root_by_age_and_quota(addon, tmp_path):
+    addon.bpy.data.images = []
+    scratch = addon.ScratchSpace(str(tmp_path), quota_bytes=25, max_age=3600)
+    old = tmp_path / str(os.getpid()) / "s1" / "old.bin"
+    _old_file(old)
+    pinned = tmp_path / str(os.getpid()) / "s1" / "pinned.bin"
+    _old_file(pinned)
+    scratch.pin(str(pinned))
+    fresh = [tmp_path / str(os.getpid()) / "s2" / f"{i}.bin" for i in range(3)]
+    for i, path in enumerate(fresh):
+        _old_file(path, age=60 - i)
+
+    usage = scratch.reclaim()
+
+    assert not old.exists()
+    assert pinned.exists()
+    # 容量超過分は古いものから消える（参照中の 10 バイトを含めて 25 バイト以内）
+    assert [path.exists() for path in fresh] == [False, False, True]
+    assert usage["used_bytes"] == 20
+
+
+def test_reclaim_keeps_files_being_written(addon, tmp_path):
+    """書き込み中のダウンロードや展開先は容量超過でも release() まで消さない"""
+    addon.bpy.data.images = []
+    scratch = addon.ScratchSpace(str(tmp_path), quota_bytes=0)
+    download = scratch.make_file(suffix=".glb")
+    extracted = scratch.make_dir(prefix="model_")
+    with open(download, "wb") as f:
+        f.write(b"partial")
+    model = os.path.join(extracted, "textures", "color.png")
+    os.makedirs(os.path.dirname(model))
+    with open(model, "wb") as f:
+        f.write(b"png")
+
+    scratch.reclaim()
+    assert os.path.exists(download)
+    assert os.path.exists(model)
+
+    scratch.release(download)
+    scratch.release(extracted)
+    assert not os.path.exists(download)
+    assert not os.path.exists(extracted)
+    assert not scratch.pins
+
+
+def test_unpinned_files_are_left_to_reclaim(addon, tmp_path):
+    addon.bpy.data.images = []
+    scratch = addon.ScratchSpace(str(tmp_path), quota_bytes=0)
+    path = scratch.make_file(suffix=".pstats", pin=False)
+    with open(path, "wb") as f:
+        f.write(b"stats")
+    scratch.reclaim()
+    assert not os.path.exists(path)
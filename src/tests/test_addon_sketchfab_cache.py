@@ -0,0 +1,64 @@
+"""
+v1 アドオン: TTLCache と Sketchfab プレビューキャッシュ
+"""
+
+import pytest
+
+UID = "0123456789abcdef0123456789abcdef"
+
+
+def test_ttl_cache_expires_entries(addon, monkeypatch):
+    """ttl を過ぎたエントリは返さずに削除する"""
+    now = [1000.0]
+    monkeypatch.setattr(addon.time, "time", lambda: now[0])
+    cache = addon.TTLCache(ttl=10, max_entries=4)
+    cache.set("a", 1)
+    now[0] += 9
+    assert cache.get("a") == 1
+    now[0] += 2
+    assert cache.get("a") is None
+    assert "a" not in cache.entries
+
+
+def test_ttl_cache_evicts_least_recently_used(addon):
+    """max_entries を超えたら最も古く使われたものから捨てる"""
+    cache = addon.TTLCache(ttl=60, max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_select_thumbnail_prefers_smallest_wide_enough(addon):
+    thumbnails = [
+        {"url": "https://x/1024.jpeg", "width": 1024},
+        {"url": "https://x/256.jpeg", "width": 256},
+        {"url": "https://x/720.jpeg", "width": 720},
+    ]
+    select = addon.SketchfabPreviewCache.select_thumbnail
+    assert select(thumbnails, 640)["width"] == 720
+    assert select(thumbnails, 2048)["width"] == 1024
+    assert select([{"width": 100}], 640) is None
+
+
+@pytest.mark.parametrize("uid", ["../../etc/passwd", UID.upper(), UID[:-1], UID + "/x", None, 42])
+def test_preview_path_rejects_invalid_uid(addon, tmp_path, uid):
+    """uid はパスに使う前に検証し、cache_dir の外を指せないようにする"""
+    cache = addon.SketchfabPreviewCache(str(tmp_path))
+    with pytest.raises(ValueError):
+        cache._path(uid, {"url": "https://x/a.png", "width": 640})
+
+
+def test_preview_path_stays_in_cache_dir(addon, tmp_path):
+    cache = addon.SketchfabPreviewCache(str(tmp_path))
+    path = cache._path(UID, {"url": "https://x/a.PNG?v=1", "width": "640"})
+    assert path == str(tmp_path / f"{UID}_640.png")
+
+
+def test_prefetch_skips_invalid_uids(addon, tmp_path, monkeypatch):
+    cache = addon.SketchfabPreviewCache(str(tmp_path))
+    monkeypatch.setattr(addon.threading, "Thread", lambda *args, **kwargs: pytest.fail("nothing to prefetch"))
+    cache.prefetch([{"uid": "../evil", "thumbnails": {"images": [{"url": "https://x/a.jpeg", "width": 640}]}}])
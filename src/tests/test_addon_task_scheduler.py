@@ -0,0 +1,68 @@
+"""
+v1 アドオン: 時分割タスクスケジューラ
+"""
+
+from concurrent.futures import Future
+
+
+def _counter(log, name, steps):
+    for i in range(steps):
+        log.append((name, i))
+        yield
+    return {"status": "success", "result": name}
+
+
+def test_one_timer_for_many_tasks(addon):
+    """タスクをいくつ投入してもタイマーは 1 つ（tick ごとの時間予算を守るため）"""
+    timers = addon.bpy.app.timers
+    scheduler = addon.TaskScheduler()
+    results = []
+    log = []
+    for name in ("a", "b", "c"):
+        scheduler.submit(_counter(log, name, 3), results.append, name=name)
+    assert len(timers.registered) == 1
+    assert timers.is_registered(scheduler.timer)
+
+    while timers.registered:
+        timers.run()
+    assert sorted(r["result"] for r in results) == ["a", "b", "c"]
+    # ラウンドロビン: 各タスクの 1 ステップ目は他のタスクの 2 ステップ目より先
+    assert log[:3] == [("a", 0), ("b", 0), ("c", 0)]
+
+    scheduler.submit(_counter(log, "d", 1), results.append)
+    assert len(timers.registered) == 1
+    scheduler.stop()
+    assert not timers.registered
+
+
+def test_tick_respects_budget(addon, monkeypatch):
+    """1 tick で使う時間は tick_budget まで"""
+    clock = [0.0]
+    monkeypatch.setattr(addon.time, "perf_counter", lambda: clock[0])
+
+    def slow():
+        for _ in range(10):
+            clock[0] += 0.01
+            yield
+
+    scheduler = addon.TaskScheduler(tick_budget=0.025)
+    scheduler.submit(slow(), lambda result: None)
+    scheduler.submit(slow(), lambda result: None)
+    scheduler.timer()
+    assert sum(task.steps for task in scheduler.tasks) == 3
+
+
+def test_waits_for_futures_without_blocking(addon):
+    future = Future()
+    results = []
+
+    def handler():
+        value = yield future
+        return {"status": "success", "result": value}
+
+    scheduler = addon.TaskScheduler()
+    scheduler.submit(handler(), results.append)
+    assert scheduler.timer() == addon.TASK_IDLE_INTERVAL
+    future.set_result(42)
+    assert scheduler.timer() is None
+    assert results == [{"status": "success", "result": 42}]
@@ -0,0 +1,45 @@
+"""
+v1 アドオン: テクスチャキャッシュ（DatablockRegistry）の容量制限
+"""
+
+import os
+import time
+import types
+
+import pytest
+
+
+def _cached(path, size, age):
+    path.write_bytes(b"x" * size)
+    mtime = time.time() - age
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def test_evicts_least_recently_used_unreferenced_files(addon, tmp_path):
+    """上限を超えたら最も前に使われたファイルから消す。読み込まれている画像と取得直後のファイルは残す"""
+    oldest = _cached(tmp_path / "a.hdr", 40, 3 * 3600)
+    loaded = _cached(tmp_path / "b.hdr", 40, 2 * 3600)
+    older = _cached(tmp_path / "c.jpg", 40, 3600)
+    fresh = _cached(tmp_path / "d.jpg", 40, 10)
+    partial = _cached(tmp_path / "e.jpg.123.part", 40, 4 * 3600)
+    addon.bpy.path = types.SimpleNamespace(abspath=lambda path: path)
+    addon.bpy.data.images = [types.SimpleNamespace(packed_file=None, source='FILE', filepath=str(loaded))]
+
+    registry = addon.DatablockRegistry(str(tmp_path), max_bytes=90)
+    stats = registry.evict()
+
+    assert [p.exists() for p in (oldest, loaded, older, fresh)] == [False, True, False, True]
+    assert partial.exists()
+    assert stats["bytes"] == 80
+    assert stats["evicted_files"] == 2 and stats["evicted_bytes"] == 80
+
+
+def test_cache_hit_marks_file_used(addon, tmp_path, monkeypatch):
+    md5 = "0" * 32
+    path = _cached(tmp_path / f"{md5}.jpg", 10, 3600)
+    monkeypatch.setattr(addon, "provider_request", lambda *args, **kwargs: pytest.fail("cached files are not downloaded again"))
+    registry = addon.DatablockRegistry(str(tmp_path))
+    assert registry.fetch_file("https://x/a.jpg", "jpg", md5=md5) == (md5, str(path), False)
+    assert time.time() - path.stat().st_mtime < 60
+
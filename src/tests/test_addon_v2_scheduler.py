@@ -0,0 +1,57 @@
+"""
+v2 アドオン: セッション間の公平スケジューラ
+"""
+
+
+def _command(cmd_type, **extra):
+    return {"type": cmd_type, "params": {}, **extra}
+
+
+def test_one_pump_timer(addon_v2):
+    """コマンドをいくつ積んでもポンプのタイマーは 1 つ"""
+    timers = addon_v2.bpy.app.timers
+    scheduler = addon_v2.SessionScheduler(lambda command, callback: callback(command["type"]))
+    results = []
+    for session_id in ("a", "b", "c"):
+        scheduler.submit(session_id, _command("create_object"), results.append)
+    assert len(timers.registered) == 1
+
+    timers.run()
+    assert results == ["create_object"] * 3
+    assert not timers.registered
+
+
+def test_round_robin_and_priorities(addon_v2):
+    dispatched = []
+    scheduler = addon_v2.SessionScheduler(lambda command, callback: dispatched.append(command["type"]))
+    scheduler.submit("a", _command("execute_code"), None)
+    scheduler.submit("a", _command("create_object"), None)
+    scheduler.submit("b", _command("get_scene_info"), None)
+    scheduler.submit("b", _command("set_material"), None)
+    scheduler.timer()
+    # インタラクティブ → 通常（セッション順）→ バルク
+    assert dispatched == ["get_scene_info", "create_object", "set_material", "execute_code"]
+
+
+def test_expired_commands_are_not_dispatched(addon_v2):
+    dispatched, results = [], []
+    scheduler = addon_v2.SessionScheduler(lambda command, callback: dispatched.append(command))
+    scheduler.submit("a", _command("create_object", deadline=1.0, request_id="r1"), results.append)
+    scheduler.timer()
+    assert not dispatched
+    assert results[0]["cancelled"] and results[0]["request_id"] == "r1"
+    assert scheduler.snapshot()["expired"] == 1
+
+
+def test_cancel_with_bad_params_is_an_error_response(addon_v2):
+    """params が null やオブジェクト以外でも、request_id がなくてもエラー応答を返す"""
+    server = addon_v2.BlenderMCPServerV2()
+    for params in (None, [], "r1", {}, {"request": "r1"}):
+        response = server._cancel_response({"type": "cancel", "params": params})
+        assert response["status"] == "error"
+
+    results = []
+    server.scheduler.submit("a", _command("create_object", request_id="r1"), results.append)
+    response = server._cancel_response({"type": "cancel", "params": {"request_id": "r1"}})
+    assert response == {"status": "success", "result": {"request_id": "r1", "cancelled": True}}
+    assert results[0]["cancelled"]
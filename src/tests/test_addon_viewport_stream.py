@@ -0,0 +1,31 @@
+"""
+v1 アドオン: ビューポートのライブプレビュー
+"""
+
+
+def test_one_timer_for_many_viewers(addon):
+    """ロングポールのたびに touch() してもキャプチャ用タイマーは 1 つ"""
+    timers = addon.bpy.app.timers
+    producer = addon.ViewportFrameProducer()
+    assert not producer.status()["running"]
+    for _ in range(5):
+        producer.touch()
+    assert len(timers.registered) == 1
+    assert producer.status()["running"]
+    assert producer.stats["viewer_requests"] == 5
+
+    producer.stop()
+    assert not timers.registered
+    assert not producer.running
+
+
+def test_idle_producer_stops(addon, monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(addon.time, "monotonic", lambda: now[0])
+    producer = addon.ViewportFrameProducer()
+    producer.touch()
+    now[0] += addon.VIEWPORT_STREAM_IDLE + 1
+    addon.bpy.app.timers.run()
+    assert not producer.running
+    producer.touch()
+    assert producer.running
@@ -0,0 +1,119 @@
+"""
+Web UI: MCP Server ワーカープール
+"""
+
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import app as A
+
+# blender_mcp.server の代わりに stdio で JSON-RPC に答えるだけのサーバー
+FAKE_SERVER = textwrap.dedent("""
+    import json, os, sys
+    print("starting up", flush=True)  # JSON でない出力は読み飛ばされる
+    for line in sys.stdin:
+        request = json.loads(line)
+        method = request["method"]
+        if method == "crash":
+            sys.exit(1)
+        if method == "fail":
+            response = {"jsonrpc": "2.0", "id": request["id"], "error": {"code": -1, "message": "failed"}}
+        else:
+            response = {"jsonrpc": "2.0", "id": request["id"], "result": {"pid": os.getpid()}}
+        print(json.dumps(response), flush=True)
+""")
+
+
+@pytest.fixture
+def pool(monkeypatch, tmp_path):
+    script = tmp_path / "fake_server.py"
+    script.write_text(FAKE_SERVER)
+    popen = subprocess.Popen
+
+    def fake_popen(args, **kwargs):
+        return popen([sys.executable, str(script)], **kwargs)
+
+    monkeypatch.setattr(A.subprocess, "Popen", fake_popen)
+    pools = []
+
+    def make(**kwargs):
+        # 保守スレッドは起動しない（start() を呼ばない）ので、状態はテストから決まる
+        pools.append(A.MCPWorkerPool(**kwargs))
+        return pools[-1]
+
+    yield make
+    for p in pools:
+        p.shutdown()
+
+
+def test_requests_reuse_idle_worker(pool):
+    p = pool(min_workers=0, max_workers=2)
+    first = p.send_request(None, "tools/list")
+    second = p.send_request(None, "tools/list")
+    assert first["pid"] == second["pid"]
+    assert p.stats["started"] == 1
+    assert p.to_dict()["requests"] == 2
+
+
+def test_session_affinity_and_scale_up(pool):
+    """同じセッションは空いていれば前回と同じワーカー、塞がっていれば新しいワーカー"""
+    p = pool(min_workers=0, max_workers=2)
+    a = p.acquire("s1")
+    b = p.acquire("s2")
+    assert a is not b
+    p.release(a)
+    p.release(b)
+    assert p.acquire("s2") is b
+    assert p.acquire("s1") is a
+    p.release(a)
+    p.release(b)
+
+    p.forget_session("s2")
+    assert "s2" not in p.sessions
+
+
+def test_acquire_waits_at_most_timeout(pool):
+    p = pool(min_workers=0, max_workers=1)
+    worker = p.acquire()
+    with pytest.raises(TimeoutError):
+        p.acquire(timeout=0.1)
+    assert p.stats["waited"] >= 1
+    p.release(worker)
+    assert p.acquire(timeout=0.1) is worker
+    p.release(worker)
+
+
+def test_recycles_after_max_requests(pool):
+    p = pool(min_workers=0, max_workers=1, max_requests=2)
+    pids = [p.send_request(None, "tools/list")["pid"] for _ in range(3)]
+    assert pids[0] == pids[1] != pids[2]
+    assert p.stats["recycled"] == 1
+    assert p.stats["started"] == 2
+
+
+def test_mcp_error_keeps_worker(pool):
+    """MCP Server が返したエラーではワーカーを入れ替えない"""
+    p = pool(min_workers=0, max_workers=1)
+    pid = p.send_request(None, "tools/list")["pid"]
+    with pytest.raises(A.MCPError):
+        p.send_request(None, "fail")
+    assert p.send_request(None, "tools/list")["pid"] == pid
+    assert p.stats["unhealthy"] == 0
+
+
+def test_unhealthy_worker_is_removed(pool):
+    p = pool(min_workers=0, max_workers=1)
+    p.send_request("s1", "tools/list")
+    with pytest.raises(Exception, match="closed connection"):
+        p.send_request("s1", "crash")
+    assert p.stats["unhealthy"] == 1
+    assert not p.workers
+    assert "s1" not in p.sessions
+    p.send_request("s1", "tools/list")
+    assert p.stats["started"] == 2
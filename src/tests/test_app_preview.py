@@ -0,0 +1,71 @@
+"""
+Web UI: プレビュー用モデルの取得とアドオンとの通信
+"""
+
+import base64
+import hashlib
+import json
+import socket
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import app as A
+
+
+def test_blender_request_reads_split_response():
+    """大きな応答が細かく分かれて届いても（UTF-8 の途中で切れても）1 つの JSON として読む"""
+    response = {"status": "success", "result": {"name": "立方体", "data": base64.b64encode(b"\0" * 300000).decode()}}
+    payload = json.dumps(response, ensure_ascii=False).encode("utf-8")
+    ours, theirs = socket.socketpair()
+
+    def serve():
+        request = json.loads(theirs.recv(65536))
+        assert request["type"] == "export_preview_gltf"
+        for i in range(0, len(payload), 1001):
+            theirs.sendall(payload[i:i + 1001])
+
+    thread = threading.Thread(target=serve)
+    thread.start()
+    try:
+        assert A.blender_request(ours, {"type": "export_preview_gltf"}) == response
+    finally:
+        thread.join()
+        ours.close()
+        theirs.close()
+
+
+def test_concurrent_preview_requests(monkeypatch, tmp_path):
+    """同じシーンへの同時リクエストが一時ファイルを取り合わない"""
+    data = b"glTF" + bytes(range(256)) * 100
+    content_hash = hashlib.sha256(data).hexdigest()[:16]
+    start = threading.Barrier(8)
+
+    def fake_send(command_type, params=None, timeout=120.0):
+        start.wait()
+        return {"hash": content_hash, "data": base64.b64encode(data).decode()}
+
+    monkeypatch.setattr(A, "PREVIEWS_DIR", str(tmp_path))
+    monkeypatch.setattr(A, "send_blender_command", fake_send)
+    monkeypatch.setattr(A, "_preview_models", {})
+    results, errors = [], []
+
+    def fetch(i):
+        try:
+            results.append(A.fetch_preview_model(f"session-{i % 2}"))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=fetch, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert results == [content_hash] * 8
+    assert (tmp_path / f"{content_hash}.glb").read_bytes() == data
+    assert not list(tmp_path.glob("*.tmp"))
+    assert A.last_preview_model("session-0") == content_hash
@@ -2,6 +2,7 @@
 
 import re
 import bpy
+import math
 import mathutils
 import json
 import threading
@@ -10,15 +11,26 @@ import time
 import requests
 import tempfile
 import traceback
+import inspect
+import ast
 import os
 import shutil
-import zipfile
+import sqlite3
+import struct
+import urllib.parse
+import zlib
+import numpy as np
 from bpy.props import IntProperty
 import io
 from datetime import datetime
 import hashlib, hmac, base64
+import sys
+import cProfile
+import pstats
 import os.path as osp
-from contextlib import redirect_stdout, suppress
+from contextlib import contextmanager, nullcontext, redirect_stdout, suppress
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
 
 bl_info = {
     "name": "Blender MCP",
@@ -36,6 +48,3380 @@ RODIN_FREE_TRIAL_KEY = "k9TcfFoEhNd9cCPP2guHAHHHkctZHIRhZDywZ1euGUXwihbYLpOjQhof
 REQ_HEADERS = requests.utils.default_headers()
 REQ_HEADERS.update({"User-Agent": "blender-mcp"})
 
+# (connect, read) timeout of asset downloads; the read timeout is per socket read, so large
+# files still download, but a stalled connection fails instead of hanging its worker
+DOWNLOAD_TIMEOUT = (10, 60)
+
+# Provider API base URLs. BLENDERMCP_PROVIDER_BASE_URL points every provider at
+# one server (e.g. v1/benchmarks/fake_providers.py, serving /<provider>/...),
+# BLENDERMCP_<PROVIDER>_URL overrides a single one.
+DEFAULT_PROVIDER_URLS = {
+    "polyhaven": "https://api.polyhaven.com",
+    "sketchfab": "https://api.sketchfab.com/v3",
+    "hyper3d": "https://hyperhuman.deemos.com/api/v2",
+    "fal": "https://queue.fal.run/fal-ai/hyper3d",
+    "hunyuan": "",  # Empty: derived from the signed Tencent Cloud host
+}
+PROVIDER_URLS = {}
+
+
+def configure_provider_urls(base_url=None, **overrides):
+    """Set the provider base URLs, from arguments or the environment"""
+    global _polyhaven_catalog
+    base_url = base_url or os.environ.get("BLENDERMCP_PROVIDER_BASE_URL")
+    for provider, default in DEFAULT_PROVIDER_URLS.items():
+        url = overrides.get(provider) or os.environ.get(f"BLENDERMCP_{provider.upper()}_URL")
+        if not url and base_url:
+            url = f"{base_url.rstrip('/')}/{provider}"
+        PROVIDER_URLS[provider] = (url or default).rstrip("/")
+    # The catalog is bound to the URL it was created with
+    _polyhaven_catalog = None
+    return dict(PROVIDER_URLS)
+
+
+def provider_url(provider, path=""):
+    """Absolute URL of `path` on a provider's API"""
+    return PROVIDER_URLS[provider] + path
+
+
+configure_provider_urls()
+
+
+class ProviderBusyError(Exception):
+    """Raised when a provider request could not get a slot in time"""
+
+
+class ProviderLimiter:
+    """Max in-flight requests plus a token bucket for one provider.
+
+    Waiters are served strictly in arrival order, whichever session they
+    come from, and a 429 pauses the whole bucket instead of letting every
+    caller retry at once.
+    """
+
+    def __init__(self, name, max_in_flight=4, rate=2.0, burst=5, max_wait=30.0):
+        self.name = name
+        self.max_in_flight = max_in_flight
+        self.rate = rate
+        self.burst = burst
+        self.max_wait = max_wait
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.in_flight = 0
+        self.queue = deque()
+        self.cond = threading.Condition()
+        self.stats = {
+            "requests": 0, "waited": 0, "total_wait": 0.0, "max_wait": 0.0,
+            "throttled": 0, "rejected": 0,
+        }
+
+    def _refill(self, now):
+        self.tokens = min(float(self.burst), self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, timeout=None):
+        """Wait for a slot in FIFO order, returns the seconds waited"""
+        start = time.monotonic()
+        deadline = start + (self.max_wait if timeout is None else timeout)
+        waiter = object()
+        with self.cond:
+            self.queue.append(waiter)
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    head = self.queue[0] is waiter
+                    free = self.in_flight < self.max_in_flight
+                    if head and free and self.tokens >= 1 and now >= self.blocked_until:
+                        break
+                    if now >= deadline:
+                        self.stats["rejected"] += 1
+                        raise ProviderBusyError(
+                            f"{self.name} is rate limited, gave up after waiting {now - start:.1f}s"
+                        )
+                    timeout = deadline - now
+                    if head and free:
+                        # Only the token bucket (or a 429 pause) holds us back
+                        timeout = min(timeout, max((1 - self.tokens) / self.rate, self.blocked_until - now))
+                    self.cond.wait(max(timeout, 0.001))
+            except BaseException:
+                self.queue.remove(waiter)
+                self.cond.notify_all()
+                raise
+            self.queue.popleft()
+            self.tokens -= 1
+            self.in_flight += 1
+            waited = time.monotonic() - start
+            self.stats["requests"] += 1
+            if waited > 0.001:
+                self.stats["waited"] += 1
+            self.stats["total_wait"] += waited
+            self.stats["max_wait"] = max(self.stats["max_wait"], waited)
+            self.cond.notify_all()
+        return waited
+
+    def release(self):
+        with self.cond:
+            self.in_flight -= 1
+            self.cond.notify_all()
+
+    def penalize(self, retry_after):
+        """Pause the bucket after the provider answered 429"""
+        with self.cond:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + retry_after)
+            self.tokens = 0.0
+            self.stats["throttled"] += 1
+            self.cond.notify_all()
+
+    def snapshot(self):
+        with self.cond:
+            self._refill(time.monotonic())
+            requests_done = self.stats["requests"]
+            return {
+                **self.stats,
+                "avg_wait": self.stats["total_wait"] / requests_done if requests_done else 0.0,
+                "in_flight": self.in_flight,
+                "queued": len(self.queue),
+                "tokens": round(self.tokens, 2),
+                "max_in_flight": self.max_in_flight,
+                "rate": self.rate,
+                "burst": self.burst,
+            }
+
+
+# (max in flight, requests per second, burst), BLENDERMCP_<PROVIDER>_LIMIT="4,2,5" overrides
+DEFAULT_PROVIDER_LIMITS = {
+    "polyhaven": (8, 10.0, 20),
+    "sketchfab": (4, 2.0, 5),
+    "hyper3d": (4, 2.0, 5),
+    "fal": (4, 5.0, 10),
+    "hunyuan": (2, 1.0, 3),
+}
+_provider_limiters = {}
+_provider_limiters_lock = threading.Lock()
+
+def get_provider_limiter(provider):
+    """Get or create the limiter shared by every session for a provider"""
+    with _provider_limiters_lock:
+        limiter = _provider_limiters.get(provider)
+        if limiter is None:
+            limits = DEFAULT_PROVIDER_LIMITS.get(provider, (4, 2.0, 5))
+            override = os.environ.get(f"BLENDERMCP_{provider.upper()}_LIMIT")
+            if override:
+                with suppress(ValueError):
+                    in_flight, rate, burst = override.split(",")
+                    limits = (int(in_flight), float(rate), int(burst))
+            limiter = _provider_limiters[provider] = ProviderLimiter(provider, *limits)
+        return limiter
+
+
+def _retry_after(response, attempt):
+    """Seconds to back off after a 429, from Retry-After or exponential"""
+    with suppress(TypeError, ValueError):
+        return min(60.0, max(0.0, float(response.headers.get("Retry-After"))))
+    return min(60.0, 2.0 ** attempt)
+
+
+def provider_request(provider, method, url, retries=2, **kwargs):
+    """requests.request() through the provider's limiter, retrying 429s after a shared pause
+
+    The seconds spent queueing are stored on the response as `limiter_wait`.
+    Waiting for the limiter blocks, so call it off the main thread (see
+    run_in_background). With stream=True the slot is held until the headers
+    arrive; the body is read by the caller.
+    """
+    limiter = get_provider_limiter(provider)
+    waited = 0.0
+    for attempt in range(retries + 1):
+        waited += limiter.acquire()
+        try:
+            response = requests.request(method, url, **kwargs)
+        finally:
+            limiter.release()
+        if response.status_code != 429 or attempt == retries:
+            break
+        limiter.penalize(_retry_after(response, attempt))
+    if waited > 1.0:
+        print(f"{provider}: request waited {waited:.2f}s for the rate limiter")
+    response.limiter_wait = waited
+    return response
+
+
+def _blendermcp_data_dir(*parts):
+    """Return (and create) a persistent BlenderMCP directory under Blender's user data path"""
+    return bpy.utils.user_resource('DATAFILES', path=os.path.join("blendermcp", *parts), create=True)
+
+
+class PolyHavenCatalog:
+    """Local copy of the Poly Haven asset catalog, indexed with SQLite FTS5.
+
+    The catalog is refreshed from the API with conditional requests
+    (ETag / If-Modified-Since), so searches run locally without network.
+    """
+
+    ASSET_TYPES = {"hdris": 0, "textures": 1, "models": 2}
+
+    def __init__(self, db_path, api_url="https://api.polyhaven.com", max_age=24 * 3600):
+        self.db_path = db_path
+        self.api_url = api_url
+        self.max_age = max_age
+        self.lock = threading.Lock()
+        self.refresh_thread = None
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.has_fts = self._init_schema()
+
+    def _init_schema(self):
+        """Create tables if needed, returns whether FTS5 is available"""
+        with self.lock, self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS assets ("
+                "id TEXT PRIMARY KEY, name TEXT, type INTEGER, categories TEXT, "
+                "tags TEXT, download_count INTEGER, data TEXT)"
+            )
+            self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            try:
+                self.conn.execute(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS assets_fts USING fts5("
+                    "name, tags, categories, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+                )
+                return True
+            except sqlite3.OperationalError:
+                # SQLite built without FTS5, fall back to LIKE matching
+                print("PolyHaven catalog: FTS5 not available, using plain text matching")
+                return False
+
+    def _get_meta(self, key):
+        with self.lock:
+            row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def count(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM assets").fetchone()[0]
+
+    def age(self):
+        """Seconds since the catalog was last confirmed up to date"""
+        refreshed_at = self._get_meta("refreshed_at")
+        return time.time() - float(refreshed_at) if refreshed_at else None
+
+    def refresh(self):
+        """Fetch the catalog if it changed upstream, returns True if it was rewritten"""
+        headers = dict(REQ_HEADERS)
+        etag = self._get_meta("etag")
+        last_modified = self._get_meta("last_modified")
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+
+        response = provider_request("polyhaven", "GET", f"{self.api_url}/assets", headers=headers, timeout=60)
+        if response.status_code == 304:
+            with self.lock, self.conn:
+                self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('refreshed_at', ?)", (str(time.time()),))
+            return False
+        if response.status_code != 200:
+            raise Exception(f"Catalog request failed with status code {response.status_code}")
+
+        rows = []
+        for asset_id, asset in response.json().items():
+            categories = [c.lower() for c in asset.get("categories", [])]
+            tags = [t.lower() for t in asset.get("tags", [])]
+            rows.append((
+                asset_id,
+                asset.get("name", asset_id),
+                asset.get("type", 0),
+                f",{','.join(categories)},",
+                f",{','.join(tags)},",
+                asset.get("download_count", 0),
+                json.dumps(asset),
+            ))
+
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM assets")
+            self.conn.executemany("INSERT INTO assets VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            if self.has_fts:
+                self.conn.execute("DELETE FROM assets_fts")
+                self.conn.execute(
+                    "INSERT INTO assets_fts (rowid, name, tags, categories) "
+                    "SELECT rowid, name, tags, categories FROM assets"
+                )
+            meta = {
+                "etag": response.headers.get("ETag", ""),
+                "last_modified": response.headers.get("Last-Modified", ""),
+                "refreshed_at": str(time.time()),
+            }
+            self.conn.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)", meta.items())
+        print(f"PolyHaven catalog refreshed: {len(rows)} assets")
+        return True
+
+    def refresh_async(self):
+        """Refresh in a background thread unless one is already running"""
+        if self.refresh_thread and self.refresh_thread.is_alive():
+            return
+
+        def refresh_quietly():
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"PolyHaven catalog refresh failed: {str(e)}")
+
+        self.refresh_thread = threading.Thread(target=refresh_quietly)
+        self.refresh_thread.daemon = True
+        self.refresh_thread.start()
+
+    def ensure_fresh(self):
+        """Populate the catalog on first use, otherwise refresh stale data in the background"""
+        if not self.count():
+            self.refresh()
+            return
+        age = self.age()
+        if age is None or age > self.max_age:
+            self.refresh_async()
+
+    def search(self, query=None, asset_type=None, categories=None, offset=0, limit=20):
+        """Ranked local search, returns the same shape as the old API-backed search"""
+        tables = "assets a"
+        where, args = [], []
+        order = "a.download_count DESC"
+
+        if asset_type in self.ASSET_TYPES:
+            where.append("a.type = ?")
+            args.append(self.ASSET_TYPES[asset_type])
+
+        if categories:
+            for category in categories.split(","):
+                if category.strip():
+                    where.append("a.categories LIKE ?")
+                    args.append(f"%,{category.strip().lower()},%")
+
+        tokens = re.findall(r"\w+", query.lower()) if query else []
+        if tokens and self.has_fts:
+            tables = "assets_fts JOIN assets a ON a.rowid = assets_fts.rowid"
+            where.append("assets_fts MATCH ?")
+            args.append(" ".join(f'"{token}"*' for token in tokens))
+            # Weights follow the FTS column order: name, tags, categories
+            order = "bm25(assets_fts, 10.0, 5.0, 2.0), a.download_count DESC"
+        else:
+            for token in tokens:
+                where.append("(a.name LIKE ? OR a.tags LIKE ? OR a.categories LIKE ?)")
+                args.extend([f"%{token}%"] * 3)
+
+        where_sql = f"WHERE {' AND '.join(where)}" if where else ""
+        with self.lock:
+            total = self.conn.execute(f"SELECT COUNT(*) FROM {tables} {where_sql}", args).fetchone()[0]
+            rows = self.conn.execute(
+                f"SELECT a.id, a.data FROM {tables} {where_sql} ORDER BY {order} LIMIT ? OFFSET ?",
+                [*args, limit, offset]
+            ).fetchall()
+
+        assets = {asset_id: json.loads(data) for asset_id, data in rows}
+        return {
+            "assets": assets,
+            "total_count": total,
+            "returned_count": len(assets),
+            "offset": offset,
+        }
+
+
+_polyhaven_catalog = None
+
+def get_polyhaven_catalog():
+    """Get or create the shared Poly Haven catalog"""
+    global _polyhaven_catalog
+    if _polyhaven_catalog is None:
+        api_url = provider_url("polyhaven")
+        db_name = "polyhaven_catalog.sqlite3"
+        if api_url != DEFAULT_PROVIDER_URLS["polyhaven"]:
+            # Keep catalogs from other endpoints out of the real one
+            db_name = f"polyhaven_catalog_{hashlib.sha1(api_url.encode('utf-8')).hexdigest()[:8]}.sqlite3"
+        _polyhaven_catalog = PolyHavenCatalog(os.path.join(_blendermcp_data_dir(), db_name), api_url=api_url)
+    return _polyhaven_catalog
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after ttl seconds"""
+
+    def __init__(self, ttl=600.0, max_entries=128):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # key -> (expires_at, value)
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.time():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value):
+        with self.lock:
+            self.entries[key] = (time.time() + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+SKETCHFAB_UID_PATTERN = re.compile(r"[0-9a-f]{32}")
+
+def is_sketchfab_uid(uid):
+    """Sketchfab model UIDs are 32 lowercase hex digits; anything else must not reach a path or URL"""
+    return isinstance(uid, str) and SKETCHFAB_UID_PATTERN.fullmatch(uid) is not None
+
+
+class SketchfabPreviewCache:
+    """Sketchfab model metadata and thumbnails, kept on disk up to max_bytes.
+
+    Sketchfab serves every thumbnail at several widths, each width is
+    cached as its own file so small previews never pay for large ones.
+    """
+
+    def __init__(self, cache_dir, max_bytes=200 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.models = TTLCache(ttl=24 * 3600, max_entries=2048)
+        self.lock = threading.Lock()
+
+    def remember_model(self, model):
+        """Keep the fields needed for previews from a search result or model response"""
+        uid = model.get("uid") if isinstance(model, dict) else None
+        if not uid:
+            return
+        self.models.set(uid, {
+            "name": model.get("name", "Unknown"),
+            "author": (model.get("user") or {}).get("username", "Unknown"),
+            "thumbnails": (model.get("thumbnails") or {}).get("images", []),
+        })
+
+    def get_model(self, uid):
+        return self.models.get(uid)
+
+    @staticmethod
+    def select_thumbnail(thumbnails, size=640):
+        """Smallest thumbnail at least size pixels wide, else the largest one"""
+        candidates = sorted(
+            (t for t in thumbnails if t.get("url")),
+            key=lambda t: t.get("width", 0)
+        )
+        if not candidates:
+            return None
+        for thumb in candidates:
+            if thumb.get("width", 0) >= size:
+                return thumb
+        return candidates[-1]
+
+    def _path(self, uid, thumb):
+        if not is_sketchfab_uid(uid):
+            raise ValueError(f"Invalid Sketchfab model UID: {uid!r}")
+        ext = "png" if thumb["url"].split("?")[0].lower().endswith(".png") else "jpeg"
+        return os.path.join(self.cache_dir, f"{uid}_{int(thumb.get('width') or 0)}.{ext}")
+
+    def get_thumbnail(self, uid, thumb):
+        """Return (image bytes, format, cached) for a thumbnail, downloading it on a miss"""
+        path = self._path(uid, thumb)
+        img_format = path.rsplit(".", 1)[-1]
+        if os.path.exists(path):
+            with suppress(Exception):
+                os.utime(path)  # Mark as recently used for eviction
+            with open(path, "rb") as f:
+                return f.read(), img_format, True
+
+        img_response = provider_request("sketchfab", "GET", thumb["url"], timeout=30)
+        if img_response.status_code != 200:
+            raise Exception(f"Failed to download thumbnail: {img_response.status_code}")
+
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(img_response.content)
+        os.replace(tmp_path, path)
+        self._evict()
+        return img_response.content, img_format, False
+
+    def prefetch(self, models, size=640, count=5):
+        """Download thumbnails of the first count models in a background thread"""
+        jobs = []
+        for model in models[:count]:
+            if not isinstance(model, dict) or not is_sketchfab_uid(model.get("uid")):
+                continue
+            thumb = self.select_thumbnail((model.get("thumbnails") or {}).get("images", []), size)
+            if thumb and not os.path.exists(self._path(model["uid"], thumb)):
+                jobs.append((model["uid"], thumb))
+        if not jobs:
+            return
+
+        def prefetch_worker():
+            for uid, thumb in jobs:
+                try:
+                    self.get_thumbnail(uid, thumb)
+                except Exception as e:
+                    print(f"Sketchfab thumbnail prefetch failed for {uid}: {str(e)}")
+
+        worker = threading.Thread(target=prefetch_worker)
+        worker.daemon = True
+        worker.start()
+
+    def _evict(self):
+        """Delete least recently used thumbnails until the cache fits in max_bytes"""
+        with self.lock:
+            files = []
+            for entry in os.scandir(self.cache_dir):
+                if entry.is_file() and not entry.name.endswith(".tmp"):
+                    stat = entry.stat()
+                    files.append((stat.st_mtime, stat.st_size, entry.path))
+            total = sum(size for _, size, _ in files)
+            for _, size, path in sorted(files):
+                if total <= self.max_bytes:
+                    break
+                with suppress(Exception):
+                    os.remove(path)
+                    total -= size
+
+
+_sketchfab_search_cache = TTLCache(ttl=600.0, max_entries=256)
+_sketchfab_preview_cache = None
+
+def get_sketchfab_preview_cache():
+    """Get or create the shared Sketchfab preview cache"""
+    global _sketchfab_preview_cache
+    if _sketchfab_preview_cache is None:
+        _sketchfab_preview_cache = SketchfabPreviewCache(_blendermcp_data_dir("sketchfab_thumbnails"))
+    return _sketchfab_preview_cache
+
+
+# Environment images kept loaded for quick HDRI switching
+ENVIRONMENT_CACHE_SIZE = 4
+TEXTURE_CACHE_LIMIT = 4 * 1024 ** 3  # bytes of cached downloads, BLENDERMCP_TEXTURE_CACHE_MB overrides
+TEXTURE_CACHE_GRACE = 300.0          # seconds a new cache file is kept for the import that fetched it
+
+
+def normalize_path(path):
+    return os.path.normcase(os.path.abspath(path))
+
+
+def loaded_image_files(root):
+    """path -> number of unpacked images loading a file below root (main thread)"""
+    refs = {}
+    root = normalize_path(root)
+    for image in bpy.data.images:
+        if image.packed_file or image.source not in {'FILE', 'SEQUENCE', 'MOVIE'}:
+            continue
+        path = normalize_path(bpy.path.abspath(image.filepath))
+        if path.startswith(root):
+            refs[path] = refs.get(path, 0) + 1
+    return refs
+
+
+class DatablockRegistry:
+    """Content-hash registry of downloaded files and the datablocks built from them.
+
+    Files are stored once under cache_dir, named by their hash, and images and
+    materials are tagged with a custom property holding their key, so repeated
+    imports reuse existing datablocks (also after the .blend is reopened).
+    The files' mtime records when they were last used; evict() keeps the cache
+    below max_bytes by deleting the least recently used files no image loads.
+    """
+
+    HASH_PROP = "blendermcp_hash"
+
+    def __init__(self, cache_dir, max_bytes=TEXTURE_CACHE_LIMIT):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.images = {}     # key -> image name
+        self.materials = {}  # key -> material name
+        self.environments = OrderedDict()  # image key -> None, most recently used last
+        self.reused = 0
+        self.evicted_files = 0
+        self.evicted_bytes = 0
+
+    @staticmethod
+    def make_key(*parts):
+        """Stable key for a datablock derived from several inputs"""
+        return hashlib.sha256(json.dumps(parts, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def fetch_file(self, url, ext, md5=None, provider="polyhaven"):
+        """Return (digest, path, downloaded) for url, downloading only if not cached.
+
+        When the provider publishes an md5 the cache is checked before any
+        download and the content is verified against it. Blocks on the
+        provider's rate limiter, run it in the background.
+        """
+        ext = ext.lstrip(".").lower()
+        if md5:
+            path = os.path.join(self.cache_dir, f"{md5}.{ext}")
+            if self._touch(path):
+                return md5, path, False
+
+        response = provider_request(provider, "GET", url, headers=REQ_HEADERS, timeout=DOWNLOAD_TIMEOUT)
+        response.raise_for_status()
+        content = response.content
+
+        if md5:
+            if hashlib.md5(content).hexdigest() != md5:
+                raise ValueError(f"Checksum mismatch for {url}")
+            digest = md5
+        else:
+            digest = hashlib.sha256(content).hexdigest()
+
+        path = os.path.join(self.cache_dir, f"{digest}.{ext}")
+        if not self._touch(path):
+            tmp_path = f"{path}.{threading.get_ident()}.part"
+            with open(tmp_path, "wb") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        return digest, path, True
+
+    @staticmethod
+    def _touch(path):
+        """Mark a cached file as used now, False if it isn't there"""
+        try:
+            os.utime(path)
+            return True
+        except OSError:
+            return False
+
+    def _files(self):
+        """(path, size, mtime) of the cached files, partial downloads excluded"""
+        files = []
+        with suppress(OSError):
+            for entry in os.scandir(self.cache_dir):
+                if entry.is_file() and not entry.name.endswith(".part"):
+                    with suppress(OSError):
+                        st = entry.stat()
+                        files.append((normalize_path(entry.path), st.st_size, st.st_mtime))
+        return files
+
+    def evict(self):
+        """Delete least recently used files until the cache fits max_bytes, returns stats() (main thread).
+
+        Files an image still loads are kept, and so are files younger than
+        TEXTURE_CACHE_GRACE, which an import may be about to load.
+        """
+        now = time.time()
+        refs = loaded_image_files(self.cache_dir)
+        files = sorted(self._files(), key=lambda entry: entry[2])
+        used = sum(size for _, size, _ in files)
+        for path, size, mtime in files:
+            if used <= self.max_bytes:
+                break
+            if path in refs or now - mtime < TEXTURE_CACHE_GRACE:
+                continue
+            with suppress(OSError):
+                os.remove(path)
+                used -= size
+                self.evicted_files += 1
+                self.evicted_bytes += size
+        return self.stats()
+
+    def _lookup(self, index, collection, key):
+        name = index.get(key)
+        datablock = collection.get(name) if name else None
+        if datablock is None or datablock.get(self.HASH_PROP) != key:
+            # Renamed, removed or loaded from a saved .blend: fall back to a scan
+            datablock = next((d for d in collection if d.get(self.HASH_PROP) == key), None)
+            if datablock is None:
+                index.pop(key, None)
+                return None
+        index[key] = datablock.name
+        return datablock
+
+    def _register(self, index, datablock, key):
+        datablock[self.HASH_PROP] = key
+        index[key] = datablock.name
+
+    def get_image(self, key):
+        return self._lookup(self.images, bpy.data.images, key)
+
+    def load_image(self, path, key, name=None, pack=False):
+        """Return (image, reused) for the cached file at path"""
+        image = self.get_image(key)
+        reused = image is not None
+        if image is None:
+            image = bpy.data.images.load(path, check_existing=True)
+            if name:
+                image.name = name
+            self._register(self.images, image, key)
+        else:
+            self.reused += 1
+        if pack and not image.packed_file:
+            image.pack()
+        return image, reused
+
+    def touch_environment(self, key, keep=ENVIRONMENT_CACHE_SIZE):
+        """Mark an environment image as used and drop the least recently used ones.
+
+        Only images nobody else uses are removed; their files stay in the
+        cache, so switching back to them is a reload without a download.
+        """
+        self.environments.pop(key, None)
+        self.environments[key] = None
+        while len(self.environments) > keep:
+            old_key, _ = self.environments.popitem(last=False)
+            image = self.get_image(old_key)
+            if image is not None and image.users == 0:
+                self.images.pop(old_key, None)
+                bpy.data.images.remove(image)
+
+    def get_material(self, key):
+        material = self._lookup(self.materials, bpy.data.materials, key)
+        if material is not None:
+            self.reused += 1
+        return material
+
+    def register_material(self, material, key):
+        self._register(self.materials, material, key)
+
+    def image_key(self, image):
+        """Key of a registered image, or a key derived from its file/name"""
+        return image.get(self.HASH_PROP) or self.make_key("image", image.filepath or image.name)
+
+    def stats(self):
+        files = self._files()
+        return {
+            "cache_dir": self.cache_dir,
+            "files": len(files),
+            "bytes": sum(size for _, size, _ in files),
+            "max_bytes": self.max_bytes,
+            "evicted_files": self.evicted_files,
+            "evicted_bytes": self.evicted_bytes,
+            "images": len(self.images),
+            "materials": len(self.materials),
+            "environments": len(self.environments),
+            "reused": self.reused,
+        }
+
+
+_datablock_registry = None
+
+def get_datablock_registry():
+    """Get or create the shared image/material registry"""
+    global _datablock_registry
+    if _datablock_registry is None:
+        limit_mb = os.environ.get("BLENDERMCP_TEXTURE_CACHE_MB")
+        _datablock_registry = DatablockRegistry(
+            _blendermcp_data_dir("textures"),
+            max_bytes=int(limit_mb) * 1024 ** 2 if limit_mb else TEXTURE_CACHE_LIMIT,
+        )
+    return _datablock_registry
+
+
+def process_alive(pid):
+    """Whether a process with this pid is still running (it is never signalled)"""
+    if pid <= 0:
+        return False
+    if sys.platform == "win32":
+        # os.kill would terminate the process on Windows
+        import ctypes
+        kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+        handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return ctypes.get_last_error() == 5  # ERROR_ACCESS_DENIED: running, owned by someone else
+        try:
+            code = ctypes.c_ulong()
+            return not kernel32.GetExitCodeProcess(handle, ctypes.byref(code)) or code.value == 259  # STILL_ACTIVE
+        finally:
+            kernel32.CloseHandle(handle)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class ScratchSpace:
+    """Managed scratch files for downloads and extracted archives.
+
+    Every session gets its own directory under root. A file is reference
+    counted by the unpacked images loading it (plus explicit pins), so
+    releasing a download keeps whatever the scene still uses. The rest is
+    deleted on release, when it outlives max_age, or oldest first once the
+    quota is exceeded. reclaim() touches bpy and must run on the main thread.
+    """
+
+    # Left behind by older MCP servers in the system temp dir
+    STALE_PATTERNS = (re.compile(r"blender_screenshot_\d+(_\w+)?\.png$"),)
+
+    def __init__(self, root, quota_bytes=2 * 1024 ** 3, max_age=6 * 3600):
+        self.base = root
+        self.root = os.path.join(root, str(os.getpid()))
+        self.quota_bytes = quota_bytes
+        self.max_age = max_age
+        self.current_session = None
+        self.pins = {}  # path -> count
+        self.lock = threading.RLock()
+        self.stats = {"reclaimed_files": 0, "reclaimed_bytes": 0, "last_reclaim": None}
+        os.makedirs(self.root, exist_ok=True)
+
+    def session_dir(self, session_id=None):
+        session_id = session_id or self.current_session or "shared"
+        path = os.path.join(self.root, re.sub(r"[^\w.-]", "_", str(session_id)))
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def make_dir(self, prefix="", session_id=None):
+        """New scratch directory, pinned with everything below it until release()"""
+        path = tempfile.mkdtemp(prefix=prefix, dir=self.session_dir(session_id))
+        self.pin(path)
+        return path
+
+    def make_file(self, suffix="", prefix="", session_id=None, pin=True):
+        """New scratch file, pinned until release() unless pin=False (left to reclaim())"""
+        fd, path = tempfile.mkstemp(suffix=suffix, prefix=prefix, dir=self.session_dir(session_id))
+        os.close(fd)
+        if pin:
+            self.pin(path)
+        return path
+
+    _norm = staticmethod(normalize_path)
+
+    def pin(self, path):
+        with self.lock:
+            path = self._norm(path)
+            self.pins[path] = self.pins.get(path, 0) + 1
+
+    def unpin(self, path):
+        with self.lock:
+            path = self._norm(path)
+            if self.pins.get(path, 0) <= 1:
+                self.pins.pop(path, None)
+            else:
+                self.pins[path] -= 1
+
+    def references(self):
+        """path -> number of loaded images and pins using it"""
+        refs = dict(self.pins)
+        for path, count in loaded_image_files(self.root).items():
+            refs[path] = refs.get(path, 0) + count
+        return refs
+
+    def _pinned_dirs(self):
+        """Prefixes of the pinned directories, whose files are in use while downloads/extractions write them"""
+        return tuple(path + os.sep for path in self.pins if os.path.isdir(path))
+
+    def _remove(self, path, size):
+        with suppress(OSError):
+            os.remove(path)
+            self.stats["reclaimed_files"] += 1
+            self.stats["reclaimed_bytes"] += size
+
+    def _walk(self, top):
+        """(path, size, mtime) of every file below top"""
+        for dirpath, _, filenames in os.walk(top):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                with suppress(OSError):
+                    st = os.stat(path)
+                    yield self._norm(path), st.st_size, st.st_mtime
+
+    @staticmethod
+    def _prune_dirs(top, keep_top=False):
+        for dirpath, _, _ in sorted(os.walk(top), key=lambda entry: -len(entry[0])):
+            if keep_top and dirpath == top:
+                continue
+            with suppress(OSError):
+                os.rmdir(dirpath)  # Only succeeds on empty directories
+
+    def release(self, path):
+        """Delete a scratch file or directory, keeping files that are still referenced"""
+        if not path:
+            return
+        with self.lock:
+            self.unpin(path)
+            if not os.path.exists(path):
+                return
+            refs = self.references()
+            pinned_dirs = self._pinned_dirs()
+            if os.path.isdir(path):
+                for file_path, size, _ in list(self._walk(path)):
+                    if file_path not in refs and not file_path.startswith(pinned_dirs):
+                        self._remove(file_path, size)
+                self._prune_dirs(path)
+            elif self._norm(path) not in refs:
+                self._remove(path, os.path.getsize(path))
+
+    def reclaim(self):
+        """Delete unreferenced files that are too old or over quota, returns the usage afterwards"""
+        now = time.time()
+        with self.lock:
+            refs = self.references()
+            pinned_dirs = self._pinned_dirs()
+            files = sorted(self._walk(self.root), key=lambda entry: entry[2])
+            used = sum(size for _, size, _ in files)
+            for path, size, mtime in files:
+                if path in refs or path.startswith(pinned_dirs):
+                    continue
+                if used > self.quota_bytes or now - mtime > self.max_age:
+                    self._remove(path, size)
+                    used -= size
+            self._prune_dirs(self.root, keep_top=True)
+
+            # Scratch roots of Blender processes that are gone, and stale screenshots.
+            # A running Blender's files may be loaded by it, so its root is never touched here.
+            with suppress(OSError):
+                for entry in os.scandir(self.base):
+                    if not entry.is_dir() or entry.path == self.root or not entry.name.isdigit():
+                        continue
+                    if process_alive(int(entry.name)):
+                        continue
+                    for path, size, _ in list(self._walk(entry.path)):
+                        self._remove(path, size)
+                    self._prune_dirs(entry.path)
+            with suppress(OSError):
+                for entry in os.scandir(tempfile.gettempdir()):
+                    if any(p.match(entry.name) for p in self.STALE_PATTERNS) and now - entry.stat().st_mtime > 3600:
+                        self._remove(entry.path, entry.stat().st_size)
+
+            self.stats["last_reclaim"] = now
+        return self.usage()
+
+    def usage(self):
+        with self.lock:
+            refs = self.references()
+            sessions = {}
+            total = referenced = count = 0
+            for path, size, _ in self._walk(self.root):
+                session = os.path.relpath(path, self._norm(self.root)).split(os.sep)[0]
+                sessions[session] = sessions.get(session, 0) + size
+                total += size
+                count += 1
+                if path in refs:
+                    referenced += size
+            return {
+                "root": self.root,
+                "quota_bytes": self.quota_bytes,
+                "used_bytes": total,
+                "files": count,
+                "referenced_bytes": referenced,
+                "sessions": sessions,
+                **self.stats,
+            }
+
+
+SCRATCH_RECLAIM_INTERVAL = 300.0
+_scratch_space = None
+
+def get_scratch_space():
+    """Get or create the shared scratch space"""
+    global _scratch_space
+    if _scratch_space is None:
+        quota_mb = os.environ.get("BLENDERMCP_SCRATCH_QUOTA_MB")
+        _scratch_space = ScratchSpace(
+            os.path.join(tempfile.gettempdir(), "blendermcp_scratch"),
+            quota_bytes=int(quota_mb) * 1024 ** 2 if quota_mb else 2 * 1024 ** 3,
+        )
+    return _scratch_space
+
+
+def _reclaim_scratch_space():
+    """Timer callback: periodic scratch reclamation and texture cache eviction on the main thread"""
+    try:
+        get_scratch_space().reclaim()
+    except Exception as e:
+        print(f"Scratch space reclamation failed: {e}")
+    try:
+        get_datablock_registry().evict()
+    except Exception as e:
+        print(f"Texture cache eviction failed: {e}")
+    return SCRATCH_RECLAIM_INTERVAL
+
+
+_current_session = None
+
+def current_session_id():
+    """Session of the command running on the main thread (None outside the v2 addon)"""
+    return _current_session
+
+
+def set_current_session(session_id):
+    """Switch per-session state (scratch directory, exec namespace) to session_id"""
+    global _current_session
+    _current_session = session_id
+    get_scratch_space().current_session = session_id
+
+
+#region Archive import
+# Files a model importer can use, everything else in an archive is skipped
+MODEL_FILE_EXTENSIONS = (".gltf", ".glb", ".obj")
+MODEL_ARCHIVE_EXTENSIONS = MODEL_FILE_EXTENSIONS + (
+    ".bin", ".mtl", ".png", ".jpg", ".jpeg", ".webp", ".ktx2", ".tga", ".bmp", ".tif", ".tiff", ".exr", ".hdr",
+)
+MAX_ARCHIVE_ENTRIES = 10000
+MAX_ARCHIVE_BYTES = 4 * 1024 * 1024 * 1024  # Uncompressed size limit against zip bombs
+
+
+class _ChunkReader:
+    """Exact-size reads over an iterable of byte chunks (an HTTP response or a file)"""
+
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.buffer = bytearray()
+
+    def _fill(self, size):
+        while len(self.buffer) < size:
+            chunk = next(self.chunks, None)
+            if chunk is None:
+                return
+            self.buffer += chunk
+
+    def read(self, size):
+        self._fill(size)
+        if len(self.buffer) < size:
+            raise ValueError("Archive is truncated")
+        data = bytes(self.buffer[:size])
+        del self.buffer[:size]
+        return data
+
+    def read_some(self, max_size=65536):
+        self._fill(1)
+        if not self.buffer:
+            raise ValueError("Archive is truncated")
+        data = bytes(self.buffer[:max_size])
+        del self.buffer[:max_size]
+        return data
+
+    def unread(self, data):
+        self.buffer[0:0] = data
+
+
+def _safe_archive_path(dest_dir, name):
+    """Resolve an archive entry name inside dest_dir, refusing anything that escapes it"""
+    normalized = name.replace("\\", "/")
+    parts = normalized.split("/")
+    if normalized.startswith("/") or re.match(r"^[A-Za-z]:", normalized) or ".." in parts:
+        raise ValueError("Security issue: Zip contains files with path traversal attempt")
+    target = os.path.abspath(os.path.join(dest_dir, *[p for p in parts if p not in ("", ".")]))
+    if os.path.commonpath([target, os.path.abspath(dest_dir)]) != os.path.abspath(dest_dir):
+        raise ValueError("Security issue: Zip contains files with path traversal attempt")
+    return target
+
+
+def _referenced_model_files(main_file):
+    """Files next to main_file that the importer will open (buffers, textures, materials)"""
+    base_dir = os.path.dirname(main_file)
+    needed = {os.path.abspath(main_file)}
+
+    def add(uri):
+        if uri and not uri.startswith("data:"):
+            needed.add(os.path.abspath(os.path.join(base_dir, urllib.parse.unquote(uri))))
+
+    if main_file.endswith(".gltf"):
+        with open(main_file, "r", encoding="utf-8") as f:
+            gltf = json.load(f)
+        for item in gltf.get("buffers", []) + gltf.get("images", []):
+            add(item.get("uri"))
+    elif main_file.endswith(".obj"):
+        mtl_files = []
+        with open(main_file, "r", encoding="utf-8", errors="ignore") as f:
+            for line in f:
+                if line.startswith("mtllib "):
+                    mtl_files.append(line[7:].strip())
+        for mtl in mtl_files:
+            add(mtl)
+            mtl_path = os.path.join(base_dir, mtl)
+            if not os.path.exists(mtl_path):
+                continue
+            with open(mtl_path, "r", encoding="utf-8", errors="ignore") as f:
+                for line in f:
+                    tokens = line.split()
+                    if tokens and (tokens[0].startswith("map_") or tokens[0] in ("bump", "disp", "decal", "norm")):
+                        add(tokens[-1])
+    return needed
+
+
+def extract_model_archive(chunks, dest_dir, max_bytes=MAX_ARCHIVE_BYTES):
+    """Stream a zip archive into dest_dir, keeping only what a model importer needs.
+
+    Entries are read one by one from their local headers as the chunks
+    arrive, validated against path traversal and size limits, and either
+    written out or discarded, so no copy of the archive touches disk.
+    Once the main glTF/GLB/OBJ is known, files it does not reference are
+    removed again.
+
+    Returns a dict with the main model file and the files kept.
+    """
+    reader = _ChunkReader(chunks)
+    written = []
+    total_bytes = 0
+    entries = 0
+
+    while True:
+        signature = reader.read(4)
+        if signature in (b"PK\x01\x02", b"PK\x05\x06"):
+            break  # Central directory reached, all entries have been seen
+        if signature != b"PK\x03\x04":
+            raise ValueError("Downloaded file is not a valid zip archive")
+
+        entries += 1
+        if entries > MAX_ARCHIVE_ENTRIES:
+            raise ValueError(f"Archive has more than {MAX_ARCHIVE_ENTRIES} entries")
+
+        (_, flags, method, _, _, crc, compressed_size, size,
+         name_len, extra_len) = struct.unpack("<HHHHHIIIHH", reader.read(26))
+        name = reader.read(name_len).decode("utf-8" if flags & 0x800 else "cp437")
+        extra = reader.read(extra_len)
+
+        # Real sizes of large entries live in the zip64 extra field
+        zip64 = False
+        offset = 0
+        while offset + 4 <= len(extra):
+            header_id, data_len = struct.unpack_from("<HH", extra, offset)
+            if header_id == 0x0001:
+                zip64 = True
+                values = list(struct.unpack_from(f"<{data_len // 8}Q", extra, offset + 4))
+                if size == 0xFFFFFFFF and values:
+                    size = values.pop(0)
+                if compressed_size == 0xFFFFFFFF and values:
+                    compressed_size = values.pop(0)
+                break
+            offset += 4 + data_len
+
+        if flags & 0x1:
+            raise ValueError("Encrypted archives are not supported")
+        if method not in (0, 8):
+            raise ValueError(f"Unsupported compression method {method} for {name}")
+        if method == 0 and flags & 0x8:
+            raise ValueError(f"Cannot stream stored entry without size: {name}")
+
+        target = _safe_archive_path(dest_dir, name)
+        keep = not name.endswith("/") and name.lower().endswith(MODEL_ARCHIVE_EXTENSIONS)
+        out = None
+        if keep:
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            out = open(target, "wb")
+            written.append(target)
+
+        actual_crc = 0
+        try:
+            if method == 8:
+                inflater = zlib.decompressobj(-15)
+                while not inflater.eof:
+                    data = inflater.decompress(reader.read_some())
+                    total_bytes += len(data)
+                    if total_bytes > max_bytes:
+                        raise ValueError("Archive exceeds the uncompressed size limit")
+                    if out:
+                        actual_crc = zlib.crc32(data, actual_crc)
+                        out.write(data)
+                reader.unread(inflater.unused_data)
+            else:
+                remaining = compressed_size
+                while remaining:
+                    data = reader.read(min(remaining, 65536))
+                    remaining -= len(data)
+                    total_bytes += len(data)
+                    if total_bytes > max_bytes:
+                        raise ValueError("Archive exceeds the uncompressed size limit")
+                    if out:
+                        actual_crc = zlib.crc32(data, actual_crc)
+                        out.write(data)
+        finally:
+            if out:
+                out.close()
+
+        if flags & 0x8:
+            # Data descriptor after the data, with an optional signature
+            descriptor = reader.read(4)
+            if descriptor == b"PK\x07\x08":
+                descriptor = reader.read(4)
+            crc = struct.unpack("<I", descriptor)[0]
+            reader.read(16 if zip64 else 8)
+
+        if keep and actual_crc != crc:
+            raise ValueError(f"CRC mismatch in archive entry: {name}")
+
+    model_files = [path for path in written if path.lower().endswith(MODEL_FILE_EXTENSIONS)]
+    if not model_files:
+        raise ValueError("No glTF/GLB/OBJ file found in the archive")
+
+    # Prefer glTF/GLB over OBJ, then the file closest to the archive root
+    model_files.sort(key=lambda path: (path.lower().endswith(".obj"), path.count(os.sep), path))
+    main_file = model_files[0]
+
+    needed = _referenced_model_files(main_file)
+    kept = []
+    for path in written:
+        if path in needed:
+            kept.append(path)
+        else:
+            with suppress(Exception):
+                os.remove(path)
+
+    return {"main_file": main_file, "files": kept, "entries": entries, "bytes": total_bytes}
+#endregion
+
+
+#region Bounding boxes
+def collect_hierarchy_meshes(roots):
+    """All mesh objects in the hierarchies below `roots` (roots included)"""
+    meshes = []
+    for root in roots:
+        if root.type == 'MESH':
+            meshes.append(root)
+        meshes.extend(child for child in root.children_recursive if child.type == 'MESH')
+    return meshes
+
+
+def world_bbox_corners(objects):
+    """World-space bounding box corners of `objects` as an (n, 8, 3) array
+
+    Local corners and world matrices are stacked once and transformed with a
+    single batched matmul instead of one mathutils product per corner.
+    """
+    count = len(objects)
+    corners = np.ones((count, 8, 4))
+    matrices = np.empty((count, 4, 4))
+    for i, obj in enumerate(objects):
+        corners[i, :, :3] = obj.bound_box
+        matrices[i] = obj.matrix_world
+    return np.matmul(corners, matrices.transpose(0, 2, 1))[:, :, :3]
+
+
+def aabb_from_corners(corners):
+    """Reduce an (n, 8, 3) corner array to [[min x, y, z], [max x, y, z]]"""
+    flat = corners.reshape(-1, 3)
+    return [flat.min(axis=0).tolist(), flat.max(axis=0).tolist()]
+
+
+def world_aabb(objects):
+    """Combined world-space AABB of all mesh objects in `objects`, or None"""
+    meshes = [obj for obj in objects if obj.type == 'MESH']
+    if not meshes:
+        return None
+    return aabb_from_corners(world_bbox_corners(meshes))
+#endregion
+
+
+#region Level of detail
+# Meshes below this many triangles are left alone when fitting a budget
+LOD_MIN_TRIANGLES = 64
+LOD_MODIFIER_NAME = "BlenderMCP_LOD"
+
+
+def count_triangles(mesh):
+    """Triangle count of a mesh without triangulating it (n-gon with k loops = k - 2)"""
+    loop_totals = np.empty(len(mesh.polygons), dtype=np.int32)
+    mesh.polygons.foreach_get("loop_total", loop_totals)
+    return int(loop_totals.sum()) - 2 * len(loop_totals)
+
+
+def decimate_to_budget(objects, max_triangles):
+    """Decimate the mesh objects in `objects` so together they fit in max_triangles.
+
+    Every large mesh gets the same collapse ratio. Meshes without other
+    modifiers have the Decimate modifier applied, and the reduced mesh is shared
+    by every object that used the original one. Meshes with existing modifier
+    stacks keep Decimate as a live proxy modifier instead.
+    Returns a report with the triangle counts before and after.
+    """
+    meshes = {}  # mesh name -> (mesh, objects using it)
+    for obj in objects:
+        if obj.type == 'MESH' and obj.data is not None:
+            meshes.setdefault(obj.data.name, (obj.data, []))[1].append(obj)
+
+    counts = {name: count_triangles(mesh) for name, (mesh, _) in meshes.items()}
+    before = sum(counts[name] * len(users) for name, (_, users) in meshes.items())
+    report = {
+        "max_triangles": max_triangles,
+        "triangles_before": before,
+        "triangles_after": before,
+        "decimated_objects": 0,
+        "ratio": 1.0,
+    }
+    if not max_triangles or before <= max_triangles:
+        return report
+
+    large = [name for name, count in counts.items() if count >= LOD_MIN_TRIANGLES]
+    large_total = sum(counts[name] * len(meshes[name][1]) for name in large)
+    small_total = before - large_total
+    if not large_total:
+        return report
+    ratio = min(1.0, max(0.01, (max_triangles - small_total) / large_total))
+    if ratio >= 1.0:
+        return report
+
+    after = small_total
+    for name in large:
+        check_cancelled()
+        mesh, users = meshes[name]
+        for user in users:
+            modifier = user.modifiers.new(LOD_MODIFIER_NAME, 'DECIMATE')
+            modifier.decimate_type = 'COLLAPSE'
+            modifier.ratio = ratio
+            modifier.use_collapse_triangulate = True
+
+        owner = users[0]
+        depsgraph = bpy.context.evaluated_depsgraph_get()
+        if all(len(user.modifiers) == 1 for user in users):
+            # Bake the reduced mesh once and share it between all users
+            lod_mesh = bpy.data.meshes.new_from_object(owner.evaluated_get(depsgraph))
+            for user in users:
+                user.modifiers.remove(user.modifiers[LOD_MODIFIER_NAME])
+                user.data = lod_mesh
+            if mesh.users == 0:
+                bpy.data.meshes.remove(mesh)
+            lod_mesh.name = name
+            triangles = count_triangles(lod_mesh)
+        else:
+            triangles = count_triangles(owner.evaluated_get(depsgraph).data)
+
+        after += triangles * len(users)
+        report["decimated_objects"] += len(users)
+
+    report["triangles_after"] = after
+    report["ratio"] = round(ratio, 4)
+    return report
+#endregion
+
+
+#region Cancellation
+# Clients send a request_id and an absolute deadline (epoch seconds) with each
+# command. A command is dropped if it has expired before it starts, and long
+# handlers check their token cooperatively: at every yield of a time-sliced
+# handler, in download/extraction loops and on every print in execute_code.
+class CommandCancelled(BaseException):
+    """Raised inside a handler whose command was cancelled or ran past its deadline.
+
+    Like asyncio.CancelledError it is not an Exception, so the broad
+    `except Exception` blocks in handlers don't turn it into an error result;
+    their finally blocks still release what they hold.
+    """
+
+
+class CancelToken:
+    def __init__(self, request_id=None, deadline=None):
+        self.request_id = request_id
+        self.deadline = deadline
+        self.reason = None
+        self.received = time.time()
+        self.stream = None    # CommandStream when the client asked for streamed frames
+        self.progress = None  # last (pct, message) reported by the command
+
+    def cancel(self, reason="cancelled"):
+        if self.reason is None:
+            self.reason = reason
+
+    @property
+    def cancelled(self):
+        if self.reason is None and self.deadline is not None and time.time() > self.deadline:
+            self.reason = "deadline exceeded"
+        return self.reason is not None
+
+    def check(self):
+        if self.cancelled:
+            raise CommandCancelled(f"Command {self.request_id or ''} {self.reason}".replace("  ", " "))
+
+    def iter_checked(self, iterable):
+        """Check for cancellation between the items of a (download) stream"""
+        for item in iterable:
+            self.check()
+            yield item
+
+    def response(self):
+        return {
+            "status": "error",
+            "message": f"Command {self.reason}",
+            "cancelled": True,
+            "request_id": self.request_id,
+        }
+
+
+_IDLE_TOKEN = CancelToken()  # outside of any command, never cancelled
+_current_token = _IDLE_TOKEN
+_active_commands = {}  # request_id -> CancelToken
+_active_commands_lock = threading.Lock()
+_commands_in_flight = 0  # received and not answered yet, with or without a request_id
+
+
+def current_cancel_token():
+    """Token of the command running on the main thread right now"""
+    return _current_token
+
+
+def _set_current_token(token):
+    global _current_token
+    _current_token = token or _IDLE_TOKEN
+
+
+def check_cancelled():
+    """Raise CommandCancelled if the running command was cancelled"""
+    _current_token.check()
+
+
+def track_command(command):
+    """Create the cancel token for an incoming command and make it cancellable"""
+    global _commands_in_flight
+    token = CancelToken(command.get("request_id"), command.get("deadline"))
+    with _active_commands_lock:
+        _commands_in_flight += 1
+        if token.request_id:
+            _active_commands[token.request_id] = token
+    return token
+
+
+def untrack_command(token):
+    global _commands_in_flight
+    with _active_commands_lock:
+        _commands_in_flight -= 1
+        if token.request_id and _active_commands.get(token.request_id) is token:
+            del _active_commands[token.request_id]
+
+
+def commands_in_flight():
+    """Commands received from clients and not answered yet, the running one included"""
+    with _active_commands_lock:
+        return _commands_in_flight
+
+
+def cancel_command(request_id, reason="cancelled"):
+    """Cancel a queued or running command; safe from any thread"""
+    with _active_commands_lock:
+        token = _active_commands.get(request_id)
+    if token is None:
+        return False
+    token.cancel(reason)
+    return True
+
+
+def report_progress(pct, message=""):
+    """Report progress of the running command, streamed to clients that asked for it"""
+    token = _current_token
+    token.progress = (float(pct), str(message))
+    if token.stream is not None:
+        token.stream.progress(pct, message)
+#endregion
+
+
+#region Command output
+EXEC_OUTPUT_LIMIT = 1_000_000        # characters of execute_code output kept for the result
+STREAM_PENDING_LIMIT = 256 * 1024    # characters of output waiting to be sent to a slow client
+STREAM_FLUSH_INTERVAL = 0.25         # seconds between frame flushes while a command runs
+
+
+class CheckedOutput:
+    """Captured stdout of a command, bounded to the first and last limit/2
+    characters, that is also streamed and doubles as a cancellation check"""
+
+    def __init__(self, token, limit=EXEC_OUTPUT_LIMIT):
+        self.token = token
+        self.half = limit // 2
+        self.head = io.StringIO()
+        self.tail = deque()
+        self.tail_length = 0
+        self.dropped = 0
+
+    def write(self, text):
+        self.token.check()
+        if self.token.stream is not None:
+            self.token.stream.output(text)
+
+        n = len(text)
+        room = self.half - self.head.tell()
+        if room > 0:
+            self.head.write(text[:room])
+            text = text[room:]
+        if text:
+            self.tail.append(text)
+            self.tail_length += len(text)
+            while self.tail_length - len(self.tail[0]) >= self.half:
+                self.tail_length -= len(self.tail[0])
+                self.dropped += len(self.tail.popleft())
+        return n
+
+    def flush(self):
+        pass
+
+    def getvalue(self):
+        tail = "".join(self.tail)
+        if self.tail_length > self.half:
+            self.dropped += self.tail_length - self.half
+            tail = tail[-self.half:]
+            self.tail, self.tail_length = deque([tail]), len(tail)
+        if not self.dropped:
+            return self.head.getvalue() + tail
+        return f"{self.head.getvalue()}\n... [{self.dropped} characters of output truncated] ...\n{tail}"
+
+
+class CommandStream:
+    """Frames a running command pushes to a streaming client.
+
+    The client's socket thread drains them while it waits for the response;
+    output piling up for a slow client is dropped oldest first beyond
+    max_pending characters, progress frames are always kept.
+    """
+
+    def __init__(self, max_pending=STREAM_PENDING_LIMIT):
+        self.max_pending = max_pending
+        self.frames = deque()
+        self.pending = 0
+        self.dropped = 0
+        self.lock = threading.Lock()
+
+    def output(self, text):
+        if not text:
+            return
+        with self.lock:
+            if self.frames and self.frames[-1]["frame"] == "output":
+                self.frames[-1]["data"] += text
+            else:
+                self.frames.append({"frame": "output", "data": text})
+            self.pending += len(text)
+            while self.pending > self.max_pending:
+                frame = next(f for f in self.frames if f["frame"] == "output")
+                excess = self.pending - self.max_pending
+                if len(frame["data"]) > excess:
+                    frame["data"] = frame["data"][excess:]
+                else:
+                    self.frames.remove(frame)
+                    excess = len(frame["data"])
+                self.pending -= excess
+                self.dropped += excess
+
+    def progress(self, pct, message=""):
+        with self.lock:
+            self.frames.append({"frame": "progress", "progress": float(pct), "total": 100.0, "message": str(message)})
+
+    def drain(self):
+        with self.lock:
+            frames, self.frames = list(self.frames), deque()
+            self.pending = 0
+            if self.dropped:
+                frames.append({"frame": "dropped", "characters": self.dropped})
+                self.dropped = 0
+        return frames
+#endregion
+
+
+#region Time-sliced tasks
+# Handlers may be generators: they yield between steps and the task scheduler
+# resumes them on the next timer tick, so short commands interleave with long
+# ones and the UI keeps drawing. Yielding a Future (see run_in_background)
+# suspends the task until it resolves and sends its result back in.
+TASK_TICK_BUDGET = 0.02     # seconds of handler work per timer tick
+TASK_IDLE_INTERVAL = 0.01   # tick interval while every task waits on I/O
+
+_background_executor = None
+
+def run_in_background(fn, *args, **kwargs):
+    """Run blocking, bpy-free work (network, disk, archives) off the main thread.
+
+    Returns a Future; a time-sliced handler yields it to wait for the result.
+    """
+    global _background_executor
+    if _background_executor is None:
+        _background_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="blendermcp-io")
+    return _background_executor.submit(fn, *args, **kwargs)
+
+
+def run_to_completion(gen):
+    """Drive a time-sliced handler synchronously and return its result"""
+    value, error = None, None
+    while True:
+        try:
+            step = gen.throw(error) if error is not None else gen.send(value)
+        except StopIteration as stop:
+            return stop.value
+        value, error = None, None
+        if isinstance(step, Future):
+            try:
+                value = step.result()
+            except BaseException as e:
+                error = e
+
+
+SCRIPT_FUNCTION_NAME = "__blendermcp_script__"
+
+
+def _has_toplevel_yield(node):
+    for child in ast.iter_child_nodes(node):
+        if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda, ast.ClassDef)):
+            continue
+        if isinstance(child, (ast.Yield, ast.YieldFrom)) or _has_toplevel_yield(child):
+            return True
+    return False
+
+
+def compile_script(code, filename="<string>"):
+    """Compile an execute_code script, returning (code object, sliced).
+
+    A script that yields at top level becomes the body of a generator
+    function: calling it (after exec) gives a time-sliced handler, and its
+    variables are local to that function instead of module globals.
+    """
+    tree = ast.parse(code, filename)
+    if not _has_toplevel_yield(tree):
+        return compile(tree, filename, "exec"), False
+
+    wrapper = ast.parse(f"def {SCRIPT_FUNCTION_NAME}():\n    pass")
+    wrapper.body[0].body = tree.body or [ast.Pass()]
+    ast.fix_missing_locations(wrapper)
+    return compile(wrapper, filename, "exec"), True
+
+
+class Task:
+    """A generator handler in flight, with the future it is waiting on"""
+
+    def __init__(self, gen, callback, name="", session_id=None, token=None):
+        self.gen = gen
+        self.callback = callback
+        self.name = name
+        self.session_id = session_id
+        self.token = token or _IDLE_TOKEN
+        self.waiting = None
+        self.steps = 0
+        self.busy_time = 0.0
+        self.created = time.monotonic()
+
+    def ready(self):
+        # A cancelled task is resumed right away, it stops waiting for its I/O
+        return self.waiting is None or self.waiting.done() or self.token.cancelled
+
+    def step(self):
+        """Resume until the next yield; return True once the task has finished"""
+        value, error = None, None
+        if self.token.cancelled:
+            if self.waiting is not None:
+                self.waiting.cancel()
+            error = CommandCancelled(f"Command {self.token.reason}")
+        elif self.waiting is not None:
+            try:
+                value = self.waiting.result()
+            except BaseException as e:
+                error = e
+        self.waiting = None
+
+        start = time.perf_counter()
+        _set_current_token(self.token)
+        try:
+            step = self.gen.throw(error) if error is not None else self.gen.send(value)
+        except StopIteration as stop:
+            self.finish(stop.value)
+            return True
+        except CommandCancelled:
+            self.finish(self.token.response())
+            return True
+        except Exception as e:
+            traceback.print_exc()
+            self.finish({"status": "error", "message": str(e)})
+            return True
+        finally:
+            _set_current_token(None)
+            self.steps += 1
+            self.busy_time += time.perf_counter() - start
+
+        if isinstance(step, Future):
+            self.waiting = step
+        return False
+
+    def finish(self, result):
+        try:
+            self.callback(result)
+        except Exception as e:
+            print(f"Error delivering result of {self.name}: {e}")
+
+
+class TaskScheduler:
+    """Resumes time-sliced handlers round-robin from a timer on the main thread.
+
+    Each tick runs ready tasks until tick_budget seconds are used; a single
+    step is never interrupted, so handlers should yield between heavy steps.
+    """
+
+    def __init__(self, tick_budget=TASK_TICK_BUDGET):
+        self.tick_budget = tick_budget
+        self.tasks = deque()
+        self.lock = threading.Lock()
+        self.completed = 0
+        # Blender identifies timers by the function object; a bound method is a new one on every access
+        self.timer = self._tick
+
+    def submit(self, gen, callback, name="", session_id=None, token=None):
+        task = Task(gen, callback, name, session_id, token)
+        with self.lock:
+            self.tasks.append(task)
+        if not bpy.app.timers.is_registered(self.timer):
+            # Persistent, so tasks survive a checkpoint rollback reopening the file
+            bpy.app.timers.register(self.timer, first_interval=0.0, persistent=True)
+        return task
+
+    def stop(self):
+        if bpy.app.timers.is_registered(self.timer):
+            bpy.app.timers.unregister(self.timer)
+
+    def _tick(self):
+        deadline = time.perf_counter() + self.tick_budget
+        idle = 0
+        while time.perf_counter() < deadline:
+            with self.lock:
+                if not self.tasks or idle >= len(self.tasks):
+                    break
+                task = self.tasks.popleft()
+            if not task.ready():
+                idle += 1
+                with self.lock:
+                    self.tasks.append(task)
+                continue
+
+            idle = 0
+            # Scratch files and names of a resumed task belong to its own session
+            set_current_session(task.session_id)
+            if task.step():
+                self.completed += 1
+            else:
+                with self.lock:
+                    self.tasks.append(task)
+
+        with self.lock:
+            if not self.tasks:
+                return None
+            runnable = any(task.ready() for task in self.tasks)
+        return 0.0 if runnable else TASK_IDLE_INTERVAL
+
+    def snapshot(self):
+        now = time.monotonic()
+        with self.lock:
+            tasks = list(self.tasks)
+        return {
+            "tick_budget": self.tick_budget,
+            "completed": self.completed,
+            "tasks": [
+                {
+                    "name": task.name,
+                    "request_id": task.token.request_id,
+                    "session_id": task.session_id,
+                    "progress": task.token.progress,
+                    "steps": task.steps,
+                    "busy_time": round(task.busy_time, 4),
+                    "age": round(now - task.created, 3),
+                    "waiting_on_io": not task.ready(),
+                }
+                for task in tasks
+            ],
+        }
+
+
+_task_scheduler = None
+
+def get_task_scheduler():
+    """Get or create the shared task scheduler"""
+    global _task_scheduler
+    if _task_scheduler is None:
+        _task_scheduler = TaskScheduler()
+    return _task_scheduler
+#endregion
+
+
+#region Exec namespaces
+EXEC_NAMESPACE_LIMIT = 16     # sessions whose namespace is kept, least recently used go first
+EXEC_CODE_CACHE_SIZE = 64     # compiled scripts kept, keyed by source hash
+DEFAULT_EXEC_SESSION = "default"
+
+
+def approx_size(obj, depth=2, _seen=None):
+    """Rough memory footprint of a value: its own size plus that of its
+    container items up to depth levels (modules and bpy data count as nothing)"""
+    if _seen is None:
+        _seen = set()
+    if id(obj) in _seen or inspect.ismodule(obj) or isinstance(obj, bpy.types.bpy_struct):
+        return 0
+    _seen.add(id(obj))
+    size = sys.getsizeof(obj, 0)
+    if depth > 0:
+        if isinstance(obj, dict):
+            size += sum(approx_size(k, depth - 1, _seen) + approx_size(v, depth - 1, _seen) for k, v in obj.items())
+        elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+            size += sum(approx_size(item, depth - 1, _seen) for item in obj)
+    return size
+
+
+class ExecNamespaces:
+    """Persistent execute_code globals per session, plus an LRU of compiled code.
+
+    Imports, helper functions and variables a script defines are there for the
+    next script of the same session. Namespaces of the least recently active
+    sessions are dropped beyond max_sessions.
+    """
+
+    def __init__(self, max_sessions=EXEC_NAMESPACE_LIMIT, code_cache_size=EXEC_CODE_CACHE_SIZE):
+        self.max_sessions = max_sessions
+        self.code_cache_size = code_cache_size
+        self.namespaces = OrderedDict()  # session_id -> namespace info
+        self.code_cache = OrderedDict()  # sha256 of source -> (code object, sliced)
+        self.stats = {"compile_hits": 0, "compile_misses": 0, "evicted_namespaces": 0}
+
+    @staticmethod
+    def _fresh_globals():
+        return {"bpy": bpy, "check_cancelled": check_cancelled, "progress": report_progress}
+
+    def _user_names(self, namespace):
+        builtin = self._fresh_globals()
+        return [name for name in namespace if not name.startswith("__") and name not in builtin]
+
+    def get(self, session_id=None):
+        """The globals dict of a session, created on first use"""
+        session_id = session_id or DEFAULT_EXEC_SESSION
+        info = self.namespaces.get(session_id)
+        if info is None:
+            info = self.namespaces[session_id] = {
+                "globals": self._fresh_globals(), "created": time.time(), "runs": 0,
+            }
+            while len(self.namespaces) > self.max_sessions:
+                self.namespaces.popitem(last=False)
+                self.stats["evicted_namespaces"] += 1
+        self.namespaces.move_to_end(session_id)
+        info["runs"] += 1
+        info["last_used"] = time.time()
+        return info["globals"]
+
+    def compile(self, code):
+        """compile_script() with a cache keyed by the source's hash"""
+        key = hashlib.sha256(code.encode("utf-8")).hexdigest()
+        cached = self.code_cache.get(key)
+        if cached is not None:
+            self.code_cache.move_to_end(key)
+            self.stats["compile_hits"] += 1
+            return cached
+        self.stats["compile_misses"] += 1
+        cached = self.code_cache[key] = compile_script(code, f"<execute_code {key[:8]}>")
+        while len(self.code_cache) > self.code_cache_size:
+            self.code_cache.popitem(last=False)
+        return cached
+
+    def reset(self, session_id=None, names=None):
+        """Forget some names, or the whole namespace, of a session"""
+        session_id = session_id or DEFAULT_EXEC_SESSION
+        info = self.namespaces.get(session_id)
+        if info is None:
+            return []
+        if names is None:
+            removed = self._user_names(info["globals"])
+            info["globals"] = self._fresh_globals()
+            return removed
+        removed = [name for name in names if name in info["globals"]]
+        for name in removed:
+            del info["globals"][name]
+        return removed
+
+    def evict(self, session_id=None, compiled=False):
+        """Drop a session's namespace and/or the compiled code cache"""
+        evicted = {"namespace": False, "compiled": 0}
+        if session_id is not None and self.namespaces.pop(session_id, None) is not None:
+            evicted["namespace"] = True
+            self.stats["evicted_namespaces"] += 1
+        if compiled:
+            evicted["compiled"] = len(self.code_cache)
+            self.code_cache.clear()
+        return evicted
+
+    def usage(self, top=5):
+        sessions = {}
+        for session_id, info in self.namespaces.items():
+            namespace = info["globals"]
+            sizes = {name: approx_size(namespace[name]) for name in self._user_names(namespace)}
+            sessions[session_id] = {
+                "variables": len(sizes),
+                "approx_bytes": sum(sizes.values()),
+                "largest": sorted(sizes.items(), key=lambda item: item[1], reverse=True)[:top],
+                "runs": info["runs"],
+                "created": info["created"],
+                "last_used": info["last_used"],
+            }
+        return {
+            "sessions": sessions,
+            "compiled_scripts": len(self.code_cache),
+            "compiled_bytes": sum(
+                len(code.co_code) + sum(len(c.co_code) for c in code.co_consts if inspect.iscode(c))
+                for code, _ in self.code_cache.values()
+            ),
+            **self.stats,
+        }
+
+
+_exec_namespaces = None
+
+def get_exec_namespaces():
+    """Get or create the shared execute_code namespaces"""
+    global _exec_namespaces
+    if _exec_namespaces is None:
+        _exec_namespaces = ExecNamespaces()
+    return _exec_namespaces
+#endregion
+
+
+#region Profiling
+PROFILE_TOP_N = 20  # hot functions returned with a profiled response
+
+
+class CommandProfiler:
+    """cProfile over the main-thread slices of one command.
+
+    Besides the hot functions it accounts where the wall time went: running
+    on the main thread (wall and CPU), waiting for background I/O, and
+    waiting for the main thread (queued behind other commands or the UI).
+    """
+
+    def __init__(self, name, session_id=None, received=None, top=PROFILE_TOP_N):
+        self.name = name
+        self.session_id = session_id
+        self.top = top
+        self.profile = cProfile.Profile()
+        self.started = time.time()
+        self.received = received or self.started
+        self.busy_time = 0.0
+        self.cpu_time = 0.0
+        self.io_wait = 0.0
+        self.main_thread_wait = self.started - self.received
+        self.slices = 0
+        self.error = None
+
+    @contextmanager
+    def slice(self):
+        wall, cpu = time.perf_counter(), time.thread_time()
+        try:
+            self.profile.enable()
+        except ValueError as e:
+            # Another profiler is active, e.g. one the script started itself
+            self.error = str(e)
+        try:
+            yield
+        finally:
+            self.profile.disable()
+            self.busy_time += time.perf_counter() - wall
+            self.cpu_time += time.thread_time() - cpu
+            self.slices += 1
+
+    def run(self, gen):
+        """Drive a time-sliced handler, profiling only its own slices"""
+        value, error = None, None
+        while True:
+            with self.slice():
+                try:
+                    step = gen.throw(error) if error is not None else gen.send(value)
+                except StopIteration as stop:
+                    return stop.value
+            value, error = None, None
+            paused = time.perf_counter()
+            try:
+                value = yield step
+            except BaseException as e:
+                error = e
+            if isinstance(step, Future):
+                self.io_wait += time.perf_counter() - paused
+            else:
+                self.main_thread_wait += time.perf_counter() - paused
+
+    def report(self):
+        stats = pstats.Stats(self.profile)
+        path = get_scratch_space().make_file(
+            suffix=".pstats", prefix=f"profile_{self.name}_", session_id=self.session_id, pin=False
+        )
+        stats.dump_stats(path)
+
+        hot = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)[:self.top]
+        report = {
+            "wall_time": round(time.time() - self.received, 6),
+            "main_thread_time": round(self.busy_time, 6),
+            "cpu_time": round(self.cpu_time, 6),
+            "main_thread_wait": round(self.main_thread_wait, 6),
+            "io_wait": round(self.io_wait, 6),
+            "slices": self.slices,
+            "top_functions": [
+                {
+                    "function": pstats.func_std_string(func),
+                    "calls": calls,
+                    "primitive_calls": primitive_calls,
+                    "tottime": round(tottime, 6),
+                    "cumtime": round(cumtime, 6),
+                }
+                for func, (primitive_calls, calls, tottime, cumtime, _) in hot
+            ],
+            "pstats_path": path,
+        }
+        if self.error:
+            report["error"] = self.error
+        return report
+
+    def attach(self, response):
+        """Add the report to a response, inside its result when that is a dict"""
+        try:
+            report = self.report()
+        except Exception as e:
+            report = {"error": f"Failed to build profile: {e}"}
+        if isinstance(response.get("result"), dict):
+            response["result"]["profile"] = report
+        else:
+            response["profile"] = report
+        return response
+#endregion
+
+
+#region Checkpoints
+CHECKPOINT_LIMIT = 8                         # restore points kept before the oldest is evicted
+CHECKPOINT_MARKER = "_blendermcp_checkpoint"  # scene property tagging the undo step of a checkpoint
+
+
+def process_rss():
+    """Resident memory of this process in bytes (None where /proc isn't available)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _main_window():
+    """The context's window, else the first one (None in background mode)"""
+    window = bpy.context.window
+    if window is None:
+        windows = bpy.context.window_manager.windows if bpy.context.window_manager else []
+        window = windows[0] if windows else None
+    return window
+
+
+def _window_override():
+    """Context with a window, which the undo operators need when run from a timer"""
+    window = _main_window()
+    return None if window is None else bpy.context.temp_override(window=window)
+
+
+class CheckpointStore:
+    """Restore points of the scene that execute_code scripts can roll back to.
+
+    A checkpoint is an undo step whose scene carries a marker property, so a
+    rollback steps back through Blender's memfile undo until the marker shows
+    up again instead of reloading anything. Where undo isn't available
+    (background mode, undo steps set to 0) every checkpoint is saved as an
+    incrementally numbered .blend copy in the session's scratch directory and
+    its scenes are loaded back on rollback. At most limit checkpoints are
+    kept, oldest evicted first.
+    """
+
+    def __init__(self, limit=CHECKPOINT_LIMIT):
+        self.limit = limit
+        self.checkpoints = OrderedDict()  # id -> info dict
+        self.counter = 0
+        self.stats = {"created": 0, "rolled_back": 0, "committed": 0, "evicted": 0}
+
+    @staticmethod
+    def undo_available():
+        if bpy.app.background or bpy.context.preferences.edit.undo_steps <= 0:
+            return False
+        override = _window_override()
+        if override is None:
+            return False
+        with override:
+            return bpy.ops.ed.undo_push.poll()
+
+    @staticmethod
+    def _marked(checkpoint_id):
+        return any(scene.get(CHECKPOINT_MARKER) == checkpoint_id for scene in bpy.data.scenes)
+
+    @staticmethod
+    def _clear_markers():
+        for scene in bpy.data.scenes:
+            if CHECKPOINT_MARKER in scene:
+                del scene[CHECKPOINT_MARKER]
+
+    def begin(self, name=None, session_id=None):
+        self.counter += 1
+        checkpoint_id = f"cp{self.counter}"
+        before = process_rss()
+        if self.undo_available():
+            bpy.context.scene[CHECKPOINT_MARKER] = checkpoint_id
+            with _window_override():
+                bpy.ops.ed.undo_push(message=f"BlenderMCP checkpoint {checkpoint_id}")
+            # Only the pushed step carries the marker
+            self._clear_markers()
+            after = process_rss()
+            method, path = "undo", None
+            # Memfile steps share unchanged chunks with the previous one, so this is the incremental cost
+            size = max(0, after - before) if before is not None and after is not None else None
+        else:
+            scratch = get_scratch_space()
+            path = os.path.join(scratch.session_dir(session_id), f"checkpoint_{self.counter:03d}.blend")
+            bpy.ops.wm.save_as_mainfile(filepath=path, copy=True, compress=False)
+            # Scratch reclaim must not delete the copy while the checkpoint can still be rolled back to
+            scratch.pin(path)
+            method, size = "file", os.path.getsize(path)
+
+        self.checkpoints[checkpoint_id] = {
+            "id": checkpoint_id,
+            "name": name or checkpoint_id,
+            "session_id": session_id,
+            "method": method,
+            "path": path,
+            "memory_bytes": size if method == "undo" else 0,
+            "disk_bytes": size if method == "file" else 0,
+            "created": time.time(),
+        }
+        self.stats["created"] += 1
+        while len(self.checkpoints) > self.limit:
+            self._drop(next(iter(self.checkpoints)))
+            self.stats["evicted"] += 1
+        return self.describe(self.checkpoints[checkpoint_id])
+
+    def _resolve(self, checkpoint_id=None):
+        if not self.checkpoints:
+            raise ValueError("No checkpoint to go back to; call begin_checkpoint first")
+        if checkpoint_id is None:
+            return next(reversed(self.checkpoints))
+        if checkpoint_id not in self.checkpoints:
+            for info in self.checkpoints.values():
+                if info["name"] == checkpoint_id:
+                    return info["id"]
+            raise ValueError(f"Unknown checkpoint: {checkpoint_id}")
+        return checkpoint_id
+
+    def _drop(self, checkpoint_id):
+        info = self.checkpoints.pop(checkpoint_id)
+        if info["path"]:
+            get_scratch_space().unpin(info["path"])
+            with suppress(OSError):
+                os.remove(info["path"])
+        return info
+
+    def _newer_than(self, checkpoint_id):
+        ids = list(self.checkpoints)
+        return ids[ids.index(checkpoint_id) + 1:]
+
+    def rollback(self, checkpoint_id=None):
+        """Restore the scene to a checkpoint; newer checkpoints are discarded, the checkpoint itself stays"""
+        checkpoint_id = self._resolve(checkpoint_id)
+        info = self.checkpoints[checkpoint_id]
+        started = time.perf_counter()
+        steps = 0
+        if info["method"] == "undo":
+            with _window_override():
+                # Push the current state so the first undo doesn't skip past unpushed edits
+                bpy.ops.ed.undo_push(message="BlenderMCP rollback")
+                for _ in range(bpy.context.preferences.edit.undo_steps + 1):
+                    if self._marked(checkpoint_id) or not bpy.ops.ed.undo.poll():
+                        break
+                    bpy.ops.ed.undo()
+                    steps += 1
+                if not self._marked(checkpoint_id):
+                    # The checkpoint fell off the undo stack: put the scene back the way it was
+                    for _ in range(steps):
+                        bpy.ops.ed.redo()
+            if not self._marked(checkpoint_id):
+                self._drop(checkpoint_id)
+                self.stats["evicted"] += 1
+                raise ValueError(f"Checkpoint {checkpoint_id} is no longer on the undo stack (raise Undo Steps to keep more)")
+            self._clear_markers()
+        else:
+            reopened = self._restore_file(info["path"])
+
+        for newer in self._newer_than(checkpoint_id):
+            self._drop(newer)
+        self.stats["rolled_back"] += 1
+        result = {
+            **self.describe(info),
+            "undo_steps": steps,
+            "rollback_time": round(time.perf_counter() - started, 4),
+        }
+        if info["method"] == "file" and reopened:
+            result["file_reopened"] = True
+            result["message"] = (
+                "The checkpoint was opened as the main file: bpy.data.filepath now points at the scratch copy, "
+                "save the file under its own path before closing Blender"
+            )
+        return result
+
+    @staticmethod
+    def _restore_file(path):
+        """Bring back the scenes of a checkpoint file, returns True if it had to be opened as the main file.
+
+        With a window the scenes are swapped in place via bpy.data.libraries.load,
+        so the open document keeps its path and queued commands keep their timers.
+        Without one (background mode) the copy is opened with open_mainfile, which
+        clears non-persistent timers, so that is refused while other commands are pending.
+        """
+        window = _main_window()
+        if window is None:
+            if commands_in_flight() > 1:
+                raise ValueError("Cannot reopen a file checkpoint while other commands are pending, retry once they finished")
+            bpy.ops.wm.open_mainfile(filepath=path, load_ui=False)
+            return True
+
+        active_name = window.scene.name
+        placeholder = bpy.data.scenes.new("BlenderMCP rollback")
+        window.scene = placeholder
+        for scene in list(bpy.data.scenes):
+            if scene != placeholder:
+                bpy.data.scenes.remove(scene)
+        # Free the names of the data only the removed scenes used, the checkpoint's copies take them over
+        bpy.data.orphans_purge(do_recursive=True)
+        with bpy.data.libraries.load(path, link=False) as (data_from, data_to):
+            data_to.scenes = list(data_from.scenes)
+        scenes = [scene for scene in data_to.scenes if scene is not None]
+        window.scene = next((scene for scene in scenes if scene.name == active_name), scenes[0])
+        bpy.data.scenes.remove(placeholder)
+        return False
+
+    def commit(self, checkpoint_id=None):
+        """Keep the changes made since a checkpoint and forget the checkpoint"""
+        info = self._drop(self._resolve(checkpoint_id))
+        self.stats["committed"] += 1
+        return self.describe(info)
+
+    def evict(self, keep=0):
+        """Forget all but the newest keep checkpoints"""
+        evicted = []
+        while len(self.checkpoints) > max(0, keep):
+            evicted.append(self._drop(next(iter(self.checkpoints)))["id"])
+            self.stats["evicted"] += 1
+        return evicted
+
+    @staticmethod
+    def describe(info):
+        return {**info, "age": round(time.time() - info["created"], 3)}
+
+    def usage(self):
+        checkpoints = [self.describe(info) for info in self.checkpoints.values()]
+        prefs = bpy.context.preferences.edit
+        return {
+            "checkpoints": checkpoints,
+            "limit": self.limit,
+            "method": "undo" if self.undo_available() else "file",
+            "memory_bytes": sum(info["memory_bytes"] or 0 for info in checkpoints),
+            "disk_bytes": sum(info["disk_bytes"] for info in checkpoints),
+            "process_rss_bytes": process_rss(),
+            "undo_steps": prefs.undo_steps,
+            "undo_memory_limit_mb": prefs.undo_memory_limit,
+            **self.stats,
+        }
+
+
+_checkpoint_store = None
+
+def get_checkpoint_store():
+    """Get or create the shared checkpoint store"""
+    global _checkpoint_store
+    if _checkpoint_store is None:
+        _checkpoint_store = CheckpointStore()
+    return _checkpoint_store
+#endregion
+
+#region Scene changes
+_scene_changes = 0
+
+def scene_change_counter():
+    """Incremented whenever the depsgraph reports an update, a file is loaded or an undo step is restored"""
+    return _scene_changes
+
+
+@bpy.app.handlers.persistent
+def _count_scene_change(*args):
+    global _scene_changes
+    depsgraph = next((arg for arg in args if isinstance(arg, bpy.types.Depsgraph)), None)
+    if depsgraph is not None and all(isinstance(update.id, bpy.types.Image) for update in depsgraph.updates):
+        # Images loaded and removed while taking a screenshot don't change the scene
+        return
+    _scene_changes += 1
+
+
+SCENE_CHANGE_HANDLERS = ("depsgraph_update_post", "load_post", "undo_post", "redo_post", "frame_change_post")
+
+def register_scene_change_handlers():
+    for name in SCENE_CHANGE_HANDLERS:
+        handlers = getattr(bpy.app.handlers, name)
+        if _count_scene_change not in handlers:
+            handlers.append(_count_scene_change)
+
+
+def unregister_scene_change_handlers():
+    for name in SCENE_CHANGE_HANDLERS:
+        handlers = getattr(bpy.app.handlers, name)
+        if _count_scene_change in handlers:
+            handlers.remove(_count_scene_change)
+#endregion
+
+
+#region Image encoding
+IMAGE_FORMATS = {"png": "PNG", "jpg": "JPEG", "jpeg": "JPEG", "webp": "WEBP"}
+DEFAULT_IMAGE_QUALITY = 80  # JPEG/WebP quality when none is given
+
+
+def read_image_pixels(filepath):
+    """Pixels of an image file as a (height, width, 4) float32 array, top row first"""
+    image = bpy.data.images.load(filepath, check_existing=False)
+    try:
+        width, height = image.size
+        pixels = np.empty(width * height * 4, dtype=np.float32)
+        image.pixels.foreach_get(pixels)
+    finally:
+        bpy.data.images.remove(image)
+    return pixels.reshape(height, width, 4)[::-1]
+
+
+def box_downsample(pixels, max_size):
+    """Shrink so the largest side is max_size, every output pixel averaging the block it covers"""
+    height, width = pixels.shape[:2]
+    scale = max_size / max(height, width)
+    if scale >= 1:
+        return pixels
+    new_height, new_width = max(1, int(height * scale)), max(1, int(width * scale))
+    rows = np.arange(new_height) * height // new_height
+    cols = np.arange(new_width) * width // new_width
+    # Columns first: reducing along the contiguous axis of the large input is the cheap pass
+    summed = np.add.reduceat(np.add.reduceat(pixels, cols, axis=1), rows, axis=0)
+    counts = np.outer(np.diff(rows, append=height), np.diff(cols, append=width)).astype(np.float32)
+    return summed / counts[..., None]
+
+
+def to_uint8(pixels):
+    return (np.clip(pixels, 0.0, 1.0) * 255.0 + 0.5).astype(np.uint8)
+
+
+def encode_png(rgba, level=6):
+    """PNG bytes of a (height, width, 4) uint8 array"""
+    height, width = rgba.shape[:2]
+    # Filter type 0 (None) in front of every row
+    raw = np.empty((height, width * 4 + 1), dtype=np.uint8)
+    raw[:, 0] = 0
+    raw[:, 1:] = rgba.reshape(height, width * 4)
+
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)
+    return b"".join((
+        b"\x89PNG\r\n\x1a\n",
+        chunk(b"IHDR", header),
+        chunk(b"IDAT", zlib.compress(raw.tobytes(), level)),
+        chunk(b"IEND", b""),
+    ))
+
+
+def _encode_with_pil(rgba, file_format, quality):
+    try:
+        from PIL import Image as PILImage
+    except ImportError:
+        return None
+    buffer = io.BytesIO()
+    image = PILImage.fromarray(rgba[..., :3] if file_format == "JPEG" else rgba)
+    image.save(buffer, format=file_format, quality=quality)
+    return buffer.getvalue()
+
+
+def _encode_with_blender(rgba, file_format, quality):
+    """Lossy encode through Blender's image writer, via a scratch file of the (already small) image"""
+    height, width = rgba.shape[:2]
+    scratch = get_scratch_space()
+    path = scratch.make_file(suffix="." + file_format.lower(), prefix="encode_")
+    image = bpy.data.images.new("BlenderMCP_encode", width, height, alpha=file_format != "JPEG")
+    try:
+        image.pixels.foreach_set((rgba[::-1].astype(np.float32) / 255.0).ravel())
+        image.file_format = file_format
+        image.save(filepath=path, quality=quality)
+        with open(path, "rb") as f:
+            return f.read()
+    finally:
+        bpy.data.images.remove(image)
+        scratch.release(path)
+
+
+def encode_image(rgba, format="png", quality=None):
+    """Encode a (height, width, 4) uint8 array as PNG, JPEG or WebP bytes.
+
+    PNG is written in memory with zlib. JPEG/WebP use Pillow when it is
+    installed, otherwise Blender's own writer.
+    """
+    file_format = IMAGE_FORMATS.get(format.lower())
+    if file_format is None:
+        raise ValueError(f"Unsupported image format: {format} (use png, jpeg or webp)")
+    if file_format == "PNG":
+        return encode_png(rgba)
+    quality = int(quality or DEFAULT_IMAGE_QUALITY)
+    data = _encode_with_pil(rgba, file_format, quality)
+    if data is None:
+        data = _encode_with_blender(rgba, file_format, quality)
+    return data
+#endregion
+
+#region Multi-view renders
+# Named views as (azimuth, elevation) in degrees; azimuth 0 looks from -Y (front), 90 from +X (right)
+VIEW_PRESETS = {
+    "front": (0.0, 0.0),
+    "back": (180.0, 0.0),
+    "right": (90.0, 0.0),
+    "side": (90.0, 0.0),
+    "left": (-90.0, 0.0),
+    "top": (0.0, 90.0),
+    "bottom": (0.0, -90.0),
+    "iso": (45.0, 35.264),
+}
+DEFAULT_VIEWS = ("front", "side", "top", "iso")
+VIEW_FRAME_MARGIN = 1.1  # ortho scale relative to the framed extent
+CONTACT_SHEET_BACKGROUND = (0.2, 0.2, 0.2, 1.0)
+
+
+def resolve_view(view):
+    """(name, azimuth, elevation) of a preset name or an {"azimuth", "elevation", "name"} dict"""
+    if isinstance(view, str):
+        if view.lower() not in VIEW_PRESETS:
+            raise ValueError(f"Unknown view: {view} (use {', '.join(VIEW_PRESETS)} or azimuth/elevation)")
+        return (view.lower(), *VIEW_PRESETS[view.lower()])
+    azimuth = float(view.get("azimuth", 0.0))
+    elevation = float(view.get("elevation", 0.0))
+    return view.get("name") or f"az{azimuth:g}_el{elevation:g}", azimuth, elevation
+
+
+def frame_view(corners, azimuth, elevation):
+    """Rotation, location, ortho scale and clip end of an orthographic camera showing all corners"""
+    rotation = mathutils.Euler((math.radians(90.0 - elevation), 0.0, math.radians(azimuth)))
+    axes = np.array(rotation.to_matrix())  # columns: camera right, up, back
+    projected = corners @ axes
+    low, high = projected.min(axis=0), projected.max(axis=0)
+    middle = (low + high) / 2
+    depth = high[2] - low[2]
+    # Center in the image plane, and in front of the nearest corner along the view axis
+    location = axes @ np.array([middle[0], middle[1], high[2] + depth + 1.0])
+    scale = max(high[0] - low[0], high[1] - low[1], 1e-3) * VIEW_FRAME_MARGIN
+    return rotation, location.tolist(), scale, 2 * depth + 2.0
+
+
+@contextmanager
+def override_settings(overrides):
+    """Set (owner, attribute, value) triples, restoring the previous values afterwards"""
+    saved = [(owner, attribute, getattr(owner, attribute)) for owner, attribute, _ in overrides]
+    try:
+        for owner, attribute, value in overrides:
+            setattr(owner, attribute, value)
+        yield
+    finally:
+        for owner, attribute, value in reversed(saved):
+            setattr(owner, attribute, value)
+
+
+def compose_contact_sheet(tiles, columns=None):
+    """Tile equally sized (height, width, 4) float images into one grid, row by row"""
+    columns = columns or math.ceil(math.sqrt(len(tiles)))
+    rows = math.ceil(len(tiles) / columns)
+    height, width = tiles[0].shape[:2]
+    sheet = np.empty((rows * height, columns * width, 4), dtype=np.float32)
+    sheet[:] = CONTACT_SHEET_BACKGROUND
+    for i, tile in enumerate(tiles):
+        row, column = divmod(i, columns)
+        sheet[row * height:(row + 1) * height, column * width:(column + 1) * width] = tile
+    return sheet, columns
+#endregion
+
+#region Screenshot cache
+SCREENSHOT_CACHE_SIZE = 8  # encoded screenshots kept
+
+
+class ScreenshotCache:
+    """Encoded viewport screenshots keyed on everything they depend on.
+
+    The key combines the scene change counter with the view matrix,
+    projection, shading and size of the 3D view and the requested size and
+    format, so any edit, orbit or resize misses while repeated requests for
+    an unchanged viewport are served from memory. The ETag is a hash of the
+    encoded bytes.
+    """
+
+    def __init__(self, size=SCREENSHOT_CACHE_SIZE):
+        self.size = size
+        self.entries = OrderedDict()  # key -> entry dict
+        self.lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "not_modified": 0}
+
+    @staticmethod
+    def make_key(area, max_size, format, quality=None):
+        space = area.spaces.active
+        region_3d = space.region_3d
+        shading = space.shading
+        return (
+            scene_change_counter(),
+            tuple(round(value, 6) for row in region_3d.view_matrix for value in row),
+            region_3d.view_perspective,
+            round(space.lens, 4),
+            shading.type,
+            shading.light,
+            shading.color_type,
+            space.overlay.show_overlays,
+            area.width,
+            area.height,
+            int(max_size),
+            IMAGE_FORMATS.get(format.lower(), format),
+            quality,
+        )
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            self.entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return entry
+
+    def put(self, key, data, width, height, format="png"):
+        entry = {
+            "data": data,
+            "format": IMAGE_FORMATS.get(format.lower(), format).lower(),
+            "etag": hashlib.sha1(data).hexdigest()[:16],
+            "width": width,
+            "height": height,
+            "created": time.time(),
+        }
+        with self.lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+        return entry
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def usage(self):
+        with self.lock:
+            return {
+                "entries": len(self.entries),
+                "bytes": sum(len(entry["data"]) for entry in self.entries.values()),
+                **self.stats,
+            }
+
+
+_screenshot_cache = None
+
+def get_screenshot_cache():
+    """Get or create the shared screenshot cache"""
+    global _screenshot_cache
+    if _screenshot_cache is None:
+        _screenshot_cache = ScreenshotCache()
+    return _screenshot_cache
+#endregion
+
+#region Viewport frames
+VIEWPORT_STREAM_FPS = 5.0        # default captures per second of the live viewport stream
+VIEWPORT_STREAM_MAX_FPS = 30.0
+VIEWPORT_STREAM_IDLE = 30.0      # seconds without a viewer before the producer stops capturing
+VIEWPORT_FRAME_WAIT = 10.0       # longest a get_viewport_frame long poll is held
+
+
+def find_view3d_area():
+    """(window, area) of the first 3D viewport, (None, None) when there is none (e.g. background mode)"""
+    screens = []
+    if bpy.context.screen is not None:
+        screens.append((bpy.context.window, bpy.context.screen))
+    window_manager = bpy.context.window_manager
+    if window_manager is not None:
+        screens.extend((window, window.screen) for window in window_manager.windows)
+    for window, screen in screens:
+        for area in screen.areas:
+            if area.type == 'VIEW_3D':
+                return window, area
+    return None, None
+
+
+def capture_viewport(window, area, max_size=800, format="png", quality=None, key=None):
+    """Capture, downsample and encode the 3D view into the screenshot cache.
+
+    Returns the cache entry and per-stage timings in milliseconds.
+    """
+    cache = get_screenshot_cache()
+    key = key or cache.make_key(area, max_size, format, quality)
+    timings = {}
+    started = stage = time.perf_counter()
+
+    def lap(name):
+        nonlocal stage
+        now = time.perf_counter()
+        timings[name] = round((now - stage) * 1000, 2)
+        stage = now
+
+    scratch = get_scratch_space()
+    capture_path = scratch.make_file(suffix=".png", prefix="screenshot_")
+    try:
+        override = {"area": area} if window is None else {"window": window, "area": area}
+        with bpy.context.temp_override(**override):
+            bpy.ops.screen.screenshot_area(filepath=capture_path)
+        lap("capture_ms")
+        pixels = read_image_pixels(capture_path)
+    finally:
+        scratch.release(capture_path)
+    lap("read_ms")
+
+    pixels = box_downsample(pixels, max_size)
+    lap("downsample_ms")
+
+    data = encode_image(to_uint8(pixels), format, quality)
+    lap("encode_ms")
+    timings["total_ms"] = round((time.perf_counter() - started) * 1000, 2)
+
+    height, width = pixels.shape[:2]
+    return cache.put(key, data, width, height, format), timings
+
+
+class ViewportFrameProducer:
+    """Latest encoded frame of the 3D viewport for live previews.
+
+    While someone asked for a frame within the last VIEWPORT_STREAM_IDLE
+    seconds, a timer checks the viewport fps times a second and captures
+    only when the screenshot cache key (scene changes, view, shading, size)
+    moved. Every frame is encoded once and handed to all waiting viewers;
+    wait() can be called from any thread.
+    """
+
+    def __init__(self):
+        self.fps = VIEWPORT_STREAM_FPS
+        self.max_size = 640
+        self.format = "jpeg"
+        self.quality = 70
+        self.frame = None  # {"seq", "etag", "data" (base64), "width", "height", "format", "captured"}
+        self.seq = 0
+        self.key = None
+        self.error = None
+        self.last_request = 0.0
+        self.condition = threading.Condition()
+        self.stats = {"captured": 0, "unchanged": 0, "viewer_requests": 0}
+        self.timer = self._tick  # one callable for register/is_registered/unregister, as in TaskScheduler
+
+    def configure(self, fps=None, max_size=None, format=None, quality=None):
+        if fps:
+            self.fps = min(max(float(fps), 0.1), VIEWPORT_STREAM_MAX_FPS)
+        if max_size:
+            self.max_size = int(max_size)
+        if format:
+            if format.lower() not in IMAGE_FORMATS:
+                raise ValueError(f"Unsupported image format: {format} (use png, jpeg or webp)")
+            self.format = format.lower()
+        if quality:
+            self.quality = int(quality)
+
+    @property
+    def running(self):
+        return bpy.app.timers.is_registered(self.timer)
+
+    def touch(self):
+        """Note a viewer and make sure the producer is capturing"""
+        self.last_request = time.monotonic()
+        self.stats["viewer_requests"] += 1
+        if not self.running:
+            bpy.app.timers.register(self.timer, first_interval=0.0, persistent=True)
+
+    def stop(self):
+        if self.running:
+            bpy.app.timers.unregister(self.timer)
+
+    def _tick(self):
+        if time.monotonic() - self.last_request > VIEWPORT_STREAM_IDLE:
+            print("Viewport stream idle, capturing stopped")
+            return None
+        try:
+            window, area = find_view3d_area()
+            if area is None:
+                raise RuntimeError("No 3D viewport found")
+            quality = None if IMAGE_FORMATS[self.format] == "PNG" else self.quality
+            key = get_screenshot_cache().make_key(area, self.max_size, self.format, quality)
+            if key == self.key:
+                self.stats["unchanged"] += 1
+            else:
+                entry = get_screenshot_cache().get(key)
+                if entry is None:
+                    entry, _ = capture_viewport(window, area, self.max_size, self.format, quality, key)
+                self.key = key
+                self._publish(entry)
+        except Exception as e:
+            with self.condition:
+                self.error = str(e)
+                self.condition.notify_all()
+        return 1.0 / self.fps
+
+    def _publish(self, entry):
+        with self.condition:
+            self.error = None
+            if self.frame and self.frame["etag"] == entry["etag"]:
+                # Different key, same pixels (e.g. a change nothing in view shows)
+                self.stats["unchanged"] += 1
+                return
+            self.seq += 1
+            self.frame = {
+                "seq": self.seq,
+                "etag": entry["etag"],
+                "data": base64.b64encode(entry["data"]).decode("ascii"),  # encoded once for every poller
+                "width": entry["width"],
+                "height": entry["height"],
+                "format": entry["format"],
+                "captured": time.time(),
+            }
+            self.stats["captured"] += 1
+            self.condition.notify_all()
+
+    def wait(self, after_seq=0, timeout=VIEWPORT_FRAME_WAIT):
+        """The first frame newer than after_seq, or None if none arrived within timeout"""
+        self.touch()
+        with self.condition:
+            self.condition.wait_for(lambda: self.seq > after_seq or self.error, timeout=timeout)
+            if self.error:
+                raise RuntimeError(self.error)
+            return self.frame if self.seq > after_seq else None
+
+    def status(self):
+        return {
+            "running": self.running,
+            "fps": self.fps,
+            "max_size": self.max_size,
+            "format": self.format,
+            "quality": self.quality,
+            "seq": self.seq,
+            "error": self.error,
+            **self.stats,
+        }
+
+
+_viewport_producer = None
+
+def get_viewport_producer():
+    """Get or create the shared viewport frame producer"""
+    global _viewport_producer
+    if _viewport_producer is None:
+        _viewport_producer = ViewportFrameProducer()
+    return _viewport_producer
+#endregion
+
+#region Preview glTF
+PREVIEW_TEXTURE_MAX_SIZE = 512  # largest side of an embedded texture
+PREVIEW_INSTANCE_MIN = 2        # uses of one mesh before it is exported with EXT_mesh_gpu_instancing
+PREVIEW_CACHE_SIZE = 8          # exported GLB files kept, by content hash
+
+GLTF_ARRAY_BUFFER, GLTF_ELEMENT_ARRAY_BUFFER = 34962, 34963
+GLTF_BYTE, GLTF_SHORT, GLTF_UNSIGNED_INT, GLTF_FLOAT = 5120, 5122, 5125, 5126
+GLTF_Z_UP_TO_Y_UP = [-0.70710678, 0.0, 0.0, 0.70710678]  # -90 degrees about X
+QUANTIZED_POSITION_MAX = 32767
+
+
+def extract_preview_mesh(mesh, with_uvs=False):
+    """Triangles of a mesh as quantized, deduplicated vertices plus indices per material slot.
+
+    Positions are SHORT components around the bounding box center (restore
+    with center + q * scale), normals normalized BYTEs.
+    """
+    triangles = mesh.loop_triangles
+    loops = np.empty(len(triangles) * 3, dtype=np.int32)
+    triangles.foreach_get("loops", loops)
+    materials = np.empty(len(triangles), dtype=np.int32)
+    triangles.foreach_get("material_index", materials)
+
+    corner_vertices = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", corner_vertices)
+    co = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", co)
+    co = co.reshape(-1, 3)
+    normals = np.empty(len(mesh.loops) * 3, dtype=np.float32)
+    mesh.corner_normals.foreach_get("vector", normals)
+
+    low, high = (co.min(axis=0), co.max(axis=0)) if len(co) else (np.zeros(3), np.zeros(3))
+    center = (low + high) / 2
+    scale = np.maximum((high - low) / 2, 1e-9) / QUANTIZED_POSITION_MAX
+    positions = np.rint((co - center) / scale).astype(np.int16)[corner_vertices]
+    normals = np.rint(normals.reshape(-1, 3) * 127.0).astype(np.int8)
+
+    columns = [positions.view(np.uint8).reshape(-1, 6), normals.view(np.uint8).reshape(-1, 3)]
+    uvs = None
+    if with_uvs and mesh.uv_layers.active is not None:
+        uvs = np.empty(len(mesh.loops) * 2, dtype=np.float32)
+        mesh.uv_layers.active.data.foreach_get("uv", uvs)
+        uvs = uvs.reshape(-1, 2)
+        uvs[:, 1] = 1.0 - uvs[:, 1]  # glTF's V runs downwards
+        columns.append(uvs.view(np.uint8).reshape(-1, 8))
+
+    # Corners with identical attributes become one vertex
+    rows = np.ascontiguousarray(np.hstack(columns))
+    keys = rows.view(np.dtype((np.void, rows.shape[1]))).ravel()
+    _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    indices = inverse.ravel().astype(np.uint32)[loops].reshape(-1, 3)
+    return {
+        "positions": positions[first],
+        "normals": normals[first],
+        "uvs": uvs[first] if uvs is not None else None,
+        "center": center.astype(np.float64),
+        "scale": scale.astype(np.float64),
+        "primitives": {int(slot): indices[materials == slot].ravel() for slot in np.unique(materials)},
+    }
+
+
+def preview_material(material):
+    """(base color, metallic, roughness, base color image) of a material"""
+    if material is None:
+        return [0.8, 0.8, 0.8, 1.0], 0.0, 0.5, None
+    color, metallic, roughness = list(material.diffuse_color), material.metallic, material.roughness
+    image = None
+    bsdf = None
+    if material.node_tree is not None:
+        bsdf = next((node for node in material.node_tree.nodes if node.type == 'BSDF_PRINCIPLED'), None)
+    if bsdf is not None:
+        base = bsdf.inputs["Base Color"]
+        if base.is_linked:
+            source = base.links[0].from_node
+            if source.type == 'TEX_IMAGE' and source.image is not None and source.image.size[0] > 0:
+                image = source.image
+        else:
+            color = list(base.default_value)
+        if not bsdf.inputs["Metallic"].is_linked:
+            metallic = bsdf.inputs["Metallic"].default_value
+        if not bsdf.inputs["Roughness"].is_linked:
+            roughness = bsdf.inputs["Roughness"].default_value
+    return color, float(metallic), float(roughness), image
+
+
+def decompose_matrices(matrices):
+    """(n, 4, 4) affine matrices to translations, x/y/z/w quaternions and scales (shear is dropped)"""
+    translations = matrices[:, :3, 3]
+    basis = matrices[:, :3, :3]
+    scales = np.linalg.norm(basis, axis=1)
+    rotations = basis / np.maximum(scales, 1e-12)[:, None, :]
+    mirrored = np.linalg.det(rotations) < 0
+    scales[mirrored, 0] *= -1
+    rotations[mirrored, :, 0] *= -1
+    m = rotations
+    w = np.sqrt(np.maximum(0.0, 1 + m[:, 0, 0] + m[:, 1, 1] + m[:, 2, 2])) / 2
+    x = np.copysign(np.sqrt(np.maximum(0.0, 1 + m[:, 0, 0] - m[:, 1, 1] - m[:, 2, 2])) / 2, m[:, 2, 1] - m[:, 1, 2])
+    y = np.copysign(np.sqrt(np.maximum(0.0, 1 - m[:, 0, 0] + m[:, 1, 1] - m[:, 2, 2])) / 2, m[:, 0, 2] - m[:, 2, 0])
+    z = np.copysign(np.sqrt(np.maximum(0.0, 1 - m[:, 0, 0] - m[:, 1, 1] + m[:, 2, 2])) / 2, m[:, 1, 0] - m[:, 0, 1])
+    quaternions = np.stack([x, y, z, w], axis=1)
+    quaternions /= np.linalg.norm(quaternions, axis=1, keepdims=True)
+    return translations, quaternions, scales
+
+
+class GlbWriter:
+    """Minimal glTF 2.0 binary container: one buffer, views and accessors appended in order"""
+
+    def __init__(self):
+        self.gltf = {
+            "asset": {"version": "2.0", "generator": "BlenderMCP preview"},
+            "scene": 0,
+            "scenes": [{"nodes": [0]}],
+            "nodes": [{"name": "root", "rotation": GLTF_Z_UP_TO_Y_UP, "children": []}],
+            "meshes": [], "materials": [], "accessors": [], "bufferViews": [],
+            "buffers": [{"byteLength": 0}],
+            "extensionsUsed": ["KHR_mesh_quantization"],
+            "extensionsRequired": ["KHR_mesh_quantization"],
+        }
+        self.chunks = []
+        self.length = 0
+
+    def view(self, data, target=None, stride=None):
+        padding = -self.length % 4
+        if padding:
+            self.chunks.append(b"\0" * padding)
+            self.length += padding
+        view = {"buffer": 0, "byteOffset": self.length, "byteLength": len(data)}
+        if target:
+            view["target"] = target
+        if stride:
+            view["byteStride"] = stride
+        self.chunks.append(data)
+        self.length += len(data)
+        self.gltf["bufferViews"].append(view)
+        return len(self.gltf["bufferViews"]) - 1
+
+    def accessor(self, array, component_type, kind, target=None, normalized=False, min_max=False):
+        """Add an (n, components) array as its own view; rows are padded to 4 bytes as vertex attributes require"""
+        array = np.ascontiguousarray(array)
+        rows = array.reshape(len(array), -1)
+        stride = None
+        if target == GLTF_ARRAY_BUFFER and rows.strides[0] % 4:
+            stride = rows.strides[0] + (-rows.strides[0] % 4)
+            padded = np.zeros((len(rows), stride), dtype=np.uint8)
+            padded[:, :rows.strides[0]] = rows.view(np.uint8).reshape(len(rows), -1)
+            data = padded.tobytes()
+        else:
+            data = rows.tobytes()
+        accessor = {
+            "bufferView": self.view(data, target, stride),
+            "componentType": component_type,
+            "count": len(rows),
+            "type": kind,
+        }
+        if normalized:
+            accessor["normalized"] = True
+        if min_max and len(rows):
+            accessor["min"] = rows.min(axis=0).tolist()
+            accessor["max"] = rows.max(axis=0).tolist()
+        self.gltf["accessors"].append(accessor)
+        return len(self.gltf["accessors"]) - 1
+
+    def extension(self, name):
+        if name not in self.gltf["extensionsUsed"]:
+            self.gltf["extensionsUsed"].append(name)
+
+    def tobytes(self):
+        self.gltf["buffers"][0]["byteLength"] = self.length
+        for key in ("materials", "meshes", "images", "textures", "samplers"):
+            if key in self.gltf and not self.gltf[key]:
+                del self.gltf[key]
+        document = json.dumps(self.gltf, separators=(",", ":")).encode("utf-8")
+        document += b" " * (-len(document) % 4)
+        binary = b"".join(self.chunks)
+        binary += b"\0" * (-len(binary) % 4)
+        return b"".join((
+            struct.pack("<III", 0x46546C67, 2, 12 + 8 + len(document) + 8 + len(binary)),
+            struct.pack("<II", len(document), 0x4E4F534A), document,
+            struct.pack("<II", len(binary), 0x004E4942), binary,
+        ))
+
+
+def collect_preview_scene(depsgraph, with_uvs=True):
+    """Unique meshes (by evaluated mesh and materials) with the world matrices of all their uses"""
+    groups = OrderedDict()  # key -> {"mesh", "materials", "matrices"}
+    for instance in depsgraph.object_instances:
+        obj = instance.object
+        if obj.type != 'MESH':
+            continue
+        materials = tuple(slot.material for slot in obj.material_slots)
+        key = (obj.data.as_pointer(), tuple(m.name if m else None for m in materials))
+        group = groups.get(key)
+        if group is None:
+            check_cancelled()
+            group = groups[key] = {
+                "name": obj.original.data.name if obj.original.data else obj.name,
+                "materials": materials,
+                "matrices": [],
+            }
+            uses_texture = any(preview_material(m)[3] is not None for m in materials)
+            group["mesh"] = extract_preview_mesh(obj.data, with_uvs and uses_texture)
+        group["matrices"].append(np.array(instance.matrix_world, dtype=np.float64))
+    return list(groups.values())
+
+
+def preview_content_hash(groups, texture_max_size, instance_min):
+    """Hash of everything that ends up in the preview GLB"""
+    digest = hashlib.sha1(f"{texture_max_size}:{instance_min}".encode())
+    for group in groups:
+        mesh = group["mesh"]
+        for key in ("positions", "normals", "uvs", "center", "scale"):
+            if mesh[key] is not None:
+                digest.update(mesh[key].tobytes())
+        for slot, indices in mesh["primitives"].items():
+            digest.update(struct.pack("<i", slot))
+            digest.update(indices.tobytes())
+        for material in group["materials"]:
+            color, metallic, roughness, image = preview_material(material)
+            digest.update(repr((material and material.name, color, metallic, roughness)).encode())
+            if image is not None:
+                digest.update(repr((image.name, tuple(image.size), image.filepath, image.is_dirty)).encode())
+        digest.update(np.stack(group["matrices"]).tobytes())
+    return digest.hexdigest()
+
+
+def build_preview_glb(groups, texture_max_size=PREVIEW_TEXTURE_MAX_SIZE, instance_min=PREVIEW_INSTANCE_MIN):
+    """GLB bytes of the collected scene and a few counts describing it"""
+    writer = GlbWriter()
+    gltf = writer.gltf
+    material_indices = {}
+    stats = {"meshes": len(groups), "objects": 0, "instanced_objects": 0, "triangles": 0, "textures": 0}
+
+    def material_index(material):
+        if material in material_indices:
+            return material_indices[material]
+        color, metallic, roughness, image = preview_material(material)
+        pbr = {"baseColorFactor": color, "metallicFactor": metallic, "roughnessFactor": roughness}
+        if image is not None:
+            width, height = image.size
+            pixels = np.empty(width * height * 4, dtype=np.float32)
+            image.pixels.foreach_get(pixels)
+            pixels = box_downsample(pixels.reshape(height, width, 4)[::-1], texture_max_size)
+            view = writer.view(encode_png(to_uint8(pixels)))
+            gltf.setdefault("images", []).append({"bufferView": view, "mimeType": "image/png", "name": image.name})
+            gltf.setdefault("samplers", [{}])
+            gltf.setdefault("textures", []).append({"source": len(gltf["images"]) - 1, "sampler": 0})
+            pbr["baseColorTexture"] = {"index": len(gltf["textures"]) - 1}
+            stats["textures"] += 1
+        gltf["materials"].append({"name": material.name if material else "default", "pbrMetallicRoughness": pbr})
+        material_indices[material] = len(gltf["materials"]) - 1
+        return material_indices[material]
+
+    for group in groups:
+        mesh = group["mesh"]
+        if not mesh["primitives"]:
+            continue
+        attributes = {
+            "POSITION": writer.accessor(mesh["positions"], GLTF_SHORT, "VEC3", GLTF_ARRAY_BUFFER, min_max=True),
+            "NORMAL": writer.accessor(mesh["normals"], GLTF_BYTE, "VEC3", GLTF_ARRAY_BUFFER, normalized=True),
+        }
+        if mesh["uvs"] is not None:
+            attributes["TEXCOORD_0"] = writer.accessor(mesh["uvs"], GLTF_FLOAT, "VEC2", GLTF_ARRAY_BUFFER)
+        primitives = []
+        for slot, indices in mesh["primitives"].items():
+            primitive = {
+                "attributes": attributes,
+                "indices": writer.accessor(indices, GLTF_UNSIGNED_INT, "SCALAR", GLTF_ELEMENT_ARRAY_BUFFER),
+            }
+            materials = group["materials"]
+            primitive["material"] = material_index(materials[slot] if slot < len(materials) else None)
+            primitives.append(primitive)
+            stats["triangles"] += len(indices) // 3 * len(group["matrices"])
+        gltf["meshes"].append({"name": group["name"], "primitives": primitives})
+        mesh_index = len(gltf["meshes"]) - 1
+
+        # Dequantization (center + q * scale) is folded into every node / instance transform
+        dequantize = np.diag([*mesh["scale"], 1.0])
+        dequantize[:3, 3] = mesh["center"]
+        matrices = np.stack(group["matrices"]) @ dequantize
+        stats["objects"] += len(matrices)
+        if len(matrices) >= instance_min:
+            translations, rotations, scales = decompose_matrices(matrices)
+            node = {"name": group["name"], "mesh": mesh_index, "extensions": {"EXT_mesh_gpu_instancing": {"attributes": {
+                "TRANSLATION": writer.accessor(translations.astype(np.float32), GLTF_FLOAT, "VEC3", GLTF_ARRAY_BUFFER),
+                "ROTATION": writer.accessor(rotations.astype(np.float32), GLTF_FLOAT, "VEC4", GLTF_ARRAY_BUFFER),
+                "SCALE": writer.accessor(scales.astype(np.float32), GLTF_FLOAT, "VEC3", GLTF_ARRAY_BUFFER),
+            }}}}
+            writer.extension("EXT_mesh_gpu_instancing")
+            stats["instanced_objects"] += len(matrices)
+            gltf["nodes"].append(node)
+            gltf["nodes"][0]["children"].append(len(gltf["nodes"]) - 1)
+        else:
+            for matrix in matrices:
+                gltf["nodes"].append({"name": group["name"], "mesh": mesh_index, "matrix": matrix.T.ravel().tolist()})
+                gltf["nodes"][0]["children"].append(len(gltf["nodes"]) - 1)
+    return writer.tobytes(), stats
+
+
+class PreviewExportCache:
+    """Preview GLB files on disk, named by the content hash of the scene they show"""
+
+    def __init__(self, root, size=PREVIEW_CACHE_SIZE):
+        self.root = root
+        self.size = size
+        self.last = None  # (scene change counter, params, content hash)
+        self.meta = {}    # content hash -> counts describing the export
+
+    def path(self, content_hash):
+        return os.path.join(self.root, f"{content_hash}.glb")
+
+    def lookup(self, content_hash):
+        """Counts of a cached export, None unless its file is still there"""
+        meta = self.meta.get(content_hash)
+        return meta if meta is not None and os.path.exists(self.path(content_hash)) else None
+
+    def store(self, content_hash, data, meta):
+        self.meta[content_hash] = meta
+        path = self.path(content_hash)
+        with open(path + ".tmp", "wb") as f:
+            f.write(data)
+        os.replace(path + ".tmp", path)
+        files = sorted(
+            (entry for entry in os.scandir(self.root) if entry.name.endswith(".glb")),
+            key=lambda entry: entry.stat().st_mtime,
+        )
+        for entry in files[:-self.size]:
+            self.meta.pop(entry.name[:-len(".glb")], None)
+            with suppress(OSError):
+                os.remove(entry.path)
+        return path
+
+
+_preview_export_cache = None
+
+def get_preview_export_cache():
+    """Get or create the preview GLB cache"""
+    global _preview_export_cache
+    if _preview_export_cache is None:
+        _preview_export_cache = PreviewExportCache(_blendermcp_data_dir("previews"))
+    return _preview_export_cache
+#endregion
+
+#region Scene deltas
+SCENE_DELTA_INTERVAL = 0.1   # seconds changes are coalesced before deltas are computed
+SCENE_DELTA_LOG = 256        # delta batches kept for clients catching up; clients further behind get a snapshot
+SCENE_DELTA_IDLE = 60.0      # seconds without a client before tracking stops
+SCENE_DELTA_WAIT = 10.0      # longest a get_scene_deltas long poll is held
+SCENE_DELTA_RESCAN_HANDLERS = ("load_post", "undo_post", "redo_post", "frame_change_post")
+
+
+def _b64(array):
+    return base64.b64encode(np.ascontiguousarray(array).tobytes()).decode("ascii")
+
+
+def preview_geometry(obj_eval, materials):
+    """Content hash and JSON payload of an evaluated mesh object's geometry.
+
+    Quantized like the preview GLB: little-endian int16 positions (restore
+    with center + q * scale), normalized int8 normals and uint32 indices per
+    material, base64 encoded.
+    """
+    mesh = obj_eval.to_mesh()
+    try:
+        data = extract_preview_mesh(mesh)
+    finally:
+        obj_eval.to_mesh_clear()
+    primitives = []
+    for slot, indices in data["primitives"].items():
+        color, metallic, roughness, _ = preview_material(materials[slot] if slot < len(materials) else None)
+        primitives.append({
+            "indices": _b64(indices),
+            "color": [float(c) for c in color],
+            "metallic": metallic,
+            "roughness": roughness,
+        })
+    payload = {
+        "positions": _b64(data["positions"]),
+        "normals": _b64(data["normals"]),
+        "center": data["center"].tolist(),
+        "scale": data["scale"].tolist(),
+        "primitives": primitives,
+    }
+    return hashlib.sha1(json.dumps(payload, sort_keys=True).encode()).hexdigest()[:16], payload
+
+
+class SceneDeltaTracker:
+    """Per-object add/update/remove deltas of the visible mesh objects for browser previews.
+
+    While a client polled within SCENE_DELTA_IDLE seconds, a
+    depsgraph_update_post handler notes which objects changed and whether
+    their geometry may have; a timer coalesces the notes every
+    SCENE_DELTA_INTERVAL and compares them against what was sent last.
+    Objects whose geometry hash did not change only send their new matrix,
+    and every geometry is sent once however many objects use it. Batches
+    are kept in a short log that wait() serves from any thread; clients
+    too far behind get a snapshot of the current state instead.
+
+    Deltas, in order of application:
+    - {"op": "geometry", "id", "positions", "normals", "center", "scale", "primitives"}
+    - {"op": "add", "name", "geometry", "matrix"}
+    - {"op": "update", "name", "matrix", "geometry" (only when it changed)}
+    - {"op": "remove", "name"}
+    Matrices are Blender world matrices (Z up), column-major.
+    """
+
+    def __init__(self):
+        self.objects = {}     # name -> {"geometry", "matrix", "materials"}
+        self.geometries = {}  # geometry hash -> payload
+        self.dirty = {}       # name -> whether its geometry may have changed
+        self.rescan = False   # re-extract every object (file load, undo, frame change)
+        self.log = deque(maxlen=SCENE_DELTA_LOG)  # (seq, deltas)
+        self.seq = 0
+        self.base_seq = 0     # the log holds every batch after this one
+        self.active = False
+        self.error = None
+        self.last_request = 0.0
+        self.condition = threading.Condition()
+        self.stats = {"batches": 0, "geometry_updates": 0, "transform_updates": 0, "snapshots": 0}
+        # Stored once so is_registered/unregister see the callables that were registered (see TaskScheduler.timer)
+        self.start_timer = self._start
+        self.flush_timer = self._flush
+
+    def touch(self):
+        """Note a client and make sure changes are being tracked"""
+        self.last_request = time.monotonic()
+        if not self.active and not bpy.app.timers.is_registered(self.start_timer):
+            bpy.app.timers.register(self.start_timer, first_interval=0.0)
+
+    def _start(self):
+        if self.active:
+            return None
+        self.active = True
+        self.rescan = True
+        if _track_scene_deltas not in bpy.app.handlers.depsgraph_update_post:
+            bpy.app.handlers.depsgraph_update_post.append(_track_scene_deltas)
+        for name in SCENE_DELTA_RESCAN_HANDLERS:
+            handlers = getattr(bpy.app.handlers, name)
+            if _rescan_scene_deltas not in handlers:
+                handlers.append(_rescan_scene_deltas)
+        print("Scene delta tracking started")
+        # The first batch only sets up the state clients get as a snapshot
+        self._flush(log=False)
+        return None
+
+    def stop(self):
+        self.active = False
+        if _track_scene_deltas in bpy.app.handlers.depsgraph_update_post:
+            bpy.app.handlers.depsgraph_update_post.remove(_track_scene_deltas)
+        for name in SCENE_DELTA_RESCAN_HANDLERS:
+            handlers = getattr(bpy.app.handlers, name)
+            if _rescan_scene_deltas in handlers:
+                handlers.remove(_rescan_scene_deltas)
+        for timer in (self.start_timer, self.flush_timer):
+            if bpy.app.timers.is_registered(timer):
+                bpy.app.timers.unregister(timer)
+        with self.condition:
+            self.objects, self.geometries, self.dirty = {}, {}, {}
+            self.log.clear()
+
+    def schedule(self):
+        if not bpy.app.timers.is_registered(self.flush_timer):
+            bpy.app.timers.register(self.flush_timer, first_interval=SCENE_DELTA_INTERVAL)
+
+    def on_update(self, depsgraph):
+        """Note the objects a depsgraph update touched (main thread, keep it cheap)"""
+        touched = False
+        for update in depsgraph.updates:
+            id = update.id
+            if isinstance(id, bpy.types.Object):
+                name = id.original.name
+                self.dirty[name] = self.dirty.get(name, False) or update.is_updated_geometry
+            elif isinstance(id, bpy.types.Material):
+                for name, state in self.objects.items():
+                    if id.original.name in state["materials"]:
+                        self.dirty[name] = True
+            elif isinstance(id, bpy.types.Image):
+                # Screenshots load and remove images without changing the scene
+                continue
+            touched = True
+        if touched:
+            self.schedule()
+
+    def _flush(self, log=True):
+        if time.monotonic() - self.last_request > SCENE_DELTA_IDLE:
+            print("Scene deltas idle, tracking stopped")
+            self.stop()
+            return None
+        try:
+            self._publish(*self._collect(), log=log)
+        except Exception as e:
+            traceback.print_exc()
+            with self.condition:
+                self.error = str(e)
+                self.condition.notify_all()
+        return None
+
+    def _collect(self):
+        """New object state, geometries and the deltas leading there from the current state"""
+        depsgraph = bpy.context.evaluated_depsgraph_get()
+        dirty, self.dirty = self.dirty, {}
+        rescan, self.rescan = self.rescan, False
+        # Work on copies: wait() reads the current state from the socket thread
+        objects, geometries = dict(self.objects), dict(self.geometries)
+        visible = {
+            obj.name: obj for obj in bpy.context.view_layer.objects
+            if obj.type == 'MESH' and obj.visible_get()
+        }
+        deltas = []
+        for name in [name for name in objects if name not in visible]:
+            del objects[name]
+            deltas.append({"op": "remove", "name": name})
+
+        for name, obj in visible.items():
+            state = objects.get(name)
+            if state is not None and not rescan and name not in dirty:
+                continue
+            obj_eval = obj.evaluated_get(depsgraph)
+            matrix = np.array(obj_eval.matrix_world, dtype=np.float64).T.ravel().tolist()
+            materials = tuple(slot.material for slot in obj.material_slots)
+            if state is None or rescan or dirty[name]:
+                geometry, payload = preview_geometry(obj_eval, materials)
+                if geometry not in geometries:
+                    geometries[geometry] = payload
+                    deltas.append({"op": "geometry", "id": geometry, **payload})
+            else:
+                geometry = state["geometry"]
+
+            if state is None:
+                deltas.append({"op": "add", "name": name, "geometry": geometry, "matrix": matrix})
+            elif geometry != state["geometry"]:
+                deltas.append({"op": "update", "name": name, "geometry": geometry, "matrix": matrix})
+                self.stats["geometry_updates"] += 1
+            elif matrix != state["matrix"]:
+                # Moved, rotated or scaled: the client keeps its geometry
+                deltas.append({"op": "update", "name": name, "matrix": matrix})
+                self.stats["transform_updates"] += 1
+            objects[name] = {
+                "geometry": geometry,
+                "matrix": matrix,
+                "materials": {m.name for m in materials if m is not None},
+            }
+
+        used = {state["geometry"] for state in objects.values()}
+        geometries = {key: payload for key, payload in geometries.items() if key in used}
+        return objects, geometries, deltas
+
+    def _publish(self, objects, geometries, deltas, log=True):
+        with self.condition:
+            self.objects, self.geometries = objects, geometries
+            self.error = None
+            if not log:
+                self.seq += 1
+                self.log.clear()
+                self.base_seq = self.seq
+            elif deltas:
+                self.seq += 1
+                self.log.append((self.seq, deltas))
+                self.base_seq = max(self.base_seq, self.log[0][0] - 1)
+                self.stats["batches"] += 1
+            else:
+                return
+            self.condition.notify_all()
+
+    def snapshot(self):
+        """Deltas building the current state from an empty scene (hold the condition)"""
+        deltas = [{"op": "geometry", "id": key, **payload} for key, payload in self.geometries.items()]
+        deltas.extend(
+            {"op": "add", "name": name, "geometry": state["geometry"], "matrix": state["matrix"]}
+            for name, state in self.objects.items()
+        )
+        return deltas
+
+    def wait(self, after_seq=0, timeout=SCENE_DELTA_WAIT):
+        """Deltas after after_seq, or None if nothing changed within timeout.
+
+        Returns {"seq", "reset", "deltas"}; with reset the client clears its
+        scene first (first poll, fell behind the log or Blender restarted).
+        """
+        self.touch()
+        with self.condition:
+            self.condition.wait_for(lambda: self.error or (self.seq > 0 and self.seq != after_seq), timeout=timeout)
+            if self.error:
+                raise RuntimeError(self.error)
+            if self.seq == 0 or self.seq == after_seq:
+                return None
+            if after_seq < self.base_seq or after_seq > self.seq:
+                self.stats["snapshots"] += 1
+                return {"seq": self.seq, "reset": True, "deltas": self.snapshot()}
+            deltas = [delta for seq, batch in self.log if seq > after_seq for delta in batch]
+            return {"seq": self.seq, "reset": False, "deltas": deltas}
+
+    def status(self):
+        with self.condition:
+            return {
+                "active": self.active,
+                "seq": self.seq,
+                "base_seq": self.base_seq,
+                "objects": len(self.objects),
+                "geometries": len(self.geometries),
+                "error": self.error,
+                **self.stats,
+            }
+
+
+_scene_delta_tracker = None
+
+def get_scene_delta_tracker():
+    """Get or create the shared scene delta tracker"""
+    global _scene_delta_tracker
+    if _scene_delta_tracker is None:
+        _scene_delta_tracker = SceneDeltaTracker()
+    return _scene_delta_tracker
+
+
+@bpy.app.handlers.persistent
+def _track_scene_deltas(scene, depsgraph=None):
+    if _scene_delta_tracker is not None and depsgraph is not None:
+        _scene_delta_tracker.on_update(depsgraph)
+
+
+@bpy.app.handlers.persistent
+def _rescan_scene_deltas(*args):
+    if _scene_delta_tracker is not None:
+        _scene_delta_tracker.rescan = True
+        _scene_delta_tracker.schedule()
+#endregion
+
+
 class BlenderMCPServer:
     def __init__(self, host='localhost', port=9876):
         self.host = host
@@ -43,6 +3429,8 @@ class BlenderMCPServer:
         self.running = False
         self.socket = None
         self.server_thread = None
+        # Dispatcher-wide profiling switch, see set_profiling
+        self.profiling = {"enabled": False, "top": PROFILE_TOP_N}
 
     def start(self):
         if self.running:
@@ -144,35 +3532,65 @@ class BlenderMCPServer:
                         command = json.loads(buffer.decode('utf-8'))
                         buffer = b''
 
-                        # Execute command in Blender's main thread
-                        response_holder = {'response': None}
-                        
-                        def execute_wrapper():
-                            try:
-                                response = self.execute_command(command)
+                        if command.get("type") == "cancel":
+                            # Answered right here: the main thread may be busy with the command to cancel
+                            response_holder = {'response': self._answer_on_socket_thread(
+                                lambda **params: {"status": "success", "result": self.cancel(**params)}, command
+                            )}
+                        elif command.get("type") == "get_viewport_frame":
+                            # Long poll for the live preview: waits here, never on the main thread
+                            response_holder = {'response': self._answer_on_socket_thread(self.get_viewport_frame, command)}
+                        elif command.get("type") == "get_scene_deltas":
+                            response_holder = {'response': self._answer_on_socket_thread(self.get_scene_deltas, command)}
+                        else:
+                            # Execute command in Blender's main thread
+                            response_holder = {'response': None}
+                            response_ready = threading.Event()
+                            token = track_command(command)
+                            stream = CommandStream() if command.get("stream") else None
+                            token.stream = stream
+
+                            def deliver(response):
                                 response_holder['response'] = response
-                            except Exception as e:
-                                print(f"Error executing command: {str(e)}")
-                                traceback.print_exc()
-                                response_holder['response'] = {
-                                    "status": "error",
-                                    "message": str(e)
-                                }
-                            return None
-
-                        # Schedule execution in main thread
-                        bpy.app.timers.register(execute_wrapper, first_interval=0.0)
-                        
-                        # Wait for response to be ready
-                        import time
-                        timeout = 5.0
-                        start = time.time()
-                        while response_holder['response'] is None and (time.time() - start) < timeout:
-                            time.sleep(0.01)
+                                response_ready.set()
+
+                            def execute_wrapper():
+                                self.submit_command(command, deliver, token)
+                                return None
+
+                            # Schedule execution in main thread
+                            bpy.app.timers.register(execute_wrapper, first_interval=0.0)
+                            
+                            # Wait for response to be ready; time-sliced handlers
+                            # finish over several ticks, so allow as long as the client does
+                            timeout = 180.0
+                            if token.deadline is not None:
+                                timeout = min(timeout, max(0.0, token.deadline - time.time()) + 1.0)
+                            waited_until = time.time() + timeout
+                            while True:
+                                remaining = waited_until - time.time()
+                                if remaining <= 0:
+                                    # The client has given up: stop the command at its next check
+                                    token.cancel("deadline exceeded")
+                                    break
+                                interval = min(STREAM_FLUSH_INTERVAL, remaining) if stream else remaining
+                                done = response_ready.wait(timeout=interval)
+                                if stream and not self._send_frames(client, stream.drain()):
+                                    token.cancel("client disconnected")
+                                    break
+                                if done:
+                                    break
+                            untrack_command(token)
+
+                            if stream and response_holder['response']:
+                                # Streaming clients read newline-delimited frames until this one
+                                response_holder['response'] = dict(response_holder['response'], frame="result")
                         
                         # Send response
                         if response_holder['response']:
                             response_json = json.dumps(response_holder['response'])
+                            if command.get("stream"):
+                                response_json += "\n"
                             try:
                                 client.sendall(response_json.encode('utf-8'))
                             except:
@@ -199,10 +3617,18 @@ class BlenderMCPServer:
             except:
                 pass
             print("Client handler stopped")
-                client.close()
-            except:
-                pass
-            print("Client handler stopped")
+
+    @staticmethod
+    def _send_frames(client, frames):
+        """Send streamed frames as JSON lines; False once the client is gone"""
+        if not frames:
+            return True
+        try:
+            client.sendall("".join(json.dumps(frame) + "\n" for frame in frames).encode('utf-8'))
+            return True
+        except OSError:
+            print("Failed to send frames - client disconnected")
+            return False
 
     def execute_command(self, command):
         """Execute a command in the main Blender thread"""
@@ -214,10 +3640,59 @@ class BlenderMCPServer:
             traceback.print_exc()
             return {"status": "error", "message": str(e)}
 
+    def submit_command(self, command, callback, token=None):
+        """Start a command on the main thread and pass its response to callback.
+
+        Time-sliced handlers are handed to the task scheduler, so callback may
+        run on a later timer tick; everything else completes immediately.
+        A command whose token is already cancelled or expired is not started.
+        """
+        token = token or _IDLE_TOKEN
+        if token.cancelled:
+            print(f"Dropping {command.get('type')}: {token.reason}")
+            callback(token.response())
+            return
+
+        _set_current_token(token)
+        try:
+            response = self._start_command(command)
+        except CommandCancelled:
+            response = token.response()
+        except Exception as e:
+            print(f"Error executing command: {str(e)}")
+            traceback.print_exc()
+            response = {"status": "error", "message": str(e)}
+        finally:
+            _set_current_token(None)
+
+        if inspect.isgenerator(response):
+            get_task_scheduler().submit(
+                response, callback, name=command.get("type"), session_id=command.get("session_id"), token=token
+            )
+        else:
+            callback(response)
+
     def _execute_command_internal(self, command):
         """Internal command execution with proper context"""
+        response = self._start_command(command)
+        if inspect.isgenerator(response):
+            # Callers of execute_command expect the finished response
+            response = run_to_completion(response)
+        return response
+
+    def _start_command(self, command):
+        """Run a command's handler and return its response, or a generator
+        producing the response when the handler is time-sliced.
+
+        Any command can ask for a cProfile report with params["profile"]; with
+        set_profiling every command gets one.
+        """
         cmd_type = command.get("type")
-        params = command.get("params", {})
+        params = dict(command.get("params", {}))
+        profile = params.pop("profile", False) or self.profiling["enabled"]
+
+        # Scratch files and exec namespace of this command are the caller's session's
+        set_current_session(command.get("session_id"))
 
         # Add a handler for checking PolyHaven status
         if cmd_type == "get_polyhaven_status":
@@ -233,6 +3708,22 @@ class BlenderMCPServer:
             "get_hyper3d_status": self.get_hyper3d_status,
             "get_sketchfab_status": self.get_sketchfab_status,
             "get_hunyuan3d_status": self.get_hunyuan3d_status,
+            "get_provider_stats": self.get_provider_stats,
+            "get_disk_usage": self.get_disk_usage,
+            "get_task_status": self.get_task_status,
+            "cancel": self.cancel,
+            "reset_exec_namespace": self.reset_exec_namespace,
+            "evict_exec_namespace": self.evict_exec_namespace,
+            "get_exec_namespaces": self.get_exec_namespaces,
+            "set_profiling": self.set_profiling,
+            "render_views": self.render_views,
+            "get_viewport_stream": self.get_viewport_stream,
+            "export_preview_gltf": self.export_preview_gltf,
+            "get_scene_delta_status": self.get_scene_delta_status,
+            "begin_checkpoint": self.begin_checkpoint,
+            "rollback": self.rollback,
+            "commit": self.commit,
+            "get_checkpoints": self.get_checkpoints,
         }
 
         # Add Polyhaven handlers only if enabled
@@ -274,18 +3765,43 @@ class BlenderMCPServer:
 
         handler = handlers.get(cmd_type)
         if handler:
+            profiler = None
+            if profile and cmd_type != "set_profiling":
+                token = current_cancel_token()
+                profiler = CommandProfiler(
+                    cmd_type, command.get("session_id"),
+                    received=token.received if token is not _IDLE_TOKEN else None,
+                    top=self.profiling["top"],
+                )
             try:
                 print(f"Executing handler for {cmd_type}")
-                result = handler(**params)
+                with profiler.slice() if profiler else nullcontext():
+                    result = handler(**params)
+                if inspect.isgenerator(result):
+                    return self._sliced_response(result, profiler)
                 print(f"Handler execution complete")
-                return {"status": "success", "result": result}
+                response = {"status": "success", "result": result}
             except Exception as e:
                 print(f"Error in handler: {str(e)}")
                 traceback.print_exc()
-                return {"status": "error", "message": str(e)}
+                response = {"status": "error", "message": str(e)}
+            return profiler.attach(response) if profiler else response
         else:
             return {"status": "error", "message": f"Unknown command type: {cmd_type}"}
 
+    @staticmethod
+    def _sliced_response(gen, profiler=None):
+        """Wrap a time-sliced handler so it produces a command response"""
+        try:
+            result = yield from (profiler.run(gen) if profiler else gen)
+            print(f"Handler execution complete")
+            response = {"status": "success", "result": result}
+        except Exception as e:
+            print(f"Error in handler: {str(e)}")
+            traceback.print_exc()
+            response = {"status": "error", "message": str(e)}
+        return profiler.attach(response) if profiler else response
+
 
 
     def get_scene_info(self):
@@ -328,19 +3844,7 @@ class BlenderMCPServer:
         if obj.type != 'MESH':
             raise TypeError("Object must be a mesh")
 
-        # Get the bounding box corners in local space
-        local_bbox_corners = [mathutils.Vector(corner) for corner in obj.bound_box]
-
-        # Convert to world coordinates
-        world_bbox_corners = [obj.matrix_world @ corner for corner in local_bbox_corners]
-
-        # Compute axis-aligned min/max coordinates
-        min_corner = mathutils.Vector(map(min, zip(*world_bbox_corners)))
-        max_corner = mathutils.Vector(map(max, zip(*world_bbox_corners)))
-
-        return [
-            [*min_corner], [*max_corner]
-        ]
+        return world_aabb([obj])
 
 
 
@@ -381,89 +3885,384 @@ class BlenderMCPServer:
 
         return obj_info
 
-    def get_viewport_screenshot(self, max_size=800, filepath=None, format="png"):
+    def get_viewport_screenshot(self, max_size=800, filepath=None, format="png", quality=None, if_none_match=None):
         """
-        Capture a screenshot of the current 3D viewport and save it to the specified path.
+        Capture a screenshot of the current 3D viewport.
+
+        The capture is read once into a NumPy buffer, box filtered down to
+        max_size and encoded in memory. Without filepath the encoded image is
+        returned base64 encoded in "data". Screenshots of an unchanged viewport
+        come from the screenshot cache (cached: true); when if_none_match
+        equals the current ETag nothing is sent and not_modified is returned.
 
         Parameters:
         - max_size: Maximum size in pixels for the largest dimension of the image
-        - filepath: Path where to save the screenshot file
-        - format: Image format (png, jpg, etc.)
+        - filepath: Optional path where to save the screenshot file
+        - format: Image format (png, jpeg or webp)
+        - quality: JPEG/WebP quality from 1 to 100
+        - if_none_match: ETag of a screenshot the client already has
 
         Returns success/error status
         """
         try:
-            if not filepath:
-                return {"error": "No filepath provided"}
-
-            # Find the active 3D viewport
-            area = None
-            for a in bpy.context.screen.areas:
-                if a.type == 'VIEW_3D':
-                    area = a
-                    break
+            if format.lower() not in IMAGE_FORMATS:
+                return {"error": f"Unsupported image format: {format} (use png, jpeg or webp)"}
+            if IMAGE_FORMATS[format.lower()] == "PNG":
+                quality = None
 
+            window, area = find_view3d_area()
             if not area:
                 return {"error": "No 3D viewport found"}
 
-            # Take screenshot with proper context override
-            with bpy.context.temp_override(area=area):
-                bpy.ops.screen.screenshot_area(filepath=filepath)
-
-            # Load and resize if needed
-            img = bpy.data.images.load(filepath)
-            width, height = img.size
-
-            if max(width, height) > max_size:
-                scale = max_size / max(width, height)
-                new_width = int(width * scale)
-                new_height = int(height * scale)
-                img.scale(new_width, new_height)
-
-                # Set format and save
-                img.file_format = format.upper()
-                img.save()
-                width, height = new_width, new_height
+            cache = get_screenshot_cache()
+            key = cache.make_key(area, max_size, format, quality)
+            entry = cache.get(key)
+            if entry and if_none_match and if_none_match == entry["etag"]:
+                cache.stats["not_modified"] += 1
+                return {
+                    "success": True,
+                    "not_modified": True,
+                    "cached": True,
+                    "etag": entry["etag"],
+                    "format": entry["format"],
+                    "width": entry["width"],
+                    "height": entry["height"],
+                }
 
-            # Cleanup Blender image data
-            bpy.data.images.remove(img)
+            timings = {}
+            if entry is None:
+                entry, timings = capture_viewport(window, area, max_size, format, quality, key)
 
-            return {
+            result = {
                 "success": True,
-                "width": width,
-                "height": height,
-                "filepath": filepath
+                "cached": not timings,
+                "etag": entry["etag"],
+                "format": entry["format"],
+                "width": entry["width"],
+                "height": entry["height"],
+                "bytes": len(entry["data"]),
             }
+            if timings:
+                result["timings"] = timings
+            if filepath:
+                with open(filepath, "wb") as f:
+                    f.write(entry["data"])
+                result["filepath"] = filepath
+            else:
+                result["data"] = base64.b64encode(entry["data"]).decode("ascii")
+            return result
 
         except Exception as e:
             return {"error": str(e)}
 
+    def get_viewport_frame(self, after_seq=0, timeout=VIEWPORT_FRAME_WAIT, fps=None, max_size=None,
+                           format=None, quality=None):
+        """Wait for a live viewport frame newer than after_seq (answered on the socket thread)
+
+        Starts the frame producer if needed; fps, max_size, format and quality
+        reconfigure it for every viewer. Returns a full command response.
+        """
+        producer = get_viewport_producer()
+        try:
+            producer.configure(fps, max_size, format, quality)
+            frame = producer.wait(int(after_seq or 0), min(float(timeout), VIEWPORT_FRAME_WAIT))
+        except (RuntimeError, ValueError) as e:
+            return {"status": "error", "message": str(e)}
+        if frame is None:
+            return {"status": "success", "result": {"not_modified": True, "seq": producer.seq}}
+        return {"status": "success", "result": dict(frame)}
+
+    def get_viewport_stream(self):
+        """State of the live viewport frame producer"""
+        return get_viewport_producer().status()
+
+    def get_scene_deltas(self, after_seq=0, timeout=SCENE_DELTA_WAIT):
+        """Wait for per-object scene deltas newer than after_seq (answered on the socket thread)
+
+        Starts change tracking if needed. Returns a full command response;
+        see SceneDeltaTracker for the delta format.
+        """
+        tracker = get_scene_delta_tracker()
+        try:
+            result = tracker.wait(int(after_seq or 0), min(float(timeout), SCENE_DELTA_WAIT))
+        except RuntimeError as e:
+            return {"status": "error", "message": str(e)}
+        if result is None:
+            return {"status": "success", "result": {"not_modified": True, "seq": tracker.seq}}
+        return {"status": "success", "result": result}
+
+    def get_scene_delta_status(self):
+        """State of the scene delta tracker"""
+        return get_scene_delta_tracker().status()
+
+    def export_preview_gltf(self, filepath=None, texture_max_size=PREVIEW_TEXTURE_MAX_SIZE,
+                            instance_min=PREVIEW_INSTANCE_MIN, if_none_match=None, inline=False):
+        """
+        Export the visible scene as a lightweight GLB for the browser preview.
+
+        Meshes are written once and shared; a mesh used instance_min times or
+        more becomes one node with EXT_mesh_gpu_instancing. Positions and
+        normals are quantized (KHR_mesh_quantization), only base colors and
+        base color textures (shrunk to texture_max_size) are kept. Exports are
+        cached by a hash of their content, which is also the ETag.
+
+        Parameters:
+        - filepath: Optional path to copy the GLB to
+        - texture_max_size: Largest side of an embedded texture in pixels
+        - instance_min: Uses of one mesh before it is instanced
+        - if_none_match: Content hash the client already has
+        - inline: Return the GLB base64 encoded in "data"
+        """
+        cache = get_preview_export_cache()
+        params = (int(texture_max_size), int(instance_min))
+        counter = scene_change_counter()
+        started = time.perf_counter()
+        timings = {}
+
+        last = cache.last
+        meta = cache.lookup(last[2]) if last and last[:2] == (counter, params) else None
+        if meta is not None:
+            # Nothing changed since the last export
+            content_hash = last[2]
+        else:
+            groups = collect_preview_scene(bpy.context.evaluated_depsgraph_get())
+            timings["collect_ms"] = round((time.perf_counter() - started) * 1000, 2)
+            content_hash = preview_content_hash(groups, *params)
+            meta = cache.lookup(content_hash)
+            if meta is None:
+                stage = time.perf_counter()
+                data, meta = build_preview_glb(groups, *params)
+                cache.store(content_hash, data, meta)
+                timings["build_ms"] = round((time.perf_counter() - stage) * 1000, 2)
+        cache.last = (counter, params, content_hash)
+
+        path = cache.path(content_hash)
+        result = {
+            "success": True,
+            "hash": content_hash,
+            "etag": content_hash,
+            "cached": "build_ms" not in timings,
+            "bytes": os.path.getsize(path),
+            "path": path,
+            **meta,
+        }
+        if timings:
+            timings["total_ms"] = round((time.perf_counter() - started) * 1000, 2)
+            result["timings"] = timings
+        if if_none_match and if_none_match == content_hash:
+            result["not_modified"] = True
+            return result
+        if filepath:
+            shutil.copyfile(path, filepath)
+            result["filepath"] = filepath
+        if inline:
+            with open(path, "rb") as f:
+                result["data"] = base64.b64encode(f.read()).decode("ascii")
+        return result
+
+    def render_views(self, views=None, size=512, objects=None, compose=True, columns=None,
+                     format="png", quality=None, filepath=None):
+        """
+        Render the scene from several angles in one go, tiled into a contact sheet.
+
+        Every view is a low-sample Workbench render through a temporary
+        orthographic camera framed on the objects, so it needs no viewport
+        and works on headless, CPU-only hosts (software OpenGL). Render
+        settings and the active camera are restored afterwards.
+
+        Parameters:
+        - views: Preset names (front, back, side/right, left, top, bottom, iso) and/or
+          {"azimuth", "elevation", "name"} dicts in degrees (default: front, side, top, iso)
+        - size: Width and height of every view in pixels
+        - objects: Names of the objects to frame (default: all visible meshes)
+        - compose: Return one tiled image instead of one image per view
+        - columns: Tiles per row of the contact sheet (default: about square)
+        - format: Image format (png, jpeg or webp)
+        - quality: JPEG/WebP quality from 1 to 100
+        - filepath: Optional path where to save the contact sheet
+        """
+        if format.lower() not in IMAGE_FORMATS:
+            return {"error": f"Unsupported image format: {format} (use png, jpeg or webp)"}
+        try:
+            resolved = [resolve_view(view) for view in (views or DEFAULT_VIEWS)]
+        except ValueError as e:
+            return {"error": str(e)}
+
+        scene = bpy.context.scene
+        if objects:
+            missing = [name for name in objects if name not in bpy.data.objects]
+            if missing:
+                return {"error": f"Objects not found: {', '.join(missing)}"}
+            meshes = collect_hierarchy_meshes([bpy.data.objects[name] for name in objects])
+        else:
+            meshes = [obj for obj in scene.objects if obj.type == 'MESH' and obj.visible_get() and not obj.hide_render]
+        if not meshes:
+            return {"error": "Nothing to render: no visible mesh objects"}
+        corners = world_bbox_corners(meshes).reshape(-1, 3)
+
+        size = max(16, int(size))
+        timings = {"render_ms": 0.0, "read_ms": 0.0}
+        started = time.perf_counter()
+        camera_data = bpy.data.cameras.new("BlenderMCP_views")
+        camera_data.type = 'ORTHO'
+        camera = bpy.data.objects.new("BlenderMCP_views", camera_data)
+        scene.collection.objects.link(camera)
+        render = scene.render
+        settings = [
+            (scene, "camera", camera),
+            (render, "engine", 'BLENDER_WORKBENCH'),
+            (render, "resolution_x", size),
+            (render, "resolution_y", size),
+            (render, "resolution_percentage", 100),
+            (render, "film_transparent", False),
+            (render.image_settings, "file_format", 'PNG'),
+            (render.image_settings, "color_mode", 'RGBA'),
+            (render.image_settings, "color_depth", '8'),
+            (scene.display, "render_aa", 'FXAA'),
+        ]
+        tiles = []
+        try:
+            with override_settings(settings):
+                for name, azimuth, elevation in resolved:
+                    check_cancelled()
+                    rotation, location, scale, clip_end = frame_view(corners, azimuth, elevation)
+                    camera.rotation_euler = rotation
+                    camera.location = location
+                    camera_data.ortho_scale = scale
+                    camera_data.clip_end = clip_end
+
+                    stage = time.perf_counter()
+                    bpy.ops.render.render()
+                    timings["render_ms"] += (time.perf_counter() - stage) * 1000
+                    stage = time.perf_counter()
+                    path = get_scratch_space().make_file(suffix=".png", prefix="view_")
+                    try:
+                        bpy.data.images["Render Result"].save_render(path)
+                        tiles.append(read_image_pixels(path))
+                    finally:
+                        get_scratch_space().release(path)
+                    timings["read_ms"] += (time.perf_counter() - stage) * 1000
+        finally:
+            bpy.data.objects.remove(camera, do_unlink=True)
+            bpy.data.cameras.remove(camera_data)
+
+        stage = time.perf_counter()
+        view_info = [
+            {"name": name, "azimuth": azimuth, "elevation": elevation}
+            for name, azimuth, elevation in resolved
+        ]
+        result = {"success": True, "format": IMAGE_FORMATS[format.lower()].lower(), "views": view_info}
+        if compose:
+            sheet, columns = compose_contact_sheet(tiles, columns)
+            for i, info in enumerate(view_info):
+                info["tile"] = [i % columns, i // columns]  # column, row from the top left
+            data = encode_image(to_uint8(sheet), format, quality)
+            result.update(width=sheet.shape[1], height=sheet.shape[0], columns=columns, bytes=len(data))
+            if filepath:
+                with open(filepath, "wb") as f:
+                    f.write(data)
+                result["filepath"] = filepath
+            else:
+                result["data"] = base64.b64encode(data).decode("ascii")
+        else:
+            for info, tile in zip(view_info, tiles):
+                data = encode_image(to_uint8(tile), format, quality)
+                info.update(width=size, height=size, data=base64.b64encode(data).decode("ascii"))
+        timings["encode_ms"] = (time.perf_counter() - stage) * 1000
+        timings["total_ms"] = (time.perf_counter() - started) * 1000
+        result["timings"] = {key: round(value, 2) for key, value in timings.items()}
+        return result
+
     def execute_code(self, code):
-        """Execute arbitrary Blender Python code"""
+        """Execute arbitrary Blender Python code
+
+        Scripts of one session share a persistent namespace, so imports and
+        helpers defined once stay available. A script using `yield` at top
+        level runs time-sliced: each yield lets Blender and other commands run
+        until the next timer tick (its variables stay local to that run).
+        """
         # This is powerful but potentially dangerous - use with caution
         try:
-            # Create a local namespace for execution
-            namespace = {"bpy": bpy}
+            # The session's persistent namespace; long loops can call
+            # check_cancelled() to stop early when the client gives up
+            namespaces = get_exec_namespaces()
+            namespace = namespaces.get(current_session_id())
+            compiled, sliced = namespaces.compile(code)
 
             # Capture stdout during execution, and return it as result
-            capture_buffer = io.StringIO()
+            capture_buffer = CheckedOutput(current_cancel_token())
             with redirect_stdout(capture_buffer):
-                exec(code, namespace)
+                exec(compiled, namespace)
+            if sliced:
+                return self._execute_code_sliced(namespace.pop(SCRIPT_FUNCTION_NAME)(), capture_buffer)
 
             captured_output = capture_buffer.getvalue()
             return {"executed": True, "result": captured_output}
         except Exception as e:
             raise Exception(f"Code execution error: {str(e)}")
 
+    def reset_exec_namespace(self, names=None):
+        """Forget names defined by earlier scripts of this session (all of them by default)"""
+        removed = get_exec_namespaces().reset(current_session_id(), names)
+        return {"session_id": current_session_id() or DEFAULT_EXEC_SESSION, "removed": removed}
+
+    def evict_exec_namespace(self, session_id=None, compiled=False):
+        """Drop the namespace of a session and/or the compiled script cache"""
+        return get_exec_namespaces().evict(session_id, compiled)
+
+    def get_exec_namespaces(self):
+        """Memory accounting of the execute_code namespaces and compiled scripts"""
+        return get_exec_namespaces().usage()
+
+    def begin_checkpoint(self, name=None):
+        """Save a restore point that rollback can return the scene to"""
+        return get_checkpoint_store().begin(name, current_session_id())
+
+    def rollback(self, checkpoint_id=None):
+        """Undo everything done since a checkpoint (the latest one by default)"""
+        return get_checkpoint_store().rollback(checkpoint_id)
+
+    def commit(self, checkpoint_id=None):
+        """Keep the changes made since a checkpoint and release it"""
+        return get_checkpoint_store().commit(checkpoint_id)
+
+    def get_checkpoints(self, keep=None):
+        """Checkpoints and their memory/disk cost, optionally evicting all but the newest keep"""
+        store = get_checkpoint_store()
+        evicted = store.evict(keep) if keep is not None else []
+        return {**store.usage(), "evicted_now": evicted}
+
+    @staticmethod
+    def _execute_code_sliced(script, capture_buffer):
+        """Step a yielding script, capturing stdout only while it runs"""
+        try:
+            while True:
+                with redirect_stdout(capture_buffer):
+                    try:
+                        next(script)
+                    except StopIteration:
+                        break
+                yield
+        except Exception as e:
+            raise Exception(f"Code execution error: {str(e)}")
+        finally:
+            # Runs the script's own finally blocks when it is cancelled
+            script.close()
+
+        return {"executed": True, "result": capture_buffer.getvalue()}
+
 
 
     def get_polyhaven_categories(self, asset_type):
-        """Get categories for a specific asset type from Polyhaven"""
+        """Get categories for a specific asset type from Polyhaven (time-sliced)"""
         try:
             if asset_type not in ["hdris", "textures", "models", "all"]:
                 return {"error": f"Invalid asset type: {asset_type}. Must be one of: hdris, textures, models, all"}
 
-            response = requests.get(f"https://api.polyhaven.com/categories/{asset_type}", headers=REQ_HEADERS)
+            response = yield run_in_background(
+                provider_request, "polyhaven", "GET", provider_url("polyhaven", f"/categories/{asset_type}"),
+                headers=REQ_HEADERS, timeout=30,
+            )
             if response.status_code == 200:
                 return {"categories": response.json()}
             else:
@@ -471,41 +4270,44 @@ class BlenderMCPServer:
         except Exception as e:
             return {"error": str(e)}
 
-    def search_polyhaven_assets(self, asset_type=None, categories=None):
-        """Search for assets from Polyhaven with optional filtering"""
+    def search_polyhaven_assets(self, asset_type=None, categories=None, query=None, offset=0, limit=20):
+        """Search the local Polyhaven catalog, ranked by relevance to the query"""
         try:
-            url = "https://api.polyhaven.com/assets"
-            params = {}
-
             if asset_type and asset_type != "all":
                 if asset_type not in ["hdris", "textures", "models"]:
                     return {"error": f"Invalid asset type: {asset_type}. Must be one of: hdris, textures, models, all"}
-                params["type"] = asset_type
-
-            if categories:
-                params["categories"] = categories
 
-            response = requests.get(url, params=params, headers=REQ_HEADERS)
-            if response.status_code == 200:
-                # Limit the response size to avoid overwhelming Blender
-                assets = response.json()
-                # Return only the first 20 assets to keep response size manageable
-                limited_assets = {}
-                for i, (key, value) in enumerate(assets.items()):
-                    if i >= 20:  # Limit to 20 assets
-                        break
-                    limited_assets[key] = value
-
-                return {"assets": limited_assets, "total_count": len(assets), "returned_count": len(limited_assets)}
-            else:
-                return {"error": f"API request failed with status code {response.status_code}"}
+            # Keep the response size manageable
+            limit = max(1, min(int(limit), 100))
+            offset = max(0, int(offset))
+
+            catalog = get_polyhaven_catalog()
+            if not catalog.count():
+                # The first download of the catalog waits for the rate limiter, keep it off the main thread
+                yield run_in_background(catalog.refresh)
+            catalog.ensure_fresh()
+            return catalog.search(
+                query=query,
+                asset_type=asset_type,
+                categories=categories,
+                offset=offset,
+                limit=limit
+            )
         except Exception as e:
             return {"error": str(e)}
 
-    def download_polyhaven_asset(self, asset_id, asset_type, resolution="1k", file_format=None):
+    def download_polyhaven_asset(self, asset_id, asset_type, resolution="1k", file_format=None, pack=False):
+        """Download a Poly Haven asset and import it into the scene
+
+        Texture files are kept in the local texture cache and referenced from
+        there; pass pack=True to also pack them into the .blend file.
+        Time-sliced: downloads run off the main thread.
+        """
         try:
             # First get the files information
-            files_response = requests.get(f"https://api.polyhaven.com/files/{asset_id}", headers=REQ_HEADERS)
+            files_response = yield run_in_background(
+                provider_request, "polyhaven", "GET", provider_url("polyhaven", f"/files/{asset_id}"), headers=REQ_HEADERS
+            )
             if files_response.status_code != 200:
                 return {"error": f"Failed to get asset files: {files_response.status_code}"}
 
@@ -521,84 +4323,44 @@ class BlenderMCPServer:
                     file_info = files_data["hdri"][resolution][file_format]
                     file_url = file_info["url"]
 
-                    # For HDRIs, we need to save to a temporary file first
-                    # since Blender can't properly load HDR data directly from memory
-                    with tempfile.NamedTemporaryFile(suffix=f".{file_format}", delete=False) as tmp_file:
-                        # Download the file
-                        response = requests.get(file_url, headers=REQ_HEADERS)
-                        if response.status_code != 200:
-                            return {"error": f"Failed to download HDRI: {response.status_code}"}
-
-                        tmp_file.write(response.content)
-                        tmp_path = tmp_file.name
-
+                    # Keep the file in the content-addressed cache, so switching back
+                    # to an HDRI used before neither downloads nor loads it again
+                    registry = get_datablock_registry()
                     try:
-                        # Create a new world if none exists
-                        if not bpy.data.worlds:
-                            bpy.data.worlds.new("World")
-
-                        world = bpy.data.worlds[0]
-                        world.use_nodes = True
-                        node_tree = world.node_tree
-
-                        # Clear existing nodes
-                        for node in node_tree.nodes:
-                            node_tree.nodes.remove(node)
-
-                        # Create nodes
-                        tex_coord = node_tree.nodes.new(type='ShaderNodeTexCoord')
-                        tex_coord.location = (-800, 0)
-
-                        mapping = node_tree.nodes.new(type='ShaderNodeMapping')
-                        mapping.location = (-600, 0)
-
-                        # Load the image from the temporary file
-                        env_tex = node_tree.nodes.new(type='ShaderNodeTexEnvironment')
-                        env_tex.location = (-400, 0)
-                        env_tex.image = bpy.data.images.load(tmp_path)
+                        digest, file_path, downloaded = yield run_in_background(
+                            registry.fetch_file, file_url, file_format, md5=file_info.get("md5")
+                        )
+                    except requests.exceptions.HTTPError as e:
+                        return {"error": f"Failed to download HDRI: {e.response.status_code}"}
 
-                        # Use a color space that exists in all Blender versions
-                        if file_format.lower() == 'exr':
-                            # Try to use Linear color space for EXR files
-                            try:
-                                env_tex.image.colorspace_settings.name = 'Linear'
-                            except:
-                                # Fallback to Non-Color if Linear isn't available
-                                env_tex.image.colorspace_settings.name = 'Non-Color'
-                        else:  # hdr
-                            # For HDR files, try these options in order
+                    try:
+                        image, reused = registry.load_image(
+                            file_path, digest, name=f"{asset_id}_{resolution}.{file_format}", pack=pack
+                        )
+                        if not reused:
+                            # Use a color space that exists in all Blender versions
                             for color_space in ['Linear', 'Linear Rec.709', 'Non-Color']:
                                 try:
-                                    env_tex.image.colorspace_settings.name = color_space
+                                    image.colorspace_settings.name = color_space
                                     break  # Stop if we successfully set a color space
                                 except:
                                     continue
 
-                        background = node_tree.nodes.new(type='ShaderNodeBackground')
-                        background.location = (-200, 0)
-
-                        output = node_tree.nodes.new(type='ShaderNodeOutputWorld')
-                        output.location = (0, 0)
-
-                        # Connect nodes
-                        node_tree.links.new(tex_coord.outputs['Generated'], mapping.inputs['Vector'])
-                        node_tree.links.new(mapping.outputs['Vector'], env_tex.inputs['Vector'])
-                        node_tree.links.new(env_tex.outputs['Color'], background.inputs['Color'])
-                        node_tree.links.new(background.outputs['Background'], output.inputs['Surface'])
+                        # The node graph is built once, after that only the image is swapped
+                        world, env_tex, rebuilt = self._ensure_hdri_world()
+                        env_tex.image = image
+                        registry.touch_environment(digest)
 
                         # Set as active world
                         bpy.context.scene.world = world
 
-                        # Clean up temporary file
-                        try:
-                            tempfile._cleanup()  # This will clean up all temporary files
-                        except:
-                            pass
-
                         return {
                             "success": True,
                             "message": f"HDRI {asset_id} imported successfully",
-                            "image_name": env_tex.image.name
+                            "image_name": image.name,
+                            "reused": reused,
+                            "downloaded": downloaded,
+                            "world_rebuilt": rebuilt,
                         }
                     except Exception as e:
                         return {"error": f"Failed to set up HDRI in Blender: {str(e)}"}
@@ -609,56 +4371,71 @@ class BlenderMCPServer:
                 if not file_format:
                     file_format = "jpg"  # Default format for textures
 
+                registry = get_datablock_registry()
                 downloaded_maps = {}
+                map_hashes = {}
+                downloaded_files = 0
 
                 try:
+                    # Download all maps into the content-addressed cache at once,
+                    # skipping those already there
+                    fetches = {}
                     for map_type in files_data:
                         if map_type not in ["blend", "gltf"]:  # Skip non-texture files
                             if resolution in files_data[map_type] and file_format in files_data[map_type][resolution]:
                                 file_info = files_data[map_type][resolution][file_format]
-                                file_url = file_info["url"]
-
-                                # Use NamedTemporaryFile like we do for HDRIs
-                                with tempfile.NamedTemporaryFile(suffix=f".{file_format}", delete=False) as tmp_file:
-                                    # Download the file
-                                    response = requests.get(file_url, headers=REQ_HEADERS)
-                                    if response.status_code == 200:
-                                        tmp_file.write(response.content)
-                                        tmp_path = tmp_file.name
-
-                                        # Load image from temporary file
-                                        image = bpy.data.images.load(tmp_path)
-                                        image.name = f"{asset_id}_{map_type}.{file_format}"
-
-                                        # Pack the image into .blend file
-                                        image.pack()
-
-                                        # Set color space based on map type
-                                        if map_type in ['color', 'diffuse', 'albedo']:
-                                            try:
-                                                image.colorspace_settings.name = 'sRGB'
-                                            except:
-                                                pass
-                                        else:
-                                            try:
-                                                image.colorspace_settings.name = 'Non-Color'
-                                            except:
-                                                pass
-
-                                        downloaded_maps[map_type] = image
-
-                                        # Clean up temporary file
-                                        try:
-                                            os.unlink(tmp_path)
-                                        except:
-                                            pass
+                                fetches[map_type] = run_in_background(
+                                    registry.fetch_file, file_info["url"], file_format, md5=file_info.get("md5")
+                                )
+
+                    for map_type, fetch in fetches.items():
+                        try:
+                            digest, file_path, fetched = yield fetch
+                        except requests.exceptions.HTTPError as e:
+                            print(f"Failed to download {map_type} map: {e}")
+                            continue
+                        downloaded_files += int(fetched)
+
+                        # Reuse the image if this exact file is already loaded
+                        image, _ = registry.load_image(
+                            file_path, digest, name=f"{asset_id}_{map_type}.{file_format}", pack=pack
+                        )
+
+                        # Set color space based on map type
+                        if map_type in ['color', 'diffuse', 'albedo']:
+                            try:
+                                image.colorspace_settings.name = 'sRGB'
+                            except:
+                                pass
+                        else:
+                            try:
+                                image.colorspace_settings.name = 'Non-Color'
+                            except:
+                                pass
+
+                        downloaded_maps[map_type] = image
+                        map_hashes[map_type] = digest
 
                     if not downloaded_maps:
                         return {"error": f"No texture maps found for the requested resolution and format"}
 
+                    # Reuse the material generated for the same set of maps
+                    material_key = registry.make_key("polyhaven_material", asset_id, map_hashes)
+                    mat = registry.get_material(material_key)
+                    if mat is not None:
+                        return {
+                            "success": True,
+                            "message": f"Texture {asset_id} already loaded, reusing material",
+                            "material": mat.name,
+                            "maps": list(downloaded_maps.keys()),
+                            "reused": True,
+                            "downloaded_files": downloaded_files,
+                        }
+
                     # Create a new material with the downloaded textures
                     mat = bpy.data.materials.new(name=asset_id)
                     mat.use_nodes = True
+                    registry.register_material(mat, material_key)
                     nodes = mat.node_tree.nodes
                     links = mat.node_tree.links
 
@@ -734,7 +4511,9 @@ class BlenderMCPServer:
                         "success": True,
                         "message": f"Texture {asset_id} imported as material",
                         "material": mat.name,
-                        "maps": list(downloaded_maps.keys())
+                        "maps": list(downloaded_maps.keys()),
+                        "reused": False,
+                        "downloaded_files": downloaded_files,
                     }
 
                 except Exception as e:
@@ -749,18 +4528,16 @@ class BlenderMCPServer:
                     file_info = files_data[file_format][resolution][file_format]
                     file_url = file_info["url"]
 
-                    # Create a temporary directory to store the model and its dependencies
-                    temp_dir = tempfile.mkdtemp()
+                    # Create a scratch directory to store the model and its dependencies
+                    scratch = get_scratch_space()
+                    temp_dir = scratch.make_dir(prefix=f"{asset_id}_")
                     main_file_path = ""
 
-                    try:
+                    def download_model_files():
                         # Download the main model file
-                        main_file_name = file_url.split("/")[-1]
-                        main_file_path = os.path.join(temp_dir, main_file_name)
-
-                        response = requests.get(file_url, headers=REQ_HEADERS)
+                        response = provider_request("polyhaven", "GET", file_url, headers=REQ_HEADERS, timeout=DOWNLOAD_TIMEOUT)
                         if response.status_code != 200:
-                            return {"error": f"Failed to download model: {response.status_code}"}
+                            return response.status_code
 
                         with open(main_file_path, "wb") as f:
                             f.write(response.content)
@@ -776,12 +4553,24 @@ class BlenderMCPServer:
                                 os.makedirs(os.path.dirname(include_file_path), exist_ok=True)
 
                                 # Download the included file
-                                include_response = requests.get(include_url, headers=REQ_HEADERS)
+                                include_response = provider_request(
+                                    "polyhaven", "GET", include_url, headers=REQ_HEADERS, timeout=DOWNLOAD_TIMEOUT
+                                )
                                 if include_response.status_code == 200:
                                     with open(include_file_path, "wb") as f:
                                         f.write(include_response.content)
                                 else:
                                     print(f"Failed to download included file: {include_path}")
+                        return response.status_code
+
+                    try:
+                        main_file_name = file_url.split("/")[-1]
+                        main_file_path = os.path.join(temp_dir, main_file_name)
+
+                        # Download off the main thread, Blender keeps running meanwhile
+                        status_code = yield run_in_background(download_model_files)
+                        if status_code != 200:
+                            return {"error": f"Failed to download model: {status_code}"}
 
                         # Import the model into Blender
                         if file_format == "gltf" or file_format == "glb":
@@ -813,9 +4602,8 @@ class BlenderMCPServer:
                     except Exception as e:
                         return {"error": f"Failed to import model: {str(e)}"}
                     finally:
-                        # Clean up temporary directory
-                        with suppress(Exception):
-                            shutil.rmtree(temp_dir)
+                        # Release the download, textures the imported model uses are kept
+                        scratch.release(temp_dir)
                 else:
                     return {"error": f"Requested format or resolution not available for this model"}
 
@@ -825,8 +4613,264 @@ class BlenderMCPServer:
         except Exception as e:
             return {"error": f"Failed to download asset: {str(e)}"}
 
-    def set_texture(self, object_name, texture_id):
-        """Apply a previously downloaded Polyhaven texture to an object by creating a new material"""
+    HDRI_NODE_NAME = "BlenderMCP Environment"
+
+    @staticmethod
+    def _ensure_hdri_world():
+        """Return (world, environment node, rebuilt) for the HDRI world setup.
+
+        The node graph is only (re)built when the environment node is missing
+        or no longer feeds the world output.
+        """
+        world = bpy.context.scene.world
+        if world is None:
+            world = bpy.data.worlds[0] if bpy.data.worlds else bpy.data.worlds.new("World")
+        world.use_nodes = True
+        node_tree = world.node_tree
+
+        env_tex = node_tree.nodes.get(BlenderMCPServer.HDRI_NODE_NAME)
+        output = next((n for n in node_tree.nodes if n.type == 'OUTPUT_WORLD' and n.is_active_output), None)
+        if env_tex is not None and output is not None and output.inputs['Surface'].is_linked:
+            background = output.inputs['Surface'].links[0].from_node
+            if background.type == 'BACKGROUND' and any(
+                link.from_node == env_tex for link in background.inputs['Color'].links
+            ):
+                return world, env_tex, False
+
+        # Clear existing nodes
+        for node in node_tree.nodes:
+            node_tree.nodes.remove(node)
+
+        # Create nodes
+        tex_coord = node_tree.nodes.new(type='ShaderNodeTexCoord')
+        tex_coord.location = (-800, 0)
+
+        mapping = node_tree.nodes.new(type='ShaderNodeMapping')
+        mapping.location = (-600, 0)
+
+        env_tex = node_tree.nodes.new(type='ShaderNodeTexEnvironment')
+        env_tex.name = BlenderMCPServer.HDRI_NODE_NAME
+        env_tex.location = (-400, 0)
+
+        background = node_tree.nodes.new(type='ShaderNodeBackground')
+        background.location = (-200, 0)
+
+        output = node_tree.nodes.new(type='ShaderNodeOutputWorld')
+        output.location = (0, 0)
+
+        # Connect nodes
+        node_tree.links.new(tex_coord.outputs['Generated'], mapping.inputs['Vector'])
+        node_tree.links.new(mapping.outputs['Vector'], env_tex.inputs['Vector'])
+        node_tree.links.new(env_tex.outputs['Color'], background.inputs['Color'])
+        node_tree.links.new(background.outputs['Background'], output.inputs['Surface'])
+
+        return world, env_tex, True
+
+    @staticmethod
+    def _build_texture_material(name, texture_images):
+        """Create a Principled BSDF material wired up with the given texture maps"""
+        new_mat = bpy.data.materials.new(name=name)
+        new_mat.use_nodes = True
+
+        # Set up the material nodes
+        nodes = new_mat.node_tree.nodes
+        links = new_mat.node_tree.links
+
+        # Clear default nodes
+        nodes.clear()
+
+        # Create output node
+        output = nodes.new(type='ShaderNodeOutputMaterial')
+        output.location = (600, 0)
+
+        # Create principled BSDF node
+        principled = nodes.new(type='ShaderNodeBsdfPrincipled')
+        principled.location = (300, 0)
+        links.new(principled.outputs[0], output.inputs[0])
+
+        # Add texture nodes based on available maps
+        tex_coord = nodes.new(type='ShaderNodeTexCoord')
+        tex_coord.location = (-800, 0)
+
+        mapping = nodes.new(type='ShaderNodeMapping')
+        mapping.location = (-600, 0)
+        mapping.vector_type = 'TEXTURE'  # Changed from default 'POINT' to 'TEXTURE'
+        links.new(tex_coord.outputs['UV'], mapping.inputs['Vector'])
+
+        # Position offset for texture nodes
+        x_pos = -400
+        y_pos = 300
+
+        # Connect different texture maps
+        for map_type, image in texture_images.items():
+            tex_node = nodes.new(type='ShaderNodeTexImage')
+            tex_node.location = (x_pos, y_pos)
+            tex_node.image = image
+
+            # Set color space based on map type
+            if map_type.lower() in ['color', 'diffuse', 'albedo']:
+                try:
+                    tex_node.image.colorspace_settings.name = 'sRGB'
+                except:
+                    pass  # Use default if sRGB not available
+            else:
+                try:
+                    tex_node.image.colorspace_settings.name = 'Non-Color'
+                except:
+                    pass  # Use default if Non-Color not available
+
+            links.new(mapping.outputs['Vector'], tex_node.inputs['Vector'])
+
+            # Connect to appropriate input on Principled BSDF
+            if map_type.lower() in ['color', 'diffuse', 'albedo']:
+                links.new(tex_node.outputs['Color'], principled.inputs['Base Color'])
+            elif map_type.lower() in ['roughness', 'rough']:
+                links.new(tex_node.outputs['Color'], principled.inputs['Roughness'])
+            elif map_type.lower() in ['metallic', 'metalness', 'metal']:
+                links.new(tex_node.outputs['Color'], principled.inputs['Metallic'])
+            elif map_type.lower() in ['normal', 'nor', 'dx', 'gl']:
+                # Add normal map node
+                normal_map = nodes.new(type='ShaderNodeNormalMap')
+                normal_map.location = (x_pos + 200, y_pos)
+                links.new(tex_node.outputs['Color'], normal_map.inputs['Color'])
+                links.new(normal_map.outputs['Normal'], principled.inputs['Normal'])
+            elif map_type.lower() in ['displacement', 'disp', 'height']:
+                # Add displacement node
+                disp_node = nodes.new(type='ShaderNodeDisplacement')
+                disp_node.location = (x_pos + 200, y_pos - 200)
+                disp_node.inputs['Scale'].default_value = 0.1  # Reduce displacement strength
+                links.new(tex_node.outputs['Color'], disp_node.inputs['Height'])
+                links.new(disp_node.outputs['Displacement'], output.inputs['Displacement'])
+
+            y_pos -= 250
+
+        # Second pass: Connect nodes with proper handling for special cases
+        texture_nodes = {}
+
+        # First find all texture nodes and store them by map type
+        for node in nodes:
+            if node.type == 'TEX_IMAGE' and node.image:
+                for map_type, image in texture_images.items():
+                    if node.image == image:
+                        texture_nodes[map_type] = node
+                        break
+
+        # Now connect everything using the nodes instead of images
+        # Handle base color (diffuse)
+        for map_name in ['color', 'diffuse', 'albedo']:
+            if map_name in texture_nodes:
+                links.new(texture_nodes[map_name].outputs['Color'], principled.inputs['Base Color'])
+                print(f"Connected {map_name} to Base Color")
+                break
+
+        # Handle roughness
+        for map_name in ['roughness', 'rough']:
+            if map_name in texture_nodes:
+                links.new(texture_nodes[map_name].outputs['Color'], principled.inputs['Roughness'])
+                print(f"Connected {map_name} to Roughness")
+                break
+
+        # Handle metallic
+        for map_name in ['metallic', 'metalness', 'metal']:
+            if map_name in texture_nodes:
+                links.new(texture_nodes[map_name].outputs['Color'], principled.inputs['Metallic'])
+                print(f"Connected {map_name} to Metallic")
+                break
+
+        # Handle normal maps
+        for map_name in ['gl', 'dx', 'nor']:
+            if map_name in texture_nodes:
+                normal_map_node = nodes.new(type='ShaderNodeNormalMap')
+                normal_map_node.location = (100, 100)
+                links.new(texture_nodes[map_name].outputs['Color'], normal_map_node.inputs['Color'])
+                links.new(normal_map_node.outputs['Normal'], principled.inputs['Normal'])
+                print(f"Connected {map_name} to Normal")
+                break
+
+        # Handle displacement
+        for map_name in ['displacement', 'disp', 'height']:
+            if map_name in texture_nodes:
+                disp_node = nodes.new(type='ShaderNodeDisplacement')
+                disp_node.location = (300, -200)
+                disp_node.inputs['Scale'].default_value = 0.1  # Reduce displacement strength
+                links.new(texture_nodes[map_name].outputs['Color'], disp_node.inputs['Height'])
+                links.new(disp_node.outputs['Displacement'], output.inputs['Displacement'])
+                print(f"Connected {map_name} to Displacement")
+                break
+
+        # Handle ARM texture (Ambient Occlusion, Roughness, Metallic)
+        if 'arm' in texture_nodes:
+            separate_rgb = nodes.new(type='ShaderNodeSeparateRGB')
+            separate_rgb.location = (-200, -100)
+            links.new(texture_nodes['arm'].outputs['Color'], separate_rgb.inputs['Image'])
+
+            # Connect Roughness (G) if no dedicated roughness map
+            if not any(map_name in texture_nodes for map_name in ['roughness', 'rough']):
+                links.new(separate_rgb.outputs['G'], principled.inputs['Roughness'])
+                print("Connected ARM.G to Roughness")
+
+            # Connect Metallic (B) if no dedicated metallic map
+            if not any(map_name in texture_nodes for map_name in ['metallic', 'metalness', 'metal']):
+                links.new(separate_rgb.outputs['B'], principled.inputs['Metallic'])
+                print("Connected ARM.B to Metallic")
+
+            # For AO (R channel), multiply with base color if we have one
+            base_color_node = None
+            for map_name in ['color', 'diffuse', 'albedo']:
+                if map_name in texture_nodes:
+                    base_color_node = texture_nodes[map_name]
+                    break
+
+            if base_color_node:
+                mix_node = nodes.new(type='ShaderNodeMixRGB')
+                mix_node.location = (100, 200)
+                mix_node.blend_type = 'MULTIPLY'
+                mix_node.inputs['Fac'].default_value = 0.8  # 80% influence
+
+                # Disconnect direct connection to base color
+                for link in base_color_node.outputs['Color'].links:
+                    if link.to_socket == principled.inputs['Base Color']:
+                        links.remove(link)
+
+                # Connect through the mix node
+                links.new(base_color_node.outputs['Color'], mix_node.inputs[1])
+                links.new(separate_rgb.outputs['R'], mix_node.inputs[2])
+                links.new(mix_node.outputs['Color'], principled.inputs['Base Color'])
+                print("Connected ARM.R to AO mix with Base Color")
+
+        # Handle AO (Ambient Occlusion) if separate
+        if 'ao' in texture_nodes:
+            base_color_node = None
+            for map_name in ['color', 'diffuse', 'albedo']:
+                if map_name in texture_nodes:
+                    base_color_node = texture_nodes[map_name]
+                    break
+
+            if base_color_node:
+                mix_node = nodes.new(type='ShaderNodeMixRGB')
+                mix_node.location = (100, 200)
+                mix_node.blend_type = 'MULTIPLY'
+                mix_node.inputs['Fac'].default_value = 0.8  # 80% influence
+
+                # Disconnect direct connection to base color
+                for link in base_color_node.outputs['Color'].links:
+                    if link.to_socket == principled.inputs['Base Color']:
+                        links.remove(link)
+
+                # Connect through the mix node
+                links.new(base_color_node.outputs['Color'], mix_node.inputs[1])
+                links.new(texture_nodes['ao'].outputs['Color'], mix_node.inputs[2])
+                links.new(mix_node.outputs['Color'], principled.inputs['Base Color'])
+                print("Connected AO to mix with Base Color")
+
+        return new_mat
+
+    def set_texture(self, object_name, texture_id, pack=False):
+        """Apply a previously downloaded Polyhaven texture to an object
+
+        The material built for a given set of images is shared by every object
+        the texture is applied to; pack=True also packs the images into the .blend.
+        """
         try:
             # Get the object
             obj = bpy.data.objects.get(object_name)
@@ -844,9 +4888,6 @@ class BlenderMCPServer:
                     # Extract the map type from the image name
                     map_type = img.name.split('_')[-1].split('.')[0]
 
-                    # Force a reload of the image
-                    img.reload()
-
                     # Ensure proper color space
                     if map_type.lower() in ['color', 'diffuse', 'albedo']:
                         try:
@@ -859,8 +4900,8 @@ class BlenderMCPServer:
                         except:
                             pass
 
-                    # Ensure the image is packed
-                    if not img.packed_file:
+                    # Images reference the texture cache unless packing is requested
+                    if pack and not img.packed_file:
                         img.pack()
 
                     texture_images[map_type] = img
@@ -875,207 +4916,17 @@ class BlenderMCPServer:
             if not texture_images:
                 return {"error": f"No texture images found for: {texture_id}. Please download the texture first."}
 
-            # Create a new material
-            new_mat_name = f"{texture_id}_material_{object_name}"
-
-            # Remove any existing material with this name to avoid conflicts
-            existing_mat = bpy.data.materials.get(new_mat_name)
-            if existing_mat:
-                bpy.data.materials.remove(existing_mat)
-
-            new_mat = bpy.data.materials.new(name=new_mat_name)
-            new_mat.use_nodes = True
-
-            # Set up the material nodes
-            nodes = new_mat.node_tree.nodes
-            links = new_mat.node_tree.links
-
-            # Clear default nodes
-            nodes.clear()
-
-            # Create output node
-            output = nodes.new(type='ShaderNodeOutputMaterial')
-            output.location = (600, 0)
-
-            # Create principled BSDF node
-            principled = nodes.new(type='ShaderNodeBsdfPrincipled')
-            principled.location = (300, 0)
-            links.new(principled.outputs[0], output.inputs[0])
-
-            # Add texture nodes based on available maps
-            tex_coord = nodes.new(type='ShaderNodeTexCoord')
-            tex_coord.location = (-800, 0)
-
-            mapping = nodes.new(type='ShaderNodeMapping')
-            mapping.location = (-600, 0)
-            mapping.vector_type = 'TEXTURE'  # Changed from default 'POINT' to 'TEXTURE'
-            links.new(tex_coord.outputs['UV'], mapping.inputs['Vector'])
-
-            # Position offset for texture nodes
-            x_pos = -400
-            y_pos = 300
-
-            # Connect different texture maps
-            for map_type, image in texture_images.items():
-                tex_node = nodes.new(type='ShaderNodeTexImage')
-                tex_node.location = (x_pos, y_pos)
-                tex_node.image = image
-
-                # Set color space based on map type
-                if map_type.lower() in ['color', 'diffuse', 'albedo']:
-                    try:
-                        tex_node.image.colorspace_settings.name = 'sRGB'
-                    except:
-                        pass  # Use default if sRGB not available
-                else:
-                    try:
-                        tex_node.image.colorspace_settings.name = 'Non-Color'
-                    except:
-                        pass  # Use default if Non-Color not available
-
-                links.new(mapping.outputs['Vector'], tex_node.inputs['Vector'])
-
-                # Connect to appropriate input on Principled BSDF
-                if map_type.lower() in ['color', 'diffuse', 'albedo']:
-                    links.new(tex_node.outputs['Color'], principled.inputs['Base Color'])
-                elif map_type.lower() in ['roughness', 'rough']:
-                    links.new(tex_node.outputs['Color'], principled.inputs['Roughness'])
-                elif map_type.lower() in ['metallic', 'metalness', 'metal']:
-                    links.new(tex_node.outputs['Color'], principled.inputs['Metallic'])
-                elif map_type.lower() in ['normal', 'nor', 'dx', 'gl']:
-                    # Add normal map node
-                    normal_map = nodes.new(type='ShaderNodeNormalMap')
-                    normal_map.location = (x_pos + 200, y_pos)
-                    links.new(tex_node.outputs['Color'], normal_map.inputs['Color'])
-                    links.new(normal_map.outputs['Normal'], principled.inputs['Normal'])
-                elif map_type.lower() in ['displacement', 'disp', 'height']:
-                    # Add displacement node
-                    disp_node = nodes.new(type='ShaderNodeDisplacement')
-                    disp_node.location = (x_pos + 200, y_pos - 200)
-                    disp_node.inputs['Scale'].default_value = 0.1  # Reduce displacement strength
-                    links.new(tex_node.outputs['Color'], disp_node.inputs['Height'])
-                    links.new(disp_node.outputs['Displacement'], output.inputs['Displacement'])
-
-                y_pos -= 250
-
-            # Second pass: Connect nodes with proper handling for special cases
-            texture_nodes = {}
-
-            # First find all texture nodes and store them by map type
-            for node in nodes:
-                if node.type == 'TEX_IMAGE' and node.image:
-                    for map_type, image in texture_images.items():
-                        if node.image == image:
-                            texture_nodes[map_type] = node
-                            break
-
-            # Now connect everything using the nodes instead of images
-            # Handle base color (diffuse)
-            for map_name in ['color', 'diffuse', 'albedo']:
-                if map_name in texture_nodes:
-                    links.new(texture_nodes[map_name].outputs['Color'], principled.inputs['Base Color'])
-                    print(f"Connected {map_name} to Base Color")
-                    break
-
-            # Handle roughness
-            for map_name in ['roughness', 'rough']:
-                if map_name in texture_nodes:
-                    links.new(texture_nodes[map_name].outputs['Color'], principled.inputs['Roughness'])
-                    print(f"Connected {map_name} to Roughness")
-                    break
-
-            # Handle metallic
-            for map_name in ['metallic', 'metalness', 'metal']:
-                if map_name in texture_nodes:
-                    links.new(texture_nodes[map_name].outputs['Color'], principled.inputs['Metallic'])
-                    print(f"Connected {map_name} to Metallic")
-                    break
-
-            # Handle normal maps
-            for map_name in ['gl', 'dx', 'nor']:
-                if map_name in texture_nodes:
-                    normal_map_node = nodes.new(type='ShaderNodeNormalMap')
-                    normal_map_node.location = (100, 100)
-                    links.new(texture_nodes[map_name].outputs['Color'], normal_map_node.inputs['Color'])
-                    links.new(normal_map_node.outputs['Normal'], principled.inputs['Normal'])
-                    print(f"Connected {map_name} to Normal")
-                    break
-
-            # Handle displacement
-            for map_name in ['displacement', 'disp', 'height']:
-                if map_name in texture_nodes:
-                    disp_node = nodes.new(type='ShaderNodeDisplacement')
-                    disp_node.location = (300, -200)
-                    disp_node.inputs['Scale'].default_value = 0.1  # Reduce displacement strength
-                    links.new(texture_nodes[map_name].outputs['Color'], disp_node.inputs['Height'])
-                    links.new(disp_node.outputs['Displacement'], output.inputs['Displacement'])
-                    print(f"Connected {map_name} to Displacement")
-                    break
-
-            # Handle ARM texture (Ambient Occlusion, Roughness, Metallic)
-            if 'arm' in texture_nodes:
-                separate_rgb = nodes.new(type='ShaderNodeSeparateRGB')
-                separate_rgb.location = (-200, -100)
-                links.new(texture_nodes['arm'].outputs['Color'], separate_rgb.inputs['Image'])
-
-                # Connect Roughness (G) if no dedicated roughness map
-                if not any(map_name in texture_nodes for map_name in ['roughness', 'rough']):
-                    links.new(separate_rgb.outputs['G'], principled.inputs['Roughness'])
-                    print("Connected ARM.G to Roughness")
-
-                # Connect Metallic (B) if no dedicated metallic map
-                if not any(map_name in texture_nodes for map_name in ['metallic', 'metalness', 'metal']):
-                    links.new(separate_rgb.outputs['B'], principled.inputs['Metallic'])
-                    print("Connected ARM.B to Metallic")
-
-                # For AO (R channel), multiply with base color if we have one
-                base_color_node = None
-                for map_name in ['color', 'diffuse', 'albedo']:
-                    if map_name in texture_nodes:
-                        base_color_node = texture_nodes[map_name]
-                        break
-
-                if base_color_node:
-                    mix_node = nodes.new(type='ShaderNodeMixRGB')
-                    mix_node.location = (100, 200)
-                    mix_node.blend_type = 'MULTIPLY'
-                    mix_node.inputs['Fac'].default_value = 0.8  # 80% influence
-
-                    # Disconnect direct connection to base color
-                    for link in base_color_node.outputs['Color'].links:
-                        if link.to_socket == principled.inputs['Base Color']:
-                            links.remove(link)
-
-                    # Connect through the mix node
-                    links.new(base_color_node.outputs['Color'], mix_node.inputs[1])
-                    links.new(separate_rgb.outputs['R'], mix_node.inputs[2])
-                    links.new(mix_node.outputs['Color'], principled.inputs['Base Color'])
-                    print("Connected ARM.R to AO mix with Base Color")
-
-            # Handle AO (Ambient Occlusion) if separate
-            if 'ao' in texture_nodes:
-                base_color_node = None
-                for map_name in ['color', 'diffuse', 'albedo']:
-                    if map_name in texture_nodes:
-                        base_color_node = texture_nodes[map_name]
-                        break
-
-                if base_color_node:
-                    mix_node = nodes.new(type='ShaderNodeMixRGB')
-                    mix_node.location = (100, 200)
-                    mix_node.blend_type = 'MULTIPLY'
-                    mix_node.inputs['Fac'].default_value = 0.8  # 80% influence
-
-                    # Disconnect direct connection to base color
-                    for link in base_color_node.outputs['Color'].links:
-                        if link.to_socket == principled.inputs['Base Color']:
-                            links.remove(link)
-
-                    # Connect through the mix node
-                    links.new(base_color_node.outputs['Color'], mix_node.inputs[1])
-                    links.new(texture_nodes['ao'].outputs['Color'], mix_node.inputs[2])
-                    links.new(mix_node.outputs['Color'], principled.inputs['Base Color'])
-                    print("Connected AO to mix with Base Color")
+            # Reuse the material already built from this exact set of images
+            registry = get_datablock_registry()
+            material_key = registry.make_key(
+                "set_texture", texture_id,
+                {map_type: registry.image_key(image) for map_type, image in texture_images.items()},
+            )
+            new_mat = registry.get_material(material_key)
+            reused = new_mat is not None
+            if new_mat is None:
+                new_mat = self._build_texture_material(f"{texture_id}_material", texture_images)
+                registry.register_material(new_mat, material_key)
 
             # CRITICAL: Make sure to clear all existing materials from the object
             while len(obj.data.materials) > 0:
@@ -1118,10 +4969,13 @@ class BlenderMCPServer:
 
             return {
                 "success": True,
-                "message": f"Created new material and applied texture {texture_id} to {object_name}",
+                "message": (
+                    f"{'Reused' if reused else 'Created new'} material and applied texture {texture_id} to {object_name}"
+                ),
                 "material": new_mat.name,
                 "maps": texture_maps,
-                "material_info": material_info
+                "material_info": material_info,
+                "reused": reused,
             }
 
         except Exception as e:
@@ -1143,6 +4997,47 @@ class BlenderMCPServer:
                             3. Restart the connection to Claude"""
         }
 
+    def get_disk_usage(self, reclaim=False):
+        """Scratch space and texture cache disk usage, optionally reclaiming/evicting first"""
+        scratch = get_scratch_space()
+        registry = get_datablock_registry()
+        return {
+            "scratch": scratch.reclaim() if reclaim else scratch.usage(),
+            "texture_cache": registry.evict() if reclaim else registry.stats(),
+        }
+
+    def set_profiling(self, enabled=True, top=None):
+        """Profile every command from now on (or stop doing so)"""
+        self.profiling["enabled"] = bool(enabled)
+        if top:
+            self.profiling["top"] = int(top)
+        return dict(self.profiling)
+
+    def get_task_status(self):
+        """Time-sliced handlers currently in flight"""
+        return get_task_scheduler().snapshot()
+
+    @staticmethod
+    def _answer_on_socket_thread(handler, command):
+        """Run a command that is answered without the main thread; bad params become an error response"""
+        params = command.get("params") or {}
+        if not isinstance(params, dict):
+            return {"status": "error", "message": "params must be an object"}
+        try:
+            return handler(**params)
+        except (TypeError, ValueError) as e:
+            return {"status": "error", "message": f"Invalid parameters for {command.get('type')}: {e}"}
+
+    def cancel(self, request_id):
+        """Cancel a queued or running command by the request_id it was sent with"""
+        return {"request_id": request_id, "cancelled": cancel_command(request_id)}
+
+    def get_provider_stats(self):
+        """Rate limiter state and queueing times of every provider used so far"""
+        with _provider_limiters_lock:
+            limiters = dict(_provider_limiters)
+        return {name: limiter.snapshot() for name, limiter in limiters.items()}
+
     #region Hyper3D
     def get_hyper3d_status(self):
         """Get the current status of Hyper3D Rodin integration"""
@@ -1201,8 +5096,8 @@ class BlenderMCPServer:
                 files.append(("prompt", (None, text_prompt)))
             if bbox_condition:
                 files.append(("bbox_condition", (None, json.dumps(bbox_condition))))
-            response = requests.post(
-                "https://hyperhuman.deemos.com/api/v2/rodin",
+            response = yield run_in_background(provider_request, "hyper3d", "POST",
+                provider_url("hyper3d", "/rodin"),
                 headers={
                     "Authorization": f"Bearer {bpy.context.scene.blendermcp_hyper3d_api_key}",
                 },
@@ -1229,8 +5124,8 @@ class BlenderMCPServer:
                 req_data["prompt"] = text_prompt
             if bbox_condition:
                 req_data["bbox_condition"] = bbox_condition
-            response = requests.post(
-                "https://queue.fal.run/fal-ai/hyper3d/rodin",
+            response = yield run_in_background(provider_request, "fal", "POST",
+                provider_url("fal", "/rodin"),
                 headers={
                     "Authorization": f"Key {bpy.context.scene.blendermcp_hyper3d_api_key}",
                     "Content-Type": "application/json",
@@ -1252,9 +5147,9 @@ class BlenderMCPServer:
                 return f"Error: Unknown Hyper3D Rodin mode!"
 
     def poll_rodin_job_status_main_site(self, subscription_key: str):
-        """Call the job status API to get the job status"""
-        response = requests.post(
-            "https://hyperhuman.deemos.com/api/v2/status",
+        """Call the job status API to get the job status (time-sliced)"""
+        response = yield run_in_background(provider_request, "hyper3d", "POST",
+            provider_url("hyper3d", "/status"),
             headers={
                 "Authorization": f"Bearer {bpy.context.scene.blendermcp_hyper3d_api_key}",
             },
@@ -1268,9 +5163,9 @@ class BlenderMCPServer:
         }
 
     def poll_rodin_job_status_fal_ai(self, request_id: str):
-        """Call the job status API to get the job status"""
-        response = requests.get(
-            f"https://queue.fal.run/fal-ai/hyper3d/requests/{request_id}/status",
+        """Call the job status API to get the job status (time-sliced)"""
+        response = yield run_in_background(provider_request, "fal", "GET",
+            provider_url("fal", f"/requests/{request_id}/status"),
             headers={
                 "Authorization": f"KEY {bpy.context.scene.blendermcp_hyper3d_api_key}",
             },
@@ -1278,6 +5173,29 @@ class BlenderMCPServer:
         data = response.json()
         return data
 
+    @staticmethod
+    def _download_to_scratch(url, provider, prefix="", suffix=""):
+        """Stream url into a new scratch file and return its path.
+
+        Time-sliced, use with yield from: the download runs off the main thread.
+        """
+        def download():
+            response = provider_request(provider, "GET", url, stream=True, timeout=DOWNLOAD_TIMEOUT)
+            response.raise_for_status()  # Raise an exception for HTTP errors
+            with open(path, "wb") as f:
+                for chunk in token.iter_checked(response.iter_content(chunk_size=65536)):
+                    f.write(chunk)
+
+        token = current_cancel_token()
+        scratch = get_scratch_space()
+        path = scratch.make_file(suffix=suffix, prefix=prefix)
+        try:
+            yield run_in_background(download)
+        except Exception:
+            scratch.release(path)
+            raise
+        return path
+
     @staticmethod
     def _clean_imported_glb(filepath, mesh_name=None):
         # Get the set of existing objects before import
@@ -1354,10 +5272,10 @@ class BlenderMCPServer:
             case _:
                 return f"Error: Unknown Hyper3D Rodin mode!"
 
-    def import_generated_asset_main_site(self, task_uuid: str, name: str):
-        """Fetch the generated asset, import into blender"""
-        response = requests.post(
-            "https://hyperhuman.deemos.com/api/v2/download",
+    def import_generated_asset_main_site(self, task_uuid: str, name: str, max_triangles: int = None):
+        """Fetch the generated asset, import into blender (time-sliced)"""
+        response = yield run_in_background(provider_request, "hyper3d", "POST",
+            provider_url("hyper3d", "/download"),
             headers={
                 "Authorization": f"Bearer {bpy.context.scene.blendermcp_hyper3d_api_key}",
             },
@@ -1369,28 +5287,9 @@ class BlenderMCPServer:
         temp_file = None
         for i in data_["list"]:
             if i["name"].endswith(".glb"):
-                temp_file = tempfile.NamedTemporaryFile(
-                    delete=False,
-                    prefix=task_uuid,
-                    suffix=".glb",
-                )
-
                 try:
-                    # Download the content
-                    response = requests.get(i["url"], stream=True)
-                    response.raise_for_status()  # Raise an exception for HTTP errors
-
-                    # Write the content to the temporary file
-                    for chunk in response.iter_content(chunk_size=8192):
-                        temp_file.write(chunk)
-
-                    # Close the file
-                    temp_file.close()
-
+                    temp_file = yield from self._download_to_scratch(i["url"], "hyper3d", prefix=task_uuid, suffix=".glb")
                 except Exception as e:
-                    # Clean up the file if there's an error
-                    temp_file.close()
-                    os.unlink(temp_file.name)
                     return {"succeed": False, "error": str(e)}
 
                 break
@@ -1399,7 +5298,7 @@ class BlenderMCPServer:
 
         try:
             obj = self._clean_imported_glb(
-                filepath=temp_file.name,
+                filepath=temp_file,
                 mesh_name=name
             )
             result = {
@@ -1414,50 +5313,36 @@ class BlenderMCPServer:
                 bounding_box = self._get_aabb(obj)
                 result["world_bounding_box"] = bounding_box
 
+            if max_triangles:
+                yield
+                result["lod"] = decimate_to_budget([obj], max_triangles)
+
             return {
                 "succeed": True, **result
             }
         except Exception as e:
             return {"succeed": False, "error": str(e)}
+        finally:
+            get_scratch_space().release(temp_file)
 
-    def import_generated_asset_fal_ai(self, request_id: str, name: str):
-        """Fetch the generated asset, import into blender"""
-        response = requests.get(
-            f"https://queue.fal.run/fal-ai/hyper3d/requests/{request_id}",
+    def import_generated_asset_fal_ai(self, request_id: str, name: str, max_triangles: int = None):
+        """Fetch the generated asset, import into blender (time-sliced)"""
+        response = yield run_in_background(provider_request, "fal", "GET",
+            provider_url("fal", f"/requests/{request_id}"),
             headers={
                 "Authorization": f"Key {bpy.context.scene.blendermcp_hyper3d_api_key}",
             }
         )
         data_ = response.json()
-        temp_file = None
-
-        temp_file = tempfile.NamedTemporaryFile(
-            delete=False,
-            prefix=request_id,
-            suffix=".glb",
-        )
 
         try:
-            # Download the content
-            response = requests.get(data_["model_mesh"]["url"], stream=True)
-            response.raise_for_status()  # Raise an exception for HTTP errors
-
-            # Write the content to the temporary file
-            for chunk in response.iter_content(chunk_size=8192):
-                temp_file.write(chunk)
-
-            # Close the file
-            temp_file.close()
-
+            temp_file = yield from self._download_to_scratch(data_["model_mesh"]["url"], "fal", prefix=request_id, suffix=".glb")
         except Exception as e:
-            # Clean up the file if there's an error
-            temp_file.close()
-            os.unlink(temp_file.name)
             return {"succeed": False, "error": str(e)}
 
         try:
             obj = self._clean_imported_glb(
-                filepath=temp_file.name,
+                filepath=temp_file,
                 mesh_name=name
             )
             result = {
@@ -1472,16 +5357,22 @@ class BlenderMCPServer:
                 bounding_box = self._get_aabb(obj)
                 result["world_bounding_box"] = bounding_box
 
+            if max_triangles:
+                yield
+                result["lod"] = decimate_to_budget([obj], max_triangles)
+
             return {
                 "succeed": True, **result
             }
         except Exception as e:
             return {"succeed": False, "error": str(e)}
+        finally:
+            get_scratch_space().release(temp_file)
     #endregion
  
     #region Sketchfab API
     def get_sketchfab_status(self):
-        """Get the current status of Sketchfab integration"""
+        """Get the current status of Sketchfab integration (time-sliced: the API key is checked off the main thread)"""
         enabled = bpy.context.scene.blendermcp_use_sketchfab
         api_key = bpy.context.scene.blendermcp_sketchfab_api_key
 
@@ -1492,8 +5383,8 @@ class BlenderMCPServer:
                     "Authorization": f"Token {api_key}"
                 }
 
-                response = requests.get(
-                    "https://api.sketchfab.com/v3/me",
+                response = yield run_in_background(provider_request, "sketchfab", "GET",
+                    provider_url("sketchfab", "/me"),
                     headers=headers,
                     timeout=30  # Add timeout of 30 seconds
                 )
@@ -1542,13 +5433,33 @@ class BlenderMCPServer:
                             4. Restart the connection to Claude"""
             }
 
-    def search_sketchfab_models(self, query, categories=None, count=20, downloadable=True):
-        """Search for models on Sketchfab based on query and optional filters"""
+    def search_sketchfab_models(self, query, categories=None, count=20, downloadable=True, prefetch_previews=0):
+        """Search for models on Sketchfab based on query and optional filters
+
+        Responses are cached for a few minutes per normalized query. With
+        prefetch_previews > 0 the thumbnails of the top results are
+        downloaded in the background so previews return without latency.
+        Time-sliced: the API call runs off the main thread.
+        """
         try:
             api_key = bpy.context.scene.blendermcp_sketchfab_api_key
             if not api_key:
                 return {"error": "Sketchfab API key is not configured"}
 
+            preview_cache = get_sketchfab_preview_cache()
+            cache_key = (
+                hashlib.sha256(api_key.encode("utf-8")).hexdigest(),
+                " ".join(query.lower().split()),
+                ",".join(sorted(c.strip().lower() for c in categories.split(",") if c.strip())) if categories else "",
+                int(count),
+                bool(downloadable),
+            )
+            cached = _sketchfab_search_cache.get(cache_key)
+            if cached is not None:
+                if prefetch_previews:
+                    preview_cache.prefetch(cached.get("results", []), count=prefetch_previews)
+                return {**cached, "cached": True}
+
             # Build search parameters with exact fields from Sketchfab API docs
             params = {
                 "type": "models",
@@ -1569,8 +5480,8 @@ class BlenderMCPServer:
 
 
             # Use the search endpoint as specified in the API documentation
-            response = requests.get(
-                "https://api.sketchfab.com/v3/search",
+            response = yield run_in_background(provider_request, "sketchfab", "GET",
+                provider_url("sketchfab", "/search"),
                 headers=headers,
                 params=params,
                 timeout=30  # Add timeout of 30 seconds
@@ -1593,7 +5504,13 @@ class BlenderMCPServer:
             if not isinstance(results, list):
                 return {"error": f"Unexpected response format from Sketchfab API: {response_data}"}
 
-            return response_data
+            _sketchfab_search_cache.set(cache_key, response_data)
+            for model in results:
+                preview_cache.remember_model(model)
+            if prefetch_previews:
+                preview_cache.prefetch(results, count=prefetch_previews)
+
+            return {**response_data, "cached": False}
 
         except requests.exceptions.Timeout:
             return {"error": "Request timed out. Check your internet connection."}
@@ -1604,85 +5521,69 @@ class BlenderMCPServer:
             traceback.print_exc()
             return {"error": str(e)}
 
-    def get_sketchfab_model_preview(self, uid):
-        """Get thumbnail preview image of a Sketchfab model by its UID"""
+    def get_sketchfab_model_preview(self, uid, size=640):
+        """Get thumbnail preview image of a Sketchfab model by its UID
+
+        Model info seen in earlier searches and downloaded thumbnails are
+        cached, so repeated previews do not touch the network. Time-sliced:
+        the API call and the thumbnail download run off the main thread.
+        """
         try:
-            import base64
-            
+            if not is_sketchfab_uid(uid):
+                return {"error": f"Invalid Sketchfab model UID: {uid}"}
+
             api_key = bpy.context.scene.blendermcp_sketchfab_api_key
             if not api_key:
                 return {"error": "Sketchfab API key is not configured"}
 
-            headers = {"Authorization": f"Token {api_key}"}
-            
-            # Get model info which includes thumbnails
-            response = requests.get(
-                f"https://api.sketchfab.com/v3/models/{uid}",
-                headers=headers,
-                timeout=30
-            )
-            
-            if response.status_code == 401:
-                return {"error": "Authentication failed (401). Check your API key."}
-            
-            if response.status_code == 404:
-                return {"error": f"Model not found: {uid}"}
-            
-            if response.status_code != 200:
-                return {"error": f"Failed to get model info: {response.status_code}"}
-            
-            data = response.json()
-            thumbnails = data.get("thumbnails", {}).get("images", [])
-            
+            preview_cache = get_sketchfab_preview_cache()
+            model = preview_cache.get_model(uid)
+
+            if model is None:
+                headers = {"Authorization": f"Token {api_key}"}
+
+                # Get model info which includes thumbnails
+                response = yield run_in_background(provider_request, "sketchfab", "GET",
+                    provider_url("sketchfab", f"/models/{uid}"),
+                    headers=headers,
+                    timeout=30
+                )
+
+                if response.status_code == 401:
+                    return {"error": "Authentication failed (401). Check your API key."}
+
+                if response.status_code == 404:
+                    return {"error": f"Model not found: {uid}"}
+
+                if response.status_code != 200:
+                    return {"error": f"Failed to get model info: {response.status_code}"}
+
+                preview_cache.remember_model({**response.json(), "uid": uid})
+                model = preview_cache.get_model(uid)
+
+            thumbnails = model["thumbnails"]
             if not thumbnails:
                 return {"error": "No thumbnail available for this model"}
-            
+
             # Find a suitable thumbnail (prefer medium size ~640px)
-            selected_thumbnail = None
-            for thumb in thumbnails:
-                width = thumb.get("width", 0)
-                if 400 <= width <= 800:
-                    selected_thumbnail = thumb
-                    break
-            
-            # Fallback to the first available thumbnail
+            selected_thumbnail = preview_cache.select_thumbnail(thumbnails, size)
             if not selected_thumbnail:
-                selected_thumbnail = thumbnails[0]
-            
-            thumbnail_url = selected_thumbnail.get("url")
-            if not thumbnail_url:
                 return {"error": "Thumbnail URL not found"}
-            
-            # Download the thumbnail image
-            img_response = requests.get(thumbnail_url, timeout=30)
-            if img_response.status_code != 200:
-                return {"error": f"Failed to download thumbnail: {img_response.status_code}"}
-            
-            # Encode image as base64
-            image_data = base64.b64encode(img_response.content).decode('ascii')
-            
-            # Determine format from content type or URL
-            content_type = img_response.headers.get("Content-Type", "")
-            if "png" in content_type or thumbnail_url.endswith(".png"):
-                img_format = "png"
-            else:
-                img_format = "jpeg"
-            
-            # Get additional model info for context
-            model_name = data.get("name", "Unknown")
-            author = data.get("user", {}).get("username", "Unknown")
-            
+
+            image_bytes, img_format, cached = yield run_in_background(preview_cache.get_thumbnail, uid, selected_thumbnail)
+
             return {
                 "success": True,
-                "image_data": image_data,
+                "image_data": base64.b64encode(image_bytes).decode('ascii'),
                 "format": img_format,
-                "model_name": model_name,
-                "author": author,
+                "model_name": model["name"],
+                "author": model["author"],
                 "uid": uid,
                 "thumbnail_width": selected_thumbnail.get("width"),
-                "thumbnail_height": selected_thumbnail.get("height")
+                "thumbnail_height": selected_thumbnail.get("height"),
+                "cached": cached
             }
-            
+
         except requests.exceptions.Timeout:
             return {"error": "Request timed out. Check your internet connection."}
         except Exception as e:
@@ -1690,13 +5591,16 @@ class BlenderMCPServer:
             traceback.print_exc()
             return {"error": f"Failed to get model preview: {str(e)}"}
 
-    def download_sketchfab_model(self, uid, normalize_size=False, target_size=1.0):
+    def download_sketchfab_model(self, uid, normalize_size=False, target_size=1.0, max_triangles=None):
         """Download a model from Sketchfab by its UID
         
         Parameters:
         - uid: The unique identifier of the Sketchfab model
         - normalize_size: If True, scale the model so its largest dimension equals target_size
         - target_size: The target size in Blender units (meters) for the largest dimension
+        - max_triangles: If set, decimate the imported meshes to fit this triangle budget
+
+        Time-sliced: the API call and the archive download run off the main thread.
         """
         try:
             api_key = bpy.context.scene.blendermcp_sketchfab_api_key
@@ -1709,9 +5613,9 @@ class BlenderMCPServer:
             }
 
             # Request download URL using the exact endpoint from the documentation
-            download_endpoint = f"https://api.sketchfab.com/v3/models/{uid}/download"
+            download_endpoint = provider_url("sketchfab", f"/models/{uid}/download")
 
-            response = requests.get(
+            response = yield run_in_background(provider_request, "sketchfab", "GET",
                 download_endpoint,
                 headers=headers,
                 timeout=30  # Add timeout of 30 seconds
@@ -1738,118 +5642,75 @@ class BlenderMCPServer:
             if not download_url:
                 return {"error": "No download URL available for this model. Make sure the model is downloadable and you have access."}
 
-            # Download the model (already has timeout)
-            model_response = requests.get(download_url, timeout=60)  # 60 second timeout
-
-            if model_response.status_code != 200:
-                return {"error": f"Model download failed with status code {model_response.status_code}"}
-
-            # Save to temporary file
-            temp_dir = tempfile.mkdtemp()
-            zip_file_path = os.path.join(temp_dir, f"{uid}.zip")
-
-            with open(zip_file_path, "wb") as f:
-                f.write(model_response.content)
-
-            # Extract the zip file with enhanced security
-            with zipfile.ZipFile(zip_file_path, 'r') as zip_ref:
-                # More secure zip slip prevention
-                for file_info in zip_ref.infolist():
-                    # Get the path of the file
-                    file_path = file_info.filename
-
-                    # Convert directory separators to the current OS style
-                    # This handles both / and \ in zip entries
-                    target_path = os.path.join(temp_dir, os.path.normpath(file_path))
-
-                    # Get absolute paths for comparison
-                    abs_temp_dir = os.path.abspath(temp_dir)
-                    abs_target_path = os.path.abspath(target_path)
-
-                    # Ensure the normalized path doesn't escape the target directory
-                    if not abs_target_path.startswith(abs_temp_dir):
-                        with suppress(Exception):
-                            shutil.rmtree(temp_dir)
-                        return {"error": "Security issue: Zip contains files with path traversal attempt"}
-
-                    # Additional explicit check for directory traversal
-                    if ".." in file_path:
-                        with suppress(Exception):
-                            shutil.rmtree(temp_dir)
-                        return {"error": "Security issue: Zip contains files with directory traversal sequence"}
-
-                # If all files passed security checks, extract them
-                zip_ref.extractall(temp_dir)
-
-            # Find the main glTF file
-            gltf_files = [f for f in os.listdir(temp_dir) if f.endswith('.gltf') or f.endswith('.glb')]
+            def fetch_archive():
+                # Stream the archive straight into the extraction directory (already has timeout)
+                model_response = provider_request("sketchfab", "GET", download_url, timeout=60, stream=True)  # 60 second timeout
+                if model_response.status_code != 200:
+                    return model_response.status_code, None
+                return 200, extract_model_archive(token.iter_checked(model_response.iter_content(chunk_size=65536)), temp_dir)
 
-            if not gltf_files:
-                with suppress(Exception):
-                    shutil.rmtree(temp_dir)
+            token = current_cancel_token()
+            scratch = get_scratch_space()
+            temp_dir = scratch.make_dir(prefix=f"sketchfab_{uid}_")
+            try:
+                status_code, extracted = yield run_in_background(fetch_archive)
+            except Exception:
+                scratch.release(temp_dir)
+                raise
+
+            if status_code != 200:
+                scratch.release(temp_dir)
+                return {"error": f"Model download failed with status code {status_code}"}
+
+            main_file = extracted["main_file"]
+            if main_file.endswith(".obj"):
+                scratch.release(temp_dir)
                 return {"error": "No glTF file found in the downloaded model"}
 
-            main_file = os.path.join(temp_dir, gltf_files[0])
-
             # Import the model
-            bpy.ops.import_scene.gltf(filepath=main_file)
+            try:
+                bpy.ops.import_scene.gltf(filepath=main_file)
+            finally:
+                # Release the download, textures still used by imported images are kept
+                scratch.release(temp_dir)
 
             # Get the imported objects
             imported_objects = list(bpy.context.selected_objects)
             imported_object_names = [obj.name for obj in imported_objects]
 
-            # Clean up temporary files
-            with suppress(Exception):
-                shutil.rmtree(temp_dir)
-
             # Find root objects (objects without parents in the imported set)
             root_objects = [obj for obj in imported_objects if obj.parent is None]
 
-            # Helper function to recursively get all mesh children
-            def get_all_mesh_children(obj):
-                """Recursively collect all mesh objects in the hierarchy"""
-                meshes = []
-                if obj.type == 'MESH':
-                    meshes.append(obj)
-                for child in obj.children:
-                    meshes.extend(get_all_mesh_children(child))
-                return meshes
-
             # Collect ALL meshes from the entire hierarchy (starting from roots)
-            all_meshes = []
-            for obj in root_objects:
-                all_meshes.extend(get_all_mesh_children(obj))
-            
+            all_meshes = collect_hierarchy_meshes(root_objects)
+
+            # Optionally reduce heavy models to the requested triangle budget,
+            # in its own slice since decimating a big import takes a while
+            lod_report = None
+            if max_triangles:
+                yield
+                lod_report = decimate_to_budget(all_meshes, max_triangles)
+
             if all_meshes:
-                # Calculate combined world bounding box for all meshes
-                all_min = mathutils.Vector((float('inf'), float('inf'), float('inf')))
-                all_max = mathutils.Vector((float('-inf'), float('-inf'), float('-inf')))
-                
-                for mesh_obj in all_meshes:
-                    # Get world-space bounding box corners
-                    for corner in mesh_obj.bound_box:
-                        world_corner = mesh_obj.matrix_world @ mathutils.Vector(corner)
-                        all_min.x = min(all_min.x, world_corner.x)
-                        all_min.y = min(all_min.y, world_corner.y)
-                        all_min.z = min(all_min.z, world_corner.z)
-                        all_max.x = max(all_max.x, world_corner.x)
-                        all_max.y = max(all_max.y, world_corner.y)
-                        all_max.z = max(all_max.z, world_corner.z)
-                
-                # Calculate dimensions
-                dimensions = [
-                    all_max.x - all_min.x,
-                    all_max.y - all_min.y,
-                    all_max.z - all_min.z
-                ]
+                # Combined world bounding box for all meshes, in one batched pass
+                corners = world_bbox_corners(all_meshes)
+                world_bounding_box = aabb_from_corners(corners)
+                dimensions = [hi - lo for lo, hi in zip(*world_bounding_box)]
                 max_dimension = max(dimensions)
-                
+
                 # Apply normalization if requested
                 scale_applied = 1.0
                 if normalize_size and max_dimension > 0:
                     scale_factor = target_size / max_dimension
                     scale_applied = scale_factor
-                    
+
+                    # Remember which root each mesh hangs from before scaling
+                    root_of = {}
+                    for root in root_objects:
+                        for mesh_obj in collect_hierarchy_meshes([root]):
+                            root_of[mesh_obj] = root
+                    origins = np.array([root_of[mesh_obj].matrix_world.translation for mesh_obj in all_meshes])
+
                     # ✅ Only apply scale to ROOT objects (not children!)
                     # Child objects inherit parent's scale through matrix_world
                     for root in root_objects:
@@ -1858,31 +5719,16 @@ class BlenderMCPServer:
                             root.scale.y * scale_factor,
                             root.scale.z * scale_factor
                         )
-                    
+
                     # Update the scene to recalculate matrix_world for all objects
                     bpy.context.view_layer.update()
-                    
-                    # Recalculate bounding box after scaling
-                    all_min = mathutils.Vector((float('inf'), float('inf'), float('inf')))
-                    all_max = mathutils.Vector((float('-inf'), float('-inf'), float('-inf')))
-                    
-                    for mesh_obj in all_meshes:
-                        for corner in mesh_obj.bound_box:
-                            world_corner = mesh_obj.matrix_world @ mathutils.Vector(corner)
-                            all_min.x = min(all_min.x, world_corner.x)
-                            all_min.y = min(all_min.y, world_corner.y)
-                            all_min.z = min(all_min.z, world_corner.z)
-                            all_max.x = max(all_max.x, world_corner.x)
-                            all_max.y = max(all_max.y, world_corner.y)
-                            all_max.z = max(all_max.z, world_corner.z)
-                    
-                    dimensions = [
-                        all_max.x - all_min.x,
-                        all_max.y - all_min.y,
-                        all_max.z - all_min.z
-                    ]
-                
-                world_bounding_box = [[all_min.x, all_min.y, all_min.z], [all_max.x, all_max.y, all_max.z]]
+
+                    # Scaling a parentless root scales its whole subtree about the
+                    # root's origin, so the new corners follow without a second pass
+                    origins = origins[:, None, :]
+                    corners = origins + (corners - origins) * scale_factor
+                    world_bounding_box = aabb_from_corners(corners)
+                    dimensions = [hi - lo for lo, hi in zip(*world_bounding_box)]
             else:
                 world_bounding_box = None
                 dimensions = None
@@ -1901,6 +5747,8 @@ class BlenderMCPServer:
             if normalize_size:
                 result["scale_applied"] = round(scale_applied, 6)
                 result["normalized"] = True
+            if lod_report:
+                result["lod"] = lod_report
             
             return result
 
@@ -1982,7 +5830,8 @@ class BlenderMCPServer:
         if not host:
             host = f"{service}.tencentcloudapi.com"
         
-        endpoint = f"https://{host}"
+        # The request is always signed for the real host, the endpoint may be a stand-in
+        endpoint = provider_url("hunyuan") or f"https://{host}"
         
         # Constructing the request body
         payload_str = json.dumps(data)
@@ -2107,7 +5956,7 @@ class BlenderMCPServer:
             # Get signed headers
             headers, endpoint = self.get_tencent_cloud_sign_headers("POST", "/", headParams, data, service, region, secret_id, secret_key)
 
-            response = requests.post(
+            response = yield run_in_background(provider_request, "hunyuan", "POST",
                 endpoint,
                 headers = headers,
                 data = json.dumps(data)
@@ -2154,7 +6003,7 @@ class BlenderMCPServer:
             if image:
                 if re.match(r'^https?://', image, re.IGNORECASE) is not None:
                     try:
-                        resImg = requests.get(image)
+                        resImg = yield run_in_background(requests.get, image)
                         resImg.raise_for_status()
                         image_base64 = base64.b64encode(resImg.content).decode("ascii")
                         data["image"] = image_base64
@@ -2169,7 +6018,9 @@ class BlenderMCPServer:
                     except Exception as e:
                         return {"error": f"Image encoding failed: {str(e)}"}
 
-            response = requests.post(
+            # Generation takes a while, keep Blender responsive meanwhile
+            response = yield run_in_background(
+                requests.post,
                 f"{base_url}/generate",
                 json = data,
             )
@@ -2179,18 +6030,17 @@ class BlenderMCPServer:
                     "error": f"Generation failed: {response.text}"
                 }
         
-            # Decode base64 and save to temporary file
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".glb") as temp_file:
+            # Decode base64 and save to a scratch file
+            scratch = get_scratch_space()
+            temp_file_name = scratch.make_file(suffix=".glb", prefix="hunyuan_")
+            with open(temp_file_name, "wb") as temp_file:
                 temp_file.write(response.content)
-                temp_file_name = temp_file.name
 
-            # Import the GLB file in the main thread
-            def import_handler():
+            # Import the GLB file, the task is resumed on the main thread
+            try:
                 bpy.ops.import_scene.gltf(filepath=temp_file_name)
-                os.unlink(temp_file.name)
-                return None
-            
-            bpy.app.timers.register(import_handler)
+            finally:
+                scratch.release(temp_file_name)
 
             return {
                 "status": "DONE",
@@ -2205,7 +6055,7 @@ class BlenderMCPServer:
         return self.poll_hunyuan_job_status_ai(*args, **kwargs)
     
     def poll_hunyuan_job_status_ai(self, job_id: str):
-        """Call the job status API to get the job status"""
+        """Call the job status API to get the job status (time-sliced)"""
         print(job_id)
         try:
             secret_id = bpy.context.scene.blendermcp_hunyuan3d_secret_id
@@ -2234,7 +6084,7 @@ class BlenderMCPServer:
 
             headers, endpoint = self.get_tencent_cloud_sign_headers("POST", "/", headParams, data, service, region, secret_id, secret_key)
 
-            response = requests.post(
+            response = yield run_in_background(provider_request, "hunyuan", "POST",
                 endpoint,
                 headers=headers,
                 data=json.dumps(data)
@@ -2251,7 +6101,7 @@ class BlenderMCPServer:
     def import_generated_asset_hunyuan(self, *args, **kwargs):
         return self.import_generated_asset_hunyuan_ai(*args, **kwargs)
             
-    def import_generated_asset_hunyuan_ai(self, name: str , zip_file_url: str):
+    def import_generated_asset_hunyuan_ai(self, name: str , zip_file_url: str, max_triangles: int = None):
         if not zip_file_url:
             return {"error": "Zip file not found"}
         
@@ -2259,30 +6109,22 @@ class BlenderMCPServer:
         if not re.match(r'^https?://', zip_file_url, re.IGNORECASE):
             return {"error": "Invalid URL format. Must start with http:// or https://"}
         
-        # Create a temporary directory
-        temp_dir = tempfile.mkdtemp(prefix="tencent_obj_")
-        zip_file_path = osp.join(temp_dir, "model.zip")
-        obj_file_path = osp.join(temp_dir, "model.obj")
-        mtl_file_path = osp.join(temp_dir, "model.mtl")
-
-        try:
-            # Download ZIP file
-            zip_response = requests.get(zip_file_url, stream=True)
+        # Create a scratch directory
+        token = current_cancel_token()
+        scratch = get_scratch_space()
+        temp_dir = scratch.make_dir(prefix="tencent_obj_")
+
+        def fetch_archive():
+            # Stream and validate the ZIP, extracting only the model and what it references
+            zip_response = provider_request("hunyuan", "GET", zip_file_url, stream=True, timeout=DOWNLOAD_TIMEOUT)
             zip_response.raise_for_status()
-            with open(zip_file_path, "wb") as f:
-                for chunk in zip_response.iter_content(chunk_size=8192):
-                    f.write(chunk)
+            return extract_model_archive(token.iter_checked(zip_response.iter_content(chunk_size=65536)), temp_dir)
 
-            # Unzip the ZIP
-            with zipfile.ZipFile(zip_file_path, "r") as zip_ref:
-                zip_ref.extractall(temp_dir)
-
-            # Find the .obj file (there may be multiple, assuming the main file is model.obj)
-            for file in os.listdir(temp_dir):
-                if file.endswith(".obj"):
-                    obj_file_path = osp.join(temp_dir, file)
+        try:
+            extracted = yield run_in_background(fetch_archive)
 
-            if not osp.exists(obj_file_path):
+            obj_file_path = extracted["main_file"]
+            if not obj_file_path.endswith(".obj"):
                 return {"succeed": False, "error": "OBJ file not found after extraction"}
 
             # Import obj file
@@ -2307,22 +6149,21 @@ class BlenderMCPServer:
                 "scale": [obj.scale.x, obj.scale.y, obj.scale.z],
             }
 
-            if obj.type == "MESH":
-                bounding_box = self._get_aabb(obj)
+            # OBJ files may split into several mesh objects; report their combined bounds
+            bounding_box = world_aabb(imported_objs)
+            if bounding_box:
                 result["world_bounding_box"] = bounding_box
 
+            if max_triangles:
+                yield
+                result["lod"] = decimate_to_budget(imported_objs, max_triangles)
+
             return {"succeed": True, **result}
         except Exception as e:
             return {"succeed": False, "error": str(e)}
         finally:
-            #  Clean up temporary zip and obj, save texture and mtl
-            try:
-                if os.path.exists(zip_file_path):
-                    os.remove(zip_file_path) 
-                if os.path.exists(obj_file_path):
-                    os.remove(obj_file_path)
-            except Exception as e:
-                print(f"Failed to clean up temporary directory {temp_dir}: {e}")
+            # Release the extraction, textures still used by imported images are kept
+            scratch.release(temp_dir)
     #endregion
 
 # Blender UI Panel
@@ -2556,6 +6397,8 @@ def register():
                 server.start()
                 bpy.context.scene.blendermcp_server_running = True
                 print(f"[BlenderMCP] Auto-started server on localhost:{port}")
+            if bpy.context.scene.blendermcp_use_polyhaven:
+                get_polyhaven_catalog().refresh_async()
         except Exception as e:
             print(f"[BlenderMCP] Error auto-starting server: {e}")
         return None
@@ -2563,12 +6406,28 @@ def register():
     # Schedule auto-start for next frame
     bpy.app.timers.register(auto_start_server)
 
+    # Periodically reclaim scratch files nothing uses anymore
+    bpy.app.timers.register(_reclaim_scratch_space, first_interval=SCRATCH_RECLAIM_INTERVAL, persistent=True)
+
+    # Lets caches tell whether the scene changed since they were filled
+    register_scene_change_handlers()
+
 def unregister():
     # Stop the server if it's running
     if hasattr(bpy.types, "blendermcp_server") and bpy.types.blendermcp_server:
         bpy.types.blendermcp_server.stop()
         del bpy.types.blendermcp_server
 
+    if bpy.app.timers.is_registered(_reclaim_scratch_space):
+        bpy.app.timers.unregister(_reclaim_scratch_space)
+    if _task_scheduler is not None:
+        _task_scheduler.stop()
+    unregister_scene_change_handlers()
+    if _viewport_producer is not None:
+        _viewport_producer.stop()
+    if _scene_delta_tracker is not None:
+        _scene_delta_tracker.stop()
+
     bpy.utils.unregister_class(BLENDERMCP_PT_Panel)
     bpy.utils.unregister_class(BLENDERMCP_OT_SetFreeTrialHyper3DAPIKey)
     bpy.utils.unregister_class(BLENDERMCP_OT_StartServer)
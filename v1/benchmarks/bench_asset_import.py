@@ -0,0 +1,198 @@
+"""
+Benchmark: end-to-end asset import throughput and tail latency.
+
+Runs the addon's provider handlers (Sketchfab, Poly Haven, Hyper3D Rodin,
+Hunyuan3D) against the local fake provider server, so results only depend
+on the configured latency/bandwidth and on the addon itself. Each iteration
+goes through BlenderMCPServer.execute_command, the same entry point the
+socket server uses, and removes what it imported afterwards.
+
+Run inside Blender:
+    blender -b --factory-startup --python v1/benchmarks/bench_asset_import.py -- \
+        --iterations 20 --latency 0.05 --bandwidth 5000000
+"""
+
+import argparse
+import importlib.util
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import bpy
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from fake_providers import FakeProviderServer  # noqa: E402
+
+ADDON_PATH = Path(__file__).resolve().parent.parent / "addon.py"
+
+
+def load_addon():
+    spec = importlib.util.spec_from_file_location("blendermcp_addon", ADDON_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def configure_scene(scene):
+    scene.blendermcp_use_polyhaven = True
+    scene.blendermcp_use_sketchfab = True
+    scene.blendermcp_sketchfab_api_key = "fake"
+    scene.blendermcp_use_hyper3d = True
+    scene.blendermcp_hyper3d_mode = "MAIN_SITE"
+    scene.blendermcp_hyper3d_api_key = "fake"
+    scene.blendermcp_use_hunyuan3d = True
+    scene.blendermcp_hunyuan3d_mode = "OFFICIAL_API"
+    scene.blendermcp_hunyuan3d_secret_id = "fake"
+    scene.blendermcp_hunyuan3d_secret_key = "fake"
+
+
+def run(server, command, **params):
+    response = server.execute_command({"type": command, "params": params})
+    if response.get("status") != "success":
+        raise RuntimeError(response.get("message"))
+    result = response["result"]
+    if isinstance(result, dict) and (result.get("error") or result.get("succeed") is False):
+        raise RuntimeError(result.get("error"))
+    return result
+
+
+def wait_until(poll, done, timeout=60.0, interval=0.05):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if done(poll()):
+            return
+        time.sleep(interval)
+    raise TimeoutError("Generation job did not finish")
+
+
+#region Scenarios
+def sketchfab(server, i, max_triangles):
+    run(server, "download_sketchfab_model", uid=f"bench-{i}", normalize_size=True,
+        target_size=1.0, max_triangles=max_triangles)
+
+
+def polyhaven_textures(server, i, max_triangles):
+    run(server, "download_polyhaven_asset", asset_id=f"textures_{i % 20:03d}", asset_type="textures")
+
+
+def polyhaven_model(server, i, max_triangles):
+    run(server, "download_polyhaven_asset", asset_id=f"models_{i % 20:03d}", asset_type="models")
+
+
+def rodin(server, i, max_triangles):
+    job = run(server, "create_rodin_job", text_prompt=f"bench {i}")
+    key = job["jobs"]["subscription_key"]
+    wait_until(
+        lambda: run(server, "poll_rodin_job_status", subscription_key=key),
+        lambda status: all(s == "Done" for s in status["status_list"]),
+    )
+    run(server, "import_generated_asset", task_uuid=job["uuid"], name=f"Rodin_{i}", max_triangles=max_triangles)
+
+
+def hunyuan(server, i, max_triangles):
+    job = run(server, "create_hunyuan_job", text_prompt=f"bench {i}")
+    job_id = f"job_{job['Response']['JobId']}"
+    status = {}
+    def poll():
+        status.update(run(server, "poll_hunyuan_job_status", job_id=job_id)["Response"])
+        return status
+    wait_until(poll, lambda s: s.get("Status") == "DONE")
+    run(server, "import_generated_asset_hunyuan", name=f"Hunyuan_{i}",
+        zip_file_url=status["ResultFile3Ds"][0]["Url"], max_triangles=max_triangles)
+
+
+SCENARIOS = {
+    "sketchfab": sketchfab,
+    "polyhaven_textures": polyhaven_textures,
+    "polyhaven_model": polyhaven_model,
+    "rodin": rodin,
+    "hunyuan": hunyuan,
+}
+#endregion
+
+
+def cleanup(existing_objects):
+    for obj in set(bpy.data.objects) - existing_objects:
+        bpy.data.objects.remove(obj, do_unlink=True)
+    bpy.data.orphans_purge(do_recursive=True)
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def bench(server, name, scenario, iterations, max_triangles):
+    timings, errors = [], 0
+    started = time.perf_counter()
+    for i in range(iterations):
+        existing = set(bpy.data.objects)
+        start = time.perf_counter()
+        try:
+            scenario(server, i, max_triangles)
+            timings.append(time.perf_counter() - start)
+        except Exception as e:
+            errors += 1
+            print(f"  {name}[{i}] failed: {e}")
+        finally:
+            cleanup(existing)
+    elapsed = time.perf_counter() - started
+
+    if not timings:
+        print(f"{name:20s} all {iterations} iterations failed")
+        return
+    ms = [t * 1000 for t in timings]
+    print(
+        f"{name:20s} n={len(ms):4d} err={errors:3d} "
+        f"thr={len(ms) / elapsed:7.2f}/s "
+        f"p50={percentile(ms, 50):8.1f} p95={percentile(ms, 95):8.1f} "
+        f"p99={percentile(ms, 99):8.1f} max={max(ms):8.1f} mean={statistics.fmean(ms):8.1f} ms"
+    )
+
+
+def main():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    parser = argparse.ArgumentParser(prog="bench_asset_import")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--bandwidth", type=float, default=None)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=None)
+    parser.add_argument("--job-duration", type=float, default=0.0)
+    parser.add_argument("--segments", type=int, default=64)
+    parser.add_argument("--parts", type=int, default=10)
+    parser.add_argument("--max-triangles", type=int, default=None)
+    parser.add_argument("--recordings", default=None)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    args = parser.parse_args(argv)
+
+    fake = FakeProviderServer(
+        latency=args.latency, jitter=args.jitter, bandwidth=args.bandwidth, error_rate=args.error_rate,
+        rate_limit=args.rate_limit, job_duration=args.job_duration, recordings=args.recordings,
+        segments=args.segments, parts=args.parts, seed=0,
+    ).start()
+
+    addon = load_addon()
+    addon.configure_provider_urls(fake.base_url)
+    addon.register()
+    try:
+        configure_scene(bpy.context.scene)
+        server = addon.BlenderMCPServer()
+        print(f"fake providers at {fake.base_url}, latency={args.latency}s bandwidth={args.bandwidth or 'unlimited'}")
+        for name in args.scenarios.split(","):
+            bench(server, name, SCENARIOS[name], args.iterations, args.max_triangles)
+        print(
+            f"server: {fake.stats['requests']} requests, {fake.stats['rate_limited']} rate limited, "
+            f"{fake.stats['bytes_sent'] / 1e6:.1f} MB sent"
+        )
+        print(f"limiters: {server.get_provider_stats()}")
+    finally:
+        addon.unregister()
+        fake.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Benchmark: world-space AABB of a many-part imported hierarchy.
+
+Compares the per-corner mathutils loop the importers used to run against the
+batched NumPy routine in addon.py, on a synthetic model with PARTS mesh
+objects parented under nested empties (the shape Sketchfab glTF imports have).
+
+Run inside Blender:
+    blender -b --factory-startup --python v1/benchmarks/bench_world_aabb.py -- [PARTS] [REPEATS]
+"""
+
+import importlib.util
+import math
+import random
+import sys
+import time
+from pathlib import Path
+
+import bpy
+import mathutils
+import numpy as np
+
+ADDON_PATH = Path(__file__).resolve().parent.parent / "addon.py"
+
+
+def load_addon():
+    spec = importlib.util.spec_from_file_location("blendermcp_addon", ADDON_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def build_hierarchy(parts, seed=0):
+    """One root empty, a level of group empties and `parts` meshes sharing one cube mesh"""
+    rng = random.Random(seed)
+    scene = bpy.context.scene
+
+    mesh = bpy.data.meshes.new("bench_cube")
+    verts = [(x, y, z) for x in (-1, 1) for y in (-1, 1) for z in (-1, 1)]
+    faces = [(0, 1, 3, 2), (4, 6, 7, 5), (0, 4, 5, 1), (2, 3, 7, 6), (0, 2, 6, 4), (1, 5, 7, 3)]
+    mesh.from_pydata(verts, [], faces)
+
+    root = bpy.data.objects.new("bench_root", None)
+    root.rotation_euler = (0.3, 0.0, 0.7)
+    scene.collection.objects.link(root)
+
+    groups = []
+    for i in range(max(1, int(math.sqrt(parts)))):
+        group = bpy.data.objects.new(f"bench_group_{i}", None)
+        group.parent = root
+        group.location = [rng.uniform(-50, 50) for _ in range(3)]
+        group.scale = [rng.uniform(0.5, 2.0)] * 3
+        scene.collection.objects.link(group)
+        groups.append(group)
+
+    for i in range(parts):
+        obj = bpy.data.objects.new(f"bench_part_{i}", mesh)
+        obj.parent = groups[i % len(groups)]
+        obj.location = [rng.uniform(-10, 10) for _ in range(3)]
+        obj.rotation_euler = [rng.uniform(0, math.pi) for _ in range(3)]
+        obj.scale = [rng.uniform(0.1, 1.0) for _ in range(3)]
+        scene.collection.objects.link(obj)
+
+    bpy.context.view_layer.update()
+    return root
+
+
+def legacy_aabb(meshes):
+    all_min = mathutils.Vector((float('inf'), float('inf'), float('inf')))
+    all_max = mathutils.Vector((float('-inf'), float('-inf'), float('-inf')))
+    for mesh_obj in meshes:
+        for corner in mesh_obj.bound_box:
+            world_corner = mesh_obj.matrix_world @ mathutils.Vector(corner)
+            all_min.x = min(all_min.x, world_corner.x)
+            all_min.y = min(all_min.y, world_corner.y)
+            all_min.z = min(all_min.z, world_corner.z)
+            all_max.x = max(all_max.x, world_corner.x)
+            all_max.y = max(all_max.y, world_corner.y)
+            all_max.z = max(all_max.z, world_corner.z)
+    return [[*all_min], [*all_max]]
+
+
+def best_of(fn, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return result, min(timings)
+
+
+def main():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    parts = int(argv[0]) if argv else 10000
+    repeats = int(argv[1]) if len(argv) > 1 else 5
+
+    addon = load_addon()
+    root = build_hierarchy(parts)
+
+    meshes, t_collect = best_of(lambda: addon.collect_hierarchy_meshes([root]), repeats)
+    expected, t_legacy = best_of(lambda: legacy_aabb(meshes), repeats)
+    actual, t_numpy = best_of(lambda: addon.world_aabb(meshes), repeats)
+
+    if not np.allclose(expected, actual, atol=1e-4):
+        raise SystemExit(f"AABB mismatch: legacy={expected} numpy={actual}")
+
+    print(f"parts={len(meshes)} repeats={repeats}")
+    print(f"collect hierarchy : {t_collect * 1000:8.2f} ms")
+    print(f"mathutils loop    : {t_legacy * 1000:8.2f} ms")
+    print(f"numpy batched     : {t_numpy * 1000:8.2f} ms  ({t_legacy / t_numpy:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,459 @@
+"""
+Local stand-in for the asset providers used by addon.py.
+
+Serves Poly Haven, Sketchfab, Hyper3D Rodin (main site and fal.ai) and
+Hunyuan3D endpoints under /<provider>/..., with configurable latency,
+jitter, bandwidth, error rate and per-provider rate limit (429 with
+Retry-After), so the addon handlers can be exercised offline (CI, load
+tests, benchmarks).
+
+Responses come from a recordings directory when one is given
+(<recordings>/<provider>/<path>[.json], "{base_url}" in recorded JSON is
+replaced by this server's URL), otherwise from small synthesized assets:
+a gridded GLB, a glTF zip, an OBJ zip, PNG maps and a Radiance HDRI.
+
+Point the addon at it with:
+    BLENDERMCP_PROVIDER_BASE_URL=http://127.0.0.1:8765 blender ...
+
+Run standalone:
+    python v1/benchmarks/fake_providers.py --port 8765 --latency 0.05 --bandwidth 5000000
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import mimetypes
+import os
+import random
+import struct
+import threading
+import time
+import uuid
+import zipfile
+import zlib
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+CHUNK_SIZE = 64 * 1024
+
+
+#region Synthesized assets
+def make_grid_geometry(segments=32):
+    """Positions and triangle indices of a segments x segments grid"""
+    positions = []
+    for y in range(segments + 1):
+        for x in range(segments + 1):
+            positions.append((x / segments - 0.5, y / segments - 0.5, 0.0))
+    indices = []
+    row = segments + 1
+    for y in range(segments):
+        for x in range(segments):
+            a = y * row + x
+            indices += [a, a + 1, a + row, a + 1, a + row + 1, a + row]
+    return positions, indices
+
+
+def make_gltf(segments=32, parts=1, buffer_uri=None):
+    """Return (gltf_json, bin_bytes) of `parts` nodes sharing one grid mesh"""
+    positions, indices = make_grid_geometry(segments)
+    pos_bytes = b"".join(struct.pack("<3f", *p) for p in positions)
+    idx_bytes = struct.pack(f"<{len(indices)}I", *indices)
+    binary = pos_bytes + idx_bytes
+    gltf = {
+        "asset": {"version": "2.0", "generator": "blender-mcp fake provider"},
+        "scene": 0,
+        "scenes": [{"nodes": [0]}],
+        "nodes": [{"name": "root", "children": list(range(1, parts + 1))}] + [
+            {"name": f"part_{i}", "mesh": 0, "translation": [float(i % 10), float(i // 10), 0.0]}
+            for i in range(parts)
+        ],
+        "meshes": [{"name": "grid", "primitives": [{"attributes": {"POSITION": 0}, "indices": 1}]}],
+        "accessors": [
+            {"bufferView": 0, "componentType": 5126, "count": len(positions), "type": "VEC3",
+             "min": [-0.5, -0.5, 0.0], "max": [0.5, 0.5, 0.0]},
+            {"bufferView": 1, "componentType": 5125, "count": len(indices), "type": "SCALAR"},
+        ],
+        "bufferViews": [
+            {"buffer": 0, "byteOffset": 0, "byteLength": len(pos_bytes), "target": 34962},
+            {"buffer": 0, "byteOffset": len(pos_bytes), "byteLength": len(idx_bytes), "target": 34963},
+        ],
+        "buffers": [{"byteLength": len(binary)}],
+    }
+    if buffer_uri:
+        gltf["buffers"][0]["uri"] = buffer_uri
+    return gltf, binary
+
+
+def make_glb(segments=32, parts=1):
+    gltf, binary = make_gltf(segments, parts)
+    json_bytes = json.dumps(gltf).encode("utf-8")
+    json_bytes += b" " * (-len(json_bytes) % 4)
+    binary += b"\0" * (-len(binary) % 4)
+    length = 12 + 8 + len(json_bytes) + 8 + len(binary)
+    return b"".join([
+        struct.pack("<4sII", b"glTF", 2, length),
+        struct.pack("<I4s", len(json_bytes), b"JSON"), json_bytes,
+        struct.pack("<I4s", len(binary), b"BIN\0"), binary,
+    ])
+
+
+def make_gltf_zip(segments=32, parts=1):
+    """Sketchfab-style archive: scene.gltf + scene.bin, plus a license file"""
+    gltf, binary = make_gltf(segments, parts, buffer_uri="scene.bin")
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("scene.gltf", json.dumps(gltf))
+        archive.writestr("scene.bin", binary)
+        archive.writestr("license.txt", "CC0 test asset")
+    return out.getvalue()
+
+
+def make_obj_zip(segments=32):
+    """Hunyuan3D-style archive: model.obj + material.mtl"""
+    positions, indices = make_grid_geometry(segments)
+    lines = ["mtllib material.mtl", "usemtl grid"]
+    lines += [f"v {x} {y} {z}" for x, y, z in positions]
+    lines += [f"f {a + 1} {b + 1} {c + 1}" for a, b, c in zip(indices[0::3], indices[1::3], indices[2::3])]
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("model.obj", "\n".join(lines) + "\n")
+        archive.writestr("material.mtl", "newmtl grid\nKd 0.8 0.8 0.8\n")
+    return out.getvalue()
+
+
+def make_png(size=64, color=(128, 128, 128)):
+    row = b"\0" + bytes(color) * size
+    def chunk(tag, data):
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data))
+    return b"".join([
+        b"\x89PNG\r\n\x1a\n",
+        chunk(b"IHDR", struct.pack(">IIBBBBB", size, size, 8, 2, 0, 0, 0)),
+        chunk(b"IDAT", zlib.compress(row * size)),
+        chunk(b"IEND", b""),
+    ])
+
+
+def make_hdr(width=64, height=32):
+    """Flat (non-RLE) Radiance HDR of a uniform grey sky"""
+    header = f"#?RADIANCE\nFORMAT=32-bit_rle_rgbe\n\n-Y {height} +X {width}\n".encode("ascii")
+    return header + bytes((128, 128, 128, 129)) * (width * height)
+#endregion
+
+
+class FakeProviderServer:
+    """Threaded HTTP server imitating the provider APIs the addon talks to"""
+
+    TEXTURE_MAPS = ("Diffuse", "nor_gl", "Rough", "arm")
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, jitter=0.0, bandwidth=None,
+                 error_rate=0.0, rate_limit=None, job_duration=0.0, recordings=None, segments=32, parts=1,
+                 seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.bandwidth = bandwidth  # bytes per second per response, None for unlimited
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit  # requests per second per provider, None for unlimited
+        self.recent = {}  # provider -> deque of request times within the last second
+        self.job_duration = job_duration
+        self.recordings = recordings
+        self.random = random.Random(seed)
+        self.jobs = {}  # job id -> created at
+        self.stats = {"requests": 0, "errors": 0, "rate_limited": 0, "bytes_sent": 0, "routes": {}}
+        self.lock = threading.Lock()
+
+        self.blobs = {
+            "model.glb": make_glb(segments, parts),
+            "model.zip": make_gltf_zip(segments, parts),
+            "hunyuan.zip": make_obj_zip(segments),
+            "texture.png": make_png(),
+            "sky.hdr": make_hdr(),
+        }
+        gltf, binary = make_gltf(segments, parts, buffer_uri="scene.bin")
+        self.blobs["scene.gltf"] = json.dumps(gltf).encode("utf-8")
+        self.blobs["scene.bin"] = binary
+
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def blob_url(self, name):
+        return f"{self.base_url}/blobs/{name}"
+
+    def _file_info(self, name):
+        data = self.blobs[name]
+        return {"url": self.blob_url(name), "md5": hashlib.md5(data).hexdigest(), "size": len(data)}
+
+    def _over_rate_limit(self, provider):
+        """Sliding one second window per provider, blobs (CDN downloads) are never limited"""
+        if not self.rate_limit or provider == "blobs":
+            return False
+        now = time.monotonic()
+        with self.lock:
+            recent = self.recent.setdefault(provider, deque())
+            while recent and now - recent[0] >= 1.0:
+                recent.popleft()
+            if len(recent) >= self.rate_limit:
+                self.stats["rate_limited"] += 1
+                return True
+            recent.append(now)
+        return False
+
+    def _job_done(self, job_id):
+        created = self.jobs.setdefault(job_id, time.time())
+        return time.time() - created >= self.job_duration
+
+    def _new_job(self):
+        job_id = uuid.uuid4().hex
+        self.jobs[job_id] = time.time()
+        return job_id
+
+    #region Routes
+    def route(self, method, provider, path, query, body, headers):
+        """Return (status, payload) where payload is a dict (JSON) or bytes"""
+        if provider == "blobs":
+            name = path.lstrip("/")
+            return (200, self.blobs[name]) if name in self.blobs else (404, {"error": "not found"})
+
+        recorded = self._recorded(provider, path)
+        if recorded is not None:
+            return 200, recorded
+
+        handler = getattr(self, f"_{provider}", None)
+        if handler is None:
+            return 404, {"error": f"unknown provider {provider}"}
+        return handler(method, path, query, body, headers)
+
+    def _recorded(self, provider, path):
+        if not self.recordings:
+            return None
+        base = os.path.join(self.recordings, provider, *[p for p in path.split("/") if p])
+        for candidate in (base, base + ".json"):
+            if os.path.isfile(candidate):
+                with open(candidate, "rb") as f:
+                    data = f.read()
+                if candidate.endswith(".json"):
+                    return json.loads(data.decode("utf-8").replace("{base_url}", self.base_url))
+                return data
+        return None
+
+    def _polyhaven(self, method, path, query, body, headers):
+        parts = [p for p in path.split("/") if p]
+        if parts == ["assets"]:
+            types = {"hdris": 0, "textures": 1, "models": 2}
+            assets = {
+                f"{kind}_{i:03d}": {
+                    "name": f"Fake {kind[:-1]} {i}",
+                    "type": code,
+                    "categories": ["fake", kind],
+                    "tags": ["test", f"tag{i % 5}"],
+                    "download_count": 1000 - i,
+                }
+                for kind, code in types.items() for i in range(20)
+            }
+            wanted = query.get("type", [None])[0]
+            if wanted in types:
+                assets = {k: v for k, v in assets.items() if v["type"] == types[wanted]}
+            return 200, assets
+        if len(parts) == 2 and parts[0] == "categories":
+            return 200, {"all": 20, "fake": 20, parts[1]: 20}
+        if len(parts) == 2 and parts[0] == "files":
+            asset_id = parts[1]
+            if asset_id.startswith("hdris"):
+                return 200, {"hdri": {"1k": {"hdr": self._file_info("sky.hdr")}}}
+            if asset_id.startswith("models"):
+                info = self._file_info("scene.gltf")
+                info["include"] = {"scene.bin": self._file_info("scene.bin")}
+                return 200, {"gltf": {"1k": {"gltf": info}}}
+            png = self._file_info("texture.png")
+            return 200, {name: {"1k": {"jpg": png, "png": png}} for name in self.TEXTURE_MAPS}
+        return 404, {"error": "not found"}
+
+    def _sketchfab(self, method, path, query, body, headers):
+        parts = [p for p in path.split("/") if p]
+        if parts == ["me"]:
+            return 200, {"username": "fake-user", "uid": "fake"}
+        if parts == ["search"]:
+            count = int(query.get("count", ["20"])[0])
+            q = query.get("q", [""])[0]
+            return 200, {"results": [self._sketchfab_model(f"{q or 'model'}-{i}") for i in range(count)]}
+        if len(parts) == 2 and parts[0] == "models":
+            return 200, self._sketchfab_model(parts[1])
+        if len(parts) == 3 and parts[0] == "models" and parts[2] == "download":
+            return 200, {"gltf": {"url": self.blob_url("model.zip"), "size": len(self.blobs["model.zip"])}}
+        return 404, {"error": "not found"}
+
+    def _sketchfab_model(self, uid):
+        return {
+            "uid": uid,
+            "name": f"Fake model {uid}",
+            "user": {"username": "fake-user"},
+            "isDownloadable": True,
+            "faceCount": 2 * 32 * 32,
+            "license": {"label": "CC0"},
+            "thumbnails": {"images": [
+                {"url": self.blob_url("texture.png"), "width": 64, "height": 64},
+            ]},
+        }
+
+    def _hyper3d(self, method, path, query, body, headers):
+        if path == "/rodin":
+            task_uuid = self._new_job()
+            return 200, {"submit_time": time.time(), "uuid": task_uuid,
+                         "jobs": {"subscription_key": task_uuid, "uuids": [task_uuid]}}
+        if path == "/status":
+            key = json.loads(body or b"{}").get("subscription_key", "")
+            return 200, {"jobs": [{"uuid": key, "status": "Done" if self._job_done(key) else "Generating"}]}
+        if path == "/download":
+            return 200, {"list": [{"name": "model.glb", "url": self.blob_url("model.glb")}]}
+        return 404, {"error": "not found"}
+
+    def _fal(self, method, path, query, body, headers):
+        parts = [p for p in path.split("/") if p]
+        if parts == ["rodin"]:
+            return 200, {"request_id": self._new_job()}
+        if len(parts) == 3 and parts[0] == "requests" and parts[2] == "status":
+            return 200, {"status": "COMPLETED" if self._job_done(parts[1]) else "IN_PROGRESS"}
+        if len(parts) == 2 and parts[0] == "requests":
+            return 200, {"model_mesh": {"url": self.blob_url("model.glb")}}
+        return 404, {"error": "not found"}
+
+    def _hunyuan(self, method, path, query, body, headers):
+        action = headers.get("X-TC-Action", "")
+        if action == "SubmitHunyuanTo3DJob":
+            return 200, {"Response": {"JobId": self._new_job(), "RequestId": uuid.uuid4().hex}}
+        if action == "QueryHunyuanTo3DJob":
+            job_id = json.loads(body or b"{}").get("JobId", "")
+            if not self._job_done(job_id):
+                return 200, {"Response": {"Status": "RUN"}}
+            return 200, {"Response": {"Status": "DONE", "ResultFile3Ds": [
+                {"Type": "OBJ", "Url": self.blob_url("hunyuan.zip")},
+            ]}}
+        return 400, {"Response": {"Error": {"Code": "InvalidAction", "Message": action}}}
+    #endregion
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _handle(self, method):
+                url = urlparse(self.path)
+                _, provider, *rest = url.path.split("/", 2) + [""]
+                path = "/" + rest[0] if rest else "/"
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+
+                delay = server.latency + (server.random.uniform(0, server.jitter) if server.jitter else 0.0)
+                if delay:
+                    time.sleep(delay)
+
+                with server.lock:
+                    server.stats["requests"] += 1
+                    route_key = f"{method} /{provider}"
+                    server.stats["routes"][route_key] = server.stats["routes"].get(route_key, 0) + 1
+
+                extra_headers = {}
+                if server._over_rate_limit(provider):
+                    status, payload = 429, {"error": "rate limited"}
+                    extra_headers["Retry-After"] = "1"
+                elif server.error_rate and server.random.random() < server.error_rate:
+                    status, payload = 503, {"error": "injected failure"}
+                    with server.lock:
+                        server.stats["errors"] += 1
+                else:
+                    try:
+                        status, payload = server.route(method, provider, path, parse_qs(url.query), body, self.headers)
+                    except Exception as e:
+                        status, payload = 500, {"error": str(e)}
+
+                if isinstance(payload, (bytes, bytearray)):
+                    content_type = mimetypes.guess_type(url.path)[0] or "application/octet-stream"
+                    data = bytes(payload)
+                else:
+                    content_type = "application/json"
+                    data = json.dumps(payload).encode("utf-8")
+
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                for key, value in extra_headers.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self._write(data)
+
+            def _write(self, data):
+                for start in range(0, len(data), CHUNK_SIZE):
+                    chunk = data[start:start + CHUNK_SIZE]
+                    self.wfile.write(chunk)
+                    if server.bandwidth:
+                        time.sleep(len(chunk) / server.bandwidth)
+                with server.lock:
+                    server.stats["bytes_sent"] += len(data)
+
+            def do_GET(self):
+                self._handle("GET")
+
+            def do_POST(self):
+                self._handle("POST")
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the BlenderMCP asset providers")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random latency, up to this many seconds")
+    parser.add_argument("--bandwidth", type=float, default=None, help="Bytes per second per response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument("--rate-limit", type=float, default=None, help="Requests per second per provider before 429")
+    parser.add_argument("--job-duration", type=float, default=0.0, help="Seconds until generation jobs are done")
+    parser.add_argument("--recordings", default=None, help="Directory with recorded responses")
+    parser.add_argument("--segments", type=int, default=32, help="Grid resolution of synthesized meshes")
+    parser.add_argument("--parts", type=int, default=1, help="Mesh nodes in synthesized glTF models")
+    args = parser.parse_args()
+
+    server = FakeProviderServer(
+        args.host, args.port, latency=args.latency, jitter=args.jitter, bandwidth=args.bandwidth,
+        error_rate=args.error_rate, rate_limit=args.rate_limit, job_duration=args.job_duration,
+        recordings=args.recordings, segments=args.segments, parts=args.parts,
+    )
+    print(f"Fake providers on {server.base_url}")
+    print(f"Use: BLENDERMCP_PROVIDER_BASE_URL={server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -4,10 +4,12 @@ import socket
 import json
 import asyncio
 import logging
-import tempfile
-from dataclasses import dataclass
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
 from contextlib import asynccontextmanager
-from typing import AsyncIterator, Dict, Any, List
+from typing import AsyncIterator, Callable, Dict, Any, List, Optional, Union
 import os
 from pathlib import Path
 import base64
@@ -25,12 +27,15 @@ logger = logging.getLogger("BlenderMCPServer")
 # Default configuration
 DEFAULT_HOST = "localhost"
 DEFAULT_PORT = 9876
+COMMAND_TIMEOUT = 180.0  # Seconds; also sent to Blender as the command's deadline
 
 @dataclass
 class BlenderConnection:
     host: str
     port: int
     sock: socket.socket = None  # Changed from 'socket' to 'sock' to avoid naming conflict
+    # One command in flight at a time: tools and the job manager share this socket
+    lock: threading.RLock = field(default_factory=threading.RLock, repr=False)
     
     def connect(self) -> bool:
         """Connect to the Blender addon socket server"""
@@ -57,11 +62,11 @@ class BlenderConnection:
             finally:
                 self.sock = None
 
-    def receive_full_response(self, sock, buffer_size=8192):
+    def receive_full_response(self, sock, buffer_size=8192, timeout=COMMAND_TIMEOUT):
         """Receive the complete response, potentially in multiple chunks"""
         chunks = []
         # Use a consistent timeout value that matches the addon's timeout
-        sock.settimeout(180.0)  # Match the addon's timeout
+        sock.settimeout(timeout)  # Match the addon's timeout
         
         try:
             while True:
@@ -113,29 +118,78 @@ class BlenderConnection:
         else:
             raise Exception("No data received")
 
-    def send_command(self, command_type: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
-        """Send a command to Blender and return the response"""
+    def receive_streamed_response(self, sock, on_frame: Callable[[Dict[str, Any]], None],
+                                  buffer_size=8192, timeout=COMMAND_TIMEOUT):
+        """Receive newline-delimited frames, passing output/progress frames to on_frame,
+        until the final result frame arrives"""
+        sock.settimeout(timeout)
+        pending = b''
+        while True:
+            chunk = sock.recv(buffer_size)
+            if not chunk:
+                raise ConnectionError("Connection closed before the result frame")
+            pending += chunk
+            *lines, pending = pending.split(b'\n')
+            for line in lines:
+                if not line.strip():
+                    continue
+                frame = json.loads(line.decode('utf-8'))
+                if frame.get("frame", "result") == "result":
+                    logger.info(f"Received result frame ({len(line)} bytes)")
+                    return line
+                try:
+                    on_frame(frame)
+                except Exception as e:
+                    logger.debug(f"Frame callback failed: {e}")
+
+    def send_command(self, command_type: str, params: Dict[str, Any] = None,
+                     timeout: float = COMMAND_TIMEOUT,
+                     on_frame: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """Send a command to Blender and return the response.
+
+        With on_frame, Blender streams the command's stdout and progress as it runs
+        and on_frame is called with each frame before the response is returned.
+        """
+        with self.lock:
+            return self._send_command(command_type, params, timeout, on_frame)
+
+    def _send_command(self, command_type: str, params: Dict[str, Any] = None,
+                      timeout: float = COMMAND_TIMEOUT,
+                      on_frame: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
         if not self.sock and not self.connect():
             raise ConnectionError("Not connected to Blender")
         
+        # Blender drops the command if it can't start it before the deadline,
+        # and a running one can be stopped by request_id
+        request_id = uuid.uuid4().hex
         command = {
             "type": command_type,
-            "params": params or {}
+            "params": params or {},
+            "request_id": request_id,
+            "deadline": time.time() + timeout,
         }
+        if on_frame is not None:
+            command["stream"] = True
+        sent = answered = False
         
         try:
             # Log the command being sent
-            logger.info(f"Sending command: {command_type} with params: {params}")
+            logger.info(f"Sending command: {command_type} ({request_id}) with params: {params}")
             
             # Send the command
             self.sock.sendall(json.dumps(command).encode('utf-8'))
+            sent = True
             logger.info(f"Command sent, waiting for response...")
             
             # Set a timeout for receiving - use the same timeout as in receive_full_response
-            self.sock.settimeout(180.0)  # Match the addon's timeout
+            self.sock.settimeout(timeout)  # Match the addon's timeout
             
             # Receive the response using the improved receive_full_response method
-            response_data = self.receive_full_response(self.sock)
+            if on_frame is not None:
+                response_data = self.receive_streamed_response(self.sock, on_frame, timeout=timeout)
+            else:
+                response_data = self.receive_full_response(self.sock, timeout=timeout)
+            answered = True
             logger.info(f"Received {len(response_data)} bytes of data")
             
             response = json.loads(response_data.decode('utf-8'))
@@ -167,6 +221,22 @@ class BlenderConnection:
             # Don't try to reconnect here - let the get_blender_connection handle reconnection
             self.sock = None
             raise Exception(f"Communication error with Blender: {str(e)}")
+        finally:
+            if sent and not answered:
+                # Nobody will read the reply anymore: stop Blender from working on it
+                threading.Thread(target=self.cancel, args=(request_id,), daemon=True).start()
+
+    def cancel(self, request_id: str) -> Dict[str, Any]:
+        """Ask Blender to cancel a command, over a separate connection since this one is busy"""
+        try:
+            with socket.create_connection((self.host, self.port), timeout=5.0) as sock:
+                sock.sendall(json.dumps({"type": "cancel", "params": {"request_id": request_id}}).encode('utf-8'))
+                response = json.loads(self.receive_full_response(sock, timeout=5.0).decode('utf-8'))
+            logger.info(f"Cancel {request_id}: {response.get('result')}")
+            return response.get("result", {})
+        except Exception as e:
+            logger.warning(f"Failed to cancel {request_id}: {str(e)}")
+            return {"request_id": request_id, "cancelled": False, "error": str(e)}
 
 @asynccontextmanager
 async def server_lifespan(server: FastMCP) -> AsyncIterator[Dict[str, Any]]:
@@ -215,9 +285,14 @@ mcp = FastMCP(
 # Global connection for resources (since resources can't access context)
 _blender_connection = None
 _polyhaven_enabled = False  # Add this global variable
+_connection_lock = threading.Lock()  # Tools and the job manager may ask for the connection concurrently
 
 def get_blender_connection():
     """Get or create a persistent Blender connection"""
+    with _connection_lock:
+        return _get_blender_connection()
+
+def _get_blender_connection():
     global _blender_connection, _polyhaven_enabled  # Add _polyhaven_enabled to globals
     
     # If we have an existing connection, check if it's still valid
@@ -251,6 +326,178 @@ def get_blender_connection():
     return _blender_connection
 
 
+@dataclass
+class GenerationJob:
+    """A Hyper3D Rodin or Hunyuan3D generation task tracked by the server"""
+    job_id: str
+    provider: str  # "rodin" or "hunyuan"
+    poll_params: Dict[str, Any]
+    import_params: Dict[str, Any]
+    status: str = "PENDING"  # PENDING, RUNNING, IMPORTING, DONE, FAILED
+    progress: float = 0.0
+    provider_status: Any = None
+    import_result: Any = None
+    error: str = None
+    polls: int = 0
+    created_at: float = field(default_factory=time.time)
+    finished: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "provider": self.provider,
+            "status": self.status,
+            "progress": round(self.progress, 3),
+            "provider_status": self.provider_status,
+            "import_result": self.import_result,
+            "error": self.error,
+            "polls": self.polls,
+            "elapsed": round(time.time() - self.created_at, 1),
+        }
+
+
+def _interpret_job_status(job: GenerationJob, result: Any) -> tuple:
+    """Map a provider poll response to (COMPLETED | RUNNING | FAILED, progress, error)"""
+    if not isinstance(result, dict):
+        raise Exception(str(result))
+    if "error" in result:
+        raise Exception(result["error"])
+
+    if job.provider == "rodin":
+        if "status_list" in result:
+            # MAIN_SITE: one status per sub-job, done when all are "Done"
+            statuses = result["status_list"]
+            if any(status in ("Failed", "Canceled") for status in statuses):
+                return "FAILED", job.progress, f"Generation failed: {statuses}"
+            done = sum(status == "Done" for status in statuses)
+            if statuses and done == len(statuses):
+                return "COMPLETED", 1.0, None
+            return "RUNNING", done / len(statuses) if statuses else 0.0, None
+        # FAL_AI
+        status = result.get("status")
+        if status == "COMPLETED":
+            return "COMPLETED", 1.0, None
+        if status in ("IN_QUEUE", "IN_PROGRESS"):
+            return "RUNNING", 0.1 if status == "IN_QUEUE" else 0.5, None
+        return "FAILED", job.progress, f"Generation failed with status {status}"
+
+    response = result.get("Response", {})
+    status = response.get("Status")
+    if status == "DONE":
+        files = response.get("ResultFile3Ds") or []
+        urls = [f.get("Url") for f in files if f.get("Url")]
+        if not urls:
+            return "FAILED", 1.0, "Generation finished without a result file"
+        job.import_params["zip_file_url"] = urls[0]
+        return "COMPLETED", 1.0, None
+    if status in ("WAIT", "RUN"):
+        return "RUNNING", 0.1 if status == "WAIT" else 0.5, None
+    return "FAILED", job.progress, response.get("ErrorMessage") or f"Generation failed with status {status}"
+
+
+class JobManager:
+    """Polls generation jobs in the background and imports the asset when done.
+
+    Each job is polled by exactly one thread, so agents waiting on or
+    polling the same job never cause extra round trips to Blender.
+    """
+
+    MIN_INTERVAL = 2.0
+    MAX_INTERVAL = 20.0
+    MAX_AGE = 1800.0
+    MAX_ERRORS = 5
+
+    def __init__(self):
+        self.jobs: Dict[str, GenerationJob] = {}
+        self.lock = threading.Lock()
+
+    def track(self, provider: str, job_id: str, poll_params: Dict[str, Any], import_params: Dict[str, Any]) -> GenerationJob:
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is not None:
+                return job
+            job = GenerationJob(job_id, provider, poll_params, import_params)
+            self.jobs[job_id] = job
+
+        thread = threading.Thread(target=self._run, args=(job,), daemon=True)
+        thread.start()
+        logger.info(f"Tracking {provider} job {job_id}")
+        return job
+
+    def find(self, key: str) -> GenerationJob:
+        """Look a job up by its id or by any of its poll parameters"""
+        with self.lock:
+            if key in self.jobs:
+                return self.jobs[key]
+            for job in self.jobs.values():
+                if key in job.poll_params.values():
+                    return job
+        return None
+
+    def _finish(self, job: GenerationJob, status: str, error: str = None):
+        job.status = status
+        job.error = error
+        job.finished.set()
+        logger.info(f"Job {job.job_id} finished: {status}{f' ({error})' if error else ''}")
+
+    def _run(self, job: GenerationJob):
+        poll_command = "poll_rodin_job_status" if job.provider == "rodin" else "poll_hunyuan_job_status"
+        interval = self.MIN_INTERVAL
+        errors = 0
+
+        while time.time() - job.created_at < self.MAX_AGE:
+            try:
+                result = get_blender_connection().send_command(poll_command, job.poll_params)
+                state, progress, error = _interpret_job_status(job, result)
+                errors = 0
+            except Exception as e:
+                errors += 1
+                logger.warning(f"Polling job {job.job_id} failed ({errors}/{self.MAX_ERRORS}): {str(e)}")
+                if errors >= self.MAX_ERRORS:
+                    self._finish(job, "FAILED", f"Polling failed: {str(e)}")
+                    return
+                time.sleep(interval)
+                continue
+
+            changed = result != job.provider_status
+            job.polls += 1
+            job.provider_status = result
+            job.progress = progress
+
+            if state == "COMPLETED":
+                self._import(job)
+                return
+            if state == "FAILED":
+                self._finish(job, "FAILED", error)
+                return
+
+            job.status = "RUNNING"
+            # Poll quickly right after progress, back off while nothing changes
+            interval = self.MIN_INTERVAL if changed else min(interval * 1.5, self.MAX_INTERVAL)
+            time.sleep(interval)
+
+        self._finish(job, "FAILED", "Timed out waiting for generation")
+
+    def _import(self, job: GenerationJob):
+        job.status = "IMPORTING"
+        import_command = "import_generated_asset" if job.provider == "rodin" else "import_generated_asset_hunyuan"
+        try:
+            result = get_blender_connection().send_command(import_command, job.import_params)
+        except Exception as e:
+            self._finish(job, "FAILED", f"Import failed: {str(e)}")
+            return
+
+        job.import_result = result
+        if isinstance(result, dict) and result.get("succeed"):
+            self._finish(job, "DONE")
+        else:
+            error = result.get("error") if isinstance(result, dict) else str(result)
+            self._finish(job, "FAILED", f"Import failed: {error}")
+
+
+_job_manager = JobManager()
+
+
 @telemetry_tool("get_scene_info")
 @mcp.tool()
 def get_scene_info(ctx: Context) -> str:
@@ -284,68 +531,300 @@ def get_object_info(ctx: Context, object_name: str) -> str:
         logger.error(f"Error getting object info from Blender: {str(e)}")
         return f"Error getting object info: {str(e)}"
 
+# Last screenshot per (max_size, format, quality) as (etag, bytes), revalidated with if_none_match
+_screenshots: Dict[tuple, tuple] = {}
+
 @telemetry_tool("get_viewport_screenshot")
 @mcp.tool()
-def get_viewport_screenshot(ctx: Context, max_size: int = 800) -> Image:
+def get_viewport_screenshot(ctx: Context, max_size: int = 800, format: str = "png", quality: int = 80) -> Image:
     """
     Capture a screenshot of the current Blender 3D viewport.
+    Cheap to call repeatedly: an unchanged viewport is not captured or transferred again.
     
     Parameters:
     - max_size: Maximum size in pixels for the largest dimension (default: 800)
+    - format: png (default), jpeg or webp. JPEG/WebP are several times smaller and fine for looking at the scene.
+    - quality: JPEG/WebP quality from 1 to 100 (default: 80)
     
     Returns the screenshot as an Image.
     """
+    format = "jpeg" if format.lower() == "jpg" else format.lower()
+    cache_key = (max_size, format, quality if format != "png" else None)
+    previous = _screenshots.get(cache_key)
     try:
         blender = get_blender_connection()
         
-        # Create temp file path
-        temp_dir = tempfile.gettempdir()
-        temp_path = os.path.join(temp_dir, f"blender_screenshot_{os.getpid()}.png")
-        
         result = blender.send_command("get_viewport_screenshot", {
             "max_size": max_size,
-            "filepath": temp_path,
-            "format": "png"
+            "format": format,
+            "quality": quality,
+            "if_none_match": previous[0] if previous else None,
         })
         
         if "error" in result:
             raise Exception(result["error"])
+
+        if result.get("not_modified") and previous:
+            logger.info(f"Viewport unchanged, reusing screenshot {previous[0]}")
+            return Image(data=previous[1], format=format)
+
+        if "data" not in result:
+            raise Exception("Blender did not return the screenshot")
+        image_bytes = base64.b64decode(result["data"])
+        if "timings" in result:
+            logger.info(f"Screenshot {result['width']}x{result['height']} {format}: {result['timings']}")
         
-        if not os.path.exists(temp_path):
-            raise Exception("Screenshot file was not created")
-        
-        # Read the file
-        with open(temp_path, 'rb') as f:
-            image_bytes = f.read()
-        
-        # Delete the temp file
-        os.remove(temp_path)
-        
-        return Image(data=image_bytes, format="png")
+        if result.get("etag"):
+            _screenshots[cache_key] = (result["etag"], image_bytes)
+        return Image(data=image_bytes, format=format)
         
     except Exception as e:
         logger.error(f"Error capturing screenshot: {str(e)}")
         raise Exception(f"Screenshot failed: {str(e)}")
 
 
+@telemetry_tool("render_views")
+@mcp.tool()
+def render_views(
+    ctx: Context,
+    views: List[Union[str, Dict[str, Any]]] = None,
+    size: int = 512,
+    objects: List[str] = None,
+    compose: bool = True,
+    format: str = "png",
+    quality: int = 80,
+) -> list:
+    """
+    Render the scene from several angles at once, to check a model from all sides without moving the viewport.
+    Uses fast solid (Workbench) renders through a temporary orthographic camera, so it also works headless.
+
+    Parameters:
+    - views: View names (front, back, side/right, left, top, bottom, iso) and/or
+      {"azimuth": degrees, "elevation": degrees, "name": label} dicts. Default: front, side, top, iso
+    - size: Size in pixels of every (square) view (default: 512)
+    - objects: Names of the objects to frame (default: all visible meshes)
+    - compose: Tile all views into one contact sheet image (default) instead of returning one image per view
+    - format: png (default), jpeg or webp
+    - quality: JPEG/WebP quality from 1 to 100 (default: 80)
+
+    Returns a JSON description of the views (and their tile positions) followed by the image(s).
+    """
+    format = "jpeg" if format.lower() == "jpg" else format.lower()
+    try:
+        blender = get_blender_connection()
+        result = blender.send_command("render_views", {
+            "views": views,
+            "size": size,
+            "objects": objects,
+            "compose": compose,
+            "format": format,
+            "quality": quality,
+        })
+        if "error" in result:
+            raise Exception(result["error"])
+
+        if compose:
+            images = [Image(data=base64.b64decode(result.pop("data")), format=format)]
+        else:
+            images = [Image(data=base64.b64decode(view.pop("data")), format=format) for view in result["views"]]
+        return [json.dumps(result, indent=2), *images]
+    except Exception as e:
+        logger.error(f"Error rendering views: {str(e)}")
+        raise Exception(f"Render views failed: {str(e)}")
+
+
 @telemetry_tool("execute_blender_code")
 @mcp.tool()
-def execute_blender_code(ctx: Context, code: str) -> str:
+async def execute_blender_code(ctx: Context, code: str, profile: bool = False, stream: bool = False) -> str:
     """
     Execute arbitrary Python code in Blender. Make sure to do it step-by-step by breaking it into smaller chunks.
+    Imports, functions and variables defined by earlier calls stay available (use reset_python_namespace to start clean).
+    For long loops (bulk edits over many objects), put a bare `yield` statement at top level between batches:
+    the script then runs in slices and Blender stays responsive.
+    Call `progress(pct, msg)` (pct from 0 to 100) in the code to report how far it got.
 
     Parameters:
     - code: The Python code to execute
+    - profile: Run the code under cProfile and report the hot functions, wall/CPU time and time spent waiting for
+      Blender's main thread. The raw .pstats file is saved in Blender's scratch space for the session.
+    - stream: Send printed output as log messages and progress(...) calls as progress notifications while
+      the code runs, instead of only returning the output at the end
     """
     try:
         # Get the global connection
         blender = get_blender_connection()
-        result = blender.send_command("execute_code", {"code": code})
-        return f"Code executed successfully: {result.get('result', '')}"
+        params = {"code": code, "profile": profile}
+        if stream:
+            result = await _send_streamed(ctx, blender, "execute_code", params)
+        else:
+            result = await asyncio.to_thread(blender.send_command, "execute_code", params)
+        output = f"Code executed successfully: {result.get('result', '')}"
+        if profile and "profile" in result:
+            output += f"\n\nProfile:\n{json.dumps(result['profile'], indent=2)}"
+        return output
     except Exception as e:
         logger.error(f"Error executing code: {str(e)}")
         return f"Error executing code: {str(e)}"
 
+async def _send_streamed(ctx: Context, blender: BlenderConnection, command_type: str,
+                         params: Dict[str, Any]) -> Dict[str, Any]:
+    """Run a command with streaming on, relaying its frames as MCP notifications"""
+    loop = asyncio.get_running_loop()
+    frames: asyncio.Queue = asyncio.Queue()
+
+    def on_frame(frame):
+        loop.call_soon_threadsafe(frames.put_nowait, frame)
+
+    async def relay():
+        # Progress notifications must increase, so repeated or lower values are dropped
+        last = -1.0
+        while True:
+            frame = await frames.get()
+            try:
+                if frame["frame"] == "progress" and frame["progress"] > last:
+                    last = frame["progress"]
+                    await ctx.report_progress(frame["progress"], frame.get("total"), frame.get("message") or None)
+                elif frame["frame"] == "output":
+                    await ctx.info(frame["data"])
+                elif frame["frame"] == "dropped":
+                    await ctx.warning(f"{frame['characters']} characters of output were dropped")
+            except Exception as e:
+                logger.debug(f"Failed to relay frame: {e}")
+            finally:
+                frames.task_done()
+
+    relay_task = asyncio.create_task(relay())
+    try:
+        result = await asyncio.to_thread(blender.send_command, command_type, params, COMMAND_TIMEOUT, on_frame)
+        await asyncio.sleep(0)  # let call_soon_threadsafe deliver the last frames
+        await frames.join()
+        return result
+    finally:
+        relay_task.cancel()
+
+@telemetry_tool("reset_python_namespace")
+@mcp.tool()
+def reset_python_namespace(ctx: Context, names: List[str] = None) -> str:
+    """
+    Forget what earlier execute_blender_code calls defined.
+
+    Parameters:
+    - names: Optional list of variable/function/module names to forget. If omitted, the whole namespace is reset.
+    """
+    try:
+        blender = get_blender_connection()
+        result = blender.send_command("reset_exec_namespace", {"names": names})
+        removed = ", ".join(result.get("removed", [])) or "nothing"
+        return f"Removed from the Python namespace: {removed}"
+    except Exception as e:
+        logger.error(f"Error resetting namespace: {str(e)}")
+        return f"Error resetting namespace: {str(e)}"
+
+@telemetry_tool("get_python_namespaces")
+@mcp.tool()
+def get_python_namespaces(ctx: Context) -> str:
+    """
+    Show the memory used by the persistent execute_blender_code namespaces (per session, largest variables)
+    and by the compiled script cache.
+    """
+    try:
+        blender = get_blender_connection()
+        result = blender.send_command("get_exec_namespaces")
+        return json.dumps(result, indent=2)
+    except Exception as e:
+        logger.error(f"Error getting namespaces: {str(e)}")
+        return f"Error getting namespaces: {str(e)}"
+
+@telemetry_tool("set_profiling")
+@mcp.tool()
+def set_profiling(ctx: Context, enabled: bool = True, top: int = 20) -> str:
+    """
+    Profile every command Blender runs (imports, scene queries, code execution) until switched off.
+    Each result then includes a profile with the top functions and timing breakdown.
+
+    Parameters:
+    - enabled: Turn profiling on or off
+    - top: Number of hot functions to report per command
+    """
+    try:
+        blender = get_blender_connection()
+        result = blender.send_command("set_profiling", {"enabled": enabled, "top": top})
+        return f"Profiling {'enabled' if result.get('enabled') else 'disabled'} (top {result.get('top')} functions)"
+    except Exception as e:
+        logger.error(f"Error setting profiling: {str(e)}")
+        return f"Error setting profiling: {str(e)}"
+
+@telemetry_tool("begin_checkpoint")
+@mcp.tool()
+def begin_checkpoint(ctx: Context, name: str = None) -> str:
+    """
+    Save a restore point of the Blender scene before trying something with execute_blender_code.
+    Use rollback_checkpoint to undo everything done since then (e.g. after checking a screenshot),
+    or commit_checkpoint to keep the changes. Checkpoints are cheap undo steps, not file reloads.
+
+    Parameters:
+    - name: Optional name to refer to the checkpoint by
+    """
+    try:
+        blender = get_blender_connection()
+        result = blender.send_command("begin_checkpoint", {"name": name})
+        return json.dumps(result, indent=2)
+    except Exception as e:
+        logger.error(f"Error creating checkpoint: {str(e)}")
+        return f"Error creating checkpoint: {str(e)}"
+
+@telemetry_tool("rollback_checkpoint")
+@mcp.tool()
+def rollback_checkpoint(ctx: Context, checkpoint_id: str = None) -> str:
+    """
+    Restore the Blender scene to a checkpoint. Checkpoints made after it are discarded,
+    the checkpoint itself stays so it can be rolled back to again.
+
+    Parameters:
+    - checkpoint_id: id or name returned by begin_checkpoint (default: the latest checkpoint)
+    """
+    try:
+        blender = get_blender_connection()
+        result = blender.send_command("rollback", {"checkpoint_id": checkpoint_id})
+        return json.dumps(result, indent=2)
+    except Exception as e:
+        logger.error(f"Error rolling back: {str(e)}")
+        return f"Error rolling back: {str(e)}"
+
+@telemetry_tool("commit_checkpoint")
+@mcp.tool()
+def commit_checkpoint(ctx: Context, checkpoint_id: str = None) -> str:
+    """
+    Keep the changes made since a checkpoint and release the checkpoint.
+
+    Parameters:
+    - checkpoint_id: id or name returned by begin_checkpoint (default: the latest checkpoint)
+    """
+    try:
+        blender = get_blender_connection()
+        result = blender.send_command("commit", {"checkpoint_id": checkpoint_id})
+        return f"Committed checkpoint {result.get('id')}"
+    except Exception as e:
+        logger.error(f"Error committing checkpoint: {str(e)}")
+        return f"Error committing checkpoint: {str(e)}"
+
+@telemetry_tool("get_checkpoints")
+@mcp.tool()
+def get_checkpoints(ctx: Context, keep: int = None) -> str:
+    """
+    List the checkpoints with their memory (undo) or disk (.blend fallback) cost.
+
+    Parameters:
+    - keep: Evict all but the newest `keep` checkpoints first to free their memory
+    """
+    try:
+        blender = get_blender_connection()
+        result = blender.send_command("get_checkpoints", {"keep": keep})
+        return json.dumps(result, indent=2)
+    except Exception as e:
+        logger.error(f"Error getting checkpoints: {str(e)}")
+        return f"Error getting checkpoints: {str(e)}"
+
 @telemetry_tool("get_polyhaven_categories")
 @mcp.tool()
 def get_polyhaven_categories(ctx: Context, asset_type: str = "hdris") -> str:
@@ -384,14 +863,21 @@ def get_polyhaven_categories(ctx: Context, asset_type: str = "hdris") -> str:
 def search_polyhaven_assets(
     ctx: Context,
     asset_type: str = "all",
-    categories: str = None
+    categories: str = None,
+    query: str = None,
+    offset: int = 0,
+    limit: int = 20
 ) -> str:
     """
     Search for assets on Polyhaven with optional filtering.
+    The search runs against a local copy of the Polyhaven catalog, so it is fast and can be repeated freely.
     
     Parameters:
     - asset_type: Type of assets to search for (hdris, textures, models, all)
     - categories: Optional comma-separated list of categories to filter by
+    - query: Optional free text matched against asset names, tags and categories; results are ranked by relevance
+    - offset: Number of results to skip, for paging through results (default 0)
+    - limit: Maximum number of results to return (default 20, max 100)
     
     Returns a list of matching assets with basic information.
     """
@@ -399,7 +885,10 @@ def search_polyhaven_assets(
         blender = get_blender_connection()
         result = blender.send_command("search_polyhaven_assets", {
             "asset_type": asset_type,
-            "categories": categories
+            "categories": categories,
+            "query": query,
+            "offset": offset,
+            "limit": limit
         })
         
         if "error" in result:
@@ -411,14 +900,14 @@ def search_polyhaven_assets(
         returned_count = result["returned_count"]
         
         formatted_output = f"Found {total_count} assets"
+        if query:
+            formatted_output += f" matching '{query}'"
         if categories:
             formatted_output += f" in categories: {categories}"
-        formatted_output += f"\nShowing {returned_count} assets:\n\n"
+        formatted_output += f"\nShowing {returned_count} assets starting at offset {result.get('offset', 0)}:\n\n"
         
-        # Sort assets by download count (popularity)
-        sorted_assets = sorted(assets.items(), key=lambda x: x[1].get("download_count", 0), reverse=True)
-        
-        for asset_id, asset_data in sorted_assets:
+        # Assets are already ranked by relevance (or popularity when no query is given)
+        for asset_id, asset_data in assets.items():
             formatted_output += f"- {asset_data.get('name', asset_id)} (ID: {asset_id})\n"
             formatted_output += f"  Type: {['HDRI', 'Texture', 'Model'][asset_data.get('type', 0)]}\n"
             formatted_output += f"  Categories: {', '.join(asset_data.get('categories', []))}\n"
@@ -436,16 +925,19 @@ def download_polyhaven_asset(
     asset_id: str,
     asset_type: str,
     resolution: str = "1k",
-    file_format: str = None
+    file_format: str = None,
+    pack: bool = False
 ) -> str:
     """
     Download and import a Polyhaven asset into Blender.
+    Textures that are already loaded are reused instead of downloaded again.
     
     Parameters:
     - asset_id: The ID of the asset to download
     - asset_type: The type of asset (hdris, textures, models)
     - resolution: The resolution to download (e.g., 1k, 2k, 4k)
     - file_format: Optional file format (e.g., hdr, exr for HDRIs; jpg, png for textures; gltf, fbx for models)
+    - pack: Pack texture images into the .blend file instead of referencing the local texture cache
     
     Returns a message indicating success or failure.
     """
@@ -455,7 +947,8 @@ def download_polyhaven_asset(
             "asset_id": asset_id,
             "asset_type": asset_type,
             "resolution": resolution,
-            "file_format": file_format
+            "file_format": file_format,
+            "pack": pack
         })
         
         if "error" in result:
@@ -466,11 +959,13 @@ def download_polyhaven_asset(
             
             # Add additional information based on asset type
             if asset_type == "hdris":
-                return f"{message}. The HDRI has been set as the world environment."
+                cached = " (reused the already loaded image)" if result.get("reused") else ""
+                return f"{message}. The HDRI has been set as the world environment{cached}."
             elif asset_type == "textures":
                 material_name = result.get("material", "")
                 maps = ", ".join(result.get("maps", []))
-                return f"{message}. Created material '{material_name}' with maps: {maps}."
+                verb = "Reused" if result.get("reused") else "Created"
+                return f"{message}. {verb} material '{material_name}' with maps: {maps}."
             elif asset_type == "models":
                 return f"{message}. The model has been imported into the current scene."
             else:
@@ -486,7 +981,8 @@ def download_polyhaven_asset(
 def set_texture(
     ctx: Context,
     object_name: str,
-    texture_id: str
+    texture_id: str,
+    pack: bool = False
 ) -> str:
     """
     Apply a previously downloaded Polyhaven texture to an object.
@@ -494,6 +990,7 @@ def set_texture(
     Parameters:
     - object_name: Name of the object to apply the texture to
     - texture_id: ID of the Polyhaven texture to apply (must be downloaded first)
+    - pack: Pack the texture images into the .blend file
     
     Returns a message indicating success or failure.
     """
@@ -502,7 +999,8 @@ def set_texture(
         blender = get_blender_connection()
         result = blender.send_command("set_texture", {
             "object_name": object_name,
-            "texture_id": texture_id
+            "texture_id": texture_id,
+            "pack": pack
         })
         
         if "error" in result:
@@ -560,6 +1058,75 @@ def get_polyhaven_status(ctx: Context) -> str:
         logger.error(f"Error checking PolyHaven status: {str(e)}")
         return f"Error checking PolyHaven status: {str(e)}"
 
+@telemetry_tool("get_task_status")
+@mcp.tool()
+def get_task_status(ctx: Context) -> str:
+    """
+    List the long-running commands (imports, yielding scripts) Blender is currently working through in slices.
+    """
+    try:
+        blender = get_blender_connection()
+        result = blender.send_command("get_task_status")
+        return json.dumps(result, indent=2)
+    except Exception as e:
+        logger.error(f"Error getting task status: {str(e)}")
+        return f"Error getting task status: {str(e)}"
+
+@telemetry_tool("cancel_command")
+@mcp.tool()
+def cancel_command(ctx: Context, request_id: str) -> str:
+    """
+    Cancel a long-running Blender command (an import or a yielding script).
+    Get the request_id from get_task_status. The command stops at its next cancellation check.
+
+    Parameters:
+    - request_id: The request_id of the command to cancel
+    """
+    try:
+        result = get_blender_connection().cancel(request_id)
+        if result.get("cancelled"):
+            return f"Cancellation requested for {request_id}"
+        return f"No running command with request_id {request_id}"
+    except Exception as e:
+        logger.error(f"Error cancelling command: {str(e)}")
+        return f"Error cancelling command: {str(e)}"
+
+@telemetry_tool("get_disk_usage")
+@mcp.tool()
+def get_disk_usage(ctx: Context, reclaim: bool = False) -> str:
+    """
+    Get the disk usage of Blender's scratch space (downloads, extracted archives) and texture cache.
+    Shows the quota, bytes used per session and how much is still referenced by loaded images,
+    and the texture cache's size against its limit.
+
+    Parameters:
+    - reclaim: Delete unreferenced scratch files that are expired or over quota, and evict least
+      recently used texture cache files over its limit, before reporting
+    """
+    try:
+        blender = get_blender_connection()
+        result = blender.send_command("get_disk_usage", {"reclaim": reclaim})
+        return json.dumps(result, indent=2)
+    except Exception as e:
+        logger.error(f"Error getting disk usage: {str(e)}")
+        return f"Error getting disk usage: {str(e)}"
+
+@telemetry_tool("get_provider_stats")
+@mcp.tool()
+def get_provider_stats(ctx: Context) -> str:
+    """
+    Get the rate limiter state of the asset providers (Poly Haven, Sketchfab, Hyper3D, Hunyuan3D).
+    Shows requests in flight, queued requests, average/max queueing time and 429 responses.
+    Useful to tell whether slow imports are caused by provider rate limits.
+    """
+    try:
+        blender = get_blender_connection()
+        result = blender.send_command("get_provider_stats")
+        return json.dumps(result, indent=2)
+    except Exception as e:
+        logger.error(f"Error getting provider stats: {str(e)}")
+        return f"Error getting provider stats: {str(e)}"
+
 @telemetry_tool("get_hyper3d_status")
 @mcp.tool()
 def get_hyper3d_status(ctx: Context) -> str:
@@ -607,7 +1174,8 @@ def search_sketchfab_models(
     query: str,
     categories: str = None,
     count: int = 20,
-    downloadable: bool = True
+    downloadable: bool = True,
+    prefetch_previews: int = 5
 ) -> str:
     """
     Search for models on Sketchfab with optional filtering.
@@ -617,6 +1185,8 @@ def search_sketchfab_models(
     - categories: Optional comma-separated list of categories
     - count: Maximum number of results to return (default 20)
     - downloadable: Whether to include only downloadable models (default True)
+    - prefetch_previews: Number of top results whose preview thumbnails are fetched in the background,
+                         so get_sketchfab_model_preview returns instantly for them (default 5, 0 disables)
 
     Returns a formatted list of matching models.
     """
@@ -627,7 +1197,8 @@ def search_sketchfab_models(
             "query": query,
             "categories": categories,
             "count": count,
-            "downloadable": downloadable
+            "downloadable": downloadable,
+            "prefetch_previews": prefetch_previews
         })
         
         if "error" in result:
@@ -724,7 +1295,8 @@ def get_sketchfab_model_preview(
 def download_sketchfab_model(
     ctx: Context,
     uid: str,
-    target_size: float
+    target_size: float,
+    max_triangles: int = None
 ) -> str:
     """
     Download and import a Sketchfab model by its UID.
@@ -740,6 +1312,8 @@ def download_sketchfab_model(
                   - Car: target_size=4.5 (4.5 meters long)
                   - Person: target_size=1.7 (1.7 meters tall)
                   - Small object (cup, phone): target_size=0.1 to 0.3
+    - max_triangles: Optional triangle budget. Heavy models are decimated to fit it,
+                     which keeps screenshots and scene queries fast (e.g. 100000).
     
     Returns a message with import details including object names, dimensions, and bounding box.
     The model must be downloadable and you must have proper access rights.
@@ -751,7 +1325,8 @@ def download_sketchfab_model(
         result = blender.send_command("download_sketchfab_model", {
             "uid": uid,
             "normalize_size": True,  # Always normalize
-            "target_size": target_size
+            "target_size": target_size,
+            "max_triangles": max_triangles
         })
         
         if result is None:
@@ -783,6 +1358,11 @@ def download_sketchfab_model(
             if result.get("normalized"):
                 scale = result.get("scale_applied", 1.0)
                 output += f"Size normalized: scale factor {scale:.6f} applied (target size: {target_size}m)\n"
+
+            # Add decimation info if a triangle budget was applied
+            if result.get("lod"):
+                lod = result["lod"]
+                output += f"Triangles: {lod['triangles_before']} -> {lod['triangles_after']} (budget: {lod['max_triangles']})\n"
             
             return output
         else:
@@ -802,12 +1382,41 @@ def _process_bbox(original_bbox: list[float] | list[int] | None) -> list[int] |
         raise ValueError("Incorrect number range: bbox must be bigger than zero!")
     return [int(float(i) / max(original_bbox) * 100) for i in original_bbox] if original_bbox else None
 
+def _track_rodin_job(result: Dict[str, Any], name: str, max_triangles: Optional[int] = None) -> Dict[str, Any]:
+    """Hand a freshly created Rodin job to the job manager, returns the tool response"""
+    if result.get("submit_time", False):
+        # MAIN_SITE
+        task_uuid = result["uuid"]
+        subscription_key = result["jobs"]["subscription_key"]
+        job = _job_manager.track(
+            "rodin", task_uuid,
+            {"subscription_key": subscription_key},
+            {"name": name, "task_uuid": task_uuid, "max_triangles": max_triangles},
+        )
+        return {
+            "task_uuid": task_uuid,
+            "subscription_key": subscription_key,
+            "job_id": job.job_id,
+        }
+    if result.get("request_id"):
+        # FAL_AI
+        request_id = result["request_id"]
+        job = _job_manager.track(
+            "rodin", request_id,
+            {"request_id": request_id},
+            {"name": name, "request_id": request_id, "max_triangles": max_triangles},
+        )
+        return {**result, "job_id": job.job_id}
+    return result
+
 @telemetry_tool("generate_hyper3d_model_via_text")
 @mcp.tool()
 def generate_hyper3d_model_via_text(
     ctx: Context,
     text_prompt: str,
-    bbox_condition: list[float]=None
+    bbox_condition: list[float]=None,
+    name: str = "Hyper3D_Model",
+    max_triangles: int = None
 ) -> str:
     """
     Generate 3D asset using Hyper3D by giving description of the desired asset, and import the asset into Blender.
@@ -817,8 +1426,11 @@ def generate_hyper3d_model_via_text(
     Parameters:
     - text_prompt: A short description of the desired model in **English**.
     - bbox_condition: Optional. If given, it has to be a list of floats of length 3. Controls the ratio between [Length, Width, Height] of the model.
+    - name: The name of the imported object in the scene.
+    - max_triangles: Optional. Decimate the imported model to at most this many triangles.
 
-    Returns a message indicating success or failure.
+    The server polls the task and imports the asset automatically when it is done.
+    Returns a job_id; call wait_for_job(job_id) to block until the asset is in the scene.
     """
     try:
         blender = get_blender_connection()
@@ -827,14 +1439,7 @@ def generate_hyper3d_model_via_text(
             "images": None,
             "bbox_condition": _process_bbox(bbox_condition),
         })
-        succeed = result.get("submit_time", False)
-        if succeed:
-            return json.dumps({
-                "task_uuid": result["uuid"],
-                "subscription_key": result["jobs"]["subscription_key"],
-            })
-        else:
-            return json.dumps(result)
+        return json.dumps(_track_rodin_job(result, name, max_triangles))
     except Exception as e:
         logger.error(f"Error generating Hyper3D task: {str(e)}")
         return f"Error generating Hyper3D task: {str(e)}"
@@ -845,7 +1450,9 @@ def generate_hyper3d_model_via_images(
     ctx: Context,
     input_image_paths: list[str]=None,
     input_image_urls: list[str]=None,
-    bbox_condition: list[float]=None
+    bbox_condition: list[float]=None,
+    name: str = "Hyper3D_Model",
+    max_triangles: int = None
 ) -> str:
     """
     Generate 3D asset using Hyper3D by giving images of the wanted asset, and import the generated asset into Blender.
@@ -856,9 +1463,12 @@ def generate_hyper3d_model_via_images(
     - input_image_paths: The **absolute** paths of input images. Even if only one image is provided, wrap it into a list. Required if Hyper3D Rodin in MAIN_SITE mode.
     - input_image_urls: The URLs of input images. Even if only one image is provided, wrap it into a list. Required if Hyper3D Rodin in FAL_AI mode.
     - bbox_condition: Optional. If given, it has to be a list of ints of length 3. Controls the ratio between [Length, Width, Height] of the model.
+    - name: The name of the imported object in the scene.
+    - max_triangles: Optional. Decimate the imported model to at most this many triangles.
 
     Only one of {input_image_paths, input_image_urls} should be given at a time, depending on the Hyper3D Rodin's current mode.
-    Returns a message indicating success or failure.
+    The server polls the task and imports the asset automatically when it is done.
+    Returns a job_id; call wait_for_job(job_id) to block until the asset is in the scene.
     """
     if input_image_paths is not None and input_image_urls is not None:
         return f"Error: Conflict parameters given!"
@@ -884,14 +1494,7 @@ def generate_hyper3d_model_via_images(
             "images": images,
             "bbox_condition": _process_bbox(bbox_condition),
         })
-        succeed = result.get("submit_time", False)
-        if succeed:
-            return json.dumps({
-                "task_uuid": result["uuid"],
-                "subscription_key": result["jobs"]["subscription_key"],
-            })
-        else:
-            return json.dumps(result)
+        return json.dumps(_track_rodin_job(result, name, max_triangles))
     except Exception as e:
         logger.error(f"Error generating Hyper3D task: {str(e)}")
         return f"Error generating Hyper3D task: {str(e)}"
@@ -922,8 +1525,14 @@ def poll_rodin_job_status(
         The task is in progress if status is "IN_PROGRESS".
         If status other than "COMPLETED", "IN_PROGRESS", "IN_QUEUE" showed up, the generating process might be failed.
         This is a polling API, so only proceed if the status are finally determined ("COMPLETED" or some failed state).
+
+    Prefer wait_for_job() for jobs created through this server, they are already polled and imported automatically.
     """
     try:
+        # Jobs tracked by the job manager are already being polled, reuse the latest status
+        job = _job_manager.find(subscription_key or request_id)
+        if job is not None and job.provider_status is not None:
+            return job.provider_status
         blender = get_blender_connection()
         kwargs = {}
         if subscription_key:
@@ -947,6 +1556,7 @@ def import_generated_asset(
     name: str,
     task_uuid: str=None,
     request_id: str=None,
+    max_triangles: int=None,
 ):
     """
     Import the asset generated by Hyper3D Rodin after the generation task is completed.
@@ -955,6 +1565,7 @@ def import_generated_asset(
     - name: The name of the object in scene
     - task_uuid: For Hyper3D Rodin mode MAIN_SITE: The task_uuid given in the generate model step.
     - request_id: For Hyper3D Rodin mode FAL_AI: The request_id given in the generate model step.
+    - max_triangles: Optional. Decimate the imported model to at most this many triangles.
 
     Only give one of {task_uuid, request_id} based on the Hyper3D Rodin Mode!
     Return if the asset has been imported successfully.
@@ -968,6 +1579,8 @@ def import_generated_asset(
             kwargs["task_uuid"] = task_uuid
         elif request_id:
             kwargs["request_id"] = request_id
+        if max_triangles:
+            kwargs["max_triangles"] = max_triangles
         result = blender.send_command("import_generated_asset", kwargs)
         return result
     except Exception as e:
@@ -995,7 +1608,9 @@ def get_hunyuan3d_status(ctx: Context) -> str:
 def generate_hunyuan3d_model(
     ctx: Context,
     text_prompt: str = None,
-    input_image_url: str = None
+    input_image_url: str = None,
+    name: str = "Hunyuan3D_Model",
+    max_triangles: int = None
 ) -> str:
     """
     Generate 3D asset using Hunyuan3D by providing either text description, image reference, 
@@ -1005,9 +1620,12 @@ def generate_hunyuan3d_model(
     Parameters:
     - text_prompt: (Optional) A short description of the desired model in English/Chinese.
     - input_image_url: (Optional) The local or remote url of the input image. Accepts None if only using text prompt.
+    - name: The name of the imported object in the scene (OFFICIAL_API mode).
+    - max_triangles: (Optional) Decimate the imported model to at most this many triangles.
 
     Returns: 
-    - When successful, returns a JSON with job_id (format: "job_xxx") indicating the task is in progress
+    - When successful, returns a JSON with job_id (format: "job_xxx") indicating the task is in progress.
+      The server polls the task and imports the asset automatically; call wait_for_job(job_id) to block until it is in the scene
     - When the job completes, the status will change to "DONE" indicating the model has been imported
     - Returns error message if the operation fails
     """
@@ -1020,6 +1638,11 @@ def generate_hunyuan3d_model(
         if "JobId" in result.get("Response", {}):
             job_id = result["Response"]["JobId"]
             formatted_job_id = f"job_{job_id}"
+            _job_manager.track(
+                "hunyuan", formatted_job_id,
+                {"job_id": formatted_job_id},
+                {"name": name, "max_triangles": max_triangles},
+            )
             return json.dumps({
                 "job_id": formatted_job_id,
             })
@@ -1045,8 +1668,14 @@ def poll_hunyuan_job_status(
         If status is "DONE", returns ResultFile3Ds, which is the generated ZIP model path
         When the status is "DONE", the response includes a field named ResultFile3Ds that contains the generated ZIP file path of the 3D model in OBJ format.
         This is a polling API, so only proceed if the status are finally determined ("DONE" or some failed state).
+
+    Prefer wait_for_job() for jobs created through this server, they are already polled and imported automatically.
     """
     try:
+        # Jobs tracked by the job manager are already being polled, reuse the latest status
+        job = _job_manager.find(job_id)
+        if job is not None and job.provider_status is not None:
+            return job.provider_status
         blender = get_blender_connection()
         kwargs = {
             "job_id": job_id,
@@ -1062,6 +1691,7 @@ def import_generated_asset_hunyuan(
     ctx: Context,
     name: str,
     zip_file_url: str,
+    max_triangles: int=None,
 ):
     """
     Import the asset generated by Hunyuan3D after the generation task is completed.
@@ -1069,6 +1699,7 @@ def import_generated_asset_hunyuan(
     Parameters:
     - name: The name of the object in scene
     - zip_file_url: The zip_file_url given in the generate model step.
+    - max_triangles: Optional. Decimate the imported model to at most this many triangles.
 
     Return if the asset has been imported successfully.
     """
@@ -1079,12 +1710,50 @@ def import_generated_asset_hunyuan(
         }
         if zip_file_url:
             kwargs["zip_file_url"] = zip_file_url
+        if max_triangles:
+            kwargs["max_triangles"] = max_triangles
         result = blender.send_command("import_generated_asset_hunyuan", kwargs)
         return result
     except Exception as e:
         logger.error(f"Error generating Hunyuan3D task: {str(e)}")
         return f"Error generating Hunyuan3D task: {str(e)}"
 
+@telemetry_tool("wait_for_job")
+@mcp.tool()
+async def wait_for_job(
+    ctx: Context,
+    job_id: str,
+    timeout: float = 300.0,
+) -> str:
+    """
+    Wait for a Hyper3D Rodin or Hunyuan3D generation job to finish and be imported into Blender.
+    Progress notifications are sent while waiting.
+
+    Parameters:
+    - job_id: The job_id returned by a generate_* tool
+    - timeout: Maximum number of seconds to wait (default 300). The job keeps running if the wait times out.
+
+    Returns the job state as JSON. status is "DONE" once the asset is imported, "FAILED" on error,
+    otherwise the job is still in progress and wait_for_job can be called again.
+    import_result contains the imported object's name and world_bounding_box.
+    """
+    job = _job_manager.find(job_id)
+    if job is None:
+        return f"Error: Unknown job_id: {job_id}"
+
+    deadline = time.monotonic() + timeout
+    while not job.finished.is_set():
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            await ctx.report_progress(job.progress, 1.0)
+        except Exception as e:
+            logger.debug(f"Failed to report progress: {e}")
+        await asyncio.to_thread(job.finished.wait, min(remaining, 2.0))
+
+    return json.dumps(job.to_dict(), indent=2)
+
 
 @mcp.prompt()
 def asset_creation_strategy() -> str:
@@ -1124,11 +1793,10 @@ def asset_creation_strategy() -> str:
                     - Wait for another day and try again
                     - Go to hyper3d.ai to find out how to get their own API key
                     - Go to fal.ai to get their own private API key
-                2. Poll the status
-                    - Use poll_rodin_job_status() to check if the generation task has completed or failed
-                3. Import the asset
-                    - Use import_generated_asset() to import the generated GLB model the asset
-                4. After importing the asset, ALWAYS check the world_bounding_box of the imported mesh, and adjust the mesh's location and size
+                2. Wait for the asset
+                    - Use wait_for_job() with the returned job_id. The server polls the task and imports the generated GLB model automatically
+                    - Only fall back to poll_rodin_job_status() and import_generated_asset() if no job_id was returned
+                3. After importing the asset, ALWAYS check the world_bounding_box of the imported mesh, and adjust the mesh's location and size
                     Adjust the imported mesh's location, scale, rotation, so that the mesh is on the right spot.
 
                 You can reuse assets previous generated by running python code to duplicate the object, without creating another generation task.
@@ -1146,10 +1814,8 @@ def asset_creation_strategy() -> str:
                         1. Create the model generation task
                             - Use generate_hunyuan3d_model by providing either a **text description** OR an **image(local or urls) reference**.
                             - Go to cloud.tencent.com out how to get their own SecretId and SecretKey
-                        2. Poll the status
-                            - Use poll_hunyuan_job_status() to check if the generation task has completed or failed
-                        3. Import the asset
-                            - Use import_generated_asset_hunyuan() to import the generated OBJ model the asset
+                        2. Wait for the asset
+                            - Use wait_for_job() with the returned job_id. The server polls the task and imports the generated OBJ model automatically
                     if Hunyuan3D mode is "LOCAL_API":
                         - For objects/models, do the following steps:
                         1. Create the model generation task